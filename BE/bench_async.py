@@ -0,0 +1,270 @@
+"""
+동기(WSGI) vs async(ASGI) 배포 동시 처리 벤치마크
+실행: python bench_async.py [--workers 2] [--concurrency 200] [--requests 400] [--latency 0.5]
+
+AI 서버 응답 지연(--latency 초)을 흉내 내는 스텁 서버를 띄우고, 같은 워커 수로
+- sync:  gunicorn config.wsgi (sync 워커, 워커당 요청 1개)
+- async: uvicorn config.asgi (ASYNC_VIEWS_ENABLED=True, AI 응답을 await)
+를 차례로 실행해 Zoom 캡처 API에 --concurrency 개씩 동시에 요청을 보낸다.
+초당 처리량, 응답 시간 중앙값/p95, 스텁 서버가 동시에 받은 최대 분석 요청 수를 비교한다.
+
+Zoom 캡처(파일 전달 모드)는 S3 없이 동작한다. 프레임은 매번 다른 이미지라 중복 판정/결과 캐시를 타지 않는다.
+설정된 DB(DJANGO_SETTINGS_MODULE)에 벤치마크 사용자/세션/기록을 만드므로 운영 DB에서 실행하지 말 것.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django
+
+django.setup()
+
+import httpx
+from django.utils import timezone
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from users.models import User
+from zoom.models import ZoomSession
+
+BENCH_EMAIL = 'bench-async@bench.local'
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class StubAIServer(ThreadingHTTPServer):
+    """/detect_deepfake 에 latency 초 뒤 응답 (동시 처리 수 기록)"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, latency):
+        super().__init__(('127.0.0.1', 0), StubAIHandler)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def reset(self):
+        with self.lock:
+            self.in_flight = 0
+            self.peak_in_flight = 0
+
+
+class StubAIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._send_json({'status': 'ok'})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+        try:
+            time.sleep(server.latency)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+        self._send_json({
+            'face_count': 1,
+            'face_quality_scores': [{'face_id': 1, 'rate': 0.9, 'is_deepfake': False, 'ResultUrl': None}]
+        })
+
+    def _send_json(self, body):
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def get_bench_token():
+    user = User.objects.filter(email=BENCH_EMAIL).first()
+    if user is None:
+        user = User.objects.create_user(email=BENCH_EMAIL, password='bench-pass-123!', nickname='bench')
+    token, _ = Token.objects.get_or_create(user=user)
+    return user, token.key
+
+
+def make_frames(count):
+    """매번 다른 노이즈 프레임 (dHash/콘텐츠 해시가 모두 다름)"""
+    frames = []
+    for _ in range(count):
+        buffer = io.BytesIO()
+        Image.frombytes('RGB', (64, 64), os.urandom(64 * 64 * 3)).save(buffer, format='JPEG')
+        frames.append(buffer.getvalue())
+    return frames
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, workers, port, fastapi_url):
+    env = {
+        **os.environ,
+        'FASTAPI_URL': fastapi_url,
+        'ASYNC_VIEWS_ENABLED': 'True' if mode == 'async' else 'False',
+        # 메모리 전달 모드는 공유 캐시가 필요하므로 워커 여러 개로는 파일 전달 모드 사용
+        'ZOOM_FRAME_TRANSPORT': 'file',
+        # 웹 프로세스 안의 작업 워커는 측정에서 제외
+        'ANALYSIS_EMBEDDED_WORKER': 'False',
+        'PROTECTION_EMBEDDED_WORKER': 'False',
+    }
+    if mode == 'async':
+        command = [
+            sys.executable, '-m', 'uvicorn', 'config.asgi:application',
+            '--host', '127.0.0.1', '--port', str(port),
+            '--workers', str(workers), '--log-level', 'warning'
+        ]
+    else:
+        command = [
+            sys.executable, '-m', 'gunicorn', 'config.wsgi:application',
+            '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+            '--worker-class', 'sync', '--timeout', '600', '--log-level', 'warning'
+        ]
+
+    process = subprocess.Popen(command, cwd=BASE_DIR, env=env)
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'{mode} 서버 실행 실패 (exit {process.returncode})')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.2)
+
+    process.terminate()
+    raise RuntimeError(f'{mode} 서버가 60초 안에 시작되지 않았습니다.')
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def send_captures(url, token, frames, concurrency):
+    """frames 를 concurrency 개씩 동시에 전송, 요청별 (상태 코드, 응답 시간 초)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=600) as client:
+        async def send(frame):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(
+                        url,
+                        headers={'Authorization': f'Token {token}'},
+                        data={'participant_count': '2'},
+                        files={'screenshot': ('frame.jpg', frame, 'image/jpeg')}
+                    )
+                    status_code = response.status_code
+                except httpx.HTTPError:
+                    status_code = None
+                return status_code, time.perf_counter() - start
+
+        return await asyncio.gather(*[send(frame) for frame in frames])
+
+
+def run(mode, args, stub, user, token):
+    session = ZoomSession.objects.create(
+        user=user,
+        session_name=f'bench-{mode}',
+        start_time=timezone.now(),
+        session_status='active'
+    )
+    port = free_port()
+    process = start_server(mode, args.workers, port, f'http://127.0.0.1:{stub.server_address[1]}')
+
+    try:
+        url = f'http://127.0.0.1:{port}/api/zoom/sessions/{session.session_id}/capture/'
+        # 워커 준비(첫 import, DB 연결) 비용은 제외
+        asyncio.run(send_captures(url, token, make_frames(args.workers), args.workers))
+
+        frames = make_frames(args.requests)
+        stub.reset()
+        start = time.perf_counter()
+        results = asyncio.run(send_captures(url, token, frames, args.concurrency))
+        elapsed = time.perf_counter() - start
+    finally:
+        stop_server(process)
+        session.session_status = 'completed'
+        session.end_time = timezone.now()
+        session.save(update_fields=['session_status', 'end_time'])
+
+    latencies = sorted(latency for status_code, latency in results if status_code == 201)
+    failed = len(results) - len(latencies)
+    return {
+        'elapsed': elapsed,
+        'ok': len(latencies),
+        'failed': failed,
+        'throughput': len(latencies) / elapsed if elapsed else 0,
+        'median': statistics.median(latencies) if latencies else None,
+        'p95': latencies[int(len(latencies) * 0.95) - 1] if latencies else None,
+        'peak_in_flight': stub.peak_in_flight,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=2, help='두 배포 모두 같은 워커 프로세스 수')
+    parser.add_argument('--concurrency', type=int, default=200, help='동시에 보내는 요청 수')
+    parser.add_argument('--requests', type=int, default=400, help='모드별 전체 요청 수')
+    parser.add_argument('--latency', type=float, default=0.5, help='AI 서버 응답 지연 (초)')
+    parser.add_argument('--modes', default='sync,async')
+    args = parser.parse_args()
+
+    stub = StubAIServer(args.latency)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    user, token = get_bench_token()
+
+    print(
+        f"워커 {args.workers}개, 동시 요청 {args.concurrency}개, 요청 {args.requests}건, "
+        f"AI 응답 지연 {args.latency}s\n"
+    )
+    results = {}
+    for mode in args.modes.split(','):
+        result = results[mode] = run(mode, args, stub, user, token)
+        print(
+            f"{mode:>5}: {result['throughput']:7.1f} req/s, "
+            f"중앙값 {result['median'] or 0:7.2f}s, p95 {result['p95'] or 0:7.2f}s, "
+            f"AI 동시 요청 최대 {result['peak_in_flight']:4d}, "
+            f"성공 {result['ok']} / 실패 {result['failed']} ({result['elapsed']:.1f}s)"
+        )
+
+    stub.shutdown()
+
+    if {'sync', 'async'} <= results.keys() and results['sync']['throughput']:
+        ratio = results['async']['throughput'] / results['sync']['throughput']
+        print(f"\nasync / sync 처리량: {ratio:.1f}배")
+
+
+if __name__ == '__main__':
+    main()
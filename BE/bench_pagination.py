@@ -0,0 +1,159 @@
+"""
+페이지 번호 vs 키셋 커서 페이지네이션 벤치마크
+실행: python bench_pagination.py [--rows 1000000] [--page-size 20] [--repeat 5] [--cleanup]
+
+벤치마크 사용자 1명에게 분석 기록 --rows 개를 만들고 (이미 있으면 재사용)
+분석 기록 목록과 같은 조건으로 페이지 깊이별 조회 시간을 잰다.
+- page:   PageNumberPagination (COUNT(*) + OFFSET)
+- cursor: KeysetPagination ((created_at, record_id) 커서, COUNT 없음)
+
+설정된 DB(DJANGO_SETTINGS_MODULE)에 실제로 데이터를 넣으므로 운영 DB에서 실행하지 말 것.
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django
+
+django.setup()
+
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from config.pagination import KeysetPagination
+from detection.models import AnalysisRecord
+from users.models import User
+
+BENCH_EMAIL = 'bench-pagination@bench.local'
+BATCH_SIZE = 10000
+
+
+class ListView:
+    """KeysetPagination 에 넘길 뷰 설정 (AnalysisRecordListView 와 동일)"""
+    cursor_ordering = ('-created_at', '-record_id')
+
+
+def get_bench_user():
+    user = User.objects.filter(email=BENCH_EMAIL).first()
+    if user is None:
+        user = User.objects.create_user(email=BENCH_EMAIL, password='bench-pass-123!', nickname='bench')
+    return user
+
+
+def ensure_records(user, rows):
+    """기록이 rows 개가 되도록 bulk_create (통계 시그널은 거치지 않음)"""
+    existing = AnalysisRecord.objects.filter(user=user).count()
+    remaining = rows - existing
+    if remaining <= 0:
+        return existing
+
+    print(f"분석 기록 {remaining}개 생성 중...")
+    start = time.perf_counter()
+    while remaining > 0:
+        count = min(BATCH_SIZE, remaining)
+        AnalysisRecord.objects.bulk_create([
+            AnalysisRecord(
+                user=user,
+                analysis_type='image',
+                file_name=f'{i}.jpg',
+                file_size=1024,
+                file_format='jpg',
+                original_path='',
+                analysis_result='safe',
+                confidence_score=90,
+                processing_time=100,
+                ai_model_version='bench'
+            )
+            for i in range(count)
+        ])
+        remaining -= count
+    print(f"생성 완료 ({time.perf_counter() - start:.1f}초)\n")
+    return rows
+
+
+def list_queryset(user):
+    """AnalysisRecordListView.get_queryset 과 같은 조건"""
+    return AnalysisRecord.objects.filter(user=user, job_status='completed').exclude(analysis_type='zoom')
+
+
+def make_request(query):
+    return Request(APIRequestFactory().get(f'/api/detection/records/?{query}'))
+
+
+def cursor_at(user, offset):
+    """offset 번째 행 직전 위치의 커서 (측정 전 준비용)"""
+    if offset == 0:
+        return None
+    row = list_queryset(user).order_by('-created_at', '-record_id')[offset - 1]
+    paginator = KeysetPagination()
+    paginator.field, paginator.tiebreaker = 'created_at', 'record_id'
+    return paginator.encode_cursor(row, reverse=False)
+
+
+def measure(paginate, repeat):
+    timings = []
+    for _ in range(repeat):
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            rows = paginate()
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(queries), len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--cleanup', action='store_true', help='측정 후 벤치마크 데이터 삭제')
+    args = parser.parse_args()
+
+    user = get_bench_user()
+    total = ensure_records(user, args.rows)
+    last_page = max(1, (total + args.page_size - 1) // args.page_size)
+
+    print(f"{connection.vendor}, 사용자 1명 기록 {total}행, 페이지당 {args.page_size}행, {args.repeat}회 중앙값\n")
+    print(f"{'페이지':>10} | {'page (ms)':>10} {'쿼리':>4} | {'cursor (ms)':>11} {'쿼리':>4} | {'배율':>6}")
+
+    for page in sorted({1, 2, last_page // 100 or 1, last_page // 2 or 1, last_page}):
+        page_request = make_request(f'page={page}&page_size={args.page_size}')
+        page_paginator = PageNumberPagination()
+        page_paginator.page_size = args.page_size
+
+        cursor = cursor_at(user, (page - 1) * args.page_size)
+        query = f'pagination=cursor&page_size={args.page_size}'
+        if cursor:
+            query += f'&cursor={cursor}'
+        cursor_request = make_request(query)
+
+        page_ms, page_queries, _ = measure(
+            lambda: page_paginator.paginate_queryset(list_queryset(user), page_request),
+            args.repeat
+        )
+        cursor_ms, cursor_queries, _ = measure(
+            lambda: KeysetPagination().paginate_queryset(list_queryset(user), cursor_request, ListView()),
+            args.repeat
+        )
+
+        print(
+            f"{page:>10} | {page_ms:10.2f} {page_queries:>4} | {cursor_ms:11.2f} {cursor_queries:>4} | "
+            f"{page_ms / cursor_ms if cursor_ms else 0:5.1f}x"
+        )
+
+    if args.cleanup:
+        # 시그널(통계 갱신)을 거치지 않고 한 번에 삭제
+        deleted = AnalysisRecord.objects.filter(user=user)._raw_delete(connection.alias)
+        user.delete()
+        print(f"\n벤치마크 데이터 삭제: {deleted}행")
+
+
+if __name__ == '__main__':
+    main()
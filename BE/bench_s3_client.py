@@ -0,0 +1,193 @@
+"""
+S3 클라이언트 재사용 벤치마크 (분석 기록 목록 API 전체)
+실행: python bench_s3_client.py [--rows 20] [--repeat 20] [--cleanup]
+
+벤치마크 사용자에게 S3 에 올라간 이미지(썸네일 포함) 기록 --rows 개를 만들고
+AnalysisRecordListView 1페이지 요청을 인증, 쿼리, 직렬화(이미지/썸네일 서명), JSON 렌더링까지 그대로 실행한다.
+- before: S3Storage 를 만들 때마다 boto3.client('s3') 새로 생성 (변경 전), URL 캐시 없음
+- after:  공용 클라이언트(get_s3_client) 재사용, URL 캐시 없음 (요청마다 새로 서명)
+- cached: 공용 클라이언트 + Presigned URL 캐시 (같은 페이지 재요청)
+
+Presigned URL 서명은 로컬 연산이라 네트워크/실제 자격 증명 없이 실행된다.
+설정된 DB(DJANGO_SETTINGS_MODULE)에 실제로 데이터를 넣으므로 운영 DB에서 실행하지 말 것.
+"""
+
+import argparse
+import os
+import statistics
+import time
+from unittest import mock
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'bench-access-key')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'bench-secret-key')
+os.environ.setdefault('AWS_STORAGE_BUCKET_NAME', 'bench-bucket')
+
+import django
+
+django.setup()
+
+import boto3
+from botocore.config import Config
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from detection.models import AnalysisRecord
+from detection.views import AnalysisRecordListView
+from media_files.models import MediaFile
+from media_files.storage import presigned_url_cache
+from media_files.thumbnails import THUMBNAIL_PURPOSE, THUMBNAIL_RELATED_MODEL
+from users.models import User
+
+BENCH_EMAIL = 'bench-s3-client@bench.local'
+
+
+def get_bench_user():
+    user = User.objects.filter(email=BENCH_EMAIL).first()
+    if user is None:
+        user = User.objects.create_user(email=BENCH_EMAIL, password='bench-pass-123!', nickname='bench')
+    return user
+
+
+def s3_media_file(user, s3_key, **fields):
+    return MediaFile(
+        user=user,
+        original_name=s3_key.rsplit('/', 1)[-1],
+        file_name=s3_key.rsplit('/', 1)[-1],
+        file_size=1024,
+        file_type='image',
+        file_format=s3_key.rsplit('.', 1)[-1],
+        mime_type='image/jpeg',
+        storage_type='s3',
+        file_path=f'https://{settings.AWS_S3_CUSTOM_DOMAIN}/{s3_key}',
+        s3_key=s3_key,
+        s3_bucket=settings.AWS_STORAGE_BUCKET_NAME,
+        **fields
+    )
+
+
+def ensure_records(user, rows):
+    """S3 이미지 + 크기별 썸네일이 연결된 기록이 rows 개가 되도록 생성"""
+    existing = AnalysisRecord.objects.filter(user=user).count()
+    for i in range(existing, rows):
+        record = AnalysisRecord.objects.create(
+            user=user,
+            analysis_type='image',
+            file_name=f'{i}.jpg',
+            file_size=1024,
+            file_format='jpg',
+            original_path=f'detection/user_{user.user_id}/{i}.jpg',
+            analysis_result='safe',
+            confidence_score=90,
+            processing_time=100,
+            ai_model_version='bench'
+        )
+        source = s3_media_file(
+            user,
+            f'detection/user_{user.user_id}/{i}.jpg',
+            purpose='detection',
+            related_model='AnalysisRecord',
+            related_record_id=record.record_id
+        )
+        source.save()
+        MediaFile.objects.bulk_create([
+            s3_media_file(
+                user,
+                f'detection/user_{user.user_id}/{i}_{size}.webp',
+                purpose=THUMBNAIL_PURPOSE,
+                related_model=THUMBNAIL_RELATED_MODEL,
+                related_record_id=source.file_id,
+                metadata={'thumbnail_size': size}
+            )
+            for size in settings.THUMBNAIL_SIZES
+        ])
+    return max(existing, rows)
+
+
+def new_client_each_time():
+    """변경 전 S3Storage.__init__: 매번 새 클라이언트"""
+    return boto3.client(
+        's3',
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_REGION,
+        config=Config(max_pool_connections=settings.AWS_S3_MAX_POOL_CONNECTIONS)
+    )
+
+
+def request_page(view, user, page_size):
+    """목록 1페이지 요청 → 렌더링된 응답"""
+    request = APIRequestFactory().get(f'/api/detection/records/?page_size={page_size}')
+    force_authenticate(request, user=user)
+    response = view(request)
+    response.render()
+    assert response.status_code == 200, response.status_code
+    return response
+
+
+def measure(view, user, page_size, repeat, keep_url_cache):
+    timings = []
+    for _ in range(repeat):
+        if not keep_url_cache:
+            presigned_url_cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = request_page(view, user, page_size)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings, len(queries), len(response.data['results'])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=settings.REST_FRAMEWORK['PAGE_SIZE'])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--cleanup', action='store_true', help='측정 후 벤치마크 데이터 삭제')
+    args = parser.parse_args()
+
+    user = get_bench_user()
+    total = ensure_records(user, args.rows)
+    view = AnalysisRecordListView.as_view()
+
+    # 첫 요청(import, 공용 클라이언트 생성, 쿼리 준비) 비용은 제외
+    request_page(view, user, args.rows)
+
+    print(f"목록 1페이지 = {args.rows}행 (기록 {total}개, 이미지 + 썸네일 서명), {args.repeat}회 반복\n")
+    results = {}
+    for name, patch_client, keep_url_cache in [
+        ('before', True, False),
+        ('after', False, False),
+        ('cached', False, True),
+    ]:
+        patcher = mock.patch('media_files.storage.get_s3_client', side_effect=new_client_each_time)
+        if patch_client:
+            patcher.start()
+        try:
+            timings, query_count, row_count = measure(view, user, args.rows, args.repeat, keep_url_cache)
+        finally:
+            if patch_client:
+                patcher.stop()
+
+        results[name] = statistics.median(timings)
+        print(
+            f"{name:>6}: 중앙값 {results[name]:8.2f} ms/요청, 최대 {max(timings):8.2f} ms, "
+            f"쿼리 {query_count}개, {row_count}행"
+        )
+
+    saved = results['before'] - results['after']
+    print(f"\n요청당 절감: {saved:.2f} ms ({saved / results['before'] * 100:.1f}%)")
+    cached_saved = results['after'] - results['cached']
+    print(f"URL 캐시 추가 절감: {cached_saved:.2f} ms ({cached_saved / results['after'] * 100:.1f}%)")
+
+    if args.cleanup:
+        record_ids = list(AnalysisRecord.objects.filter(user=user).values_list('record_id', flat=True))
+        MediaFile.objects.filter(user=user).delete()
+        # 시그널(통계 갱신)을 거치지 않고 한 번에 삭제
+        deleted = AnalysisRecord.objects.filter(record_id__in=record_ids)._raw_delete(connection.alias)
+        user.delete()
+        print(f"\n벤치마크 데이터 삭제: 기록 {deleted}행")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,11 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+HTTP 요청은 Django가 처리하고, WebSocket 연결은 경로에 맞는 컨슈머로 보낸다.
+WebSocket을 쓰려면 ASGI 서버로 실행해야 한다.
+    uvicorn config.asgi:application
+    gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
@@ -13,4 +18,27 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
-application = get_asgi_application()
+# Django 초기화 후에 모델을 쓰는 라우팅을 import
+django_application = get_asgi_application()
+
+from zoom.routing import websocket_urlpatterns  # noqa: E402
+
+
+async def websocket_application(scope, receive, send):
+    """경로가 맞는 WebSocket 컨슈머 실행 (없으면 연결 거부)"""
+    for pattern, consumer_class in websocket_urlpatterns:
+        match = pattern.match(scope['path'])
+        if match:
+            consumer = consumer_class(scope, receive, send, **match.groupdict())
+            await consumer()
+            return
+
+    await receive()  # websocket.connect
+    await send({'type': 'websocket.close', 'code': 4404})
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        await websocket_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -0,0 +1,163 @@
+"""
+async 뷰 공통 (ASGI 배포)
+
+DRF APIView 는 동기 뷰라 AI 서버 응답을 기다리는 동안 워커 스레드 하나를 그대로 붙잡는다.
+AsyncAPIView 는 Django async 뷰 위에서 DRF 인증/권한/파서/응답(Response)을 그대로 쓰고,
+- 인증, 권한 확인, multipart 파싱처럼 DB/파일 I/O 가 있는 단계는 스레드 풀에서 실행
+- 핸들러(async def post)는 AI 서버 응답을 이벤트 루프에서 await
+하므로 ASGI 워커 1개가 수백 건의 분석 요청을 동시에 들고 있을 수 있다.
+
+사용법:
+    class AsyncImageAnalysisView(AsyncAPIView):
+        async def post(self, request):
+            media_file = await database_sync_to_async(upload_for_detection)(...)
+            result = await ainfer_media_file(media_file, 'image')
+            return Response(...)
+
+WSGI 로 실행해도 동작하지만 요청마다 이벤트 루프를 새로 만들므로 이점이 없다.
+ASYNC_VIEWS_ENABLED=True 로 uvicorn(config.asgi) 배포에서만 켠다.
+"""
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import Http404
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+
+def database_sync_to_async(func):
+    """
+    DB를 쓰는 동기 함수를 스레드 풀에서 실행
+
+    thread_sensitive=False 로 여러 요청의 작업이 한 스레드에 줄 서지 않게 하고,
+    요청 사이클 밖의 스레드이므로 앞뒤로 오래된 DB 연결을 정리한다.
+    """
+    def inner(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(inner, thread_sensitive=False)
+
+
+class AsyncAPIView(View):
+    """DRF 인증/권한/파서/Response 를 쓰는 async 뷰 (핸들러는 async def)"""
+
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = api_settings.DEFAULT_PERMISSION_CLASSES
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    content_negotiation_class = api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # APIView 와 같이 CSRF 는 SessionAuthentication 이 세션 인증 요청에만 확인
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        self.format_kwarg = kwargs.get(api_settings.FORMAT_SUFFIX_KWARG)
+        request = Request(
+            request,
+            parsers=[parser() for parser in self.parser_classes],
+            authenticators=[auth() for auth in self.authentication_classes],
+            parser_context={'view': self, 'args': args, 'kwargs': kwargs}
+        )
+        self.request = request
+
+        try:
+            await database_sync_to_async(self.initial)(request)
+
+            method = request.method.lower()
+            handler = getattr(self, method, None) if method in self.http_method_names else None
+            if handler is None:
+                raise exceptions.MethodNotAllowed(request.method)
+
+            response = await handler(request, *args, **kwargs)
+        except (exceptions.APIException, Http404) as exc:
+            response = self.handle_exception(request, exc)
+
+        return self.finalize_response(request, response)
+
+    def initial(self, request):
+        """콘텐츠 협상 → 인증 → 권한 확인 → 요청 제한 → 본문 파싱 (스레드 풀에서 실행)"""
+        renderer, media_type = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = renderer, media_type
+
+        request.user
+
+        for permission in [permission() for permission in self.permission_classes]:
+            if not permission.has_permission(request, self):
+                if request.authenticators and not request.successful_authenticator:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permission, 'message', None))
+
+        self.check_throttles(request)
+
+        # 핸들러에서 request.data 를 읽을 때 이벤트 루프가 막히지 않도록 미리 파싱
+        request.data
+
+    def perform_content_negotiation(self, request, force=False):
+        """APIView 와 같은 렌더러 선택 (force=True 면 실패 시 첫 렌더러)"""
+        renderers = [renderer() for renderer in self.renderer_classes]
+        try:
+            return self.content_negotiation_class().select_renderer(request, renderers, self.format_kwarg)
+        except Exception:
+            if force:
+                return (renderers[0], renderers[0].media_type)
+            raise
+
+    def check_throttles(self, request):
+        """요청 제한 (APIView.check_throttles 와 같이 초과 시 429 + Retry-After)"""
+        durations = [
+            throttle.wait()
+            for throttle in [throttle() for throttle in self.throttle_classes]
+            if not throttle.allow_request(request, self)
+        ]
+        if durations:
+            raise exceptions.Throttled(max(
+                (duration for duration in durations if duration is not None),
+                default=None
+            ))
+
+    def handle_exception(self, request, exc):
+        """APIView.handle_exception 과 같은 오류 응답 (인증 실패는 401 + WWW-Authenticate)"""
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            auth_header = (
+                request.authenticators[0].authenticate_header(request)
+                if request.authenticators else None
+            )
+            if auth_header:
+                exc.auth_header = auth_header
+            else:
+                exc.status_code = status.HTTP_403_FORBIDDEN
+
+        return exception_handler(exc, {
+            'view': self,
+            'args': self.args,
+            'kwargs': self.kwargs,
+            'request': request
+        })
+
+    def finalize_response(self, request, response):
+        """Response 렌더러 지정 (렌더링은 Django 핸들러가 수행)"""
+        if not hasattr(request, 'accepted_renderer'):
+            # 협상 전에 실패한 요청 (406 등)
+            request.accepted_renderer, request.accepted_media_type = \
+                self.perform_content_negotiation(request, force=True)
+        response.accepted_renderer = request.accepted_renderer
+        response.accepted_media_type = request.accepted_media_type
+        response.renderer_context = {
+            'view': self,
+            'args': self.args,
+            'kwargs': self.kwargs,
+            'request': request
+        }
+        return response
@@ -0,0 +1,191 @@
+"""
+키셋(커서) 페이지네이션
+
+PageNumberPagination 은 페이지마다 COUNT(*) + OFFSET 조회를 하므로 기록이 쌓일수록 느려진다.
+KeysetPagination 은 (정렬 필드, 기본키) 로 마지막 행 위치를 커서에 담아
+WHERE (created_at, id) < (커서) ORDER BY created_at DESC, id DESC LIMIT n 으로 조회한다.
+(user, -created_at) 인덱스를 그대로 타고, 페이지 깊이와 무관하게 일정한 시간이 걸린다.
+
+엔드포인트별로 켜고, 기존 클라이언트를 위해 페이지 번호 방식도 그대로 지원한다.
+- ?pagination=cursor 또는 ?cursor=... → 커서 방식 {next, previous, results}
+- 그 외 (?page=N)                     → 기존 페이지 번호 방식 {count, next, previous, results}
+
+사용법:
+    class AnalysisRecordListView(generics.ListAPIView):
+        pagination_class = KeysetPagination
+        cursor_ordering = ('-created_at', '-record_id')  # (정렬 필드, 타이브레이커)
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """(정렬 필드, 기본키) 키셋 커서 페이지네이션 + 페이지 번호 호환 모드"""
+
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+
+    invalid_cursor_message = '잘못된 커서입니다.'
+
+    def __init__(self):
+        self.fallback = None
+
+    # ---------------------------------------------------------------
+    # 모드 선택
+    # ---------------------------------------------------------------
+
+    def use_cursor(self, request):
+        return (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == 'cursor'
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.use_cursor(request):
+            # 기존 페이지 번호 방식
+            self.fallback = PageNumberPagination()
+            return self.fallback.paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        field, tiebreaker = getattr(view, 'cursor_ordering', ('-created_at', '-pk'))
+        self.descending = field.startswith('-')
+        self.field = field.lstrip('-')
+        self.tiebreaker = tiebreaker.lstrip('-')
+        self.model_field = queryset.model._meta.get_field(self.field)
+
+        cursor = self.decode_cursor(request)
+        self.reverse = cursor is not None and cursor['r']
+
+        # 역방향(이전 페이지)이면 정렬을 뒤집어 조회한 뒤 결과를 다시 뒤집음
+        descending = self.descending != self.reverse
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(f'{prefix}{self.field}', f'{prefix}{self.tiebreaker}')
+
+        if cursor is not None:
+            # (field, pk) < (v, id) 를 인덱스 범위 조건으로 쓸 수 있게
+            # field <= v AND NOT (field = v AND pk >= id) 로 표현 (OR 는 인덱스를 못 탐)
+            range_lookup, tie_lookup = ('lte', 'gte') if descending else ('gte', 'lte')
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__{range_lookup}': cursor['v']})
+                & ~Q(**{self.field: cursor['v'], f'{self.tiebreaker}__{tie_lookup}': cursor['pk']})
+            )
+
+        # 한 행 더 읽어 다음 페이지 존재 여부 확인 (COUNT 없음)
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if self.reverse:
+            rows.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    # ---------------------------------------------------------------
+    # 응답
+    # ---------------------------------------------------------------
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if self.fallback is not None:
+            return self.fallback.get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self.build_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if self.fallback is not None:
+            return self.fallback.get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self.build_link(self.page[0], reverse=True)
+
+    def build_link(self, row, reverse):
+        url = remove_query_param(self.base_url, 'page')
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(row, reverse))
+
+    # ---------------------------------------------------------------
+    # 커서 인코딩
+    # ---------------------------------------------------------------
+
+    def encode_cursor(self, row, reverse):
+        value = getattr(row, self.field)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+
+        payload = {'v': value, 'pk': getattr(row, self.tiebreaker), 'r': int(reverse)}
+        encoded = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode())
+        return encoded.decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        """
+        Returns:
+            dict | None: {'v': 정렬 필드 값, 'pk': 타이브레이커 값, 'r': 역방향 여부}
+
+        Raises:
+            NotFound: 잘못된 커서
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            padding = '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(encoded + padding))
+            return {
+                'v': self.model_field.to_python(payload['v']),
+                'pk': int(payload['pk']),
+                'r': bool(payload.get('r', 0))
+            }
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
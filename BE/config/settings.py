@@ -101,6 +101,16 @@ DATABASES = {
     }
 }
 
+# 캐시 (REDIS_URL 이 있으면 워커 프로세스 공용 Redis, 없으면 프로세스별 메모리 캐시)
+REDIS_URL = os.getenv('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -208,6 +218,22 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 IMAGE_MAX_SIZE = 10 * 1024 * 1024  # 10MB
 IMAGE_ALLOWED_EXTENSIONS = ['jpg', 'jpeg', 'png', 'webp']
 
+# 분석용 이미지 정규화 (EXIF 회전 적용, 메타데이터 제거, 긴 변 제한, 재인코딩)
+IMAGE_NORMALIZE_ENABLED = os.getenv('IMAGE_NORMALIZE_ENABLED', 'True') == 'True'
+IMAGE_NORMALIZE_PURPOSES = ['detection', 'zoom']  # 보호(워터마크)용 원본은 건드리지 않음
+IMAGE_NORMALIZE_MAX_EDGE = int(os.getenv('IMAGE_NORMALIZE_MAX_EDGE', '1280'))  # 긴 변 최대 픽셀 (모델 입력 크기)
+IMAGE_NORMALIZE_QUALITY = int(os.getenv('IMAGE_NORMALIZE_QUALITY', '90'))  # JPEG 품질
+IMAGE_NORMALIZE_KEEP_ORIGINAL = os.getenv('IMAGE_NORMALIZE_KEEP_ORIGINAL', 'False') == 'True'  # 원본도 별도 MediaFile 로 보관
+
+# 목록 화면용 WebP 썸네일 (원본 옆에 저장, 임시 파일은 목록에서 처음 조회될 때 생성)
+THUMBNAIL_ENABLED = os.getenv('THUMBNAIL_ENABLED', 'True') == 'True'
+THUMBNAIL_PURPOSES = ['detection', 'zoom', 'profiles']
+THUMBNAIL_SIZES = [128, 256, 512]  # 긴 변 픽셀
+THUMBNAIL_DEFAULT_SIZE = 256  # ?thumbnail_size 가 없을 때
+THUMBNAIL_QUALITY = 80  # WebP 품질
+THUMBNAIL_LAZY_ASYNC = os.getenv('THUMBNAIL_LAZY_ASYNC', 'True') == 'True'  # 지연 생성을 백그라운드로 (False면 조회 요청 안에서)
+THUMBNAIL_LAZY_WORKERS = int(os.getenv('THUMBNAIL_LAZY_WORKERS', '2'))  # 지연 생성 동시 처리 수 (프로세스 공용)
+
 # 비디오 파일 설정
 VIDEO_MAX_SIZE = 500 * 1024 * 1024  # 500MB
 VIDEO_MAX_DURATION = 30 * 60  # 30분 (초 단위)
@@ -219,6 +245,67 @@ FASTAPI_URL = os.getenv('FASTAPI_URL', 'http://localhost:8001')
 AI_REQUEST_TIMEOUT = 300  # 5분
 
 FASTAPI_WATERMARK_URL = os.getenv('FASTAPI_WATERMARK_URL', 'http://localhost:8002')
+PROTECTION_UPLOAD_WORKERS = int(os.getenv('PROTECTION_UPLOAD_WORKERS', '4'))  # 요청 처리 중 파일별 동시 업로드 수 (프로세스 공용)
+PROTECTION_BATCH_WORKERS = int(os.getenv('PROTECTION_BATCH_WORKERS', '10'))  # 워커의 파일별 워터마크 동시 호출 수 (프로세스 공용)
+PROTECTION_TIMEOUT = 600  # 워터마크 호출 읽기 타임아웃 (초)
+
+# AI 서버 HTTP 커넥션 풀
+AI_HTTP_POOL_SIZE = int(os.getenv('AI_HTTP_POOL_SIZE', '10'))  # 서버당 유지할 커넥션 수
+AI_HTTP_POOL_BLOCK = False  # True면 풀이 가득 찼을 때 새 커넥션 대신 대기
+AI_HTTP_CONNECT_TIMEOUT = 3  # 연결 타임아웃 (초), 읽기 타임아웃은 요청별
+AI_HTTP_MAX_RETRIES = 2  # GET/HEAD 재시도 횟수
+AI_HTTP_RETRY_BACKOFF = 0.5  # 재시도 백오프 계수 (초)
+AI_ASYNC_POOL_SIZE = int(os.getenv('AI_ASYNC_POOL_SIZE', '200'))  # async 뷰: 이벤트 루프당 서버별 동시 연결 수
+
+# async 뷰 (이미지 분석 / Zoom 캡처)
+ASYNC_VIEWS_ENABLED = os.getenv('ASYNC_VIEWS_ENABLED', 'False') == 'True'  # uvicorn(config.asgi) 배포에서만 True
+
+# AI 서버 상태 캐시 / 서킷 브레이커
+AI_HEALTH_CACHE_TTL = 30  # 상태 캐시 유효 시간 (초)
+AI_HEALTH_PROBE_TIMEOUT = 2  # 백그라운드 /health 확인 타임아웃 (초)
+AI_CIRCUIT_FAILURE_THRESHOLD = 3  # 연속 실패 몇 번이면 차단할지
+AI_CIRCUIT_RESET_TIMEOUT = 30  # 차단 후 재확인까지 대기 (초)
+
+
+# 비동기 분석 작업 설정 (DB 기반 큐)
+ANALYSIS_EMBEDDED_WORKER = os.getenv('ANALYSIS_EMBEDDED_WORKER', 'True') == 'True'  # 웹 프로세스 안에서 워커 실행
+ANALYSIS_WORKER_CONCURRENCY = int(os.getenv('ANALYSIS_WORKER_CONCURRENCY', '4'))  # 워커당 동시 분석 수
+ANALYSIS_MAX_IN_FLIGHT_PER_USER = int(os.getenv('ANALYSIS_MAX_IN_FLIGHT_PER_USER', '2'))  # 사용자당 동시 분석 수
+ANALYSIS_MAX_PENDING_PER_USER = int(os.getenv('ANALYSIS_MAX_PENDING_PER_USER', '10'))  # 사용자당 대기 가능 작업 수
+ANALYSIS_WORKER_POLL_INTERVAL = 2  # 초
+ANALYSIS_JOB_STALE_TIMEOUT = AI_REQUEST_TIMEOUT * 2  # 처리 중 상태로 멈춘 작업 재등록 기준 (초)
+
+# 일괄 이미지 분석 (detection/batch/)
+DETECTION_BATCH_MAX_IMAGES = int(os.getenv('DETECTION_BATCH_MAX_IMAGES', '20'))  # 요청당 최대 이미지 수
+DETECTION_BATCH_WORKERS = int(os.getenv('DETECTION_BATCH_WORKERS', '8'))  # 프로세스당 동시 업로드/분석 수
+
+# 보호 작업 워커 설정 (DB 기반 큐)
+PROTECTION_EMBEDDED_WORKER = os.getenv('PROTECTION_EMBEDDED_WORKER', 'True') == 'True'  # 웹 프로세스 안에서 워커 실행
+PROTECTION_WORKER_CONCURRENCY = int(os.getenv('PROTECTION_WORKER_CONCURRENCY', '2'))  # 워커당 동시 작업 수
+PROTECTION_WORKER_POLL_INTERVAL = 2  # 초
+PROTECTION_JOB_STALE_TIMEOUT = PROTECTION_TIMEOUT * 3  # 처리 중 상태로 멈춘 작업 재등록 기준 (초)
+
+# 분석 결과 캐시 (콘텐츠 해시 + 모델 버전, 같은 파일은 AI 서버 재호출 없이 결과 재사용)
+ANALYSIS_RESULT_CACHE_ALIAS = os.getenv('ANALYSIS_RESULT_CACHE_ALIAS', 'default')
+ANALYSIS_RESULT_CACHE_TTL = int(os.getenv('ANALYSIS_RESULT_CACHE_TTL', str(7 * 24 * 60 * 60)))  # 초, 0이면 사용 안 함
+
+# Zoom 캡처 중복 프레임 판정 (dHash 64비트)
+ZOOM_DEDUP_ENABLED = os.getenv('ZOOM_DEDUP_ENABLED', 'True') == 'True'
+ZOOM_DEDUP_HAMMING_THRESHOLD = int(os.getenv('ZOOM_DEDUP_HAMMING_THRESHOLD', '5'))  # 이 거리 이하면 같은 화면
+ZOOM_DEDUP_MAX_REUSE = int(os.getenv('ZOOM_DEDUP_MAX_REUSE', '20'))  # 연속 재사용 후 한 번은 실제 분석
+
+# Zoom 실시간 캡처 채널 (WebSocket)
+ZOOM_WS_MAX_IN_FLIGHT = int(os.getenv('ZOOM_WS_MAX_IN_FLIGHT', '2'))  # 연결당 동시에 분석하는 프레임 수
+
+# Zoom 캡처 프레임 전달 방식
+# memory: 디스크/MediaFile 없이 단기 캐시에 올려 두고 AI 서버가 토큰 URL로 가져감
+#         AI 서버의 GET 은 다른 워커 프로세스로 갈 수 있으므로 공유 캐시(Redis 등) 필수 (시스템 체크 zoom.E001)
+# file: MEDIA_ROOT 에 임시 저장 후 로컬 경로 전달 (기존 방식)
+ZOOM_FRAME_TRANSPORT = os.getenv('ZOOM_FRAME_TRANSPORT', 'file')
+ZOOM_FRAME_CACHE_ALIAS = os.getenv('ZOOM_FRAME_CACHE_ALIAS', 'default')  # memory 모드: 워커 간 공유 캐시여야 함
+ZOOM_FRAME_BLOB_TTL = AI_REQUEST_TIMEOUT + 30  # 초
+ZOOM_FRAME_BASE_URL = os.getenv('ZOOM_FRAME_BASE_URL', '')  # AI 서버가 접근할 백엔드 주소 (비우면 요청 Host 사용)
+ZOOM_RETAIN_ALERT_FRAMES = os.getenv('ZOOM_RETAIN_ALERT_FRAMES', 'True') == 'True'  # 경고 프레임만 보관
 
 
 # 로깅 설정
@@ -234,6 +321,11 @@ LOGGING = {
             'format': '{levelname} {message}',
             'style': '{',
         },
+        # 단계별 처리 시간 (메시지 자체가 JSON 1줄)
+        'json_line': {
+            'format': '{message}',
+            'style': '{',
+        },
     },
     'handlers': {
         'console': {
@@ -245,6 +337,11 @@ LOGGING = {
             'filename': BASE_DIR / 'logs' / 'debug.log',
             'formatter': 'verbose',
         },
+        'stage_timings_file': {
+            'class': 'logging.FileHandler',
+            'filename': BASE_DIR / 'logs' / 'stage_timings.log',
+            'formatter': 'json_line',
+        },
     },
     'root': {
         'handlers': ['console', 'file'],
@@ -256,12 +353,31 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        # async 뷰의 AI 서버 호출마다 남는 INFO 로그 제외
+        'httpx': {
+            'level': 'WARNING',
+        },
+        # 요청/작업별 단계 시간 JSON 로그 (media_files/timing.py)
+        'media_files.timing': {
+            'handlers': ['stage_timings_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
 # logs 디렉토리 생성
 os.makedirs(BASE_DIR / 'logs', exist_ok=True)
 
+# SystemLog 비동기 일괄 기록 (media_files/log_writer.py)
+SYSTEM_LOG_ASYNC = os.getenv('SYSTEM_LOG_ASYNC', 'True') == 'True'
+SYSTEM_LOG_BATCH_SIZE = int(os.getenv('SYSTEM_LOG_BATCH_SIZE', '100'))
+SYSTEM_LOG_FLUSH_INTERVAL = float(os.getenv('SYSTEM_LOG_FLUSH_INTERVAL', '1.0'))  # 초
+SYSTEM_LOG_MAX_BUFFER = int(os.getenv('SYSTEM_LOG_MAX_BUFFER', '10000'))  # 넘으면 버리고 dropped 집계
+
+# 단계별 처리 시간 (media_files/timing.py): AnalysisRecord / ProtectionJob.stage_timings + logs/stage_timings.log
+STAGE_TIMINGS_ENABLED = os.getenv('STAGE_TIMINGS_ENABLED', 'True') == 'True'
+
 # AWS S3 설정
 AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
 AWS_SECRET_ACCESS_KEY = os.getenv('AWS_SECRET_ACCESS_KEY')
@@ -269,9 +385,50 @@ AWS_STORAGE_BUCKET_NAME = os.getenv('AWS_STORAGE_BUCKET_NAME')
 AWS_REGION = os.getenv('AWS_REGION', 'ap-northeast-2')
 AWS_S3_CUSTOM_DOMAIN = f'{AWS_STORAGE_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com'
 
+# S3 커넥션 풀 크기 (프로세스 공용 클라이언트)
+AWS_S3_MAX_POOL_CONNECTIONS = int(os.getenv('AWS_S3_MAX_POOL_CONNECTIONS', '20'))
+
 # S3 URL 만료 시간 (초)
-AWS_PRESIGNED_URL_EXPIRATION = 259200  # 1시간
+AWS_PRESIGNED_URL_EXPIRATION = 259200  # 3일
+
+# Presigned URL 캐시
+# 남은 유효 시간이 MIN_REMAINING(초)보다 많으면 같은 URL을 재사용 (클라이언트 이미지 캐시 적중)
+# CACHE_ALIAS 를 지정하면 프로세스 LRU 뒤에 Django 캐시(예: 'default')도 사용해 워커 간 공유
+AWS_PRESIGNED_URL_CACHE_SIZE = int(os.getenv('AWS_PRESIGNED_URL_CACHE_SIZE', '10000'))
+AWS_PRESIGNED_URL_MIN_REMAINING = int(os.getenv('AWS_PRESIGNED_URL_MIN_REMAINING', '86400'))
+AWS_PRESIGNED_URL_CACHE_ALIAS = os.getenv('AWS_PRESIGNED_URL_CACHE_ALIAS', '')
 
 # S3 사용 설정
 USE_S3_FOR_PROTECTION = os.getenv('USE_S3_FOR_PROTECTION', 'False') == 'True'
-USE_S3_FOR_REPORTS = os.getenv('USE_S3_FOR_REPORTS', 'False') == 'True'
\ No newline at end of file
+USE_S3_FOR_REPORTS = os.getenv('USE_S3_FOR_REPORTS', 'False') == 'True'
+
+# 대용량 영상 S3 스트리밍 업로드 (임시 파일 없이 multipart 업로드)
+S3_STREAMING_UPLOAD = os.getenv('S3_STREAMING_UPLOAD', 'True') == 'True'
+S3_MULTIPART_PART_SIZE = int(os.getenv('S3_MULTIPART_PART_SIZE', str(8 * 1024 * 1024)))  # 8MB (S3 최소 5MB)
+S3_MULTIPART_CONCURRENCY = int(os.getenv('S3_MULTIPART_CONCURRENCY', '4'))
+
+# 만료된 임시 파일 정리 (python manage.py cleanup_temp_files)
+TEMP_FILE_RETENTION_HOURS = int(os.getenv('TEMP_FILE_RETENTION_HOURS', '72'))
+TEMP_FILE_CLEANUP_CHUNK_SIZE = int(os.getenv('TEMP_FILE_CLEANUP_CHUNK_SIZE', '5000'))  # 한 번에 처리할 행 수 (S3 는 1000개씩 나눠 동시 삭제)
+TEMP_FILE_CLEANUP_S3_CONCURRENCY = int(os.getenv('TEMP_FILE_CLEANUP_S3_CONCURRENCY', '4'))  # 동시 delete_objects 호출 수
+
+# 영상 프레임 샘플링 분석 (opencv-python-headless 필요, 없으면 전체 영상 분석)
+VIDEO_SAMPLING_ENABLED = os.getenv('VIDEO_SAMPLING_ENABLED', 'True') == 'True'
+VIDEO_SAMPLING_PROFILES = {  # AppSetting.analysis_quality 별 초당 프레임 수 / 최대 프레임 수
+    'low': {'fps': 0.2, 'max_frames': 12},
+    'medium': {'fps': 0.5, 'max_frames': 30},
+    'high': {'fps': 1.0, 'max_frames': 60},
+}
+VIDEO_SAMPLING_CONCURRENCY = int(os.getenv('VIDEO_SAMPLING_CONCURRENCY', '4'))  # 프레임 이미지 분석 동시 호출 수 (프로세스 공용)
+VIDEO_SAMPLING_SCENE_THRESHOLD = 5  # 직전 프레임과 dHash 거리가 이 이하면 같은 장면으로 보고 건너뜀
+VIDEO_SAMPLING_DEEPFAKE_RATIO = 0.5  # 얼굴이 보인 프레임 중 이 비율 이상이 딥페이크면 딥페이크
+VIDEO_SAMPLING_JPEG_QUALITY = 90
+# 프레임 전달: file 은 MEDIA_ROOT 임시 파일 로컬 경로, memory 는 Zoom 과 같은 단기 캐시 토큰 URL (공유 캐시 필수, zoom.E002)
+VIDEO_SAMPLING_FRAME_TRANSPORT = os.getenv('VIDEO_SAMPLING_FRAME_TRANSPORT', 'file')
+VIDEO_SAMPLING_FRAME_BASE_URL = os.getenv('VIDEO_SAMPLING_FRAME_BASE_URL', ZOOM_FRAME_BASE_URL)  # memory 모드: AI 서버가 프레임을 가져갈 백엔드 주소 (비우면 요청 Host)
+
+# 로컬 미디어 전송 (MediaFileContentView)
+MEDIA_SENDFILE_BACKEND = os.getenv('MEDIA_SENDFILE_BACKEND', '')  # nginx: X-Accel-Redirect, apache: X-Sendfile, 비우면 Django 가 직접 전송 (Range 지원)
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')  # nginx internal location (alias MEDIA_ROOT)
+MEDIA_SERVE_URL_EXPIRATION = 3600  # 서명된 다운로드 URL 유효 시간 (초)
+MEDIA_SERVE_CHUNK_SIZE = 64 * 1024  # 직접 전송 시 읽기 단위 (바이트)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import AnalysisRecord
+from .models import AnalysisBatch, AnalysisRecord, UserAnalysisStats
 
 
 @admin.register(AnalysisRecord)
@@ -13,11 +13,12 @@ class AnalysisRecordAdmin(admin.ModelAdmin):
         'file_name',
         'analysis_result',
         'confidence_score',
+        'job_status',
         'created_at'
     ]
-    list_filter = ['analysis_type', 'analysis_result', 'created_at']
+    list_filter = ['analysis_type', 'analysis_result', 'job_status', 'created_at']
     search_fields = ['user__email', 'file_name']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['stage_timings', 'created_at', 'updated_at']
     ordering = ['-created_at']
     
     fieldsets = (
@@ -44,13 +45,55 @@ class AnalysisRecordAdmin(admin.ModelAdmin):
                 'confidence_score',
                 'detection_details',
                 'processing_time',
+                'stage_timings',
                 'ai_model_version'
             )
         }),
+        ('작업 상태', {
+            'fields': (
+                'job_status',
+                'error_message'
+            )
+        }),
         ('타임스탬프', {
             'fields': (
                 'created_at',
                 'updated_at'
             )
         }),
-    )
\ No newline at end of file
+    )
+
+@admin.register(UserAnalysisStats)
+class UserAnalysisStatsAdmin(admin.ModelAdmin):
+    """사용자 분석 통계 관리자 (rebuild_analysis_stats 로 재계산)"""
+    
+    list_display = [
+        'user',
+        'total_count',
+        'safe_count',
+        'suspicious_count',
+        'deepfake_count',
+        'updated_at'
+    ]
+    search_fields = ['user__email']
+    readonly_fields = [field.name for field in UserAnalysisStats._meta.fields]
+
+
+@admin.register(AnalysisBatch)
+class AnalysisBatchAdmin(admin.ModelAdmin):
+    """일괄 분석 관리자"""
+    
+    list_display = [
+        'batch_id',
+        'user',
+        'analysis_type',
+        'image_count',
+        'completed_count',
+        'failed_count',
+        'analysis_result',
+        'created_at'
+    ]
+    list_filter = ['analysis_type', 'analysis_result', 'created_at']
+    search_fields = ['user__email']
+    readonly_fields = [field.name for field in AnalysisBatch._meta.fields]
+    ordering = ['-created_at']
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class DetectionConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "detection"
+
+    def ready(self):
+        # 사용자 분석 통계 자동 갱신
+        from . import signals  # noqa: F401
+
+        # ✅ 내장 분석 워커 (웹 서버 프로세스에서만)
+        from .jobs import start_embedded_worker
+        start_embedded_worker()
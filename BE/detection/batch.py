@@ -0,0 +1,253 @@
+"""
+일괄 이미지 분석 (앨범/단체 사진)
+
+이미지 N장을 요청 1번으로 받아
+- 이미지별 업로드 → AI 분석을 공용 스레드 풀(DETECTION_BATCH_WORKERS)에서 동시에 실행
+  (업로드가 끝난 이미지부터 바로 분석 시작, 같은 배치 안의 같은 내용은 분석 1번)
+- AnalysisRecord 는 bulk_create 로 한 번에 저장하고 AnalysisBatch 1건으로 묶는다
+요청당 처리 시간은 이미지 수가 아니라 풀 크기에 따라 늘어난다.
+
+AI 서버에는 일괄 분석 엔드포인트가 없으므로 이미지별 /detect_deepfake 호출을 동시에 보낸다.
+"""
+import copy
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from media_files.models import MediaFile
+from media_files.services import FileService
+from media_files.timing import collecting, current_timer, stage
+from .models import AnalysisBatch, AnalysisRecord
+from .pipeline import build_analysis_record, infer_media_file, upload_for_detection
+from .stats import records_completed
+
+logger = logging.getLogger(__name__)
+
+
+VERDICT_SEVERITY = ['safe', 'suspicious', 'deepfake']
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_batch_executor():
+    """프로세스 공용 일괄 분석 스레드 풀 (AI 서버로의 동시 호출 수 제한)"""
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.DETECTION_BATCH_WORKERS,
+                    thread_name_prefix='detection-batch'
+                )
+    return _executor
+
+
+class _SharedInference:
+    """배치 안에서 같은 content_hash 는 AI 분석을 한 번만 (나머지는 결과 대기)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures = {}
+
+    def run(self, content_hash, infer):
+        with self._lock:
+            future = self._futures.get(content_hash)
+            is_owner = future is None
+            if is_owner:
+                future = self._futures[content_hash] = Future()
+
+        if not is_owner:
+            # ResultUrl 서명은 결과를 제자리에서 바꾸므로 복사본 사용
+            return copy.deepcopy(future.result())
+
+        try:
+            result = infer()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        future.set_result(copy.deepcopy(result))
+        return result
+
+
+def analyze_batch(user, images, analysis_type, request=None):
+    """
+    이미지 여러 장 동시 분석 후 일괄 저장
+
+    Args:
+        user: 요청 사용자
+        images: UploadedFile 목록
+        analysis_type: image, screenshot
+        request: 로컬 파일 절대 URL 생성용 (선택)
+
+    Returns:
+        dict: {
+            'batch': AnalysisBatch (분석 성공이 1건도 없으면 None),
+            'results': [원본 순서대로 이미지별 응답 항목]
+        }
+    """
+    start_time = time.time()
+    shared = _SharedInference()
+    executor = get_batch_executor()
+
+    futures = [
+        executor.submit(_process_one, user, index, image, analysis_type, request, shared)
+        for index, image in enumerate(images)
+    ]
+    outcomes = [future.result() for future in futures]
+
+    # 분석에 실패한 이미지는 기록에 연결되지 않으므로 업로드한 파일을 바로 삭제
+    _discard_failed_uploads(user, outcomes)
+
+    succeeded = [outcome for outcome in outcomes if 'result' in outcome]
+    if not succeeded:
+        return {'batch': None, 'results': [_error_entry(outcome) for outcome in outcomes]}
+
+    records = [
+        build_analysis_record(
+            user=user,
+            analysis_type=analysis_type,
+            result=outcome['result'],
+            file_name=outcome['media_file'].original_name,
+            file_size=outcome['media_file'].file_size,
+            file_format=outcome['media_file'].file_format,
+            original_path=outcome['media_file'].file_path,
+            stage_timings=outcome.get('stage_timings', {})
+        )
+        for outcome in succeeded
+    ]
+
+    with stage('persist'):
+        batch = _save_batch(user, analysis_type, len(images), records, [o['media_file'] for o in succeeded],
+                            int((time.time() - start_time) * 1000))
+
+    timer = current_timer()
+    if timer is not None:
+        timer.fields['batch_id'] = batch.batch_id
+
+    for outcome, record in zip(succeeded, records):
+        outcome['record'] = record
+
+    results = [
+        _result_entry(outcome) if 'record' in outcome else _error_entry(outcome)
+        for outcome in outcomes
+    ]
+    return {'batch': batch, 'results': results}
+
+
+def _process_one(user, index, image, analysis_type, request, shared):
+    """이미지 1장 업로드 → 분석 (배치 스레드 풀, 단계별 시간은 이미지별로 수집)"""
+    outcome = {'index': index, 'file_name': image.name}
+
+    with collecting('detection.batch_image') as timer:
+        try:
+            media_file = upload_for_detection(user=user, uploaded_file=image, file_type='image')
+            outcome['media_file'] = media_file
+
+            result = shared.run(
+                media_file.content_hash,
+                lambda: infer_media_file(media_file, analysis_type, request=request)
+            )
+            if result['success']:
+                outcome['result'] = result
+            else:
+                outcome['error'] = result.get('error', '알 수 없는 오류')
+
+        except ValueError as e:
+            outcome['error'] = str(e)
+        except Exception as e:
+            logger.exception(f"일괄 분석 실패: {image.name}")
+            outcome['error'] = f'처리 중 오류: {str(e)}'
+        finally:
+            close_old_connections()
+
+        if timer is not None:
+            timer.fields['index'] = index
+            timer.fields['status'] = 'completed' if 'result' in outcome else 'failed'
+            outcome['stage_timings'] = timer.as_dict()
+
+    return outcome
+
+
+def _discard_failed_uploads(user, outcomes):
+    """업로드는 됐지만 분석에 실패한 MediaFile 삭제 (같은 내용의 파일끼리는 저장소 객체를 공유하므로 순서대로)"""
+    file_service = FileService(user)
+    for outcome in outcomes:
+        media_file = outcome.get('media_file')
+        if media_file is None or 'result' in outcome:
+            continue
+        try:
+            file_service.delete_file(media_file.file_id, hard_delete=True)
+        except Exception:
+            logger.exception(f"분석 실패 파일 삭제 실패: file_id={media_file.file_id}")
+        del outcome['media_file']
+
+
+def _save_batch(user, analysis_type, image_count, records, media_files, processing_time):
+    """AnalysisBatch + AnalysisRecord 일괄 저장, MediaFile 연결, 통계 반영 (트랜잭션 1번)"""
+    verdicts = [record.analysis_result for record in records]
+
+    with transaction.atomic():
+        batch = AnalysisBatch.objects.create(
+            user=user,
+            analysis_type=analysis_type,
+            image_count=image_count,
+            completed_count=len(records),
+            failed_count=image_count - len(records),
+            safe_count=verdicts.count('safe'),
+            suspicious_count=verdicts.count('suspicious'),
+            deepfake_count=verdicts.count('deepfake'),
+            analysis_result=max(verdicts, key=VERDICT_SEVERITY.index),
+            processing_time=processing_time
+        )
+
+        for record in records:
+            record.batch = batch
+        AnalysisRecord.objects.bulk_create(records)
+
+        if records[0].record_id is None:
+            # MySQL 은 bulk_create 후 PK 를 돌려주지 않음: 한 INSERT 안의 자동 증가 값은 입력 순서대로 증가
+            record_ids = batch.records.order_by('record_id').values_list('record_id', flat=True)
+            for record, record_id in zip(records, record_ids):
+                record.record_id = record_id
+
+        for media_file, record in zip(media_files, records):
+            media_file.related_model = 'AnalysisRecord'
+            media_file.related_record_id = record.record_id
+        MediaFile.objects.bulk_update(media_files, ['related_model', 'related_record_id'])
+
+        # bulk_create 는 post_save 시그널이 없으므로 통계를 직접 반영
+        records_completed(records)
+        for record in records:
+            record._counted_in_stats = True
+
+    return batch
+
+
+def _result_entry(outcome):
+    record = outcome['record']
+    return {
+        'index': outcome['index'],
+        'file_name': outcome['file_name'],
+        'record_id': record.record_id,
+        'analysis_result': record.analysis_result,
+        'confidence_score': float(record.confidence_score),
+        'face_count': outcome['result']['face_count'],
+        'face_quality_scores': record.detection_details,
+        'processing_time': record.processing_time,
+        'error': None
+    }
+
+
+def _error_entry(outcome):
+    return {
+        'index': outcome['index'],
+        'file_name': outcome['file_name'],
+        'record_id': None,
+        'error': outcome.get('error', '알 수 없는 오류')
+    }
@@ -0,0 +1,221 @@
+"""
+AI 서버(FastAPI) HTTP 클라이언트
+
+서버 URL마다 프로세스 공용 requests.Session 을 하나씩 두고 커넥션을 재사용한다.
+- 커넥션 풀 크기 (AI_HTTP_POOL_SIZE), keep-alive
+- 멱등 요청(GET/HEAD)만 백오프 재시도 (POST 분석 요청은 재시도하지 않음)
+- 연결 타임아웃과 읽기 타임아웃 분리
+- 풀 포화 지표 (동시 요청 수, 최대치, 풀 크기를 넘은 요청 수, 커넥션 재사용률)
+
+async 뷰(ASGI)용 AsyncModelServerClient 는 httpx.AsyncClient 로 같은 역할을 한다.
+httpx 클라이언트는 이벤트 루프에 묶이므로 (이벤트 루프, 서버 URL)마다 하나씩 둔다.
+"""
+import asyncio
+import threading
+import weakref
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class ModelServerClient:
+    """AI 서버 1개에 대한 커넥션 풀 클라이언트"""
+
+    def __init__(self, base_url, pool_size=None, connect_timeout=None,
+                 max_retries=None, backoff_factor=None):
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size or settings.AI_HTTP_POOL_SIZE
+        self.connect_timeout = connect_timeout or settings.AI_HTTP_CONNECT_TIMEOUT
+
+        retry = Retry(
+            total=settings.AI_HTTP_MAX_RETRIES if max_retries is None else max_retries,
+            backoff_factor=settings.AI_HTTP_RETRY_BACKOFF if backoff_factor is None else backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            raise_on_status=False
+        )
+        self.adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+            pool_block=settings.AI_HTTP_POOL_BLOCK
+        )
+
+        self.session = requests.Session()
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._saturated_requests = 0
+        self._total_requests = 0
+
+    def get(self, path, read_timeout, **kwargs):
+        """GET 요청 (실패 시 백오프 재시도)"""
+        return self.request('GET', path, read_timeout, **kwargs)
+
+    def post(self, path, read_timeout, **kwargs):
+        """POST 요청 (재시도 없음)"""
+        return self.request('POST', path, read_timeout, **kwargs)
+
+    def request(self, method, path, read_timeout, **kwargs):
+        """
+        AI 서버 호출
+
+        Args:
+            method: HTTP 메서드
+            path: '/detect_deepfake' 처럼 base_url 뒤에 붙일 경로
+            read_timeout: 응답 대기 시간 (초), 연결 타임아웃은 별도 설정값 사용
+
+        Raises:
+            requests.exceptions.RequestException
+        """
+        with self._lock:
+            self._total_requests += 1
+            self._in_flight += 1
+            if self._in_flight > self.pool_size:
+                self._saturated_requests += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+        try:
+            return self.session.request(
+                method,
+                f"{self.base_url}{path}",
+                timeout=(self.connect_timeout, read_timeout),
+                **kwargs
+            )
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def stats(self):
+        """풀 사용 지표 (워커 수 산정용)"""
+        connections_opened = 0
+        idle_connections = 0
+        pool_requests = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            connections_opened += pool.num_connections
+            pool_requests += pool.num_requests
+            if pool.pool is not None:
+                # 큐에는 아직 열지 않은 슬롯(None)도 들어 있다
+                idle_connections += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+
+        with self._lock:
+            return {
+                'pool_size': self.pool_size,
+                'in_flight': self._in_flight,
+                'peak_in_flight': self._peak_in_flight,
+                'saturated_requests': self._saturated_requests,
+                'total_requests': self._total_requests,
+                'connections_opened': connections_opened,
+                'idle_connections': idle_connections,
+                'connection_reuse_ratio': round(
+                    max(0.0, 1 - connections_opened / pool_requests), 3
+                ) if pool_requests else None,
+            }
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_model_client(base_url):
+    """서버 URL별 프로세스 공용 클라이언트"""
+    with _clients_lock:
+        client = _clients.get(base_url)
+        if client is None:
+            client = ModelServerClient(base_url)
+            _clients[base_url] = client
+        return client
+
+
+class AsyncModelServerClient:
+    """AI 서버 1개에 대한 비동기 커넥션 풀 클라이언트 (이벤트 루프 1개 전용)"""
+
+    def __init__(self, base_url, pool_size=None, connect_timeout=None, max_retries=None):
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size or settings.AI_ASYNC_POOL_SIZE
+        self.connect_timeout = connect_timeout or settings.AI_HTTP_CONNECT_TIMEOUT
+
+        # 재시도는 연결 실패만 (요청을 보내기 전이므로 POST 도 안전)
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size
+            ),
+            retries=settings.AI_HTTP_MAX_RETRIES if max_retries is None else max_retries
+        )
+        self.client = httpx.AsyncClient(base_url=self.base_url, transport=transport)
+
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._saturated_requests = 0
+        self._total_requests = 0
+
+    async def get(self, path, read_timeout, **kwargs):
+        """GET 요청"""
+        return await self.request('GET', path, read_timeout, **kwargs)
+
+    async def post(self, path, read_timeout, **kwargs):
+        """POST 요청"""
+        return await self.request('POST', path, read_timeout, **kwargs)
+
+    async def request(self, method, path, read_timeout, **kwargs):
+        """
+        AI 서버 호출 (풀이 가득 차면 빈 커넥션을 read_timeout 까지 대기)
+
+        Raises:
+            httpx.HTTPError
+        """
+        self._total_requests += 1
+        self._in_flight += 1
+        if self._in_flight > self.pool_size:
+            self._saturated_requests += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+        try:
+            return await self.client.request(
+                method,
+                path,
+                timeout=httpx.Timeout(read_timeout, connect=self.connect_timeout),
+                **kwargs
+            )
+        finally:
+            self._in_flight -= 1
+
+    def stats(self):
+        """풀 사용 지표"""
+        return {
+            'pool_size': self.pool_size,
+            'in_flight': self._in_flight,
+            'peak_in_flight': self._peak_in_flight,
+            'saturated_requests': self._saturated_requests,
+            'total_requests': self._total_requests,
+        }
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+# 이벤트 루프 → {서버 URL: 클라이언트} (루프가 사라지면 함께 정리)
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_model_client(base_url):
+    """현재 이벤트 루프의 서버 URL별 공용 비동기 클라이언트 (async 코드 안에서만 호출)"""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(base_url)
+        if client is None:
+            client = AsyncModelServerClient(base_url)
+            clients[base_url] = client
+        return client
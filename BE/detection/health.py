@@ -0,0 +1,186 @@
+"""
+AI 서버 상태 모니터 (프로세스 공용 서킷 브레이커)
+
+요청마다 /health 를 호출하는 대신 서버 상태를 캐시한다.
+- closed: 정상. 실제 요청 결과로 상태를 갱신하고, 캐시가 TTL을 넘기면 백그라운드로 확인
+- open: 연속 실패가 임계값을 넘음. 요청은 바로 대체 응답(Mock)으로 처리
+- half_open: reset_timeout 이후 백그라운드 /health 확인 중. 성공하면 closed, 실패하면 다시 open
+
+4xx 응답은 요청 내용 문제이므로 실패로 세지 않는다 (서버는 응답하고 있음).
+closed 상태의 TTL 확인 실패도 실패 1번으로만 센다.
+
+요청 경로에서는 절대 동기 /health 호출을 하지 않는다.
+"""
+import logging
+import threading
+import time
+
+import requests
+from django.conf import settings
+
+from .clients import get_model_client
+
+logger = logging.getLogger(__name__)
+
+
+def is_client_error(error):
+    """4xx 응답 오류인지 (requests/httpx 공통)"""
+    status_code = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status_code is not None and 400 <= status_code < 500
+
+
+class ServiceHealthMonitor:
+    """AI 서버 1개에 대한 상태 캐시 + 서킷 브레이커"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, base_url, failure_threshold=None, reset_timeout=None, cache_ttl=None):
+        self.base_url = base_url
+        self.failure_threshold = failure_threshold or settings.AI_CIRCUIT_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout or settings.AI_CIRCUIT_RESET_TIMEOUT
+        self.cache_ttl = cache_ttl or settings.AI_HEALTH_CACHE_TTL
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.last_checked = None
+        self.last_success = None
+        self.last_failure = None
+        self.last_error = None
+        self.opened_at = None
+
+        self._lock = threading.Lock()
+        self._probing = False
+
+    def allow_request(self):
+        """
+        실제 AI 요청을 보내도 되는지 (캐시된 상태만 확인, 블로킹 없음)
+
+        Returns:
+            bool: False면 호출자는 대체 응답으로 처리
+        """
+        now = time.monotonic()
+        probe = False
+
+        with self._lock:
+            if self.state == self.CLOSED:
+                allowed = True
+                if self.last_checked is None or now - self.last_checked > self.cache_ttl:
+                    probe = True
+            elif self.state == self.OPEN:
+                allowed = False
+                if now - self.opened_at >= self.reset_timeout:
+                    self.state = self.HALF_OPEN
+                    probe = True
+            else:
+                allowed = False
+
+        if probe:
+            self.probe_in_background()
+
+        return allowed
+
+    def record_success(self):
+        """실제 요청 성공 (상태 갱신)"""
+        with self._lock:
+            now = time.monotonic()
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.last_checked = now
+            self.last_success = now
+            self.last_error = None
+            self.opened_at = None
+
+    def record_failure(self, error=None):
+        """실제 요청 실패 (연속 실패가 임계값 이상이면 open, 4xx 는 제외)"""
+        with self._lock:
+            now = time.monotonic()
+            if is_client_error(error):
+                # 서버는 응답했으므로 상태 확인 시각만 갱신
+                self.last_checked = now
+                return
+
+            self.consecutive_failures += 1
+            self.last_checked = now
+            self.last_failure = now
+            self.last_error = str(error) if error else None
+
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"AI 서버 서킷 open: {self.base_url} ({self.last_error})")
+                self.state = self.OPEN
+                self.opened_at = now
+
+    def probe(self):
+        """/health 를 직접 호출해 상태 갱신 (백그라운드 또는 명시적 새로고침용)"""
+        try:
+            response = get_model_client(self.base_url).get(
+                '/health',
+                read_timeout=settings.AI_HEALTH_PROBE_TIMEOUT
+            )
+            healthy = response.status_code == 200
+            error = None if healthy else f'HTTP {response.status_code}'
+        except requests.exceptions.RequestException as e:
+            healthy = False
+            error = e
+
+        if healthy:
+            self.record_success()
+        else:
+            # half_open 이면 다시 open, closed 면 실패 1번
+            self.record_failure(error)
+
+        return healthy
+
+    def probe_in_background(self):
+        """프로브를 데몬 스레드로 1개만 실행"""
+        with self._lock:
+            if self._probing:
+                return
+            self._probing = True
+
+        def run():
+            try:
+                self.probe()
+            finally:
+                with self._lock:
+                    self._probing = False
+
+        threading.Thread(target=run, name='ai-health-probe', daemon=True).start()
+
+    @property
+    def is_healthy(self):
+        """마지막으로 알려진 상태가 정상인지"""
+        return self.state == self.CLOSED
+
+    def snapshot(self):
+        """현재 캐시 상태 (API 응답용)"""
+        now = time.monotonic()
+
+        def age(timestamp):
+            return round(now - timestamp, 1) if timestamp is not None else None
+
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'last_checked_seconds_ago': age(self.last_checked),
+                'last_success_seconds_ago': age(self.last_success),
+                'last_failure_seconds_ago': age(self.last_failure),
+                'last_error': self.last_error,
+            }
+
+
+_monitors = {}
+_monitors_lock = threading.Lock()
+
+
+def get_health_monitor(base_url):
+    """서버 URL별 프로세스 공용 모니터"""
+    with _monitors_lock:
+        monitor = _monitors.get(base_url)
+        if monitor is None:
+            monitor = ServiceHealthMonitor(base_url)
+            _monitors[base_url] = monitor
+        return monitor
@@ -0,0 +1,317 @@
+"""
+비동기 분석 작업 큐 (DB 기반)
+
+별도 브로커 없이 AnalysisRecord 테이블을 큐로 사용한다.
+- 뷰는 job_status='pending' 레코드를 만들고 202를 반환
+- 워커는 SELECT ... FOR UPDATE SKIP LOCKED 로 작업을 가져가 스레드 풀에서 실행
+- 워커당 동시 실행 수(ANALYSIS_WORKER_CONCURRENCY)와
+  사용자당 동시 실행 수(ANALYSIS_MAX_IN_FLIGHT_PER_USER)를 제한
+
+워커 실행 방법 (둘 중 하나)
+- ANALYSIS_EMBEDDED_WORKER=True: 웹 서버 프로세스가 뜰 때 DetectionConfig.ready() 에서 시작
+  (재시작 전에 쌓인 pending 작업도 새 요청을 기다리지 않고 처리)
+- ANALYSIS_EMBEDDED_WORKER=False: python manage.py run_analysis_worker 로 전용 프로세스 실행
+  (gunicorn --preload 처럼 fork 전에 앱을 읽는 배포는 스레드가 워커 프로세스로 넘어가지 않으므로 이쪽 사용)
+"""
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from media_files.timing import collect_timings
+from .models import AnalysisRecord
+from .pipeline import AI_MODEL_VERSION, complete_pending_record, link_media_file, store_stage_timings
+
+logger = logging.getLogger(__name__)
+
+
+def pending_job_count(user):
+    """사용자의 대기/처리 중 작업 수"""
+    return AnalysisRecord.objects.filter(
+        user=user,
+        job_status__in=['pending', 'processing']
+    ).count()
+
+
+def create_analysis_job(user, media_file, analysis_type, source_url=None):
+    """
+    분석 작업 등록
+
+    Args:
+        user: 요청 사용자
+        media_file: 업로드된 MediaFile
+        analysis_type: 분석 유형 (image, screenshot, video)
+        source_url: 로컬 파일인 경우 AI 서버가 접근할 절대 URL
+
+    Returns:
+        AnalysisRecord: pending 상태의 분석 기록
+    """
+    record = AnalysisRecord.objects.create(
+        user=user,
+        analysis_type=analysis_type,
+        file_name=media_file.original_name,
+        file_size=media_file.file_size,
+        file_format=media_file.file_format,
+        original_path=media_file.file_path,
+        ai_model_version=AI_MODEL_VERSION,
+        job_status='pending'
+    )
+
+    # ✅ 관계 연결 (워커가 입력 파일을 찾을 때 사용)
+    if source_url:
+        media_file.metadata = {**(media_file.metadata or {}), 'source_url': source_url}
+    link_media_file(media_file, record)
+
+    # 커밋 이후 워커 깨우기
+    transaction.on_commit(notify_worker)
+
+    return record
+
+
+@collect_timings('detection.job')
+def process_analysis_job(record_id):
+    """
+    작업 1건 실행 (워커 스레드에서 호출)
+
+    입력 파일 URL 생성 → AI 분석 → ResultUrl 서명 → 판정 → 기록 갱신 (단계별 시간 포함)
+    """
+    from media_files.models import MediaFile
+
+    record = AnalysisRecord.objects.get(record_id=record_id)
+
+    media_file = MediaFile.objects.filter(
+        related_model='AnalysisRecord',
+        related_record_id=record_id,
+        is_deleted=False
+    ).first()
+
+    if media_file is None:
+        _mark_failed(record, '분석할 파일을 찾을 수 없습니다.')
+        return
+
+    result = complete_pending_record(record, media_file)
+
+    if not result['success']:
+        _mark_failed(record, result['error'], result.get('processing_time', 0))
+
+
+def _mark_failed(record, message, processing_time=0):
+    """작업 실패 처리"""
+    record.job_status = 'failed'
+    record.error_message = message
+    record.processing_time = processing_time
+    record.save(update_fields=['job_status', 'error_message', 'processing_time', 'updated_at'])
+    store_stage_timings(record)
+
+
+class AnalysisJobWorker:
+    """pending 분석 작업을 가져와 스레드 풀에서 실행하는 워커"""
+
+    def __init__(self, concurrency=None, per_user_limit=None, poll_interval=None):
+        self.concurrency = concurrency or settings.ANALYSIS_WORKER_CONCURRENCY
+        self.per_user_limit = per_user_limit or settings.ANALYSIS_MAX_IN_FLIGHT_PER_USER
+        self.poll_interval = poll_interval or settings.ANALYSIS_WORKER_POLL_INTERVAL
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concurrency,
+            thread_name_prefix='analysis-job'
+        )
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def in_flight(self):
+        """현재 실행 중인 작업 수"""
+        with self._lock:
+            return len(self._in_flight)
+
+    def start(self):
+        """백그라운드 스레드로 워커 실행"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self.run_forever,
+            name='analysis-job-poller',
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, wait=True):
+        """워커 종료"""
+        self._stop.set()
+        self._wakeup.set()
+        self._executor.shutdown(wait=wait)
+
+    def notify(self):
+        """새 작업 등록 알림 (폴링 대기 해제)"""
+        self._wakeup.set()
+
+    def run_forever(self):
+        """작업이 없으면 poll_interval 만큼 대기하며 반복"""
+        # AppConfig.ready() 에서 시작된 경우 앱 로딩이 끝난 뒤 첫 폴링
+        while not apps.ready and not self._stop.is_set():
+            self._stop.wait(0.1)
+
+        while not self._stop.is_set():
+            try:
+                self.requeue_stale_jobs()
+                claimed = self.poll_once()
+            except Exception:
+                logger.exception("분석 작업 폴링 실패")
+                claimed = 0
+            finally:
+                close_old_connections()
+
+            if not claimed:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def poll_once(self):
+        """
+        빈 슬롯만큼 작업을 가져와 실행
+
+        Returns:
+            int: 가져온 작업 수
+        """
+        free_slots = self.concurrency - self.in_flight
+        if free_slots <= 0:
+            return 0
+
+        record_ids = self._claim(free_slots)
+
+        for record_id in record_ids:
+            with self._lock:
+                self._in_flight.add(record_id)
+            self._executor.submit(self._run, record_id)
+
+        return len(record_ids)
+
+    def _claim(self, limit):
+        """pending 작업을 processing으로 바꾸며 가져오기"""
+        with transaction.atomic():
+            # 사용자별 처리 중 작업 수
+            busy = dict(
+                AnalysisRecord.objects.filter(job_status='processing')
+                .values('user')
+                .annotate(count=Count('record_id'))
+                .values_list('user', 'count')
+            )
+
+            # 대기 작업이 있는 사용자를 가장 오래된 작업 순으로 (한 사용자의 대량 등록이
+            # 앞을 채워도 뒤의 다른 사용자 작업을 가져갈 수 있도록 사용자 단위로 고름)
+            waiting_users = (
+                AnalysisRecord.objects.filter(job_status='pending')
+                .values('user')
+                .annotate(oldest=Min('created_at'))
+                .order_by('oldest')
+                .values_list('user', flat=True)
+            )
+
+            claimed = []
+            for user_id in waiting_users:
+                slots = min(self.per_user_limit - busy.get(user_id, 0), limit - len(claimed))
+                if slots <= 0:
+                    continue
+
+                claimed.extend(
+                    AnalysisRecord.objects
+                    .select_for_update(skip_locked=True)
+                    .filter(job_status='pending', user_id=user_id)
+                    .order_by('created_at')
+                    .values_list('record_id', flat=True)[:slots]
+                )
+                if len(claimed) >= limit:
+                    break
+
+            if claimed:
+                AnalysisRecord.objects.filter(record_id__in=claimed).update(
+                    job_status='processing',
+                    updated_at=timezone.now()
+                )
+
+        return claimed
+
+    def _run(self, record_id):
+        """작업 실행 (스레드 풀)"""
+        close_old_connections()
+        try:
+            process_analysis_job(record_id)
+        except Exception as e:
+            logger.exception(f"분석 작업 실패: record_id={record_id}")
+            AnalysisRecord.objects.filter(record_id=record_id).update(
+                job_status='failed',
+                error_message=f'처리 중 오류: {str(e)}',
+                updated_at=timezone.now()
+            )
+        finally:
+            with self._lock:
+                self._in_flight.discard(record_id)
+            close_old_connections()
+            self._wakeup.set()
+
+    def requeue_stale_jobs(self):
+        """워커가 죽어 processing 상태로 남은 작업을 다시 pending으로"""
+        threshold = timezone.now() - timedelta(seconds=settings.ANALYSIS_JOB_STALE_TIMEOUT)
+        return AnalysisRecord.objects.filter(
+            job_status='processing',
+            updated_at__lt=threshold
+        ).update(job_status='pending', updated_at=timezone.now())
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_worker():
+    """프로세스 내장 워커 (최초 호출 시 시작)"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = AnalysisJobWorker()
+            _worker.start()
+        return _worker
+
+
+def notify_worker():
+    """내장 워커가 켜져 있으면 깨우기 (꺼져 있으면 전용 워커 프로세스가 폴링)"""
+    if settings.ANALYSIS_EMBEDDED_WORKER:
+        get_worker().notify()
+
+
+WEB_SERVER_COMMANDS = ('gunicorn', 'uvicorn', 'daphne', 'hypercorn')
+
+
+def is_web_server_process(argv=None):
+    """
+    웹 서버 프로세스인지 (내장 워커 시작 여부 판단)
+
+    migrate, test, shell, 전용 워커 명령이나 스크립트에서는 워커를 띄우지 않는다.
+    runserver 는 자동 리로더의 감시(부모) 프로세스가 아닌 서버(자식) 프로세스에서만.
+    """
+    argv = sys.argv if argv is None else argv
+    if not argv:
+        return False
+
+    if len(argv) > 1 and argv[1] == 'runserver':
+        return os.environ.get('RUN_MAIN') == 'true' or '--noreload' in argv
+
+    # gunicorn ... / python -m uvicorn ... (.../uvicorn/__main__.py)
+    parts = argv[0].replace('\\', '/').split('/')
+    return any(name in parts[-2:] for name in WEB_SERVER_COMMANDS)
+
+
+def start_embedded_worker():
+    """웹 서버 프로세스 시작 시 내장 워커 실행 (DetectionConfig.ready)"""
+    if settings.ANALYSIS_EMBEDDED_WORKER and is_web_server_process():
+        get_worker()
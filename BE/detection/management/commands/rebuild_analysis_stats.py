@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from detection.models import AnalysisRecord
+from detection.stats import rebuild_user_stats
+
+
+class Command(BaseCommand):
+    """사용자별 분석 통계(UserAnalysisStats) 백필 / 재계산
+
+    사용법: python manage.py rebuild_analysis_stats [--user-id 1 --user-id 2]
+    (배포 직후 한 번 실행, 이후로는 기록 완료/삭제 시 자동 갱신)
+    """
+
+    help = '완료된 분석 기록으로 사용자별 분석 통계를 다시 계산합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, action='append', default=None, help='대상 사용자 ID (여러 번 지정 가능)')
+
+    def handle(self, *args, **options):
+        user_ids = options['user_id']
+        if user_ids is None:
+            user_ids = (
+                AnalysisRecord.objects
+                .filter(job_status='completed')
+                .order_by('user_id')
+                .values_list('user_id', flat=True)
+                .distinct()
+            )
+
+        rebuilt = 0
+        for user_id in user_ids.iterator() if hasattr(user_ids, 'iterator') else user_ids:
+            rebuild_user_stats(user_id)
+            rebuilt += 1
+
+        self.stdout.write(self.style.SUCCESS(f'분석 통계 재계산 완료: 사용자 {rebuilt}명'))
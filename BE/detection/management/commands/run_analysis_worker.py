@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from detection.jobs import AnalysisJobWorker
+
+
+class Command(BaseCommand):
+    """비동기 분석 작업 전용 워커 실행
+
+    사용법: python manage.py run_analysis_worker --concurrency 4
+    (ANALYSIS_EMBEDDED_WORKER=False 로 웹 프로세스 내장 워커를 끄고 사용)
+    """
+
+    help = 'DB 큐에 쌓인 비동기 분석 작업을 처리합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=None, help='워커당 동시 분석 수')
+        parser.add_argument('--per-user-limit', type=int, default=None, help='사용자당 동시 분석 수')
+        parser.add_argument('--poll-interval', type=float, default=None, help='폴링 간격(초)')
+
+    def handle(self, *args, **options):
+        worker = AnalysisJobWorker(
+            concurrency=options['concurrency'],
+            per_user_limit=options['per_user_limit'],
+            poll_interval=options['poll_interval']
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'분석 워커 시작 (동시 {worker.concurrency}개, 사용자당 {worker.per_user_limit}개)'
+        ))
+
+        try:
+            worker.run_forever()
+        except KeyboardInterrupt:
+            self.stdout.write('분석 워커 종료 중...')
+        finally:
+            worker.stop(wait=True)
@@ -0,0 +1,72 @@
+# Generated by Django 5.1 on 2026-10-18 15:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("detection", "0003_analysisrecord_detection_details_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysisrecord",
+            name="error_message",
+            field=models.TextField(blank=True, null=True, verbose_name="오류 메시지"),
+        ),
+        migrations.AddField(
+            model_name="analysisrecord",
+            name="job_status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "대기 중"),
+                    ("processing", "처리 중"),
+                    ("completed", "완료"),
+                    ("failed", "실패"),
+                ],
+                default="completed",
+                max_length=20,
+                verbose_name="작업 상태",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="analysisrecord",
+            name="analysis_result",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("safe", "안전"),
+                    ("suspicious", "의심"),
+                    ("deepfake", "딥페이크"),
+                ],
+                max_length=20,
+                null=True,
+                verbose_name="분석 결과",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="analysisrecord",
+            name="confidence_score",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                max_digits=5,
+                verbose_name="신뢰도 점수 (%)",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="analysisrecord",
+            name="processing_time",
+            field=models.IntegerField(default=0, verbose_name="처리 시간(ms)"),
+        ),
+        migrations.AddIndex(
+            model_name="analysisrecord",
+            index=models.Index(
+                fields=["job_status", "created_at"],
+                name="analysis_re_job_sta_70aca2_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.1 on 2026-10-18 15:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("detection", "0004_analysisrecord_job_status"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserAnalysisStats",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="analysis_stats",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="사용자",
+                    ),
+                ),
+                (
+                    "total_count",
+                    models.IntegerField(default=0, verbose_name="전체 분석 수"),
+                ),
+                ("safe_count", models.IntegerField(default=0, verbose_name="안전")),
+                (
+                    "suspicious_count",
+                    models.IntegerField(default=0, verbose_name="의심"),
+                ),
+                (
+                    "deepfake_count",
+                    models.IntegerField(default=0, verbose_name="딥페이크"),
+                ),
+                ("image_count", models.IntegerField(default=0, verbose_name="이미지")),
+                ("video_count", models.IntegerField(default=0, verbose_name="영상")),
+                (
+                    "screenshot_count",
+                    models.IntegerField(default=0, verbose_name="스크린샷"),
+                ),
+                (
+                    "zoom_count",
+                    models.IntegerField(default=0, verbose_name="Zoom 캡처"),
+                ),
+                (
+                    "recent_record_ids",
+                    models.JSONField(
+                        blank=True,
+                        default=list,
+                        verbose_name="최근 분석 기록 ID (최신순)",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="수정일시"),
+                ),
+            ],
+            options={
+                "verbose_name": "사용자 분석 통계",
+                "verbose_name_plural": "사용자 분석 통계 목록",
+                "db_table": "user_analysis_stats",
+            },
+        ),
+    ]
@@ -0,0 +1,112 @@
+# Generated by Django 5.1 on 2026-10-18 15:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("detection", "0005_user_analysis_stats"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnalysisBatch",
+            fields=[
+                ("batch_id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "analysis_type",
+                    models.CharField(
+                        choices=[
+                            ("image", "이미지"),
+                            ("video", "영상"),
+                            ("screenshot", "스크린샷"),
+                            ("zoom", "Zoom 캡처"),
+                        ],
+                        default="image",
+                        max_length=20,
+                        verbose_name="분석 유형",
+                    ),
+                ),
+                (
+                    "image_count",
+                    models.IntegerField(default=0, verbose_name="요청 이미지 수"),
+                ),
+                (
+                    "completed_count",
+                    models.IntegerField(default=0, verbose_name="분석 완료 수"),
+                ),
+                (
+                    "failed_count",
+                    models.IntegerField(default=0, verbose_name="분석 실패 수"),
+                ),
+                ("safe_count", models.IntegerField(default=0, verbose_name="안전")),
+                (
+                    "suspicious_count",
+                    models.IntegerField(default=0, verbose_name="의심"),
+                ),
+                (
+                    "deepfake_count",
+                    models.IntegerField(default=0, verbose_name="딥페이크"),
+                ),
+                (
+                    "analysis_result",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("safe", "안전"),
+                            ("suspicious", "의심"),
+                            ("deepfake", "딥페이크"),
+                        ],
+                        max_length=20,
+                        null=True,
+                        verbose_name="종합 결과 (가장 위험한 판정)",
+                    ),
+                ),
+                (
+                    "processing_time",
+                    models.IntegerField(default=0, verbose_name="처리 시간(ms)"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="생성일시"),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="analysis_batches",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="사용자",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "일괄 분석",
+                "verbose_name_plural": "일괄 분석 목록",
+                "db_table": "analysis_batches",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="analysisrecord",
+            name="batch",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="records",
+                to="detection.analysisbatch",
+                verbose_name="일괄 분석",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="analysisbatch",
+            index=models.Index(
+                fields=["user", "-created_at"], name="analysis_ba_user_id_ff62fa_idx"
+            ),
+        ),
+    ]
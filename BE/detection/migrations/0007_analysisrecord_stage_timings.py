@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-18 16:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("detection", "0006_analysis_batch"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysisrecord",
+            name="stage_timings",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text='{"validate": 3.1, "store": 41.7, "inference": 812.4, "persist": 6.2, "total": 871.0}',
+                verbose_name="단계별 처리 시간(ms)",
+            ),
+        ),
+    ]
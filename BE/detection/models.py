@@ -18,6 +18,13 @@ class AnalysisRecord(models.Model):
         ('deepfake', '딥페이크'),
     ]
     
+    JOB_STATUS_CHOICES = [
+        ('pending', '대기 중'),
+        ('processing', '처리 중'),
+        ('completed', '완료'),
+        ('failed', '실패'),
+    ]
+    
     record_id = models.BigAutoField(primary_key=True)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -46,11 +53,14 @@ class AnalysisRecord(models.Model):
     analysis_result = models.CharField(
         max_length=20,
         choices=RESULT_CHOICES,
+        null=True,
+        blank=True,
         verbose_name='분석 결과'
     )
     confidence_score = models.DecimalField(
         max_digits=5,
         decimal_places=2,
+        default=0,
         verbose_name='신뢰도 점수 (%)'
     )
     
@@ -62,8 +72,37 @@ class AnalysisRecord(models.Model):
         help_text='[{"person_id": 1, "is_deepfake": true, "confidence": 95.5, "detection_image_url": "https://..."}]'
     )
     
-    processing_time = models.IntegerField(verbose_name='처리 시간(ms)')
+    processing_time = models.IntegerField(default=0, verbose_name='처리 시간(ms)')
     ai_model_version = models.CharField(max_length=50, verbose_name='AI 모델 버전')
+    # ✅ 요청 단계별 소요 시간 (validate/store/presign/health/inference/postprocess/persist, total)
+    stage_timings = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='단계별 처리 시간(ms)',
+        help_text='{"validate": 3.1, "store": 41.7, "inference": 812.4, "persist": 6.2, "total": 871.0}'
+    )
+    
+    # ✅ 비동기 분석 작업 상태 (동기 분석은 바로 completed)
+    job_status = models.CharField(
+        max_length=20,
+        choices=JOB_STATUS_CHOICES,
+        default='completed',
+        verbose_name='작업 상태'
+    )
+    error_message = models.TextField(
+        null=True,
+        blank=True,
+        verbose_name='오류 메시지'
+    )
+    # ✅ 일괄 분석(batch/)으로 만들어진 기록
+    batch = models.ForeignKey(
+        'AnalysisBatch',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='records',
+        verbose_name='일괄 분석'
+    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일시')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='수정일시')
     
@@ -76,7 +115,105 @@ class AnalysisRecord(models.Model):
             models.Index(fields=['-created_at']),
             models.Index(fields=['user', '-created_at']),
             models.Index(fields=['analysis_result']),
+            models.Index(fields=['job_status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        if self.job_status != 'completed':
+            return f"{self.file_name} - {self.get_job_status_display()}"
+        return f"{self.file_name} - {self.get_analysis_result_display()}"
+
+class UserAnalysisStats(models.Model):
+    """
+    사용자별 분석 통계 (완료된 AnalysisRecord 기준)
+    
+    기록이 완료/삭제될 때 F() 로 바로 갱신하므로 통계 API는 이 행 1개만 읽는다.
+    (갱신: detection/stats.py, 재계산: python manage.py rebuild_analysis_stats)
+    """
+    
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='analysis_stats',
+        verbose_name='사용자'
+    )
+    
+    # 결과별
+    total_count = models.IntegerField(default=0, verbose_name='전체 분석 수')
+    safe_count = models.IntegerField(default=0, verbose_name='안전')
+    suspicious_count = models.IntegerField(default=0, verbose_name='의심')
+    deepfake_count = models.IntegerField(default=0, verbose_name='딥페이크')
+    
+    # 분석 유형별
+    image_count = models.IntegerField(default=0, verbose_name='이미지')
+    video_count = models.IntegerField(default=0, verbose_name='영상')
+    screenshot_count = models.IntegerField(default=0, verbose_name='스크린샷')
+    zoom_count = models.IntegerField(default=0, verbose_name='Zoom 캡처')
+    
+    recent_record_ids = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='최근 분석 기록 ID (최신순)'
+    )
+    
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='수정일시')
+    
+    class Meta:
+        db_table = 'user_analysis_stats'
+        verbose_name = '사용자 분석 통계'
+        verbose_name_plural = '사용자 분석 통계 목록'
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.total_count}건"
+
+
+class AnalysisBatch(models.Model):
+    """
+    일괄 이미지 분석 요청 1건 (앨범 단위 집계)
+    
+    이미지별 결과는 batch 로 연결된 AnalysisRecord 에 있고, 이 행은 요청 전체의 요약이다.
+    """
+    
+    batch_id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='analysis_batches',
+        verbose_name='사용자'
+    )
+    analysis_type = models.CharField(
+        max_length=20,
+        choices=AnalysisRecord.ANALYSIS_TYPE_CHOICES,
+        default='image',
+        verbose_name='분석 유형'
+    )
+    
+    # 집계
+    image_count = models.IntegerField(default=0, verbose_name='요청 이미지 수')
+    completed_count = models.IntegerField(default=0, verbose_name='분석 완료 수')
+    failed_count = models.IntegerField(default=0, verbose_name='분석 실패 수')
+    safe_count = models.IntegerField(default=0, verbose_name='안전')
+    suspicious_count = models.IntegerField(default=0, verbose_name='의심')
+    deepfake_count = models.IntegerField(default=0, verbose_name='딥페이크')
+    analysis_result = models.CharField(
+        max_length=20,
+        choices=AnalysisRecord.RESULT_CHOICES,
+        null=True,
+        blank=True,
+        verbose_name='종합 결과 (가장 위험한 판정)'
+    )
+    processing_time = models.IntegerField(default=0, verbose_name='처리 시간(ms)')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일시')
+    
+    class Meta:
+        db_table = 'analysis_batches'
+        verbose_name = '일괄 분석'
+        verbose_name_plural = '일괄 분석 목록'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
         ]
     
     def __str__(self):
-        return f"{self.file_name} - {self.get_analysis_result_display()}"
\ No newline at end of file
+        return f"{self.user_id} - {self.image_count}장 ({self.analysis_result or '실패'})"
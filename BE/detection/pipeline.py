@@ -0,0 +1,425 @@
+"""
+딥페이크 분석 공통 파이프라인
+
+업로드 → 결과 캐시 확인 → 입력 URL 생성 → AI 분석 (1회) → ResultUrl 서명 → 판정 → 기록 저장
+
+ImageAnalysisView, VideoAnalysisView, ZoomCaptureView와 비동기 작업 워커가
+모두 이 모듈을 사용한다.
+a 로 시작하는 함수(ainfer_media_file 등)는 async 뷰용으로, AI 호출만 await 하고
+캐시/DB/S3 작업은 스레드 풀에서 실행한다.
+"""
+import os
+import re
+from urllib.parse import urlsplit
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from config.async_api import database_sync_to_async
+from media_files.services import FileService
+from media_files.storage import S3Storage
+from media_files.timing import current_timer, stage
+from users.models import AppSetting
+from .models import AnalysisRecord
+from .result_cache import AnalysisResultCache
+from .sampling import analyze_sampled_video, is_sampling_available
+from .services import AIModelService, AsyncAIModelService
+
+
+AI_MODEL_VERSION = 'v1.0'
+
+result_cache = AnalysisResultCache(AI_MODEL_VERSION)
+
+
+def upload_for_detection(user, uploaded_file, file_type, purpose='detection',
+                         use_s3=True, metadata=None):
+    """
+    분석 대상 파일 업로드 (분석 후 정리되는 임시 파일)
+
+    Raises:
+        ValueError: 파일 검증/업로드 실패
+    """
+    return FileService(user).upload_file(
+        uploaded_file=uploaded_file,
+        file_type=file_type,
+        purpose=purpose,
+        is_temporary=True,
+        metadata=metadata,
+        use_s3=use_s3
+    )
+
+
+def resolve_source_url(media_file, request=None):
+    """
+    AI 서버가 내려받을 입력 URL
+
+    - S3: Presigned URL
+    - 로컬: 요청 기준 절대 URL (워커에서는 등록 시 저장한 source_url)
+    """
+    if media_file.storage_type == 's3':
+        return S3Storage().get_presigned_url(media_file.s3_key)
+
+    if request is not None:
+        return request.build_absolute_uri(f'/media/{media_file.file_path}')
+
+    return (media_file.metadata or {}).get('source_url')
+
+
+def run_inference(source_url, analysis_type):
+    """AI 분석 1회 호출 (영상은 analyze_video, 그 외는 analyze_image)"""
+    ai_service = AIModelService()
+    if analysis_type == 'video':
+        return ai_service.analyze_video(source_url)
+    return ai_service.analyze_image(source_url)
+
+
+async def arun_inference(source_url, analysis_type):
+    """run_inference 의 async 버전"""
+    ai_service = AsyncAIModelService()
+    if analysis_type == 'video':
+        return await ai_service.analyze_video(source_url)
+    return await ai_service.analyze_image(source_url)
+
+
+def infer_with_cache(content_hash, analysis_type, get_source_url):
+    """
+    같은 내용의 분석 결과가 캐시에 있으면 재사용, 없으면 AI 분석 1회 후 캐시에 저장
+
+    Args:
+        content_hash: 파일 내용 SHA-256
+        analysis_type: image, screenshot, video, zoom
+        get_source_url: 캐시 미스일 때만 호출되는 입력 URL 생성 함수
+
+    Returns:
+        dict: run_inference 결과 (캐시 적중 시 cached=True)
+    """
+    with stage('cache'):
+        cached = result_cache.get(content_hash)
+    if cached is not None:
+        return cached
+
+    source_url = get_source_url()
+    if not source_url:
+        return {
+            'success': False,
+            'error': '분석할 파일의 URL을 만들 수 없습니다.',
+            'processing_time': 0
+        }
+
+    result = run_inference(source_url, analysis_type)
+    # ResultUrl 서명(제자리 수정) 전에 원본을 저장
+    with stage('cache'):
+        result_cache.set(content_hash, result)
+    return result
+
+
+async def ainfer_with_cache(content_hash, analysis_type, get_source_url):
+    """infer_with_cache 의 async 버전 (get_source_url 은 스레드 풀에서 호출)"""
+    with stage('cache'):
+        cached = await sync_to_async(result_cache.get, thread_sensitive=False)(content_hash)
+    if cached is not None:
+        return cached
+
+    source_url = await sync_to_async(get_source_url, thread_sensitive=False)()
+    if not source_url:
+        return {
+            'success': False,
+            'error': '분석할 파일의 URL을 만들 수 없습니다.',
+            'processing_time': 0
+        }
+
+    result = await arun_inference(source_url, analysis_type)
+    with stage('cache'):
+        await sync_to_async(result_cache.set, thread_sensitive=False)(content_hash, result)
+    return result
+
+
+def infer_media_file(media_file, analysis_type, request=None, source_url=None):
+    """업로드된 MediaFile 분석 (결과 캐시 사용, 영상은 가능하면 프레임 샘플링)"""
+    if analysis_type == 'video' and is_sampling_available():
+        result = infer_sampled_video(media_file, request=request, source_url=source_url)
+        if result is not None:
+            return result
+
+    return infer_with_cache(
+        media_file.content_hash,
+        analysis_type,
+        lambda: source_url or resolve_source_url(media_file, request)
+    )
+
+
+async def ainfer_media_file(media_file, analysis_type, request=None, source_url=None):
+    """infer_media_file 의 async 버전 (프레임 샘플링은 디코딩이 길어 스레드 풀에서 실행)"""
+    if analysis_type == 'video' and is_sampling_available():
+        result = await database_sync_to_async(infer_sampled_video)(
+            media_file, request=request, source_url=source_url
+        )
+        if result is not None:
+            return result
+
+    return await ainfer_with_cache(
+        media_file.content_hash,
+        analysis_type,
+        lambda: source_url or resolve_source_url(media_file, request)
+    )
+
+
+def get_analysis_quality(user_id):
+    """사용자 분석 품질 설정 (AppSetting 이 없으면 기본값 medium)"""
+    quality = (
+        AppSetting.objects
+        .filter(user_id=user_id)
+        .values_list('analysis_quality', flat=True)
+        .first()
+    )
+    return quality or 'medium'
+
+
+def resolve_frame_base_url(media_file, request=None, source_url=None):
+    """
+    AI 서버가 샘플링 프레임을 가져갈 백엔드 주소
+
+    설정값(VIDEO_SAMPLING_FRAME_BASE_URL) → 요청 Host → 워커 등록 시 저장한 source_url 의 origin 순
+    """
+    if settings.VIDEO_SAMPLING_FRAME_BASE_URL:
+        return settings.VIDEO_SAMPLING_FRAME_BASE_URL
+
+    if request is not None:
+        return request.build_absolute_uri('/')
+
+    parts = urlsplit(source_url or (media_file.metadata or {}).get('source_url') or '')
+    if parts.scheme in ('http', 'https') and parts.netloc:
+        return f'{parts.scheme}://{parts.netloc}'
+
+    return None
+
+
+def infer_sampled_video(media_file, request=None, source_url=None):
+    """
+    영상 프레임 샘플링 분석 (결과 캐시는 분석 품질별로 따로 저장)
+
+    Returns:
+        dict: run_inference 와 같은 형식,
+              프레임 주소를 만들 수 없거나 디코딩할 수 없으면 None (전체 영상 분석으로 전환)
+    """
+    frame_base_url = None
+    if settings.VIDEO_SAMPLING_FRAME_TRANSPORT == 'memory':
+        frame_base_url = resolve_frame_base_url(media_file, request, source_url)
+        if not frame_base_url:
+            return None
+
+    quality = get_analysis_quality(media_file.user_id)
+    cache_key = f'{media_file.content_hash}:sampled:{quality}' if media_file.content_hash else None
+
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # 로컬 파일은 디스크에서 바로, S3 는 Presigned URL 로 스트리밍 디코딩
+    if media_file.storage_type == 's3':
+        video_source = S3Storage().get_presigned_url(media_file.s3_key)
+    else:
+        video_source = os.path.join(settings.MEDIA_ROOT, media_file.file_path)
+
+    result = analyze_sampled_video(video_source, quality, frame_base_url)
+    if result is not None:
+        result_cache.set(cache_key, result)
+    return result
+
+
+def presign_result_urls(face_scores):
+    """AI 서버가 돌려준 S3 ResultUrl을 Presigned URL로 변환 (제자리 수정)"""
+    s3_storage = None
+
+    for face in face_scores:
+        if not face.get('ResultUrl'):
+            continue
+
+        match = re.search(r'amazonaws\.com/(.+?)$', face['ResultUrl'])
+        if match:
+            if s3_storage is None:
+                s3_storage = S3Storage()
+            face['ResultUrl'] = s3_storage.get_presigned_url(match.group(1))
+
+    return face_scores
+
+
+def decide_verdict(face_scores):
+    """
+    얼굴별 결과로 최종 판정
+
+    Returns:
+        tuple: (analysis_result, confidence_score 0-100)
+    """
+    is_any_deepfake = any(face['is_deepfake'] for face in face_scores)
+    avg_confidence = sum(face['rate'] for face in face_scores) / len(face_scores) if face_scores else 0
+
+    if is_any_deepfake:
+        analysis_result = 'deepfake' if avg_confidence >= 0.8 else 'suspicious'
+    else:
+        analysis_result = 'safe'
+
+    return analysis_result, avg_confidence * 100
+
+
+def save_analysis_record(user, analysis_type, result, file_name, file_size, file_format,
+                         original_path=''):
+    """ResultUrl 서명 → 판정 → AnalysisRecord 저장"""
+    record = build_analysis_record(
+        user, analysis_type, result, file_name, file_size, file_format, original_path
+    )
+    with stage('persist'):
+        record.save(force_insert=True)
+    return record
+
+
+def build_analysis_record(user, analysis_type, result, file_name, file_size, file_format,
+                          original_path='', **extra):
+    """ResultUrl 서명 → 판정 → 저장 전 AnalysisRecord (일괄 저장용)"""
+    with stage('postprocess'):
+        face_scores = presign_result_urls(result['face_quality_scores'])
+        analysis_result, confidence_score = decide_verdict(face_scores)
+
+    return AnalysisRecord(
+        user=user,
+        analysis_type=analysis_type,
+        file_name=file_name,
+        file_size=file_size,
+        file_format=file_format,
+        original_path=original_path,
+        analysis_result=analysis_result,
+        confidence_score=confidence_score,
+        detection_details=face_scores,
+        processing_time=result['processing_time'],
+        ai_model_version=AI_MODEL_VERSION,
+        **extra
+    )
+
+
+def link_media_file(media_file, record):
+    """MediaFile ↔ AnalysisRecord 관계 연결"""
+    media_file.related_model = 'AnalysisRecord'
+    media_file.related_record_id = record.record_id
+    with stage('persist'):
+        media_file.save()
+
+
+def store_stage_timings(record):
+    """
+    지금까지 수집한 단계별 시간을 기록에 저장 (수집 중이 아니면 무시)
+
+    update() 로 저장해 통계 시그널(post_save)을 다시 타지 않는다.
+    """
+    timer = current_timer()
+    if timer is None or record.record_id is None:
+        return
+
+    timer.fields['record_id'] = record.record_id
+    record.stage_timings = timer.as_dict()
+    AnalysisRecord.objects.filter(record_id=record.record_id).update(stage_timings=record.stage_timings)
+
+
+def analyze_media_file(user, media_file, analysis_type, request=None, source_url=None):
+    """
+    업로드된 파일 분석 후 AnalysisRecord 저장
+
+    Args:
+        user: 요청 사용자
+        media_file: 업로드된 MediaFile
+        analysis_type: image, screenshot, video, zoom
+        request: 로컬 파일 절대 URL 생성용 (선택)
+        source_url: 입력 URL 직접 지정 (선택)
+
+    Returns:
+        dict: {
+            'success': bool,
+            'record': AnalysisRecord,
+            'result': AI 분석 결과 (ResultUrl 서명 완료),
+            'error': str (실패 시)
+        }
+    """
+    result = infer_media_file(media_file, analysis_type, request=request, source_url=source_url)
+
+    if not result['success']:
+        return result
+
+    return record_media_file_result(user, media_file, analysis_type, result)
+
+
+async def aanalyze_media_file(user, media_file, analysis_type, request=None, source_url=None):
+    """analyze_media_file 의 async 버전 (기록 저장은 스레드 풀에서 실행)"""
+    result = await ainfer_media_file(media_file, analysis_type, request=request, source_url=source_url)
+
+    if not result['success']:
+        return result
+
+    return await database_sync_to_async(record_media_file_result)(user, media_file, analysis_type, result)
+
+
+def record_media_file_result(user, media_file, analysis_type, result):
+    """분석 결과로 AnalysisRecord 저장 후 MediaFile 연결"""
+    record = save_analysis_record(
+        user=user,
+        analysis_type=analysis_type,
+        result=result,
+        file_name=media_file.original_name,
+        file_size=media_file.file_size,
+        file_format=media_file.file_format,
+        original_path=media_file.file_path
+    )
+
+    link_media_file(media_file, record)
+    store_stage_timings(record)
+
+    return {
+        'success': True,
+        'record': record,
+        'result': result
+    }
+
+
+def complete_pending_record(record, media_file):
+    """
+    비동기 작업으로 등록된 pending 기록을 분석 결과로 채우기
+
+    Returns:
+        dict: AI 분석 결과 (실패 시 success=False)
+    """
+    result = infer_media_file(media_file, record.analysis_type)
+
+    if not result['success']:
+        return result
+
+    with stage('postprocess'):
+        face_scores = presign_result_urls(result['face_quality_scores'])
+        analysis_result, confidence_score = decide_verdict(face_scores)
+
+    record.analysis_result = analysis_result
+    record.confidence_score = confidence_score
+    record.detection_details = face_scores
+    record.processing_time = result['processing_time']
+    record.job_status = 'completed'
+    record.error_message = None
+    with stage('persist'):
+        record.save(update_fields=[
+            'analysis_result',
+            'confidence_score',
+            'detection_details',
+            'processing_time',
+            'job_status',
+            'error_message',
+            'updated_at'
+        ])
+    store_stage_timings(record)
+
+    return result
+
+
+def build_analysis_response(record, result):
+    """분석 API 응답 본문"""
+    return {
+        'record_id': record.record_id,
+        'face_count': result['face_count'],
+        'face_quality_scores': result['face_quality_scores'],
+        'processing_time': result['processing_time']
+    }
@@ -0,0 +1,100 @@
+"""
+분석 결과 캐시 (콘텐츠 해시 + 모델 버전)
+
+같은 내용의 파일은 AI 서버를 다시 호출하지 않고 이전 분석 결과
+(face_quality_scores = detection_details)를 재사용한다.
+- 저장소: Django 캐시 (ANALYSIS_RESULT_CACHE_ALIAS), 워커 간 공유
+- 보관 기간: ANALYSIS_RESULT_CACHE_TTL (초, 0이면 사용 안 함)
+- Mock 응답은 저장하지 않음
+"""
+import copy
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class AnalysisResultCache:
+    """(content_hash, 모델 버전) → AI 분석 결과"""
+
+    KEY_PREFIX = 'analysis_result'
+
+    def __init__(self, model_version):
+        self.model_version = model_version
+
+    @property
+    def cache(self):
+        return caches[settings.ANALYSIS_RESULT_CACHE_ALIAS]
+
+    @property
+    def enabled(self):
+        return settings.ANALYSIS_RESULT_CACHE_TTL > 0
+
+    def _key(self, content_hash):
+        return f'{self.KEY_PREFIX}:{self.model_version}:{content_hash}'
+
+    def _counter_key(self, name):
+        return f'{self.KEY_PREFIX}:{self.model_version}:{name}'
+
+    def _count(self, name):
+        key = self._counter_key(name)
+        self.cache.add(key, 0, timeout=None)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            # add 와 incr 사이에 키가 밀려난 경우
+            self.cache.set(key, 1, timeout=None)
+
+    def get(self, content_hash):
+        """
+        캐시된 분석 결과
+
+        Returns:
+            dict: run_inference 와 같은 형식 (cached=True), 없으면 None
+        """
+        if not self.enabled or not content_hash:
+            return None
+
+        start_time = time.time()
+        cached = self.cache.get(self._key(content_hash))
+
+        if cached is None:
+            self._count('misses')
+            return None
+
+        self._count('hits')
+        return {
+            'success': True,
+            'face_count': cached['face_count'],
+            'face_quality_scores': copy.deepcopy(cached['face_quality_scores']),
+            'processing_time': int((time.time() - start_time) * 1000),
+            'cached': True
+        }
+
+    def set(self, content_hash, result):
+        """성공한 실제 분석 결과 저장 (ResultUrl 서명 전 원본)"""
+        if not self.enabled or not content_hash:
+            return
+        if not result.get('success') or result.get('is_mock'):
+            return
+
+        self.cache.set(
+            self._key(content_hash),
+            {
+                'face_count': result['face_count'],
+                'face_quality_scores': copy.deepcopy(result['face_quality_scores']),
+            },
+            settings.ANALYSIS_RESULT_CACHE_TTL
+        )
+
+    def stats(self):
+        """적중/실패 횟수 (헬스 체크 응답용)"""
+        hits = self.cache.get(self._counter_key('hits'), 0)
+        misses = self.cache.get(self._counter_key('misses'), 0)
+        total = hits + misses
+        return {
+            'model_version': self.model_version,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 3) if total else None,
+        }
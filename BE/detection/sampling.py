@@ -0,0 +1,293 @@
+"""
+영상 프레임 샘플링 분석
+
+영상 전체 URL 을 /detect_deepfake 에 넘기면 지연이 영상 길이에 비례한다 (최대 30분).
+샘플링 모드는 영상을 직접 디코딩해 N 프레임마다 1장씩 뽑고,
+앞 프레임과 거의 같은 장면(dHash)은 건너뛰어 장면이 바뀌는 프레임만 남긴 뒤
+각 프레임을 이미지 분석으로 공용 스레드 풀(VIDEO_SAMPLING_CONCURRENCY)에서 동시에 보낸다.
+얼굴별 결과는 프레임 전체에 걸쳐 모아 기존 face_quality_scores 형식으로 돌려준다.
+
+- 샘플링 밀도: AppSetting.analysis_quality (low/medium/high) → VIDEO_SAMPLING_PROFILES
+- 프레임 전달 (VIDEO_SAMPLING_FRAME_TRANSPORT)
+  file: MEDIA_ROOT/sampling 임시 파일의 로컬 경로 (Zoom 파일 전달 모드와 같이 AI 서버와 디스크 공유)
+  memory: Zoom 메모리 전달과 같은 단기 보관소(zoom/frames.py) 토큰 URL (워커 간 공유 캐시 필수)
+- 얼굴별 결과는 AI 서버의 face_id(프레임 안 검출 순서) 기준 근사치: 프레임마다 같은 번호가 같은 사람이라는 보장은 없다
+- OpenCV(cv2)가 없거나 디코딩할 수 없는 영상이면 None 을 반환하고 호출 측은 전체 영상 분석으로 되돌아간다
+"""
+import io
+import logging
+import math
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.urls import reverse
+
+from zoom.dedup import compute_dhash, hamming_distance
+from zoom.frames import frame_blob_store
+from .services import AIModelService
+
+try:
+    import cv2
+except ImportError:  # opencv-python-headless 미설치 시 전체 영상 분석만 사용
+    cv2 = None
+
+logger = logging.getLogger(__name__)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_sampling_executor():
+    """프로세스 공용 프레임 분석 스레드 풀 (AI 서버로의 동시 호출 수 제한)"""
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.VIDEO_SAMPLING_CONCURRENCY,
+                    thread_name_prefix='video-sampling'
+                )
+    return _executor
+
+
+def is_sampling_available():
+    """샘플링 모드 사용 가능 여부 (설정 + OpenCV 설치)"""
+    return settings.VIDEO_SAMPLING_ENABLED and cv2 is not None
+
+
+def get_sampling_profile(quality):
+    """분석 품질별 샘플링 설정 {'fps': 초당 프레임 수, 'max_frames': 최대 프레임 수}"""
+    profiles = settings.VIDEO_SAMPLING_PROFILES
+    return profiles.get(quality) or profiles['medium']
+
+
+def plan_frame_step(video_fps, frame_count, profile):
+    """
+    몇 프레임마다 1장을 뽑을지 계산
+
+    초당 profile['fps'] 장을 기준으로 하되, 긴 영상은 max_frames 장을 넘지 않도록 간격을 넓힌다.
+    """
+    if not video_fps or video_fps <= 0:
+        video_fps = 30.0
+
+    step = max(1, round(video_fps / profile['fps']))
+    if frame_count > 0:
+        step = max(step, math.ceil(frame_count / profile['max_frames']))
+    return step
+
+
+def extract_frames(video_source, profile):
+    """
+    영상에서 분석할 프레임(JPEG 바이트)을 차례로 추출
+
+    건너뛰는 프레임은 grab() 만 해서 색 변환/인코딩 비용을 줄이고,
+    직전에 남긴 프레임과 dHash 거리가 VIDEO_SAMPLING_SCENE_THRESHOLD 이하면 같은 장면으로 보고 버린다.
+
+    Args:
+        video_source: 로컬 파일 경로 또는 HTTP(S) URL (S3 Presigned URL)
+
+    Yields:
+        tuple: (프레임 번호, 영상 내 시각(초), JPEG 바이트)
+
+    Raises:
+        ValueError: 영상을 열 수 없음
+    """
+    capture = cv2.VideoCapture(video_source)
+    if not capture.isOpened():
+        capture.release()
+        raise ValueError('영상을 디코딩할 수 없습니다.')
+
+    try:
+        video_fps = capture.get(cv2.CAP_PROP_FPS)
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        step = plan_frame_step(video_fps, frame_count, profile)
+        encode_params = [cv2.IMWRITE_JPEG_QUALITY, settings.VIDEO_SAMPLING_JPEG_QUALITY]
+
+        last_hash = None
+        extracted = 0
+        frame_index = 0
+
+        while extracted < profile['max_frames'] and capture.grab():
+            if frame_index % step == 0:
+                ok, frame = capture.retrieve()
+                if ok:
+                    encoded, buffer = cv2.imencode('.jpg', frame, encode_params)
+                    if encoded:
+                        jpeg = buffer.tobytes()
+                        frame_hash = compute_dhash(io.BytesIO(jpeg))
+                        if last_hash is None or hamming_distance(last_hash, frame_hash) > settings.VIDEO_SAMPLING_SCENE_THRESHOLD:
+                            last_hash = frame_hash
+                            extracted += 1
+                            timestamp = frame_index / video_fps if video_fps else 0.0
+                            yield frame_index, round(timestamp, 2), jpeg
+            frame_index += 1
+    finally:
+        capture.release()
+
+
+def analyze_sampled_video(video_source, quality, frame_base_url):
+    """
+    샘플링 프레임 분석 후 얼굴별 결과 집계
+
+    Args:
+        video_source: 디코딩할 영상 (로컬 경로 또는 URL)
+        quality: AppSetting.analysis_quality
+        frame_base_url: AI 서버가 프레임을 가져갈 백엔드 주소 (memory 전달 모드만, file 모드는 None)
+
+    Returns:
+        dict: AIModelService.analyze_video 와 같은 형식 (+ 'sampling' 요약),
+              영상을 디코딩할 수 없으면 None
+    """
+    start_time = time.time()
+    profile = get_sampling_profile(quality)
+    base_url = (frame_base_url or '').rstrip('/')
+    executor = get_sampling_executor()
+
+    # 디코딩하면서 바로 분석을 보내 디코딩과 AI 호출이 겹치도록 함
+    futures = {}
+    try:
+        for frame_index, timestamp, jpeg in extract_frames(video_source, profile):
+            future = executor.submit(_analyze_frame, jpeg, base_url)
+            futures[future] = (frame_index, timestamp)
+    except ValueError:
+        logger.warning(f"영상 디코딩 실패, 전체 영상 분석으로 전환: {video_source}")
+        return None
+    except Exception:
+        logger.exception(f"프레임 추출 실패, 전체 영상 분석으로 전환: {video_source}")
+        return None
+
+    if not futures:
+        return None
+
+    frame_results = []
+    errors = []
+    is_mock = False
+    for future in as_completed(futures):
+        frame_index, timestamp = futures[future]
+        result = future.result()
+        if not result['success']:
+            errors.append(result.get('error'))
+            continue
+        is_mock = is_mock or result.get('is_mock', False)
+        frame_results.append((frame_index, timestamp, result))
+
+    processing_time = int((time.time() - start_time) * 1000)
+
+    if not frame_results:
+        return {
+            'success': False,
+            'error': errors[0] or 'AI 분석 중 오류가 발생했습니다. 다시 시도해주세요.',
+            'processing_time': processing_time
+        }
+
+    frame_results.sort(key=lambda item: item[0])
+    face_quality_scores = aggregate_face_scores(frame_results)
+
+    result = {
+        'success': True,
+        'face_count': len(face_quality_scores),
+        'face_quality_scores': face_quality_scores,
+        'processing_time': processing_time,
+        'sampling': {
+            'quality': quality,
+            'sampled_frames': len(futures),
+            'analyzed_frames': len(frame_results),
+            'failed_frames': len(errors)
+        }
+    }
+    if is_mock:
+        result['is_mock'] = True
+    return result
+
+
+def _analyze_frame(jpeg, base_url):
+    """프레임 1장 이미지 분석 (샘플링 스레드 풀)"""
+    release = None
+    try:
+        frame_url, release = _publish_frame(jpeg, base_url)
+        return AIModelService().analyze_image(frame_url)
+    except Exception as e:
+        logger.exception("샘플링 프레임 분석 실패")
+        return {'success': False, 'error': f'처리 중 오류: {str(e)}'}
+    finally:
+        if release is not None:
+            release()
+
+
+def _publish_frame(jpeg, base_url):
+    """
+    AI 서버가 가져갈 프레임 주소 (VIDEO_SAMPLING_FRAME_TRANSPORT)
+
+    Returns:
+        tuple: (입력 URL 또는 로컬 경로, 분석 후 호출할 정리 함수)
+    """
+    if settings.VIDEO_SAMPLING_FRAME_TRANSPORT == 'memory':
+        token = frame_blob_store.put(jpeg, 'image/jpeg')
+        return f"{base_url}{reverse('zoom:frame_blob', args=[token])}", lambda: frame_blob_store.delete(token)
+
+    frame_dir = os.path.join(settings.MEDIA_ROOT, 'sampling')
+    os.makedirs(frame_dir, exist_ok=True)
+    frame_path = os.path.join(frame_dir, f'{secrets.token_hex(16)}.jpg')
+    with open(frame_path, 'wb') as f:
+        f.write(jpeg)
+
+    def release():
+        try:
+            os.remove(frame_path)
+        except FileNotFoundError:
+            pass
+
+    return frame_path, release
+
+
+def aggregate_face_scores(frame_results):
+    """
+    프레임별 얼굴 결과를 face_id 기준으로 집계
+
+    face_id 는 AI 서버가 프레임마다 매기는 검출 순서일 뿐 사람 식별자가 아니므로
+    얼굴별 판정은 "프레임마다 n번째로 검출된 얼굴" 기준의 근사치다.
+    영상 전체 판정(어느 얼굴이든 딥페이크인지)에는 영향이 없다.
+
+    - is_deepfake: 그 얼굴이 보인 프레임 중 딥페이크 판정 비율이 VIDEO_SAMPLING_DEEPFAKE_RATIO 이상
+    - rate: 최종 판정과 같은 판정을 받은 프레임들의 평균 신뢰도
+    - ResultUrl: 최종 판정과 같은 프레임 중 신뢰도가 가장 높은 프레임의 결과
+
+    Args:
+        frame_results: [(프레임 번호, 시각(초), analyze_image 결과), ...] (프레임 순)
+
+    Returns:
+        list: face_quality_scores 항목 (+ frame_count, deepfake_frame_count, timestamp)
+    """
+    faces = {}
+    for _, timestamp, result in frame_results:
+        for face in result.get('face_quality_scores', []):
+            faces.setdefault(face['face_id'], []).append((timestamp, face))
+
+    face_quality_scores = []
+    for face_id in sorted(faces):
+        observations = faces[face_id]
+        deepfake_frames = [item for item in observations if item[1]['is_deepfake']]
+        is_deepfake = len(deepfake_frames) / len(observations) >= settings.VIDEO_SAMPLING_DEEPFAKE_RATIO
+
+        matching = deepfake_frames if is_deepfake else [
+            item for item in observations if not item[1]['is_deepfake']
+        ] or observations
+        timestamp, representative = max(matching, key=lambda item: item[1]['rate'])
+
+        face_quality_scores.append({
+            'face_id': face_id,
+            'rate': round(sum(item[1]['rate'] for item in matching) / len(matching), 4),
+            'is_deepfake': is_deepfake,
+            'ResultUrl': representative.get('ResultUrl'),
+            'timestamp': timestamp,
+            'frame_count': len(observations),
+            'deepfake_frame_count': len(deepfake_frames)
+        })
+
+    return face_quality_scores
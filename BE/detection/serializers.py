@@ -1,8 +1,58 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import AnalysisRecord
+from media_files.resolvers import RelatedMediaResolver
+from media_files.serving import build_path_content_url
+from media_files.thumbnails import pick_size
+from .models import AnalysisBatch, AnalysisRecord
 
 
-class AnalysisRecordSerializer(serializers.ModelSerializer):
+class RecordMediaListSerializer(serializers.ListSerializer):
+    """페이지 전체의 MediaFile을 한 번에 조회해 child에 넘겨주는 ListSerializer"""
+    
+    def to_representation(self, data):
+        records = list(data.all() if hasattr(data, 'all') else data)
+        
+        self.child.media_resolver = RelatedMediaResolver(
+            'AnalysisRecord',
+            [record.record_id for record in records],
+            request=self.context.get('request'),
+            fallback_paths={record.record_id: record.original_path for record in records}
+        )
+        
+        return super().to_representation(records)
+
+
+class RecordImageUrlMixin:
+    """image_url / thumbnail_url 필드 (MediaFile 일괄 조회 결과 사용)"""
+    
+    media_resolver = None
+    
+    def to_representation(self, instance):
+        # 단건 조회면 해당 레코드만 조회
+        if not isinstance(self.parent, RecordMediaListSerializer):
+            self.media_resolver = RelatedMediaResolver(
+                'AnalysisRecord',
+                [instance.record_id],
+                request=self.context.get('request'),
+                fallback_paths={instance.record_id: instance.original_path}
+            )
+        return super().to_representation(instance)
+    
+    def get_image_url(self, obj):
+        """분석한 이미지의 URL (S3는 Presigned URL)"""
+        if not obj.original_path:
+            return None
+        
+        return self.media_resolver.url_for(obj.record_id, fallback_path=obj.original_path)
+    
+    def get_thumbnail_url(self, obj):
+        """목록용 WebP 썸네일 URL (?thumbnail_size=128|256|512, 없으면 None)"""
+        request = self.context.get('request')
+        size = pick_size(request.query_params.get('thumbnail_size') if request else None)
+        return self.media_resolver.thumbnail_url_for(obj.record_id, size)
+
+
+class AnalysisRecordSerializer(RecordImageUrlMixin, serializers.ModelSerializer):
     """분석 기록 Serializer"""
     
     analysis_type_display = serializers.CharField(
@@ -17,6 +67,7 @@ class AnalysisRecordSerializer(serializers.ModelSerializer):
     is_deepfake = serializers.SerializerMethodField()
     # ✅ 동적 URL 생성
     image_url = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
     heatmap_url = serializers.SerializerMethodField()
     
     class Meta:
@@ -33,6 +84,7 @@ class AnalysisRecordSerializer(serializers.ModelSerializer):
             'processed_path',
             'heatmap_path',
             'image_url',  # ✅ 추가
+            'thumbnail_url',
             'heatmap_url',  # ✅ 추가
             'analysis_result',
             'analysis_result_display',
@@ -41,6 +93,8 @@ class AnalysisRecordSerializer(serializers.ModelSerializer):
             'detection_details',
             'processing_time',
             'ai_model_version',
+            'job_status',
+            'error_message',
             'created_at',
             'updated_at'
         ]
@@ -50,43 +104,12 @@ class AnalysisRecordSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at'
         ]
+        list_serializer_class = RecordMediaListSerializer
     
     def get_is_deepfake(self, obj):
         """analysis_result를 기반으로 is_deepfake 계산"""
         return obj.analysis_result in ['suspicious', 'deepfake']
     
-    def get_image_url(self, obj):
-        """원본 이미지 URL (매번 새로운 Presigned URL 생성)"""
-        if not obj.original_path:
-            return None
-        
-        from media_files.models import MediaFile
-        from media_files.storage import S3Storage
-        
-        try:
-            media_file = MediaFile.objects.get(
-                related_model='AnalysisRecord',
-                related_record_id=obj.record_id,
-                is_deleted=False
-            )
-            
-            # S3인 경우 매번 새로운 Presigned URL 생성
-            if media_file.storage_type == 's3' and media_file.s3_key:
-                s3_storage = S3Storage()
-                return s3_storage.get_presigned_url(media_file.s3_key)
-            
-            # 로컬 파일인 경우
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(f'/media/{media_file.file_path}')
-            
-        except MediaFile.DoesNotExist:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(f'/media/{obj.original_path}')
-        
-        return None
-    
     def get_heatmap_url(self, obj):
         """히트맵 이미지 URL (매번 새로운 Presigned URL 생성)"""
         if not obj.heatmap_path:
@@ -112,12 +135,8 @@ class AnalysisRecordSerializer(serializers.ModelSerializer):
             # 추출 실패시 원본 URL 반환
             return obj.heatmap_path
         
-        # 로컬 경로인 경우
-        request = self.context.get('request')
-        if request:
-            return request.build_absolute_uri(f'/media/{obj.heatmap_path}')
-        
-        return None
+        # 로컬 경로인 경우 서명된 전송 URL (/media/ 는 DEBUG 에서만 열림)
+        return build_path_content_url(self.context.get('request'), obj.user_id, obj.heatmap_path)
 
 
 class ImageAnalysisRequestSerializer(serializers.Serializer):
@@ -128,12 +147,35 @@ class ImageAnalysisRequestSerializer(serializers.Serializer):
         choices=['image', 'screenshot'],
         default='image'
     )
+    # ✅ async: 작업 등록 후 202 반환 (결과는 jobs/<id>/ 로 조회)
+    mode = serializers.ChoiceField(
+        choices=['sync', 'async'],
+        default='sync'
+    )
+
+
+class BatchImageAnalysisRequestSerializer(serializers.Serializer):
+    """일괄 이미지 분석 요청 Serializer (images 필드를 여러 번 전송)"""
+    
+    images = serializers.ListField(
+        child=serializers.ImageField(),
+        min_length=1,
+        max_length=settings.DETECTION_BATCH_MAX_IMAGES
+    )
+    analysis_type = serializers.ChoiceField(
+        choices=['image', 'screenshot'],
+        default='image'
+    )
 
 
 class VideoAnalysisRequestSerializer(serializers.Serializer):
     """영상 분석 요청 Serializer"""
     
     video = serializers.FileField(required=True)
+    mode = serializers.ChoiceField(
+        choices=['sync', 'async'],
+        default='sync'
+    )
     
     def validate_video(self, value):
         # 파일 확장자 검증
@@ -152,7 +194,7 @@ class VideoAnalysisRequestSerializer(serializers.Serializer):
         return value
 
 
-class AnalysisRecordListSerializer(serializers.ModelSerializer):
+class AnalysisRecordListSerializer(RecordImageUrlMixin, serializers.ModelSerializer):
     """분석 기록 목록 Serializer (간단한 정보만)"""
     
     analysis_type_display = serializers.CharField(
@@ -165,6 +207,7 @@ class AnalysisRecordListSerializer(serializers.ModelSerializer):
     )
     is_deepfake = serializers.SerializerMethodField()
     image_url = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
     
     class Meta:
         model = AnalysisRecord
@@ -178,48 +221,74 @@ class AnalysisRecordListSerializer(serializers.ModelSerializer):
             'is_deepfake',
             'confidence_score',
             'image_url',
+            'thumbnail_url',
             'created_at'
         ]
         read_only_fields = fields
+        list_serializer_class = RecordMediaListSerializer
     
     def get_is_deepfake(self, obj):
         """analysis_result를 기반으로 is_deepfake 계산"""
         return obj.analysis_result in ['suspicious', 'deepfake']
+
+
+class AnalysisBatchSerializer(serializers.ModelSerializer):
+    """일괄 분석 요약 Serializer"""
     
-    def get_image_url(self, obj):
-        """분석한 이미지의 URL 반환 (매번 새로운 Presigned URL 생성)"""
-        if not obj.original_path:
-            return None
-        
-        from media_files.models import MediaFile
-        from media_files.storage import S3Storage
-        
-        try:
-            # MediaFile에서 정보 찾기
-            media_file = MediaFile.objects.get(
-                related_model='AnalysisRecord',
-                related_record_id=obj.record_id,
-                is_deleted=False
-            )
-            
-            # S3인 경우 매번 새로운 Presigned URL 생성
-            if media_file.storage_type == 's3' and media_file.s3_key:
-                s3_storage = S3Storage()
-                return s3_storage.get_presigned_url(media_file.s3_key)
-            
-            # 로컬 파일인 경우
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(f'/media/{media_file.file_path}')
-            
-        except MediaFile.DoesNotExist:
-            # MediaFile이 없으면 original_path로 로컬 URL 생성
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(f'/media/{obj.original_path}')
-        
-        return None
+    class Meta:
+        model = AnalysisBatch
+        fields = [
+            'batch_id',
+            'analysis_type',
+            'image_count',
+            'completed_count',
+            'failed_count',
+            'safe_count',
+            'suspicious_count',
+            'deepfake_count',
+            'analysis_result',
+            'processing_time',
+            'created_at'
+        ]
+        read_only_fields = fields
+
+
+class AnalysisJobStatusSerializer(serializers.ModelSerializer):
+    """비동기 분석 작업 상태 Serializer"""
     
+    job_id = serializers.IntegerField(source='record_id', read_only=True)
+    job_status_display = serializers.CharField(
+        source='get_job_status_display',
+        read_only=True
+    )
+    face_count = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = AnalysisRecord
+        fields = [
+            'job_id',
+            'record_id',
+            'analysis_type',
+            'job_status',
+            'job_status_display',
+            'error_message',
+            'analysis_result',
+            'confidence_score',
+            'face_count',
+            'detection_details',
+            'processing_time',
+            'created_at',
+            'updated_at'
+        ]
+        read_only_fields = fields
+    
+    def get_face_count(self, obj):
+        """탐지된 얼굴 수 (완료 전에는 None)"""
+        if obj.job_status != 'completed':
+            return None
+        return len(obj.detection_details or [])
+
+
 class AnalysisStatisticsSerializer(serializers.Serializer):
     """분석 통계 Serializer"""
     
@@ -227,4 +296,5 @@ class AnalysisStatisticsSerializer(serializers.Serializer):
     safe_count = serializers.IntegerField()
     suspicious_count = serializers.IntegerField()
     deepfake_count = serializers.IntegerField()
+    type_counts = serializers.DictField(child=serializers.IntegerField())
     recent_analyses = AnalysisRecordListSerializer(many=True)
\ No newline at end of file
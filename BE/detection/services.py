@@ -1,7 +1,12 @@
+import httpx
 import requests
 import time
 from django.conf import settings
-from media_files.models import SystemLog
+from config.async_api import database_sync_to_async
+from media_files.log_writer import write_system_log
+from media_files.timing import stage
+from .clients import get_async_model_client, get_model_client
+from .health import get_health_monitor
 
 
 class AIModelService:
@@ -10,6 +15,8 @@ class AIModelService:
     def __init__(self):
         self.fastapi_url = settings.FASTAPI_URL
         self.timeout = settings.AI_REQUEST_TIMEOUT
+        self.client = get_model_client(self.fastapi_url)
+        self.health = get_health_monitor(self.fastapi_url)
     
     def analyze_image(self, s3_url):
         """
@@ -33,52 +40,11 @@ class AIModelService:
                 'processing_time': int (ms)
             }
         """
-        
-        start_time = time.time()
-        
-        # 🔧 AI 서버 연결 확인
-        if not self.check_health():
-            print("⚠️ AI 서버 없음 - Mock 데이터 반환")
-            return self._get_mock_image_response(start_time)
-        
-        # 실제 AI 서버 호출 (새로운 명세)
-        try:
-            payload = {
-                "request_version": "Multi Person Deepfake detection",
-                "InputUrl": s3_url
-            }
-            
-            response = requests.post(
-                f"{self.fastapi_url}/detect_deepfake",
-                json=payload,  # ← JSON으로 전송!
-                timeout=self.timeout
-            )
-            
-            response.raise_for_status()
-            result = response.json()
-            
-            processing_time = int((time.time() - start_time) * 1000)
-            
-            return {
-                'success': True,
-                'face_count': result.get('face_count', 0),
-                'face_quality_scores': result.get('face_quality_scores', []),
-                'processing_time': processing_time
-            }
-        
-        except requests.exceptions.RequestException as e:
-            SystemLog.objects.create(
-                log_level='error',
-                log_category='detection',
-                message=f'AI 모델 분석 실패: {str(e)}',
-                error_code='AI_API_ERROR'
-            )
-            
-            return {
-                'success': False,
-                'error': 'AI 분석 중 오류가 발생했습니다. 다시 시도해주세요.',
-                'processing_time': int((time.time() - start_time) * 1000)
-            }
+        return self._detect(
+            s3_url,
+            mock_response=self._get_mock_image_response,
+            error_message='AI 모델 분석 실패'
+        )
     
     def analyze_video(self, s3_url):
         """
@@ -90,50 +56,73 @@ class AIModelService:
         Returns:
             dict: 이미지 분석과 동일한 구조
         """
+        return self._detect(
+            s3_url,
+            mock_response=self._get_mock_video_response,
+            error_message='영상 AI 분석 실패'
+        )
+    
+    def _detect(self, s3_url, mock_response, error_message):
+        """/detect_deepfake 호출 (서버 상태는 캐시된 값만 확인)"""
         
         start_time = time.time()
         
-        if not self.check_health():
+        # 🔧 AI 서버 상태 확인 (캐시, 블로킹 없음)
+        with stage('health'):
+            available = self.health.allow_request()
+        if not available:
             print("⚠️ AI 서버 없음 - Mock 데이터 반환")
-            return self._get_mock_video_response(start_time)
+            return mock_response(start_time)
         
+        # 실제 AI 서버 호출 (새로운 명세)
         try:
-            payload = {
-                "request_version": "Multi Person Deepfake detection",
-                "InputUrl": s3_url
-            }
-            
-            response = requests.post(
-                f"{self.fastapi_url}/detect_deepfake",
-                json=payload,
-                timeout=self.timeout
-            )
+            with stage('inference'):
+                response = self.client.post(
+                    '/detect_deepfake',
+                    json=self._detect_payload(s3_url),  # ← JSON으로 전송!
+                    read_timeout=self.timeout
+                )
+                
+                response.raise_for_status()
+                result = response.json()
+            self.health.record_success()
             
-            response.raise_for_status()
-            result = response.json()
-            
-            processing_time = int((time.time() - start_time) * 1000)
-            
-            return {
-                'success': True,
-                'face_count': result.get('face_count', 0),
-                'face_quality_scores': result.get('face_quality_scores', []),
-                'processing_time': processing_time
-            }
+            return self._success_response(result, start_time)
         
         except requests.exceptions.RequestException as e:
-            SystemLog.objects.create(
-                log_level='error',
-                log_category='detection',
-                message=f'영상 AI 분석 실패: {str(e)}',
-                error_code='AI_API_ERROR'
-            )
-            
-            return {
-                'success': False,
-                'error': 'AI 분석 중 오류가 발생했습니다. 다시 시도해주세요.',
-                'processing_time': int((time.time() - start_time) * 1000)
-            }
+            # 연결 실패도 실패 응답 (실제 분석 요청에 Mock 결과를 돌려주지 않음)
+            self.health.record_failure(e)
+            write_system_log(**self._error_log(error_message, e))
+            return self._failure_response(start_time)
+    
+    def _detect_payload(self, s3_url):
+        return {
+            "request_version": "Multi Person Deepfake detection",
+            "InputUrl": s3_url
+        }
+    
+    def _success_response(self, result, start_time):
+        return {
+            'success': True,
+            'face_count': result.get('face_count', 0),
+            'face_quality_scores': result.get('face_quality_scores', []),
+            'processing_time': int((time.time() - start_time) * 1000)
+        }
+    
+    def _failure_response(self, start_time):
+        return {
+            'success': False,
+            'error': 'AI 분석 중 오류가 발생했습니다. 다시 시도해주세요.',
+            'processing_time': int((time.time() - start_time) * 1000)
+        }
+    
+    def _error_log(self, error_message, error):
+        return {
+            'log_level': 'error',
+            'log_category': 'detection',
+            'message': f'{error_message}: {str(error)}',
+            'error_code': 'AI_API_ERROR'
+        }
 
     def _get_mock_image_response(self, start_time):
         """
@@ -162,7 +151,8 @@ class AIModelService:
             'success': True,
             'face_count': face_count,
             'face_quality_scores': face_quality_scores,
-            'processing_time': processing_time
+            'processing_time': processing_time,
+            'is_mock': True
         }
     
     def _get_mock_video_response(self, start_time):
@@ -172,12 +162,68 @@ class AIModelService:
         return self._get_mock_image_response(start_time)
     
     def check_health(self):
-        """FastAPI 서버 상태 확인"""
+        """FastAPI 서버 상태 확인 (/health 직접 호출, 결과는 캐시에 반영)"""
+        return self.health.probe()
+
+
+class AsyncAIModelService(AIModelService):
+    """
+    AI 모델 서비스 async 버전 (ASGI async 뷰용)
+    
+    응답을 기다리는 동안 스레드를 잡지 않고, 이벤트 루프 공용 httpx 커넥션 풀을 쓴다.
+    서버 상태(서킷 브레이커)와 Mock 응답은 동기 서비스와 공유한다.
+    """
+    
+    def __init__(self):
+        self.fastapi_url = settings.FASTAPI_URL
+        self.timeout = settings.AI_REQUEST_TIMEOUT
+        self.client = get_async_model_client(self.fastapi_url)
+        self.health = get_health_monitor(self.fastapi_url)
+    
+    async def analyze_image(self, s3_url):
+        """이미지 딥페이크 분석 (AIModelService.analyze_image 와 같은 결과)"""
+        return await self._detect(
+            s3_url,
+            mock_response=self._get_mock_image_response,
+            error_message='AI 모델 분석 실패'
+        )
+    
+    async def analyze_video(self, s3_url):
+        """영상 딥페이크 분석 (AIModelService.analyze_video 와 같은 결과)"""
+        return await self._detect(
+            s3_url,
+            mock_response=self._get_mock_video_response,
+            error_message='영상 AI 분석 실패'
+        )
+    
+    async def _detect(self, s3_url, mock_response, error_message):
+        """/detect_deepfake 호출 (서버 상태는 캐시된 값만 확인)"""
+        
+        start_time = time.time()
+        
+        with stage('health'):
+            available = self.health.allow_request()
+        if not available:
+            print("⚠️ AI 서버 없음 - Mock 데이터 반환")
+            return mock_response(start_time)
+        
         try:
-            response = requests.get(
-                f"{self.fastapi_url}/health",
-                timeout=2  # 빠른 타임아웃
-            )
-            return response.status_code == 200
-        except:
-            return False
\ No newline at end of file
+            with stage('inference'):
+                response = await self.client.post(
+                    '/detect_deepfake',
+                    json=self._detect_payload(s3_url),
+                    read_timeout=self.timeout
+                )
+                
+                response.raise_for_status()
+                result = response.json()
+            self.health.record_success()
+            
+            return self._success_response(result, start_time)
+        
+        except (httpx.HTTPError, ValueError) as e:
+            # 연결 실패도 실패 응답 (실제 분석 요청에 Mock 결과를 돌려주지 않음)
+            # ValueError: JSON 이 아닌 응답 본문 (json.JSONDecodeError)
+            self.health.record_failure(e)
+            await database_sync_to_async(write_system_log)(**self._error_log(error_message, e))
+            return self._failure_response(start_time)
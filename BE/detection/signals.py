@@ -0,0 +1,34 @@
+"""
+AnalysisRecord 완료/삭제 → 사용자 통계(UserAnalysisStats) 갱신
+
+비동기 작업은 pending 으로 만들어졌다가 나중에 completed 로 저장되므로,
+불러올 때의 작업 상태를 기억해 두고 completed 로 바뀌는 순간 한 번만 반영한다.
+"""
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import AnalysisRecord
+from .stats import record_completed, record_removed
+
+
+def _is_completed(instance):
+    # only() 로 job_status 를 불러오지 않은 경우 추가 쿼리를 만들지 않음
+    return instance.__dict__.get('job_status') == 'completed'
+
+
+@receiver(post_init, sender=AnalysisRecord)
+def remember_job_status(sender, instance, **kwargs):
+    instance._counted_in_stats = instance.pk is not None and _is_completed(instance)
+
+
+@receiver(post_save, sender=AnalysisRecord)
+def count_completed_record(sender, instance, **kwargs):
+    if _is_completed(instance) and not instance._counted_in_stats:
+        record_completed(instance)
+        instance._counted_in_stats = True
+
+
+@receiver(post_delete, sender=AnalysisRecord)
+def uncount_deleted_record(sender, instance, **kwargs):
+    if instance._counted_in_stats:
+        record_removed(instance)
@@ -0,0 +1,149 @@
+"""
+사용자별 분석 통계 (UserAnalysisStats) 증분 갱신
+
+통계 API가 호출마다 사용자의 전체 AnalysisRecord 를 COUNT 하던 것을,
+기록이 완료/삭제될 때 F() 로 카운터를 올리고 내리는 방식으로 바꾼다.
+- 카운터: UPDATE ... SET x = x + 1 (동시 요청에도 값이 틀어지지 않음)
+- 최근 기록 ID: 같은 트랜잭션에서 행 잠금 후 갱신
+- 통계 행이 없으면(기존 사용자, 백필 전) 그 자리에서 전체 재계산
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+
+from .models import AnalysisRecord, UserAnalysisStats
+
+
+RECENT_RECORD_COUNT = 5
+
+RESULT_FIELDS = {
+    'safe': 'safe_count',
+    'suspicious': 'suspicious_count',
+    'deepfake': 'deepfake_count',
+}
+
+TYPE_FIELDS = {
+    'image': 'image_count',
+    'video': 'video_count',
+    'screenshot': 'screenshot_count',
+    'zoom': 'zoom_count',
+}
+
+
+def _completed_records(user_id):
+    return AnalysisRecord.objects.filter(user_id=user_id, job_status='completed')
+
+
+def _counter_updates(records, delta):
+    updates = {'total_count': F('total_count') + delta * len(records)}
+
+    for record in records:
+        for field in (RESULT_FIELDS.get(record.analysis_result), TYPE_FIELDS.get(record.analysis_type)):
+            if field:
+                updates[field] = updates.get(field, F(field)) + delta
+
+    return updates
+
+
+def record_completed(record):
+    """완료된 기록 1건 반영"""
+    records_completed([record])
+
+
+def records_completed(records):
+    """
+    같은 사용자의 완료된 기록 여러 건을 UPDATE 1번으로 반영
+
+    bulk_create 는 post_save 시그널이 없으므로 일괄 저장한 쪽에서 직접 호출한다.
+    """
+    if not records:
+        return
+
+    user_id = records[0].user_id
+    with transaction.atomic():
+        updated = UserAnalysisStats.objects.filter(user_id=user_id).update(
+            **_counter_updates(records, 1)
+        )
+        if not updated:
+            rebuild_user_stats(user_id)
+            return
+
+        stats = (
+            UserAnalysisStats.objects
+            .select_for_update()
+            .only('user_id', 'recent_record_ids')
+            .get(user_id=user_id)
+        )
+        recent = sorted(
+            set(stats.recent_record_ids) | {record.record_id for record in records},
+            reverse=True
+        )
+        recent = recent[:RECENT_RECORD_COUNT]
+        if recent != stats.recent_record_ids:
+            stats.recent_record_ids = recent
+            stats.save(update_fields=['recent_record_ids'])
+
+
+def record_removed(record):
+    """삭제된 (완료) 기록 1건 반영"""
+    with transaction.atomic():
+        updated = UserAnalysisStats.objects.filter(user_id=record.user_id).update(
+            **_counter_updates([record], -1)
+        )
+        if not updated:
+            return
+
+        stats = (
+            UserAnalysisStats.objects
+            .select_for_update()
+            .only('user_id', 'recent_record_ids')
+            .get(user_id=record.user_id)
+        )
+        if record.record_id not in stats.recent_record_ids:
+            return
+
+        # 최근 목록에서 빠진 자리는 남은 기록으로 다시 채움
+        stats.recent_record_ids = _recent_record_ids(record.user_id)
+        stats.save(update_fields=['recent_record_ids'])
+
+
+def _recent_record_ids(user_id):
+    return list(
+        _completed_records(user_id)
+        .order_by('-record_id')
+        .values_list('record_id', flat=True)[:RECENT_RECORD_COUNT]
+    )
+
+
+def rebuild_user_stats(user_id):
+    """
+    사용자 통계 전체 재계산 (백필 / 보정)
+
+    Returns:
+        UserAnalysisStats
+    """
+    aggregates = {'total_count': Count('record_id')}
+    for result, field in RESULT_FIELDS.items():
+        aggregates[field] = Count('record_id', filter=Q(analysis_result=result))
+    for analysis_type, field in TYPE_FIELDS.items():
+        aggregates[field] = Count('record_id', filter=Q(analysis_type=analysis_type))
+
+    values = _completed_records(user_id).aggregate(**aggregates)
+    values['recent_record_ids'] = _recent_record_ids(user_id)
+
+    try:
+        with transaction.atomic():
+            stats, _ = UserAnalysisStats.objects.update_or_create(user_id=user_id, defaults=values)
+    except IntegrityError:
+        # 동시에 다른 요청이 행을 만든 경우
+        UserAnalysisStats.objects.filter(user_id=user_id).update(**values)
+        stats = UserAnalysisStats.objects.get(user_id=user_id)
+
+    return stats
+
+
+def get_user_stats(user):
+    """통계 행 조회 (없으면 재계산해서 생성)"""
+    try:
+        return UserAnalysisStats.objects.get(user_id=user.pk)
+    except UserAnalysisStats.DoesNotExist:
+        return rebuild_user_stats(user.pk)
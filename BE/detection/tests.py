@@ -1,3 +1,1196 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import httpx
+import requests
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase, APITransactionTestCase
+from rest_framework.throttling import BaseThrottle
+
+from media_files.log_writer import system_log_writer
+from media_files.models import MediaFile
+from media_files.services import FileService
+from media_files.storage import S3Storage
+from users.models import User
+from zoom.frames import frame_blob_store
+from zoom.models import ZoomSession
+from zoom.views import AsyncZoomCaptureView
+from . import jobs
+from .jobs import AnalysisJobWorker, is_web_server_process
+from . import clients
+from .clients import ModelServerClient, get_model_client
+from .health import ServiceHealthMonitor
+from .models import AnalysisBatch, AnalysisRecord, UserAnalysisStats
+from .sampling import _publish_frame, aggregate_face_scores, analyze_sampled_video, cv2
+from .services import AIModelService, AsyncAIModelService
+from .views import AsyncImageAnalysisView
+
+
+class StubAIServerHandler(BaseHTTPRequestHandler):
+    """FastAPI AI 서버 스텁 (/health, /detect_deepfake)"""
+
+    def do_GET(self):
+        self.server.calls.append(('GET', self.path))
+        self._send_json({'status': 'ok'})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        self.server.calls.append(('POST', self.path))
+        time.sleep(getattr(self.server, 'delay', 0))
+        raw_body = getattr(self.server, 'raw_body', None)
+        if raw_body is not None:
+            # 프록시 오류 페이지처럼 JSON 이 아닌 본문
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(raw_body)))
+            self.end_headers()
+            self.wfile.write(raw_body)
+            return
+        self._send_json({
+            'face_count': 1,
+            'face_quality_scores': [{
+                'face_id': 1,
+                'rate': 0.9,
+                'is_deepfake': True,
+                'ResultUrl': 'https://bucket.s3.ap-northeast-2.amazonaws.com/results/face_1.jpg'
+            }]
+        })
+
+    def _send_json(self, body):
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubAIServer(ThreadingHTTPServer):
+    """동시 요청 테스트용으로 listen backlog 확대 (기본 5면 연결이 거부될 수 있음)"""
+
+    request_queue_size = 64
+
+
+def make_image(name='test.jpg', quality=75, color='blue'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 32), color=color).save(buffer, format='JPEG', quality=quality)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class SingleInferenceTest(APITestCase):
+    """분석 요청 1건당 /detect_deepfake 호출이 정확히 1번인지 확인"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = StubAIServer(('127.0.0.1', 0), StubAIServerHandler)
+        cls.server.calls = []
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+        cls.media_root = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.calls.clear()
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='tester@test.com',
+            password='testpass123!',
+            nickname='tester'
+        )
+        self.client.force_authenticate(self.user)
+
+        host, port = self.server.server_address
+        settings_override = override_settings(
+            FASTAPI_URL=f'http://{host}:{port}',
+            MEDIA_ROOT=self.media_root
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.s3_mocks = {}
+        for name, value in [
+            ('upload', True),
+            ('delete', True),
+            ('get_presigned_url', 'https://signed.example.com/object'),
+        ]:
+            patcher = mock.patch.object(S3Storage, name, return_value=value)
+            self.s3_mocks[name] = patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def detect_calls(self):
+        return [call for call in self.server.calls if call == ('POST', '/detect_deepfake')]
+
+    def test_image_analysis_calls_model_once(self):
+        response = self.client.post(
+            '/api/detection/image/',
+            {'image': make_image()},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['face_count'], 1)
+        self.assertEqual(len(self.detect_calls()), 1)
+
+    def test_image_analysis_records_stage_timings(self):
+        response = self.client.post(
+            '/api/detection/image/',
+            {'image': make_image()},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, 201)
+        stage_timings = AnalysisRecord.objects.get(record_id=response.data['record_id']).stage_timings
+        self.assertTrue(
+            {'validate', 'store', 'cache', 'health', 'inference', 'postprocess', 'persist', 'total'}
+            <= stage_timings.keys()
+        )
+        # 중첩 단계는 바깥 단계에서 빠지므로 단계 합이 전체를 넘지 않음
+        stages = {name: ms for name, ms in stage_timings.items() if name != 'total'}
+        self.assertLessEqual(sum(stages.values()), stage_timings['total'] + 1)
+
+    def test_video_analysis_calls_model_once(self):
+        video = SimpleUploadedFile('clip.mp4', b'\x00' * 1024, content_type='video/mp4')
+
+        response = self.client.post(
+            '/api/detection/video/',
+            {'video': video},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(self.detect_calls()), 1)
+
+    def test_identical_image_reuses_upload_and_result(self):
+        responses = [
+            self.client.post('/api/detection/image/', {'image': make_image()}, format='multipart')
+            for _ in range(2)
+        ]
+
+        self.assertEqual([response.status_code for response in responses], [201, 201])
+        self.assertEqual(len(self.detect_calls()), 1)
+        # 원본 1번 (두 번째 업로드는 저장소 객체 재사용, 임시 파일은 업로드 시 썸네일을 만들지 않음)
+        self.assertEqual(self.s3_mocks['upload'].call_count, 1)
+        self.assertFalse(MediaFile.objects.filter(purpose='thumbnail').exists())
+
+        first, second = AnalysisRecord.objects.order_by('record_id')
+        self.assertNotEqual(first.record_id, second.record_id)
+        self.assertEqual(first.detection_details, second.detection_details)
+
+        stats = self.client.get('/api/detection/health/').data['analysis_cache']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    @override_settings(ZOOM_FRAME_TRANSPORT='memory')
+    def test_zoom_capture_calls_model_once(self):
+        session = ZoomSession.objects.create(
+            user=self.user,
+            session_name='면접',
+            start_time='2025-01-01T00:00:00Z'
+        )
+
+        response = self.client.post(
+            f'/api/zoom/sessions/{session.session_id}/capture/',
+            {'screenshot': make_image('capture.jpg'), 'participant_count': 2},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.data['alert_triggered'])
+        self.assertEqual(len(self.detect_calls()), 1)
+
+        # 메모리 전달 모드: 경고가 난 프레임만 파일로 남음
+        retained = MediaFile.objects.get(purpose='zoom')
+        record = AnalysisRecord.objects.get(analysis_type='zoom')
+        self.assertEqual(retained.related_record_id, record.record_id)
+        self.assertEqual(record.original_path, retained.file_path)
+
+
+    def test_near_duplicate_zoom_frame_reuses_verdict(self):
+        session = ZoomSession.objects.create(
+            user=self.user,
+            session_name='면접',
+            start_time='2025-01-01T00:00:00Z'
+        )
+        url = f'/api/zoom/sessions/{session.session_id}/capture/'
+
+        # 인코딩 품질만 달라 바이트(콘텐츠 해시)는 다르지만 화면은 같은 프레임
+        responses = [
+            self.client.post(url, {'screenshot': make_image('capture.jpg', quality), 'participant_count': 2},
+                             format='multipart')
+            for quality in (75, 90)
+        ]
+
+        self.assertEqual([response.status_code for response in responses], [201, 201])
+        self.assertEqual([response.data['is_deduplicated'] for response in responses], [False, True])
+        self.assertEqual(len(self.detect_calls()), 1)
+
+        captures = session.captures.order_by('capture_id')
+        self.assertEqual(captures[0].record_id, captures[1].record_id)
+        session.refresh_from_db()
+        self.assertEqual(session.total_captures, 2)
+
+
+class StubAIServerTransactionMixin:
+    """스레드/이벤트 루프에서 DB 를 쓰는 테스트용: 스텁 AI 서버 + 로컬 MEDIA_ROOT + S3 모킹"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = StubAIServer(('127.0.0.1', 0), StubAIServerHandler)
+        cls.server.calls = []
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+        cls.media_root = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.calls.clear()
+        self.server.delay = 0
+        self.server.raw_body = None
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='batch@test.com',
+            password='testpass123!',
+            nickname='batch'
+        )
+        self.client.force_authenticate(self.user)
+
+        host, port = self.server.server_address
+        settings_override = override_settings(
+            FASTAPI_URL=f'http://{host}:{port}',
+            MEDIA_ROOT=self.media_root
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        for name, value in [
+            ('upload', True),
+            ('get_presigned_url', 'https://signed.example.com/object'),
+        ]:
+            patcher = mock.patch.object(S3Storage, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        # 스레드에서 남긴 SystemLog 는 백그라운드 저장이므로 테스트 DB 가 남아 있을 때 비움
+        self.addCleanup(system_log_writer.flush)
+
+    def detect_calls(self):
+        return [call for call in self.server.calls if call == ('POST', '/detect_deepfake')]
+
+
+class BatchImageAnalysisTest(StubAIServerTransactionMixin, APITransactionTestCase):
+    """일괄 분석: 이미지별 결과 + 기록 일괄 저장, 같은 내용은 AI 호출 1번"""
+
+    def test_batch_analysis_saves_records_and_aggregate(self):
+        images = [
+            make_image('red.jpg', color='red'),
+            make_image('green.jpg', color='green'),
+            make_image('blue.jpg', color='blue'),
+            make_image('blue_copy.jpg', color='blue'),
+        ]
+
+        response = self.client.post('/api/detection/batch/', {'images': images}, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['image_count'], 4)
+        self.assertEqual(response.data['completed_count'], 4)
+        self.assertEqual(response.data['analysis_result'], 'deepfake')
+        self.assertEqual([item['index'] for item in response.data['results']], [0, 1, 2, 3])
+        self.assertEqual(
+            [item['file_name'] for item in response.data['results']],
+            ['red.jpg', 'green.jpg', 'blue.jpg', 'blue_copy.jpg']
+        )
+
+        # 같은 내용(blue)은 배치 안에서 한 번만 분석
+        self.assertEqual(len(self.detect_calls()), 3)
+
+        batch = AnalysisBatch.objects.get(batch_id=response.data['batch_id'])
+        record_ids = [item['record_id'] for item in response.data['results']]
+        self.assertEqual(sorted(record_ids), list(batch.records.values_list('record_id', flat=True).order_by('record_id')))
+        self.assertEqual(
+            MediaFile.objects.filter(related_model='AnalysisRecord', related_record_id__in=record_ids).count(),
+            4
+        )
+
+        stats = UserAnalysisStats.objects.get(user=self.user)
+        self.assertEqual(stats.total_count, 4)
+        self.assertEqual(stats.deepfake_count, 4)
+
+        detail = self.client.get(f"/api/detection/batches/{batch.batch_id}/")
+        self.assertEqual(detail.status_code, 200)
+        self.assertEqual(len(detail.data['records']), 4)
+
+    def test_failed_images_do_not_leave_orphaned_uploads(self):
+        from . import batch as batch_module
+
+        infer = batch_module.infer_media_file
+
+        def infer_or_fail(media_file, analysis_type, request=None):
+            if media_file.original_name == 'bad.jpg':
+                return {'success': False, 'error': 'AI 서버 오류'}
+            return infer(media_file, analysis_type, request=request)
+
+        images = [make_image('good.jpg', color='red'), make_image('bad.jpg', color='green')]
+        with mock.patch.object(batch_module, 'infer_media_file', side_effect=infer_or_fail), \
+                mock.patch.object(S3Storage, 'delete', return_value=True) as delete:
+            response = self.client.post('/api/detection/batch/', {'images': images}, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([item['error'] for item in response.data['results']], [None, 'AI 서버 오류'])
+        # 분석에 실패한 이미지의 MediaFile 과 S3 객체는 바로 삭제
+        good = MediaFile.objects.get()
+        self.assertEqual(good.original_name, 'good.jpg')
+        self.assertEqual(good.related_record_id, response.data['results'][0]['record_id'])
+        self.assertEqual(delete.call_count, 1)
+        self.assertNotEqual(delete.call_args.args[0], good.s3_key)
+
+    def test_batch_rejects_too_many_images(self):
+        images = [make_image(f'{index}.jpg') for index in range(settings.DETECTION_BATCH_MAX_IMAGES + 1)]
+
+        response = self.client.post('/api/detection/batch/', {'images': images}, format='multipart')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.server.calls)
+
+
+class AsyncViewTest(StubAIServerTransactionMixin, APITransactionTestCase):
+    """async 뷰/서비스: 요청/응답은 동기 뷰와 같고, AI 응답 대기는 스레드 없이 동시에"""
+
+    def setUp(self):
+        super().setUp()
+        self.token = Token.objects.create(user=self.user)
+        self.factory = RequestFactory()
+
+    def call(self, view_class, path, data, **kwargs):
+        request = self.factory.post(path, data, HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        return async_to_sync(view_class.as_view())(request, **kwargs)
+
+    def test_async_image_view_matches_sync_response(self):
+        response = self.call(AsyncImageAnalysisView, '/api/detection/image/', {'image': make_image()})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['face_count'], 1)
+        self.assertEqual(len(self.detect_calls()), 1)
+        record = AnalysisRecord.objects.get(record_id=response.data['record_id'])
+        self.assertEqual(record.analysis_result, 'deepfake')
+        self.assertTrue(MediaFile.objects.filter(related_record_id=record.record_id).exists())
+
+    def test_async_zoom_capture_view(self):
+        session = ZoomSession.objects.create(
+            user=self.user,
+            session_name='면접',
+            start_time='2025-01-01T00:00:00Z'
+        )
+
+        response = self.call(
+            AsyncZoomCaptureView,
+            f'/api/zoom/sessions/{session.session_id}/capture/',
+            {'screenshot': make_image('capture.jpg'), 'participant_count': 2},
+            session_id=session.session_id
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.data['alert_triggered'])
+        self.assertEqual(len(self.detect_calls()), 1)
+        session.refresh_from_db()
+        self.assertEqual(session.total_captures, 1)
+
+    def test_async_view_requires_authentication(self):
+        request = self.factory.post('/api/detection/image/', {'image': make_image()})
+        response = async_to_sync(AsyncImageAnalysisView.as_view())(request)
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Token')
+        self.assertFalse(self.server.calls)
+
+    def test_async_view_applies_throttles(self):
+        class RejectAllThrottle(BaseThrottle):
+            def allow_request(self, request, view):
+                return False
+
+            def wait(self):
+                return 7
+
+        with mock.patch.object(AsyncImageAnalysisView, 'throttle_classes', [RejectAllThrottle]):
+            response = self.call(AsyncImageAnalysisView, '/api/detection/image/', {'image': make_image()})
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '7')
+        self.assertFalse(self.detect_calls())
+
+    def test_async_view_negotiates_renderer(self):
+        request = self.factory.post(
+            '/api/detection/image/',
+            {'image': make_image()},
+            HTTP_AUTHORIZATION=f'Token {self.token.key}',
+            HTTP_ACCEPT='application/xml'
+        )
+        response = async_to_sync(AsyncImageAnalysisView.as_view())(request)
+
+        self.assertEqual(response.status_code, 406)
+        self.assertEqual(response.accepted_media_type, 'application/json')
+        self.assertFalse(self.detect_calls())
+
+        response = self.call(AsyncImageAnalysisView, '/api/detection/image/', {'image': make_image()})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.accepted_media_type, 'application/json')
+
+    def test_async_service_handles_non_json_body(self):
+        self.server.raw_body = b'<html>502 Bad Gateway</html>'
+
+        async def analyze():
+            return await AsyncAIModelService().analyze_image('https://example.com/a.jpg')
+
+        with mock.patch('detection.services.write_system_log') as write_log:
+            result = async_to_sync(analyze)()
+
+        self.assertFalse(result['success'])
+        self.assertNotIn('is_mock', result)
+        write_log.assert_called_once()
+
+    def test_async_service_overlaps_inference(self):
+        self.server.delay = 0.3
+
+        async def analyze_many():
+            service = AsyncAIModelService()
+            return await asyncio.gather(*[
+                service.analyze_image(f'https://example.com/{index}.jpg') for index in range(20)
+            ])
+
+        start = time.monotonic()
+        results = async_to_sync(analyze_many)()
+        elapsed = time.monotonic() - start
+
+        self.assertTrue(all(result['success'] and not result.get('is_mock') for result in results))
+        self.assertEqual(len(self.detect_calls()), 20)
+        # 순차 처리라면 20 * 0.3 = 6초
+        self.assertLess(elapsed, 3)
+
+
+def free_port_url():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return f'http://127.0.0.1:{sock.getsockname()[1]}'
+
+
+def http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.exceptions.HTTPError(f'HTTP {status_code}', response=response)
+
+
+class CircuitBreakerTest(SimpleTestCase):
+    """AI 서버 서킷 브레이커 상태 전이: closed → open → half_open → closed/open"""
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('detection.health.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.monitor = ServiceHealthMonitor('http://ai.test', failure_threshold=3, reset_timeout=30, cache_ttl=60)
+        # 프로브는 테스트에서 직접 실행
+        patcher = mock.patch.object(self.monitor, 'probe_in_background')
+        self.probe_in_background = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.monitor.record_success()
+
+    def test_consecutive_failures_open_the_circuit(self):
+        self.monitor.record_failure(requests.exceptions.ConnectionError('refused'))
+        self.monitor.record_failure(http_error(500))
+        self.assertEqual(self.monitor.state, ServiceHealthMonitor.CLOSED)
+        self.assertTrue(self.monitor.allow_request())
+
+        self.monitor.record_failure(requests.exceptions.ReadTimeout('timeout'))
+        self.assertEqual(self.monitor.state, ServiceHealthMonitor.OPEN)
+        self.assertFalse(self.monitor.allow_request())
+
+    def test_success_resets_failure_count(self):
+        self.monitor.record_failure(http_error(502))
+        self.monitor.record_failure(http_error(502))
+        self.monitor.record_success()
+        self.monitor.record_failure(http_error(502))
+
+        self.assertEqual(self.monitor.state, ServiceHealthMonitor.CLOSED)
+        self.assertEqual(self.monitor.consecutive_failures, 1)
+
+    def test_client_errors_are_not_failures(self):
+        for _ in range(5):
+            self.monitor.record_failure(http_error(422))
+        self.monitor.record_failure(httpx.HTTPStatusError(
+            'bad request',
+            request=httpx.Request('POST', 'http://ai.test/detect_deepfake'),
+            response=httpx.Response(400)
+        ))
+
+        self.assertEqual(self.monitor.state, ServiceHealthMonitor.CLOSED)
+        self.assertEqual(self.monitor.consecutive_failures, 0)
+
+    def test_half_open_probe_closes_or_reopens(self):
+        for _ in range(3):
+            self.monitor.record_failure(http_error(503))
+        opened_at = self.monitor.opened_at
+
+        # reset_timeout 전에는 프로브 없이 차단
+        self.now += 10
+        self.assertFalse(self.monitor.allow_request())
+        self.probe_in_background.assert_not_called()
+
+        self.now += 20
+        self.assertFalse(self.monitor.allow_request())
+        self.assertEqual(self.monitor.state, ServiceHealthMonitor.HALF_OPEN)
+        self.probe_in_background.assert_called_once_with()
+
+        # 프로브 실패 → 다시 open (reset_timeout 재시작)
+        with mock.patch.object(ModelServerClient, 'get', return_value=mock.Mock(status_code=503)):
+            self.assertFalse(self.monitor.probe())
+        self.assertEqual(self.monitor.state, ServiceHealthMonitor.OPEN)
+        self.assertGreater(self.monitor.opened_at, opened_at)
+
+        self.now += 30
+        self.assertFalse(self.monitor.allow_request())
+        with mock.patch.object(ModelServerClient, 'get', return_value=mock.Mock(status_code=200)):
+            self.assertTrue(self.monitor.probe())
+        self.assertEqual(self.monitor.state, ServiceHealthMonitor.CLOSED)
+        self.assertEqual(self.monitor.consecutive_failures, 0)
+        self.assertTrue(self.monitor.allow_request())
+
+    def test_single_failed_ttl_probe_does_not_open(self):
+        self.now += 61
+        self.assertTrue(self.monitor.allow_request())
+        self.probe_in_background.assert_called_once_with()
+
+        with mock.patch.object(ModelServerClient, 'get', side_effect=requests.exceptions.ConnectionError('refused')):
+            self.assertFalse(self.monitor.probe())
+        self.assertEqual(self.monitor.state, ServiceHealthMonitor.CLOSED)
+        self.assertEqual(self.monitor.consecutive_failures, 1)
+
+
+
+class StatusServerHandler(BaseHTTPRequestHandler):
+    """keep-alive 로 server.status 를 돌려주는 스텁 (요청 메서드와 클라이언트 포트 기록)"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._respond()
+
+    def do_HEAD(self):
+        self._respond()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self._respond()
+
+    def _respond(self):
+        self.server.calls.append((self.command, self.client_address[1]))
+        payload = b'{}'
+        self.send_response(self.server.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ModelServerClientTest(SimpleTestCase):
+    """서버 URL별 공용 클라이언트, keep-alive 커넥션 재사용, GET/HEAD 만 재시도"""
+
+    def setUp(self):
+        self.server = StubAIServer(('127.0.0.1', 0), StatusServerHandler)
+        self.server.calls = []
+        self.server.status = 200
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+        patcher = mock.patch.dict(clients._clients, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_one_client_per_base_url(self):
+        client = get_model_client(self.base_url)
+
+        self.assertIs(get_model_client(self.base_url), client)
+        self.assertIsNot(get_model_client(free_port_url()), client)
+
+    def test_sequential_requests_reuse_one_connection(self):
+        client = ModelServerClient(self.base_url, pool_size=2)
+        self.addCleanup(client.session.close)
+
+        for _ in range(5):
+            self.assertEqual(client.get('/health', read_timeout=5).status_code, 200)
+        client.post('/detect_deepfake', read_timeout=5, json={})
+
+        self.assertEqual(len({port for _, port in self.server.calls}), 1)
+        stats = client.stats()
+        self.assertEqual(stats['connections_opened'], 1)
+        self.assertEqual(stats['idle_connections'], 1)
+        self.assertEqual(stats['total_requests'], 6)
+        self.assertEqual(stats['connection_reuse_ratio'], round(1 - 1 / 6, 3))
+
+    def test_only_idempotent_requests_are_retried(self):
+        self.server.status = 503
+        client = ModelServerClient(self.base_url, max_retries=2, backoff_factor=0)
+        self.addCleanup(client.session.close)
+
+        for method in ['GET', 'HEAD', 'POST']:
+            self.server.calls.clear()
+            response = client.request(method, '/detect_deepfake', read_timeout=5)
+
+            self.assertEqual(response.status_code, 503)
+            expected = 1 if method == 'POST' else 3
+            self.assertEqual([call[0] for call in self.server.calls], [method] * expected)
+
+    def test_retries_stop_at_a_successful_response(self):
+        client = ModelServerClient(self.base_url, max_retries=2, backoff_factor=0)
+        self.addCleanup(client.session.close)
+
+        statuses = iter([502, 504, 200])
+        original = StatusServerHandler._respond
+
+        def respond(handler):
+            handler.server.status = next(statuses)
+            original(handler)
+
+        with mock.patch.object(StatusServerHandler, '_respond', respond):
+            response = client.get('/health', read_timeout=5)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.server.calls), 3)
+
+
+class ConnectionFailureTest(SimpleTestCase):
+    """실제 분석 요청이 연결에 실패하면 Mock 이 아닌 실패 응답"""
+
+    def test_connection_error_returns_failure_not_mock(self):
+        # 연결되지 않는 서버: 상태 캐시는 closed 이므로 실제 호출 후 실패
+        with override_settings(FASTAPI_URL=free_port_url()), \
+                mock.patch.object(ServiceHealthMonitor, 'probe_in_background'), \
+                mock.patch('detection.services.write_system_log') as write_log:
+            sync_result = AIModelService().analyze_image('https://example.com/a.jpg')
+
+            async def analyze():
+                return await AsyncAIModelService().analyze_image('https://example.com/a.jpg')
+            async_result = async_to_sync(analyze)()
+
+        for result in [sync_result, async_result]:
+            self.assertFalse(result['success'])
+            self.assertNotIn('is_mock', result)
+            self.assertIn('error', result)
+        self.assertEqual(write_log.call_count, 2)
+
+
+class AnalysisJobQueueTest(StubAIServerTransactionMixin, APITransactionTestCase):
+    """비동기 분석 작업 큐: 202 등록 → 워커 처리, 대기 수 제한, 작업 가져오기, 멈춘 작업 재등록"""
+
+    def setUp(self):
+        super().setUp()
+        settings_override = override_settings(ANALYSIS_EMBEDDED_WORKER=False)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def pending_record(self, user, **fields):
+        return AnalysisRecord.objects.create(
+            user=user,
+            analysis_type='image',
+            file_name='job.jpg',
+            file_size=100,
+            file_format='jpg',
+            original_path='detection/job.jpg',
+            job_status=fields.pop('job_status', 'pending'),
+            **fields
+        )
+
+    def test_async_request_is_processed_by_worker(self):
+        response = self.client.post(
+            '/api/detection/image/',
+            {'image': make_image(), 'mode': 'async'},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['job_status'], 'pending')
+        self.assertFalse(self.detect_calls())
+
+        status_url = response.data['status_url']
+        self.assertEqual(self.client.get(status_url).data['job_status'], 'pending')
+
+        worker = AnalysisJobWorker(concurrency=1)
+        self.assertEqual(worker.poll_once(), 1)
+        worker.stop(wait=True)
+
+        job = self.client.get(status_url)
+        self.assertEqual(job.status_code, 200)
+        self.assertEqual(job.data['job_status'], 'completed')
+        self.assertEqual(job.data['job_id'], response.data['job_id'])
+        self.assertEqual(len(self.detect_calls()), 1)
+
+        # 다른 사용자의 작업은 조회 불가
+        other = User.objects.create_user(email='other@test.com', password='testpass123!', nickname='other')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(status_url).status_code, 404)
+
+    @override_settings(ANALYSIS_MAX_PENDING_PER_USER=2)
+    def test_pending_jobs_per_user_are_capped(self):
+        status_codes = [
+            self.client.post(
+                '/api/detection/image/',
+                {'image': make_image(f'{color}.jpg', color=color), 'mode': 'async'},
+                format='multipart'
+            ).status_code
+            for color in ['red', 'green', 'blue']
+        ]
+
+        self.assertEqual(status_codes, [202, 202, 429])
+        self.assertEqual(AnalysisRecord.objects.filter(job_status='pending').count(), 2)
+
+    def test_claim_skips_locked_rows_and_limits_jobs_per_user(self):
+        other = User.objects.create_user(email='other@test.com', password='testpass123!', nickname='other')
+        first, second, third = [self.pending_record(self.user) for _ in range(3)]
+        other_job = self.pending_record(other)
+
+        worker = AnalysisJobWorker(concurrency=10, per_user_limit=2)
+        with mock.patch.object(
+            QuerySet, 'select_for_update', autospec=True, side_effect=QuerySet.select_for_update
+        ) as select_for_update:
+            claimed = worker._claim(10)
+            # 다른 워커: 이미 가져간 작업은 없고, 사용자당 처리 중 2개 제한에 걸림
+            self.assertEqual(AnalysisJobWorker(concurrency=10, per_user_limit=2)._claim(10), [])
+
+        self.assertEqual(claimed, [first.record_id, second.record_id, other_job.record_id])
+        self.assertTrue(all(call.kwargs == {'skip_locked': True} for call in select_for_update.call_args_list))
+        self.assertEqual(
+            dict(AnalysisRecord.objects.values_list('record_id', 'job_status')),
+            {
+                first.record_id: 'processing',
+                second.record_id: 'processing',
+                third.record_id: 'pending',
+                other_job.record_id: 'processing',
+            }
+        )
+
+    def test_heavy_user_backlog_does_not_starve_other_users(self):
+        light = User.objects.create_user(email='light@test.com', password='testpass123!', nickname='light')
+        for _ in range(2):
+            self.pending_record(self.user, job_status='processing')
+        heavy_backlog = [self.pending_record(self.user) for _ in range(12)]
+        light_job = self.pending_record(light)
+
+        # 앞쪽 대기 작업이 모두 처리 중 제한에 걸린 사용자 것이어도 뒤의 다른 사용자 작업을 가져감
+        claimed = AnalysisJobWorker(concurrency=2, per_user_limit=2)._claim(2)
+
+        self.assertEqual(claimed, [light_job.record_id])
+        self.assertEqual(
+            AnalysisRecord.objects.filter(record_id__in=[r.record_id for r in heavy_backlog], job_status='pending').count(),
+            12
+        )
+
+    @override_settings(ANALYSIS_JOB_STALE_TIMEOUT=60)
+    def test_stale_processing_jobs_are_requeued(self):
+        stale = self.pending_record(self.user, job_status='processing')
+        fresh = self.pending_record(self.user, job_status='processing')
+        AnalysisRecord.objects.filter(record_id=stale.record_id).update(
+            updated_at=timezone.now() - timedelta(seconds=120)
+        )
+
+        self.assertEqual(AnalysisJobWorker().requeue_stale_jobs(), 1)
+
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual(stale.job_status, 'pending')
+        self.assertEqual(fresh.job_status, 'processing')
+
+    def test_embedded_worker_starts_only_in_web_server_process(self):
+        self.assertTrue(is_web_server_process(['/venv/bin/gunicorn', 'config.wsgi:application']))
+        self.assertTrue(is_web_server_process(['/venv/lib/uvicorn/__main__.py', 'config.asgi:application']))
+        self.assertTrue(is_web_server_process(['manage.py', 'runserver', '--noreload']))
+        self.assertFalse(is_web_server_process(['manage.py', 'migrate']))
+        self.assertFalse(is_web_server_process(['manage.py', 'run_analysis_worker']))
+        with mock.patch.dict(os.environ, {'RUN_MAIN': 'true'}):
+            self.assertTrue(is_web_server_process(['manage.py', 'runserver']))
+        with mock.patch.dict(os.environ, {'RUN_MAIN': ''}):
+            # 자동 리로더의 감시 프로세스
+            self.assertFalse(is_web_server_process(['manage.py', 'runserver']))
+
+        with mock.patch.object(jobs, 'get_worker') as get_worker, \
+                mock.patch.object(jobs.sys, 'argv', ['/venv/bin/gunicorn', 'config.wsgi:application']):
+            jobs.start_embedded_worker()
+            get_worker.assert_not_called()
+
+            with override_settings(ANALYSIS_EMBEDDED_WORKER=True):
+                jobs.start_embedded_worker()
+            get_worker.assert_called_once_with()
+
+
+class RecordListQueryCountTest(APITestCase):
+    """분석 기록 목록의 쿼리 수가 페이지 크기와 무관하게 일정한지 확인"""
+
+    def setUp(self):
+        patcher = mock.patch.object(
+            S3Storage,
+            'get_presigned_url',
+            side_effect=lambda s3_key, expiration=None: f'https://signed.example.com/{s3_key}'
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # 썸네일 지연 생성은 백그라운드 작업이므로 목록 쿼리 수와 무관
+        patcher = mock.patch('media_files.resolvers.ensure_thumbnails', return_value={})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_user_with_records(self, email, count):
+        user = User.objects.create_user(email=email, password='testpass123!', nickname='tester')
+
+        for i in range(count):
+            record = AnalysisRecord.objects.create(
+                user=user,
+                analysis_type='image',
+                file_name=f'{i}.jpg',
+                file_size=1024,
+                file_format='jpg',
+                original_path=f'detection/user_{user.user_id}/{i}.jpg',
+                analysis_result='safe',
+                confidence_score=90,
+                processing_time=100,
+                ai_model_version='v1.0'
+            )
+            MediaFile.objects.create(
+                user=user,
+                original_name=f'{i}.jpg',
+                file_name=f'{i}.jpg',
+                file_size=1024,
+                file_type='image',
+                file_format='jpg',
+                mime_type='image/jpeg',
+                storage_type='s3',
+                file_path=f'https://bucket.s3.amazonaws.com/detection/user_{user.user_id}/{i}.jpg',
+                s3_key=f'detection/user_{user.user_id}/{i}.jpg',
+                purpose='detection',
+                related_model='AnalysisRecord',
+                related_record_id=record.record_id
+            )
+
+        return user
+
+    def count_list_queries(self, user):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/detection/records/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(all(row['image_url'] for row in response.data['results']))
+        return len(queries), len(response.data['results'])
+
+    def test_query_count_is_constant(self):
+        small_user = self.create_user_with_records('small@test.com', 2)
+        large_user = self.create_user_with_records('large@test.com', 20)
+
+        small_queries, small_rows = self.count_list_queries(small_user)
+        large_queries, large_rows = self.count_list_queries(large_user)
+
+        self.assertEqual((small_rows, large_rows), (2, 20))
+        self.assertEqual(small_queries, large_queries)
+        # COUNT + 기록 조회 + MediaFile 일괄 조회 + 썸네일 일괄 조회
+        self.assertEqual(large_queries, 4)
+
+    def test_cursor_pagination_walks_ties_in_order(self):
+        user = self.create_user_with_records('cursor@test.com', 7)
+        # 같은 created_at 이면 record_id 로 순서 결정
+        AnalysisRecord.objects.filter(user=user).update(created_at=timezone.now())
+        expected = list(
+            AnalysisRecord.objects.filter(user=user)
+            .order_by('-record_id').values_list('record_id', flat=True)
+        )
+        self.client.force_authenticate(user)
+
+        url, pages, seen = '/api/detection/records/?pagination=cursor&page_size=3', [], []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            # COUNT 없이 기록 조회 + MediaFile 일괄 조회 + 썸네일 일괄 조회
+            self.assertEqual(len(queries), 3)
+            pages.append(response.data)
+            seen += [row['record_id'] for row in response.data['results']]
+            url = response.data['next']
+
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages), 3)
+
+        response = self.client.get(pages[-1]['previous'])
+        self.assertEqual([row['record_id'] for row in response.data['results']], expected[3:6])
+
+        response = self.client.get('/api/detection/records/?cursor=invalid')
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(DEBUG=False)
+class LocalRecordMediaUrlTest(APITestCase):
+    """로컬 저장 이미지/히트맵 URL 은 DEBUG 가 꺼져도 받을 수 있는 서명된 전송 URL"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, SYSTEM_LOG_ASYNC=False)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        patcher = mock.patch('media_files.resolvers.ensure_thumbnails', return_value={})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user(email='local@test.com', password='testpass123!', nickname='local')
+
+    def upload(self, color):
+        return FileService(self.user).upload_file(make_image(color=color), 'image', 'detection')
+
+    def create_record(self, media_file, analysis_type='image', **extra):
+        return AnalysisRecord.objects.create(
+            user=self.user,
+            analysis_type=analysis_type,
+            file_name=media_file.original_name,
+            file_size=media_file.file_size,
+            file_format='jpg',
+            original_path=media_file.file_path,
+            analysis_result='safe',
+            confidence_score=90,
+            processing_time=100,
+            ai_model_version='v1.0',
+            **extra
+        )
+
+    def test_record_list_urls_are_served_without_debug_static(self):
+        linked = self.upload('red')
+        record = self.create_record(linked)
+        linked.related_model = 'AnalysisRecord'
+        linked.related_record_id = record.record_id
+        linked.save()
+
+        # MediaFile 연결 전에 만들어진 Zoom 캡처 기록은 저장 경로로 찾음
+        unlinked = self.upload('green')
+        heatmap = self.upload('blue')
+        capture = self.create_record(unlinked, analysis_type='zoom', heatmap_path=heatmap.file_path)
+
+        self.client.force_authenticate(self.user)
+        response = self.client.get('/api/detection/records/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['record_id'] for row in response.data['results']], [record.record_id])
+        detail = self.client.get(f'/api/detection/records/{capture.record_id}/')
+        self.assertEqual(detail.status_code, 200)
+        urls = [
+            (response.data['results'][0]['image_url'], linked),
+            (detail.data['image_url'], unlinked),
+            (detail.data['heatmap_url'], heatmap),
+        ]
+
+        # 인증 헤더를 보낼 수 없는 <img> 처럼 토큰만으로 조회
+        self.client.force_authenticate(None)
+        for url, media_file in urls:
+            self.assertIn(f'/api/files/{media_file.file_id}/content/?token=', url)
+            content = self.client.get(url)
+            self.assertEqual(content.status_code, 200)
+            self.assertEqual(content['Content-Length'], str(media_file.file_size))
+            self.assertNotIn('/media/', url)
+
+
+class AnalysisStatisticsTest(APITestCase):
+    """사용자 통계가 기록 완료/삭제 시 갱신되고 API는 통계 행만 읽는지 확인"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='stats@test.com', password='testpass123!', nickname='tester')
+        self.client.force_authenticate(self.user)
+
+    def create_record(self, analysis_result='safe', analysis_type='image', job_status='completed'):
+        return AnalysisRecord.objects.create(
+            user=self.user,
+            analysis_type=analysis_type,
+            file_name='test.jpg',
+            file_size=1024,
+            file_format='jpg',
+            original_path='',
+            analysis_result=analysis_result if job_status == 'completed' else None,
+            confidence_score=90,
+            processing_time=100,
+            ai_model_version='v1.0',
+            job_status=job_status
+        )
+
+    def get_statistics(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/detection/statistics/')
+        self.assertEqual(response.status_code, 200)
+        return response.data, len(queries)
+
+    def test_statistics_follow_record_changes(self):
+        records = [self.create_record('safe') for _ in range(6)]
+        self.create_record('deepfake', analysis_type='video')
+        pending = self.create_record(job_status='pending')
+
+        # 비동기 작업 완료
+        pending = AnalysisRecord.objects.get(record_id=pending.record_id)
+        pending.job_status = 'completed'
+        pending.analysis_result = 'suspicious'
+        pending.save(update_fields=['job_status', 'analysis_result', 'updated_at'])
+
+        # 최근 목록에 있는 기록 삭제
+        AnalysisRecord.objects.get(record_id=pending.record_id).delete()
+        records[0].delete()
+
+        data, query_count = self.get_statistics()
+
+        self.assertEqual(data['total_analyses'], 6)
+        self.assertEqual(data['safe_count'], 5)
+        self.assertEqual(data['suspicious_count'], 0)
+        self.assertEqual(data['deepfake_count'], 1)
+        self.assertEqual(data['type_counts']['video'], 1)
+        self.assertEqual(
+            [row['record_id'] for row in data['recent_analyses']],
+            list(
+                AnalysisRecord.objects.filter(user=self.user, job_status='completed')
+                .order_by('-record_id').values_list('record_id', flat=True)[:5]
+            )
+        )
+        # 통계 행 + 최근 기록 + MediaFile 일괄 조회
+        self.assertEqual(query_count, 3)
+
+    def test_missing_statistics_are_rebuilt(self):
+        self.create_record('safe')
+        self.create_record('deepfake')
+        self.user.analysis_stats.delete()
+
+        data, _ = self.get_statistics()
+
+        self.assertEqual((data['total_analyses'], data['safe_count'], data['deepfake_count']), (2, 1, 1))
+
+
+class VideoSamplingTest(SimpleTestCase):
+    """샘플링 프레임 결과가 얼굴별로 집계되고, 분석 품질에 맞는 수의 프레임만 분석하는지 확인"""
+
+    def frame_result(self, *faces):
+        return {
+            'success': True,
+            'face_count': len(faces),
+            'face_quality_scores': [
+                {'face_id': face_id, 'rate': rate, 'is_deepfake': is_deepfake, 'ResultUrl': f'frame_{face_id}_{rate}'}
+                for face_id, rate, is_deepfake in faces
+            ]
+        }
+
+    def test_face_verdicts_are_aggregated_across_frames(self):
+        frame_results = [
+            (0, 0.0, self.frame_result((1, 0.9, True), (2, 0.8, False))),
+            (30, 1.0, self.frame_result((1, 0.7, True))),
+            (60, 2.0, self.frame_result((1, 0.6, False), (2, 0.6, False))),
+        ]
+
+        faces = aggregate_face_scores(frame_results)
+
+        self.assertEqual([face['face_id'] for face in faces], [1, 2])
+        # 얼굴 1: 3프레임 중 2프레임이 딥페이크 → 딥페이크, 딥페이크 프레임 평균 신뢰도
+        self.assertTrue(faces[0]['is_deepfake'])
+        self.assertAlmostEqual(faces[0]['rate'], 0.8)
+        self.assertEqual(faces[0]['ResultUrl'], 'frame_1_0.9')
+        self.assertEqual((faces[0]['frame_count'], faces[0]['deepfake_frame_count']), (3, 2))
+        self.assertFalse(faces[1]['is_deepfake'])
+        self.assertAlmostEqual(faces[1]['rate'], 0.7)
+
+    @skipUnless(cv2 is not None, 'opencv-python-headless 미설치')
+    def test_frames_are_sampled_by_analysis_quality(self):
+        import numpy as np
+
+        video_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, video_dir, ignore_errors=True)
+        video_path = f'{video_dir}/clip.avi'
+        settings_override = override_settings(MEDIA_ROOT=video_dir, VIDEO_SAMPLING_FRAME_TRANSPORT='file')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        # 10fps x 20초, 1초마다 장면이 바뀌는 영상
+        writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (64, 64))
+        for second in range(20):
+            frame = np.zeros((64, 64, 3), dtype=np.uint8)
+            frame[:, : (second % 8 + 1) * 8] = 255
+            frame[: (second // 8 + 1) * 16, :] = (0, 0, 255)
+            for _ in range(10):
+                writer.write(frame)
+        writer.release()
+
+        with mock.patch.object(
+            AIModelService,
+            'analyze_image',
+            return_value=self.frame_result((1, 0.9, False))
+        ) as analyze_image:
+            low = analyze_sampled_video(video_path, 'low', None)
+            low_calls = analyze_image.call_count
+            high = analyze_sampled_video(video_path, 'high', None)
+            high_calls = analyze_image.call_count - low_calls
+
+        self.assertEqual(low['sampling']['analyzed_frames'], low_calls)
+        self.assertEqual(high['sampling']['analyzed_frames'], high_calls)
+        self.assertLessEqual(low_calls, 4)
+        self.assertGreater(high_calls, low_calls)
+        self.assertEqual(high['face_quality_scores'][0]['frame_count'], high_calls)
+        # 파일 전달 모드: 임시 프레임 파일 경로를 넘기고 분석 후 삭제
+        self.assertTrue(analyze_image.call_args.args[0].startswith(f'{video_dir}/sampling/'))
+        self.assertEqual(os.listdir(f'{video_dir}/sampling'), [])
+
+    def test_frames_are_published_per_transport(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+
+        with override_settings(MEDIA_ROOT=media_root, VIDEO_SAMPLING_FRAME_TRANSPORT='file'):
+            frame_path, release = _publish_frame(b'jpeg-bytes', None)
+            with open(frame_path, 'rb') as f:
+                self.assertEqual(f.read(), b'jpeg-bytes')
+            release()
+            self.assertFalse(os.path.exists(frame_path))
+
+        with override_settings(VIDEO_SAMPLING_FRAME_TRANSPORT='memory'):
+            frame_url, release = _publish_frame(b'jpeg-bytes', 'http://backend')
+            self.assertTrue(frame_url.startswith('http://backend/api/zoom/frames/'))
+            token = frame_url.rstrip('/').rsplit('/', 1)[-1]
+            self.assertEqual(frame_blob_store.get(token), (b'jpeg-bytes', 'image/jpeg'))
+            release()
+            self.assertIsNone(frame_blob_store.get(token))
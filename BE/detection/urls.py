@@ -1,11 +1,16 @@
 # detection/urls.py
+from django.conf import settings
 from django.urls import path
 from .views import (
     ImageAnalysisView,
+    AsyncImageAnalysisView,
+    BatchImageAnalysisView,
     VideoAnalysisView,
     AnalysisRecordListView,
     AnalysisRecordDetailView,
     AnalysisStatisticsView,
+    AnalysisJobStatusView,
+    AnalysisBatchDetailView,
     AIHealthCheckView
 )
 
@@ -13,13 +18,25 @@ app_name = 'detection'
 
 urlpatterns = [
     # 분석
-    path('image/', ImageAnalysisView.as_view(), name='image_analysis'),
+    # ✅ ASGI 배포에서는 AI 응답을 await 하는 async 뷰
+    path(
+        'image/',
+        (AsyncImageAnalysisView if settings.ASYNC_VIEWS_ENABLED else ImageAnalysisView).as_view(),
+        name='image_analysis'
+    ),
+    path('batch/', BatchImageAnalysisView.as_view(), name='batch_analysis'),
     path('video/', VideoAnalysisView.as_view(), name='video_analysis'),
     
     # 기록
     path('records/', AnalysisRecordListView.as_view(), name='record_list'),
     path('records/<int:pk>/', AnalysisRecordDetailView.as_view(), name='record_detail'),
     
+    # 비동기 작업 상태
+    path('jobs/<int:job_id>/', AnalysisJobStatusView.as_view(), name='job_status'),
+    
+    # 일괄 분석 결과
+    path('batches/<int:batch_id>/', AnalysisBatchDetailView.as_view(), name='batch_detail'),
+    
     # 통계
     path('statistics/', AnalysisStatisticsView.as_view(), name='statistics'),
     
@@ -1,29 +1,95 @@
 from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Count, Q
 from django.conf import settings
+from django.urls import reverse
 import os
 
-from .models import AnalysisRecord
+from .models import AnalysisBatch, AnalysisRecord
 from .serializers import (
     AnalysisRecordSerializer,
     AnalysisRecordListSerializer,
     ImageAnalysisRequestSerializer,
+    BatchImageAnalysisRequestSerializer,
     VideoAnalysisRequestSerializer,
-    AnalysisStatisticsSerializer
+    AnalysisBatchSerializer,
+    AnalysisStatisticsSerializer,
+    AnalysisJobStatusSerializer
 )
 from .services import AIModelService
+from .clients import get_model_client
+from .health import get_health_monitor
+from .jobs import create_analysis_job, pending_job_count
+from .stats import get_user_stats, TYPE_FIELDS
+from .batch import analyze_batch
+from .pipeline import (
+    upload_for_detection,
+    analyze_media_file,
+    aanalyze_media_file,
+    build_analysis_response,
+    result_cache
+)
+from media_files.log_writer import system_log_writer
 from media_files.services import FileService
+from media_files.timing import collect_timings, stage
+from media_files.upload_handlers import StreamingUploadMixin
+from config.async_api import AsyncAPIView, database_sync_to_async
+from config.pagination import KeysetPagination
+
+
+def _too_many_pending_jobs(user):
+    """사용자당 대기 작업 수 제한 초과 여부"""
+    return pending_job_count(user) >= settings.ANALYSIS_MAX_PENDING_PER_USER
+
+
+def _submit_analysis_job(request, media_file, analysis_type):
+    """비동기 분석 작업 등록 후 202 응답"""
+    return Response(
+        _create_analysis_job(request, media_file, analysis_type),
+        status=status.HTTP_202_ACCEPTED
+    )
+
+
+def _create_analysis_job(request, media_file, analysis_type):
+    """비동기 분석 작업 등록 (202 응답 본문 반환)"""
+    source_url = None
+    if media_file.storage_type != 's3':
+        source_url = request.build_absolute_uri(f'/media/{media_file.file_path}')
+    
+    record = create_analysis_job(
+        user=request.user,
+        media_file=media_file,
+        analysis_type=analysis_type,
+        source_url=source_url
+    )
+    
+    return {
+        'job_id': record.record_id,
+        'job_status': record.job_status,
+        'status_url': request.build_absolute_uri(
+            reverse('detection:job_status', args=[record.record_id])
+        )
+    }
+
+
+def _too_many_jobs_response():
+    """대기 작업 수 제한 초과 응답"""
+    return Response(
+        {'error': '대기 중인 분석 작업이 너무 많습니다. 잠시 후 다시 시도해주세요.'},
+        status=status.HTTP_429_TOO_MANY_REQUESTS
+    )
 
 
 class ImageAnalysisView(APIView):
     """이미지 딥페이크 분석 API (단일 사람)"""
     
+    @collect_timings('detection.image')
     def post(self, request):
         serializer = ImageAnalysisRequestSerializer(data=request.data)
         
-        if not serializer.is_valid():
+        with stage('validate'):
+            is_valid = serializer.is_valid()
+        if not is_valid:
             return Response(
                 serializer.errors,
                 status=status.HTTP_400_BAD_REQUEST
@@ -31,101 +97,107 @@ class ImageAnalysisView(APIView):
         
         image = serializer.validated_data['image']
         analysis_type = serializer.validated_data['analysis_type']
+        is_async = serializer.validated_data['mode'] == 'async'
         
-        # ✅ FileService 사용
-        file_service = FileService(request.user)
+        if is_async and _too_many_pending_jobs(request.user):
+            return _too_many_jobs_response()
         
         try:
             # ✅ 통합 파일 업로드
-            media_file = file_service.upload_file(
+            media_file = upload_for_detection(
+                user=request.user,
                 uploaded_file=image,
-                file_type='image',
-                purpose='detection',
-                is_temporary=True,  # 분석 후 삭제
-                use_s3=True
+                file_type='image'
             )
             
-            # ✅ S3 URL 생성
-            from media_files.storage import S3Storage
-            
-            if media_file.storage_type == 's3':
-                s3_storage = S3Storage()
-                s3_url = s3_storage.get_presigned_url(media_file.s3_key)
-            else:
-                # 로컬 파일인 경우 전체 URL 생성
-                s3_url = request.build_absolute_uri(f'/media/{media_file.file_path}')
+            # ✅ 비동기 모드: 작업만 등록하고 바로 반환
+            if is_async:
+                return _submit_analysis_job(request, media_file, analysis_type)
             
-            # AI 분석 (S3 URL 전달)
-            ai_service = AIModelService()
-            result = ai_service.analyze_image(s3_url)
+            # ✅ AI 분석 1회 → ResultUrl 서명 → 판정 → 기록 저장
+            outcome = analyze_media_file(
+                user=request.user,
+                media_file=media_file,
+                analysis_type=analysis_type,
+                request=request
+            )
             
-            if not result['success']:
+            if not outcome['success']:
                 return Response(
-                    {'error': result['error']},
+                    {'error': outcome['error']},
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
             
-            # AI 분석
-            ai_service = AIModelService()
-            result = ai_service.analyze_image(s3_url)
-
-            if not result['success']:
-                return Response(...)
-
-            # ✅ ResultUrl을 Presigned URL로 변환 (먼저!)
-            from media_files.storage import S3Storage
-            import re
-
-            for face in result['face_quality_scores']:  # ← result에서 직접!
-                if 'ResultUrl' in face and face['ResultUrl']:
-                    original_url = face['ResultUrl']
-                    
-                    # S3 키 추출
-                    match = re.search(r'amazonaws\.com/(.+?)$', original_url)
-                    if match:
-                        s3_key = match.group(1)
-                        
-                        # Presigned URL 생성
-                        s3_storage = S3Storage()
-                        face['ResultUrl'] = s3_storage.get_presigned_url(s3_key)
-
-            # ✅ 이제 변환된 face_quality_scores로 판정 계산
-            face_scores = result['face_quality_scores']
-            is_any_deepfake = any(face['is_deepfake'] for face in face_scores)
-            avg_confidence = sum(face['rate'] for face in face_scores) / len(face_scores) if face_scores else 0
+            return Response(
+                build_analysis_response(outcome['record'], outcome['result']),
+                status=status.HTTP_201_CREATED
+            )
+        
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-            # 분석 결과 결정
-            if is_any_deepfake:
-                analysis_result = 'deepfake' if avg_confidence >= 0.8 else 'suspicious'
-            else:
-                analysis_result = 'safe'
 
-            # 분석 기록 저장
-            record = AnalysisRecord.objects.create(
+class AsyncImageAnalysisView(AsyncAPIView):
+    """
+    이미지 딥페이크 분석 API async 버전 (ASYNC_VIEWS_ENABLED, ASGI 배포)
+    
+    ImageAnalysisView 와 요청/응답이 같고, AI 서버 응답은 스레드 없이 await 한다.
+    """
+    
+    @collect_timings('detection.image')
+    async def post(self, request):
+        serializer = ImageAnalysisRequestSerializer(data=request.data)
+        
+        # 이미지 검증(Pillow)은 CPU 작업이라 스레드 풀에서
+        with stage('validate'):
+            is_valid = await database_sync_to_async(serializer.is_valid)()
+        if not is_valid:
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        image = serializer.validated_data['image']
+        analysis_type = serializer.validated_data['analysis_type']
+        is_async = serializer.validated_data['mode'] == 'async'
+        
+        if is_async and await database_sync_to_async(_too_many_pending_jobs)(request.user):
+            return _too_many_jobs_response()
+        
+        try:
+            media_file = await database_sync_to_async(upload_for_detection)(
+                user=request.user,
+                uploaded_file=image,
+                file_type='image'
+            )
+            
+            if is_async:
+                return Response(
+                    await database_sync_to_async(_create_analysis_job)(request, media_file, analysis_type),
+                    status=status.HTTP_202_ACCEPTED
+                )
+            
+            # ✅ AI 분석은 await, 기록 저장만 스레드 풀
+            outcome = await aanalyze_media_file(
                 user=request.user,
+                media_file=media_file,
                 analysis_type=analysis_type,
-                file_name=media_file.original_name,
-                file_size=media_file.file_size,
-                file_format=media_file.file_format,
-                original_path=media_file.file_path,
-                analysis_result=analysis_result,
-                confidence_score=avg_confidence * 100,  # 0-100 스케일
-                detection_details=face_scores,  # ✅ 다중 얼굴 결과 저장
-                processing_time=result['processing_time'],
-                ai_model_version='v1.0'
+                request=request
             )
             
-            media_file.related_model = 'AnalysisRecord'
-            media_file.related_record_id = record.record_id
-            media_file.save()
+            if not outcome['success']:
+                return Response(
+                    {'error': outcome['error']},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
             
-            # ✅ 새로운 API 응답 구조
-            return Response({
-                'record_id': record.record_id,
-                'face_count': result['face_count'],
-                'face_quality_scores': result['face_quality_scores'],
-                'processing_time': result['processing_time']
-            }, status=status.HTTP_201_CREATED)
+            return Response(
+                build_analysis_response(outcome['record'], outcome['result']),
+                status=status.HTTP_201_CREATED
+            )
         
         except ValueError as e:
             return Response(
@@ -134,115 +206,109 @@ class ImageAnalysisView(APIView):
             )
 
 
-class VideoAnalysisView(APIView):
+class BatchImageAnalysisView(APIView):
+    """일괄 이미지 분석 API (앨범/단체 사진, 이미지별 결과 + 일괄 분석 ID)"""
+    
+    @collect_timings('detection.batch')
+    def post(self, request):
+        serializer = BatchImageAnalysisRequestSerializer(data=request.data)
+        
+        with stage('validate'):
+            is_valid = serializer.is_valid()
+        if not is_valid:
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # ✅ 업로드 → 분석을 이미지별로 동시에, 기록은 한 번에 저장
+        outcome = analyze_batch(
+            user=request.user,
+            images=serializer.validated_data['images'],
+            analysis_type=serializer.validated_data['analysis_type'],
+            request=request
+        )
+        batch = outcome['batch']
+        
+        if batch is None:
+            return Response(
+                {'error': '모든 이미지 분석에 실패했습니다.', 'results': outcome['results']},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        return Response({
+            'batch_id': batch.batch_id,
+            'image_count': batch.image_count,
+            'completed_count': batch.completed_count,
+            'failed_count': batch.failed_count,
+            'analysis_result': batch.analysis_result,
+            'processing_time': batch.processing_time,
+            'results': outcome['results']
+        }, status=status.HTTP_201_CREATED)
+
+
+class VideoAnalysisView(StreamingUploadMixin, APIView):
     """영상 딥페이크 분석 API (다중 사람)"""
     
+    # ✅ 영상은 임시 파일 없이 S3 multipart 업로드로 바로 스트리밍
+    streaming_upload_fields = ('video',)
+    
+    @collect_timings('detection.video')
     def post(self, request):
         serializer = VideoAnalysisRequestSerializer(data=request.data)
         
-        if not serializer.is_valid():
+        # 스트리밍 도중 확장자/형식/크기 검증 실패
+        upload_rejection = self.get_upload_rejection()
+        if upload_rejection:
+            return Response(
+                {'error': upload_rejection},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        with stage('validate'):
+            is_valid = serializer.is_valid()
+        if not is_valid:
             return Response(
                 serializer.errors,
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         video = serializer.validated_data['video']
+        is_async = serializer.validated_data['mode'] == 'async'
         
-        # ✅ FileService 사용
-        file_service = FileService(request.user)
+        if is_async and _too_many_pending_jobs(request.user):
+            return _too_many_jobs_response()
         
         try:
             # ✅ 통합 파일 업로드
-            media_file = file_service.upload_file(
+            media_file = upload_for_detection(
+                user=request.user,
                 uploaded_file=video,
-                file_type='video',
-                purpose='detection',
-                is_temporary=True,  # 분석 후 삭제
-                use_s3=True
+                file_type='video'
             )
             
-            # ✅ S3 URL 생성
-            from media_files.storage import S3Storage
+            # ✅ 비동기 모드: 작업만 등록하고 바로 반환
+            if is_async:
+                return _submit_analysis_job(request, media_file, 'video')
             
-            if media_file.storage_type == 's3':
-                s3_storage = S3Storage()
-                s3_url = s3_storage.get_presigned_url(media_file.s3_key)
-            else:
-                # 로컬 파일인 경우 전체 URL 생성
-                s3_url = request.build_absolute_uri(f'/media/{media_file.file_path}')
-            
-            # AI 분석 (S3 URL 전달)
-            ai_service = AIModelService()
-            result = ai_service.analyze_video(s3_url)
+            # ✅ AI 분석 1회 → ResultUrl 서명 → 판정 → 기록 저장
+            outcome = analyze_media_file(
+                user=request.user,
+                media_file=media_file,
+                analysis_type='video',
+                request=request
+            )
             
-            if not result['success']:
+            if not outcome['success']:
                 return Response(
-                    {'error': result['error']},
+                    {'error': outcome['error']},
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
             
-            # AI 분석
-            ai_service = AIModelService()
-            result = ai_service.analyze_image(s3_url)
-
-            if not result['success']:
-                return Response(...)
-
-            # ✅ ResultUrl을 Presigned URL로 변환 (먼저!)
-            from media_files.storage import S3Storage
-            import re
-
-            for face in result['face_quality_scores']:  # ← result에서 직접!
-                if 'ResultUrl' in face and face['ResultUrl']:
-                    original_url = face['ResultUrl']
-                    
-                    # S3 키 추출
-                    match = re.search(r'amazonaws\.com/(.+?)$', original_url)
-                    if match:
-                        s3_key = match.group(1)
-                        
-                        # Presigned URL 생성
-                        s3_storage = S3Storage()
-                        face['ResultUrl'] = s3_storage.get_presigned_url(s3_key)
-
-            # ✅ 이제 변환된 face_quality_scores로 판정 계산
-            face_scores = result['face_quality_scores']
-            is_any_deepfake = any(face['is_deepfake'] for face in face_scores)
-            avg_confidence = sum(face['rate'] for face in face_scores) / len(face_scores) if face_scores else 0
-
-            # 분석 결과 결정
-            if is_any_deepfake:
-                analysis_result = 'deepfake' if avg_confidence >= 0.8 else 'suspicious'
-            else:
-                analysis_result = 'safe'
-            
-            # 분석 기록 저장
-            record = AnalysisRecord.objects.create(
-                user=request.user,
-                analysis_type='video',
-                file_name=media_file.original_name,
-                file_size=media_file.file_size,
-                file_format=media_file.file_format,
-                original_path=media_file.file_path,
-                analysis_result=analysis_result,
-                confidence_score=avg_confidence * 100,  # 0-100 스케일
-                detection_details=face_scores,  # ✅ 다중 얼굴 결과 저장
-                processing_time=result['processing_time'],
-                ai_model_version='v1.0'
+            return Response(
+                build_analysis_response(outcome['record'], outcome['result']),
+                status=status.HTTP_201_CREATED
             )
-            
-            # ✅ 관계 연결
-            media_file.related_model = 'AnalysisRecord'
-            media_file.related_record_id = record.record_id
-            media_file.save()
-            
-            # ✅ 새로운 API 응답 구조
-            return Response({
-                'record_id': record.record_id,
-                'face_count': result['face_count'],
-                'face_quality_scores': result['face_quality_scores'],
-                'processing_time': result['processing_time']
-            }, status=status.HTTP_201_CREATED)
         
         except ValueError as e:
             return Response(
@@ -255,11 +321,15 @@ class AnalysisRecordListView(generics.ListAPIView):
     """분석 기록 목록 조회 API"""
     
     serializer_class = AnalysisRecordListSerializer
+    # ✅ ?pagination=cursor 면 키셋 커서 페이지네이션 (기본은 페이지 번호)
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-created_at', '-record_id')
     
     def get_queryset(self):
         # Zoom 캡처 제외
         queryset = AnalysisRecord.objects.filter(
-            user=self.request.user
+            user=self.request.user,
+            job_status='completed'
         ).exclude(
             analysis_type='zoom'
         )
@@ -310,41 +380,100 @@ class AnalysisRecordDetailView(generics.RetrieveDestroyAPIView):
 
 
 class AnalysisStatisticsView(APIView):
-    """분석 통계 API"""
+    """분석 통계 API (사용자별 통계 행 1개 + 최근 기록 조회)"""
     
     def get(self, request):
-        # 사용자의 전체 분석 통계
-        records = AnalysisRecord.objects.filter(user=request.user)
-        
-        stats = records.aggregate(
-            total=Count('record_id'),
-            safe=Count('record_id', filter=Q(analysis_result='safe')),
-            suspicious=Count('record_id', filter=Q(analysis_result='suspicious')),
-            deepfake=Count('record_id', filter=Q(analysis_result='deepfake'))
-        )
+        # ✅ 기록 완료/삭제 시 갱신되는 통계 행 사용 (전체 COUNT 없음)
+        stats = get_user_stats(request.user)
         
         # 최근 5개 분석 기록
-        recent = records[:5]
+        recent = AnalysisRecord.objects.filter(
+            record_id__in=stats.recent_record_ids
+        ).order_by('-record_id')
         
         data = {
-            'total_analyses': stats['total'],
-            'safe_count': stats['safe'],
-            'suspicious_count': stats['suspicious'],
-            'deepfake_count': stats['deepfake'],
-            'recent_analyses': AnalysisRecordListSerializer(recent, many=True).data
+            'total_analyses': stats.total_count,
+            'safe_count': stats.safe_count,
+            'suspicious_count': stats.suspicious_count,
+            'deepfake_count': stats.deepfake_count,
+            'type_counts': {
+                analysis_type: getattr(stats, field)
+                for analysis_type, field in TYPE_FIELDS.items()
+            },
+            'recent_analyses': AnalysisRecordListSerializer(
+                recent,
+                many=True,
+                context={'request': request}
+            ).data
         }
         
         return Response(data)
 
 
+class AnalysisJobStatusView(APIView):
+    """비동기 분석 작업 상태 조회 API"""
+    
+    def get(self, request, job_id):
+        try:
+            record = AnalysisRecord.objects.get(
+                record_id=job_id,
+                user=request.user
+            )
+        except AnalysisRecord.DoesNotExist:
+            return Response(
+                {'error': '작업을 찾을 수 없습니다.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        return Response(AnalysisJobStatusSerializer(record).data)
+
+
+class AnalysisBatchDetailView(APIView):
+    """일괄 분석 결과 조회 API"""
+    
+    def get(self, request, batch_id):
+        try:
+            batch = AnalysisBatch.objects.get(
+                batch_id=batch_id,
+                user=request.user
+            )
+        except AnalysisBatch.DoesNotExist:
+            return Response(
+                {'error': '일괄 분석을 찾을 수 없습니다.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        data = AnalysisBatchSerializer(batch).data
+        data['records'] = AnalysisRecordListSerializer(
+            batch.records.order_by('record_id'),
+            many=True,
+            context={'request': request}
+        ).data
+        return Response(data)
+
+
 class AIHealthCheckView(APIView):
-    """AI 서버 상태 확인 API"""
+    """AI 서버 상태 확인 API (캐시된 상태 반환, ?refresh=true 면 즉시 확인)"""
     
     def get(self, request):
         ai_service = AIModelService()
-        is_healthy = ai_service.check_health()
+        
+        if request.query_params.get('refresh') == 'true':
+            ai_service.check_health()
+        
+        watermark_health = get_health_monitor(settings.FASTAPI_WATERMARK_URL)
         
         return Response({
-            'status': 'healthy' if is_healthy else 'unhealthy',
-            'fastapi_url': ai_service.fastapi_url
-        })
\ No newline at end of file
+            'status': 'healthy' if ai_service.health.is_healthy else 'unhealthy',
+            'fastapi_url': ai_service.fastapi_url,
+            'circuit': ai_service.health.snapshot(),
+            'pool': ai_service.client.stats(),
+            'watermark': {
+                'status': 'healthy' if watermark_health.is_healthy else 'unhealthy',
+                'fastapi_url': watermark_health.base_url,
+                'circuit': watermark_health.snapshot(),
+                'pool': get_model_client(settings.FASTAPI_WATERMARK_URL).stats()
+            },
+            'analysis_cache': result_cache.stats(),
+            'system_log': system_log_writer.stats()
+        })
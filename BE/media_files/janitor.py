@@ -0,0 +1,240 @@
+"""
+만료된 임시 파일 정리
+
+만료된 임시 MediaFile 을 파일 ID 순 키셋 페이지(청크)로 읽어가며
+- S3 객체는 delete_objects (호출당 1000개) 를 여러 개 동시에 호출해 삭제
+- 로컬 파일은 unlink
+- 파일 삭제에 성공한 행만 청크 단위로 한 번에 DB 삭제 (실패한 행은 다음 실행에서 재시도)
+
+중복 제거(content_hash)로 다른 MediaFile 이 같은 저장소 객체를 쓰고 있으면 객체는 남긴다.
+여러 노드에서 동시에 실행돼도 DB 어드바이저리 락으로 한 곳에서만 정리한다.
+"""
+import logging
+import os
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .log_writer import write_system_log
+from .models import MediaFile
+from .storage import S3Storage
+
+logger = logging.getLogger(__name__)
+
+
+CLEANUP_LOCK_NAME = 'media_files.cleanup_temporary_files'
+
+
+@contextmanager
+def advisory_lock(name):
+    """
+    DB 어드바이저리 락 (기다리지 않고 바로 시도)
+
+    MySQL GET_LOCK / PostgreSQL pg_try_advisory_lock 을 쓰고,
+    지원하지 않는 DB(SQLite 등 단일 노드 개발 환경)에서는 항상 획득한 것으로 본다.
+
+    Yields:
+        bool: 락 획득 여부
+    """
+    vendor = connection.vendor
+
+    if vendor == 'mysql':
+        acquire_sql, release_sql, key = 'SELECT GET_LOCK(%s, 0)', 'SELECT RELEASE_LOCK(%s)', name
+    elif vendor == 'postgresql':
+        acquire_sql = 'SELECT pg_try_advisory_lock(%s)'
+        release_sql = 'SELECT pg_advisory_unlock(%s)'
+        key = zlib.crc32(name.encode())
+    else:
+        yield True
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(acquire_sql, [key])
+        acquired = bool(cursor.fetchone()[0])
+
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute(release_sql, [key])
+
+
+class TemporaryFileJanitor:
+    """만료된 임시 파일 일괄 정리"""
+
+    def __init__(self, older_than_hours=None, chunk_size=None, s3_concurrency=None):
+        self.older_than_hours = older_than_hours or settings.TEMP_FILE_RETENTION_HOURS
+        self.chunk_size = chunk_size or settings.TEMP_FILE_CLEANUP_CHUNK_SIZE
+        self.s3_concurrency = s3_concurrency or settings.TEMP_FILE_CLEANUP_S3_CONCURRENCY
+
+    def run(self):
+        """
+        정리 실행
+
+        Returns:
+            dict: {
+                'locked': 다른 노드가 실행 중이라 건너뛰었는지,
+                'scanned': 확인한 행 수,
+                'deleted': DB에서 삭제한 행 수,
+                's3_objects_deleted': 삭제한 S3 객체 수,
+                'local_files_deleted': 삭제한 로컬 파일 수,
+                'shared_skipped': 공유 중이라 남긴 객체 수,
+                'failed': 파일 삭제 실패로 남긴 행 수,
+                'chunks': 처리한 청크 수,
+                'elapsed_seconds': 소요 시간,
+                'rows_per_second': 초당 삭제 행 수
+            }
+        """
+        report = {
+            'locked': False,
+            'scanned': 0,
+            'deleted': 0,
+            's3_objects_deleted': 0,
+            'local_files_deleted': 0,
+            'shared_skipped': 0,
+            'failed': 0,
+            'chunks': 0,
+            'elapsed_seconds': 0.0,
+            'rows_per_second': 0.0,
+        }
+
+        with advisory_lock(CLEANUP_LOCK_NAME) as acquired:
+            if not acquired:
+                report['locked'] = True
+                logger.info("임시 파일 정리: 다른 노드에서 실행 중이라 건너뜀")
+                return report
+
+            started = time.monotonic()
+            with ThreadPoolExecutor(
+                max_workers=self.s3_concurrency,
+                thread_name_prefix='temp-file-janitor'
+            ) as executor:
+                self._run_chunks(executor, report)
+
+            elapsed = time.monotonic() - started
+            report['elapsed_seconds'] = round(elapsed, 3)
+            report['rows_per_second'] = round(report['deleted'] / elapsed, 1) if elapsed > 0 else 0.0
+
+        write_system_log(
+            log_level='info',
+            log_category='system',
+            message=f"임시 파일 정리 완료: {report['deleted']}개 삭제",
+            request_data=report
+        )
+        return report
+
+    def _run_chunks(self, executor, report):
+        threshold_time = timezone.now() - timedelta(hours=self.older_than_hours)
+        expired = MediaFile.objects.filter(
+            is_temporary=True,
+            is_deleted=False,
+            created_at__lt=threshold_time
+        )
+
+        last_id = 0
+        while True:
+            # 키셋 페이지네이션: OFFSET 없이 마지막 file_id 이후만 조회
+            rows = list(
+                expired.filter(file_id__gt=last_id)
+                .order_by('file_id')
+                .values('file_id', 'storage_type', 'file_path', 's3_key')[:self.chunk_size]
+            )
+            if not rows:
+                break
+
+            last_id = rows[-1]['file_id']
+            self._process_chunk(executor, rows, report)
+            report['chunks'] += 1
+
+    def _process_chunk(self, executor, rows, report):
+        report['scanned'] += len(rows)
+        file_ids = [row['file_id'] for row in rows]
+
+        # 이 청크 밖의 살아 있는 MediaFile 이 쓰는 객체는 남김
+        shared = set(
+            MediaFile.objects.filter(
+                file_path__in={row['file_path'] for row in rows},
+                is_deleted=False
+            )
+            .exclude(file_id__in=file_ids)
+            .values_list('storage_type', 'file_path')
+        )
+
+        s3_keys = set()
+        local_paths = set()
+        for row in rows:
+            if (row['storage_type'], row['file_path']) in shared:
+                continue
+            if row['storage_type'] == 's3':
+                if row['s3_key']:
+                    s3_keys.add(row['s3_key'])
+            else:
+                local_paths.add(row['file_path'])
+
+        report['shared_skipped'] += len({
+            (row['storage_type'], row['file_path']) for row in rows
+        } & shared)
+
+        failed_s3_keys = self._delete_s3_objects(executor, sorted(s3_keys), report)
+        failed_local_paths = self._delete_local_files(local_paths, report)
+
+        failed_ids = set()
+        for row in rows:
+            if row['storage_type'] == 's3':
+                if row['s3_key'] in failed_s3_keys:
+                    failed_ids.add(row['file_id'])
+            elif row['file_path'] in failed_local_paths:
+                failed_ids.add(row['file_id'])
+        deletable_ids = [file_id for file_id in file_ids if file_id not in failed_ids]
+
+        if deletable_ids:
+            report['deleted'] += MediaFile.objects.filter(file_id__in=deletable_ids).delete()[0]
+
+        if failed_ids:
+            report['failed'] += len(failed_ids)
+            errors = {**failed_s3_keys, **failed_local_paths}
+            write_system_log(
+                log_level='error',
+                log_category='system',
+                message=f'임시 파일 삭제 실패: {len(failed_ids)}개',
+                error_code='FILE_CLEANUP_ERROR',
+                request_data={
+                    'file_ids': sorted(failed_ids)[:100],
+                    'errors': dict(list(errors.items())[:10])
+                }
+            )
+
+    def _delete_s3_objects(self, executor, s3_keys, report):
+        """1000개 단위 delete_objects 를 동시에 호출, 실패한 키 반환"""
+        if not s3_keys:
+            return {}
+
+        storage = S3Storage()
+        batch_size = S3Storage.DELETE_OBJECTS_MAX_KEYS
+        batches = [s3_keys[i:i + batch_size] for i in range(0, len(s3_keys), batch_size)]
+
+        failed = {}
+        for deleted, errors in executor.map(storage.delete_many, batches):
+            report['s3_objects_deleted'] += len(deleted)
+            failed.update(errors)
+        return failed
+
+    def _delete_local_files(self, local_paths, report):
+        """로컬 파일 unlink, 실패한 경로 반환 (이미 없는 파일은 성공으로 처리)"""
+        failed = {}
+        for file_path in local_paths:
+            try:
+                os.remove(os.path.join(settings.MEDIA_ROOT, file_path))
+                report['local_files_deleted'] += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                failed[file_path] = str(e)
+        return failed
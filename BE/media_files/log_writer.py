@@ -0,0 +1,206 @@
+"""
+SystemLog 비동기 일괄 기록
+
+업로드/삭제/AI 오류마다 SystemLog INSERT + 커밋을 요청 안에서 바로 하는 대신,
+프로세스 내 큐에 넣고 백그라운드 스레드가 bulk_create 로 모아서 저장한다.
+- 배치 크기 SYSTEM_LOG_BATCH_SIZE, 최대 대기 SYSTEM_LOG_FLUSH_INTERVAL 초
+- 큐 크기 SYSTEM_LOG_MAX_BUFFER 를 넘으면 버리고 dropped 로 집계 (요청은 막지 않음)
+- 프로세스 종료 시(atexit) 남은 로그 저장
+- 트랜잭션 안에서 남긴 로그, SYSTEM_LOG_ASYNC=False 면 기존처럼 바로 저장
+
+저장 형식은 그대로 SystemLog 모델이다. 단, created_at 은 실제 저장 시각(최대 flush 간격만큼 늦음)이다.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, close_old_connections, connection
+
+from .models import SystemLog
+
+logger = logging.getLogger(__name__)
+
+
+class SystemLogWriter:
+    """SystemLog 버퍼 + 백그라운드 bulk_create 스레드"""
+
+    _STOP = object()
+
+    def __init__(self, batch_size=None, flush_interval=None, max_buffer=None):
+        self.batch_size = batch_size or settings.SYSTEM_LOG_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.SYSTEM_LOG_FLUSH_INTERVAL
+        self.max_buffer = max_buffer or settings.SYSTEM_LOG_MAX_BUFFER
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def write(self, **fields):
+        """
+        로그 1건 기록 요청 (SystemLog 필드를 키워드 인자로)
+
+        Returns:
+            bool: 기록(또는 큐 등록) 여부, 버퍼가 가득 차 버리면 False
+        """
+        if not settings.SYSTEM_LOG_ASYNC or connection.in_atomic_block:
+            # 트랜잭션 안의 로그는 같은 트랜잭션과 함께 커밋/롤백
+            SystemLog.objects.create(**fields)
+            return True
+
+        log = SystemLog(**fields)
+        # 연결된 객체 대신 ID만 보관 (버퍼에 있는 동안 객체가 삭제/변경돼도 영향 없음)
+        for field in SystemLog._meta.concrete_fields:
+            if field.is_relation and field.is_cached(log):
+                field.delete_cached_value(log)
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(log)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def flush(self, timeout=5):
+        """큐에 쌓인 로그를 지금 저장하고 완료까지 대기"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
+
+    def stop(self, timeout=5):
+        """남은 로그 저장 후 스레드 종료 (atexit)"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(self._STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self._queue.qsize() if self._queue is not None else 0,
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'batches': self.batches,
+                'max_buffer': self.max_buffer,
+            }
+
+    def _ensure_started(self):
+        """첫 기록 시 스레드 시작 (fork 된 워커 프로세스에서는 새로 시작)"""
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._pid == pid and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = pid
+            self._queue = queue.Queue(maxsize=self.max_buffer)
+            self._thread = threading.Thread(
+                target=self._run,
+                name='system-log-writer',
+                daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        batch = []
+        waiters = []
+        deadline = None
+        stopping = False
+
+        while not stopping:
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is self._STOP:
+                stopping = True
+            elif isinstance(item, threading.Event):
+                waiters.append(item)
+            elif item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            timed_out = deadline is not None and time.monotonic() >= deadline
+            if batch and (len(batch) >= self.batch_size or timed_out or waiters or stopping):
+                self._save(batch)
+                batch = []
+                deadline = None
+
+            for waiter in waiters:
+                waiter.set()
+            waiters = []
+
+    def _save(self, batch):
+        close_old_connections()
+        try:
+            SystemLog.objects.bulk_create(batch, batch_size=self.batch_size)
+            with self._lock:
+                self.written += len(batch)
+                self.batches += 1
+        except IntegrityError:
+            # 버퍼에 있는 동안 사용자가 삭제된 경우 등: 한 건 때문에 배치 전체를 버리지 않음
+            self._save_one_by_one(batch)
+        except DatabaseError as e:
+            with self._lock:
+                self.failed += len(batch)
+            logger.error(f"SystemLog 일괄 저장 실패 ({len(batch)}건): {str(e)}")
+            connection.close()
+        except Exception:
+            # 기록 스레드는 어떤 경우에도 멈추지 않음
+            with self._lock:
+                self.failed += len(batch)
+            logger.exception(f"SystemLog 일괄 저장 실패 ({len(batch)}건)")
+
+    def _save_one_by_one(self, batch):
+        written = 0
+        for log in batch:
+            try:
+                try:
+                    log.save(force_insert=True)
+                except IntegrityError:
+                    # 삭제된 사용자의 로그는 사용자 없이 남김
+                    log.pk = None
+                    log.user = None
+                    log.save(force_insert=True)
+                written += 1
+            except DatabaseError as e:
+                with self._lock:
+                    self.failed += 1
+                logger.error(f"SystemLog 저장 실패: {str(e)}")
+
+        with self._lock:
+            self.written += written
+            self.batches += 1
+
+
+system_log_writer = SystemLogWriter()
+atexit.register(system_log_writer.stop)
+
+
+def write_system_log(**fields):
+    """SystemLog 비동기 기록 (SystemLog.objects.create 대체)"""
+    return system_log_writer.write(**fields)
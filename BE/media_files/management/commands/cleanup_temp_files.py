@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from media_files.janitor import TemporaryFileJanitor
+
+
+class Command(BaseCommand):
+    """만료된 임시 파일 정리
+
+    사용법: python manage.py cleanup_temp_files --older-than-hours 72
+    (cron 등으로 여러 노드에서 실행해도 한 노드에서만 정리)
+    """
+
+    help = '만료된 임시 파일(S3 객체, 로컬 파일, DB 행)을 일괄 삭제합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-hours', type=int, default=None, help='보관 시간(시간)')
+        parser.add_argument('--chunk-size', type=int, default=None, help='한 번에 처리할 행 수')
+        parser.add_argument('--concurrency', type=int, default=None, help='동시 S3 delete_objects 호출 수')
+
+    def handle(self, *args, **options):
+        janitor = TemporaryFileJanitor(
+            older_than_hours=options['older_than_hours'],
+            chunk_size=options['chunk_size'],
+            s3_concurrency=options['concurrency']
+        )
+
+        report = janitor.run()
+
+        if report['locked']:
+            self.stdout.write(self.style.WARNING('다른 노드에서 정리 중이라 건너뜁니다.'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"임시 파일 정리 완료: {report['deleted']}개 삭제 "
+            f"({report['chunks']}개 청크, {report['elapsed_seconds']}초, "
+            f"{report['rows_per_second']}행/초)"
+        ))
+        self.stdout.write(
+            f"S3 객체 {report['s3_objects_deleted']}개, 로컬 파일 {report['local_files_deleted']}개 삭제, "
+            f"공유 중 {report['shared_skipped']}개 유지, 실패 {report['failed']}개"
+        )
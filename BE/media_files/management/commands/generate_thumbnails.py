@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from media_files.models import MediaFile
+from media_files.thumbnails import THUMBNAIL_PURPOSE, THUMBNAIL_RELATED_MODEL, create_thumbnails_from_storage
+
+
+class Command(BaseCommand):
+    """썸네일이 없는 기존 이미지의 썸네일 생성
+
+    사용법: python manage.py generate_thumbnails --limit 1000
+    """
+
+    help = '썸네일이 없는 이미지(THUMBNAIL_PURPOSES)의 WebP 썸네일을 생성합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='처리할 최대 파일 수')
+
+    def handle(self, *args, **options):
+        sources = (
+            MediaFile.objects
+            .filter(
+                file_type__in=['image', 'screenshot'],
+                purpose__in=settings.THUMBNAIL_PURPOSES,
+                is_deleted=False
+            )
+            .exclude(
+                file_id__in=MediaFile.objects.filter(
+                    purpose=THUMBNAIL_PURPOSE,
+                    related_model=THUMBNAIL_RELATED_MODEL
+                ).values('related_record_id')
+            )
+            .order_by('file_id')
+        )
+        if options['limit']:
+            sources = sources[:options['limit']]
+
+        created = 0
+        failed = 0
+        for source in sources.iterator():
+            try:
+                created += len(create_thumbnails_from_storage(source))
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"썸네일 생성 실패: file_id={source.file_id} ({str(e)})")
+
+        self.stdout.write(self.style.SUCCESS(f"썸네일 {created}개 생성, 실패 {failed}개"))
@@ -0,0 +1,29 @@
+# Generated by Django 5.1 on 2026-10-18 15:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("media_files", "0003_mediafile"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mediafile",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                max_length=64,
+                null=True,
+                verbose_name="콘텐츠 해시(SHA-256)",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mediafile",
+            index=models.Index(
+                fields=["content_hash"], name="media_files_content_fd44b5_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1 on 2026-10-18 15:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("media_files", "0004_mediafile_content_hash"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="mediafile",
+            name="purpose",
+            field=models.CharField(
+                choices=[
+                    ("detection", "딥페이크 분석"),
+                    ("protection", "콘텐츠 보호"),
+                    ("zoom", "Zoom 감시"),
+                    ("thumbnail", "썸네일"),
+                ],
+                max_length=20,
+                verbose_name="사용 목적",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mediafile",
+            index=models.Index(
+                fields=["related_model", "related_record_id"],
+                name="media_files_related_4af381_idx",
+            ),
+        ),
+    ]
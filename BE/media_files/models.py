@@ -20,6 +20,7 @@ class MediaFile(models.Model):
         ('detection', '딥페이크 분석'),
         ('protection', '콘텐츠 보호'),
         ('zoom', 'Zoom 감시'),
+        ('thumbnail', '썸네일'),
         # ('report', '신고 증거'),
     ]
     
@@ -42,6 +43,12 @@ class MediaFile(models.Model):
     )
     file_format = models.CharField(max_length=10, verbose_name='파일 확장자')
     mime_type = models.CharField(max_length=100, verbose_name='MIME 타입')
+    content_hash = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        verbose_name='콘텐츠 해시(SHA-256)'
+    )
     
     # 저장 위치
     storage_type = models.CharField(
@@ -119,6 +126,8 @@ class MediaFile(models.Model):
             models.Index(fields=['purpose']),
             models.Index(fields=['is_temporary']),
             models.Index(fields=['is_deleted']),
+            models.Index(fields=['content_hash']),
+            models.Index(fields=['related_model', 'related_record_id']),
         ]
     
     def __str__(self):
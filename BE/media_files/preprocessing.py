@@ -0,0 +1,117 @@
+"""
+분석용 이미지 정규화 (Pillow)
+
+원본(최대 IMAGE_MAX_SIZE, 해상도 제한 없음)을 그대로 S3 와 AI 서버로 보내는 대신
+업로드 단계에서 한 번 줄여 저장한다.
+- EXIF 회전 정보 적용 후 EXIF/ICC 등 메타데이터 제거
+- 긴 변을 IMAGE_NORMALIZE_MAX_EDGE(모델 입력 크기)로 제한
+- 투명도가 있으면 PNG, 없으면 JPEG(IMAGE_NORMALIZE_QUALITY)로 다시 인코딩
+
+S3 저장 용량, AI 서버 다운로드 시간, 추론 시간이 함께 줄어든다.
+"""
+import io
+import os
+import time
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+ORIENTATION_TAG = 0x0112
+
+NORMALIZED_FORMATS = {
+    'JPEG': ('jpg', 'image/jpeg'),
+    'PNG': ('png', 'image/png'),
+}
+
+
+def should_normalize(file_type, purpose):
+    """정규화 대상 업로드인지 (분석용 이미지/스크린샷)"""
+    return (
+        settings.IMAGE_NORMALIZE_ENABLED
+        and file_type in ('image', 'screenshot')
+        and purpose in settings.IMAGE_NORMALIZE_PURPOSES
+    )
+
+
+def normalize_image(image_file, max_edge=None, quality=None):
+    """
+    이미지 정규화
+
+    회전/축소/메타데이터 제거가 필요 없고 다시 인코딩해도 작아지지 않으면 원본을 그대로 쓴다.
+
+    Args:
+        image_file: 파일 객체 (읽은 뒤 포인터는 처음으로 되돌림)
+
+    Returns:
+        tuple: (업로드할 파일 객체, 정규화 정보 dict | None)
+               읽을 수 없는 이미지는 (원본, None)
+
+    Raises:
+        ValueError: 픽셀 수가 너무 많은 이미지 (압축 폭탄)
+    """
+    max_edge = max_edge or settings.IMAGE_NORMALIZE_MAX_EDGE
+    quality = quality or settings.IMAGE_NORMALIZE_QUALITY
+    start_time = time.time()
+
+    image_file.seek(0)
+    try:
+        with Image.open(image_file) as image:
+            original_format = image.format
+            original_dimensions = image.size
+            exif = image.getexif()
+            has_metadata = bool(exif) or 'icc_profile' in image.info
+            transposed = exif.get(ORIENTATION_TAG, 1) != 1
+            resized = max(original_dimensions) > max_edge
+
+            # JPEG 은 목표 크기에 가까운 축소 디코딩으로 전체 해상도 디코딩 비용을 줄임
+            if resized:
+                image.draft('RGB', (max_edge, max_edge))
+
+            normalized = ImageOps.exif_transpose(image)
+            if resized:
+                normalized.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+            has_alpha = normalized.mode in ('RGBA', 'LA', 'PA') or (
+                normalized.mode == 'P' and 'transparency' in normalized.info
+            )
+            output_format = 'PNG' if has_alpha else 'JPEG'
+            if output_format == 'JPEG' and normalized.mode != 'RGB':
+                normalized = normalized.convert('RGB')
+
+            buffer = io.BytesIO()
+            if output_format == 'JPEG':
+                normalized.save(buffer, format='JPEG', quality=quality, optimize=True)
+            else:
+                normalized.save(buffer, format='PNG', optimize=True)
+            dimensions = normalized.size
+
+    except Image.DecompressionBombError:
+        raise ValueError('이미지 해상도가 너무 큽니다.')
+    except (UnidentifiedImageError, OSError):
+        # 검증은 확장자/크기까지만 하므로 읽을 수 없는 이미지는 기존처럼 그대로 저장
+        return image_file, None
+    finally:
+        image_file.seek(0)
+
+    normalized_size = buffer.tell()
+    changed = resized or transposed or has_metadata
+    if not changed and normalized_size >= image_file.size:
+        return image_file, None
+
+    extension, content_type = NORMALIZED_FORMATS[output_format]
+    stem = os.path.splitext(image_file.name)[0]
+    normalized_file = SimpleUploadedFile(f'{stem}.{extension}', buffer.getvalue(), content_type=content_type)
+
+    return normalized_file, {
+        'original_size': image_file.size,
+        'normalized_size': normalized_size,
+        'original_format': original_format,
+        'format': output_format,
+        'original_dimensions': list(original_dimensions),
+        'dimensions': list(dimensions),
+        'exif_transposed': transposed,
+        'quality': quality if output_format == 'JPEG' else None,
+        'elapsed_ms': int((time.time() - start_time) * 1000),
+    }
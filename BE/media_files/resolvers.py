@@ -0,0 +1,131 @@
+"""
+연결된 MediaFile 일괄 조회 / URL 생성
+
+목록 Serializer가 행마다 MediaFile.objects.get() + S3Storage()를 호출하던 것을
+페이지 단위 쿼리 1번 + 공용 클라이언트로 한꺼번에 서명하도록 바꾼다.
+"""
+from .models import MediaFile
+from .serving import build_content_url
+from .storage import S3Storage
+from .thumbnails import ensure_thumbnails, get_thumbnails, should_create_thumbnails
+
+
+class RelatedMediaResolver:
+    """related_model / related_record_id 로 연결된 MediaFile 의 URL 조회"""
+
+    def __init__(self, related_model, record_ids, request=None, fallback_paths=None):
+        """
+        Args:
+            related_model: 'AnalysisRecord' 등 연결된 모델 이름
+            record_ids: 한 페이지 분량의 레코드 ID 목록
+            request: 로컬 파일 절대 URL 생성용 (선택)
+            fallback_paths: {레코드 ID: 저장 경로}, 연결된 MediaFile 이 없는 레코드는 경로로 찾음
+        """
+        self.related_model = related_model
+        self.request = request
+        self.media_files = {}
+        self.urls = {}
+        self.path_urls = {}
+        self.thumbnails = {}
+        self._s3_storage = None
+
+        self._prefetch(record_ids)
+        self._prefetch_paths(fallback_paths or {})
+
+    def _prefetch(self, record_ids):
+        """MediaFile 일괄 조회 (쿼리 1번) 후 URL 일괄 생성"""
+        record_ids = [record_id for record_id in record_ids if record_id is not None]
+        if not record_ids:
+            return
+
+        media_files = MediaFile.objects.filter(
+            related_model=self.related_model,
+            related_record_id__in=record_ids,
+            is_deleted=False
+        ).order_by('file_id')
+
+        # 레코드당 첫 번째 파일만 사용
+        for media_file in media_files:
+            self.media_files.setdefault(media_file.related_record_id, media_file)
+
+        # 썸네일 일괄 조회 (쿼리 1번, 서명은 요청한 크기만)
+        self.thumbnails = get_thumbnails(
+            [media_file.file_id for media_file in self.media_files.values()]
+        )
+
+        # 업로드 시 만들지 않은 임시 파일 썸네일은 처음 조회될 때 생성
+        missing = [
+            media_file for media_file in self.media_files.values()
+            if media_file.file_id not in self.thumbnails
+            and should_create_thumbnails(media_file.file_type, media_file.purpose)
+        ]
+        if missing:
+            self.thumbnails.update(ensure_thumbnails(missing))
+
+        self._sign_all()
+
+    def _prefetch_paths(self, fallback_paths):
+        """연결되지 않은 레코드의 저장 경로로 MediaFile 일괄 조회 (해당 레코드가 있을 때만 쿼리 1번)"""
+        paths = {
+            path for record_id, path in fallback_paths.items()
+            if path and record_id not in self.media_files
+        }
+        if not paths:
+            return
+
+        for media_file in MediaFile.objects.filter(file_path__in=paths, is_deleted=False).order_by('file_id'):
+            if media_file.file_path not in self.path_urls:
+                self.path_urls[media_file.file_path] = self.build_url(media_file)
+
+    @property
+    def s3_storage(self):
+        if self._s3_storage is None:
+            self._s3_storage = S3Storage()
+        return self._s3_storage
+
+    def _sign_all(self):
+        """S3 파일은 공용 클라이언트 하나로 서명, 로컬 파일은 서명된 전송 URL"""
+        for record_id, media_file in self.media_files.items():
+            self.urls[record_id] = self.build_url(media_file)
+
+    def build_url(self, media_file):
+        """MediaFile URL (S3는 Presigned URL, 로컬은 MediaFileContentView 서명 URL)"""
+        if media_file.storage_type == 's3' and media_file.s3_key:
+            return self.s3_storage.get_presigned_url(media_file.s3_key)
+        # /media/ 는 DEBUG 에서만 열려 있으므로 운영에서도 받을 수 있는 전송 API 사용
+        return build_content_url(self.request, media_file)
+
+    def get(self, record_id):
+        """레코드에 연결된 MediaFile (없으면 None)"""
+        return self.media_files.get(record_id)
+
+    def url_for(self, record_id, fallback_path=None):
+        """
+        레코드의 파일 URL
+
+        Args:
+            record_id: 레코드 ID
+            fallback_path: 연결된 MediaFile 이 없을 때 사용할 저장 경로 (fallback_paths 로 미리 조회)
+        """
+        if record_id in self.urls:
+            return self.urls[record_id]
+
+        return self.path_urls.get(fallback_path)
+
+    def thumbnail_url_for(self, record_id, size):
+        """
+        레코드 파일의 썸네일 URL (썸네일이 없으면 None)
+
+        Args:
+            record_id: 레코드 ID
+            size: THUMBNAIL_SIZES 중 하나
+        """
+        media_file = self.media_files.get(record_id)
+        if media_file is None:
+            return None
+
+        thumbnail = self.thumbnails.get(media_file.file_id, {}).get(size)
+        if thumbnail is None:
+            return None
+
+        return self.build_url(thumbnail)
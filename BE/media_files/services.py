@@ -1,11 +1,16 @@
+import hashlib
 import os
 import uuid
 import mimetypes
 from django.conf import settings
 from django.core.files.uploadedfile import UploadedFile
 from django.utils import timezone
-from .models import MediaFile, SystemLog
+from .log_writer import write_system_log
+from .models import MediaFile
+from .preprocessing import normalize_image, should_normalize
 from .storage import S3Storage
+from .thumbnails import create_thumbnails, delete_thumbnails, should_create_thumbnails
+from .timing import stage
 
 
 
@@ -37,7 +42,8 @@ class FileService:
         purpose: str,
         is_temporary: bool = False,
         metadata: dict = None,
-        use_s3: bool = False
+        use_s3: bool = False,
+        normalize: bool = True
     ) -> MediaFile:
         """
         파일 업로드 및 DB 저장
@@ -49,20 +55,133 @@ class FileService:
             is_temporary: 임시 파일 여부
             metadata: 추가 메타데이터
             use_s3: S3 사용 여부
+            normalize: 분석용 이미지 정규화 여부 (detection/zoom 이미지만 해당)
         
         Returns:
             MediaFile: 저장된 미디어 파일 객체
         """
         
+        # 업로드 핸들러가 이미 S3로 스트리밍한 파일 (S3StreamedFile)
+        streamed_s3_key = getattr(uploaded_file, 's3_key', None)
+        
         # 1. 파일 검증
-        self._validate_file(uploaded_file, file_type)
+        try:
+            with stage('validate'):
+                self._validate_file(uploaded_file, file_type)
+        except ValueError:
+            if streamed_s3_key:
+                S3Storage().delete(streamed_s3_key)
+            raise
+        
+        # ✅ 분석용 이미지는 회전 적용/메타데이터 제거/축소 후 저장 (해시도 저장되는 내용 기준)
+        original_name = uploaded_file.name
+        if normalize and not streamed_s3_key and should_normalize(file_type, purpose):
+            with stage('normalize'):
+                uploaded_file, metadata = self._normalize_image(
+                    uploaded_file, file_type, purpose, is_temporary, metadata, use_s3
+                )
+        
+        # 2. 콘텐츠 해시 (스트리밍 업로드는 핸들러가 계산한 값 사용)
+        with stage('validate'):
+            content_hash = (
+                getattr(uploaded_file, 'content_hash', None)
+                or self._compute_content_hash(uploaded_file)
+            )
+        
+        # 3. 파일 저장 (같은 내용의 파일이 이미 있으면 저장소 객체 재사용)
+        with stage('store'):
+            storage = self._store_file(uploaded_file, purpose, use_s3, streamed_s3_key, content_hash)
+        unique_filename, file_path, s3_key, s3_bucket, storage_type, duplicate = storage
+        extension = self._get_file_extension(uploaded_file.name)
+        
+        # 4. MIME 타입 결정
+        mime_type, _ = mimetypes.guess_type(uploaded_file.name)
+        if not mime_type:
+            mime_type = uploaded_file.content_type or 'application/octet-stream'
+        
+        # 5. DB 저장
+        with stage('persist'):
+            media_file = MediaFile.objects.create(
+                user=self.user,
+                original_name=original_name,
+                file_name=unique_filename,
+                file_size=uploaded_file.size,
+                file_type=file_type,
+                file_format=extension,
+                mime_type=mime_type,
+                content_hash=content_hash,
+                storage_type=storage_type,
+                file_path=file_path,
+                s3_key=s3_key,
+                s3_bucket=s3_bucket,
+                purpose=purpose,
+                is_temporary=is_temporary,
+                metadata=metadata or {}
+            )
+        
+        if streamed_s3_key:
+            uploaded_file.is_saved = True
+        
+        # ✅ 목록 화면용 WebP 썸네일 (실패해도 업로드는 성공)
+        # 임시 파일은 목록에서 처음 조회될 때 생성 (thumbnails.ensure_thumbnails)
+        if not streamed_s3_key and not is_temporary and should_create_thumbnails(file_type, purpose):
+            with stage('thumbnail'):
+                self._create_thumbnails(media_file, uploaded_file)
+        
+        # 6. 로그 기록
+        write_system_log(
+            user=self.user,
+            log_level='info',
+            log_category='system',
+            message=f'파일 업로드 성공: {original_name}',
+            request_data={
+                'file_type': file_type,
+                'purpose': purpose,
+                'file_size': uploaded_file.size,
+                'deduplicated': duplicate is not None
+            }
+        )
         
-        # 2. 파일명 생성
+        return media_file
+    
+    def _store_file(
+        self,
+        uploaded_file: UploadedFile,
+        purpose: str,
+        use_s3: bool,
+        streamed_s3_key: str,
+        content_hash: str
+    ) -> tuple:
+        """
+        저장소에 파일 저장 (같은 내용의 파일이 이미 있으면 저장소 객체 재사용)
+        
+        Returns:
+            tuple: (unique_filename, file_path, s3_key, s3_bucket, storage_type, duplicate)
+        """
         extension = self._get_file_extension(uploaded_file.name)
-        unique_filename = self._generate_unique_filename(extension)
+        duplicate = self._find_duplicate(
+            content_hash,
+            's3' if (use_s3 or streamed_s3_key) else 'local'
+        )
         
-        # 3. 파일 저장
-        if use_s3:
+        if duplicate is not None:
+            if streamed_s3_key:
+                # 이미 올라간 스트리밍 객체는 중복이므로 제거
+                S3Storage().delete(streamed_s3_key)
+            unique_filename = duplicate.file_name
+            file_path = duplicate.file_path
+            s3_key = duplicate.s3_key
+            s3_bucket = duplicate.s3_bucket
+            storage_type = duplicate.storage_type
+        elif streamed_s3_key:
+            # 다시 올리지 않고 스트리밍 결과만 기록
+            unique_filename = streamed_s3_key.rsplit('/', 1)[-1]
+            s3_key = streamed_s3_key
+            file_path = f"https://{settings.AWS_S3_CUSTOM_DOMAIN}/{s3_key}"
+            storage_type = 's3'
+            s3_bucket = settings.AWS_STORAGE_BUCKET_NAME
+        elif use_s3:
+            unique_filename = self._generate_unique_filename(extension)
             file_path, s3_key = self._save_to_s3(
                 uploaded_file,
                 unique_filename,
@@ -71,6 +190,7 @@ class FileService:
             storage_type = 's3'
             s3_bucket = settings.AWS_STORAGE_BUCKET_NAME
         else:
+            unique_filename = self._generate_unique_filename(extension)
             file_path = self._save_to_local(
                 uploaded_file,
                 unique_filename,
@@ -80,43 +200,55 @@ class FileService:
             s3_bucket = None
             storage_type = 'local'
         
-        # 4. MIME 타입 결정
-        mime_type, _ = mimetypes.guess_type(uploaded_file.name)
-        if not mime_type:
-            mime_type = uploaded_file.content_type or 'application/octet-stream'
+        return unique_filename, file_path, s3_key, s3_bucket, storage_type, duplicate
+    
+    def _normalize_image(
+        self,
+        uploaded_file: UploadedFile,
+        file_type: str,
+        purpose: str,
+        is_temporary: bool,
+        metadata: dict,
+        use_s3: bool
+    ) -> tuple:
+        """
+        분석용 이미지 정규화 (전후 크기는 metadata['preprocessing']에 기록)
         
-        # 5. DB 저장
-        media_file = MediaFile.objects.create(
-            user=self.user,
-            original_name=uploaded_file.name,
-            file_name=unique_filename,
-            file_size=uploaded_file.size,
-            file_type=file_type,
-            file_format=extension,
-            mime_type=mime_type,
-            storage_type=storage_type,
-            file_path=file_path,
-            s3_key=s3_key,
-            s3_bucket=s3_bucket,
-            purpose=purpose,
-            is_temporary=is_temporary,
-            metadata=metadata or {}
-        )
+        IMAGE_NORMALIZE_KEEP_ORIGINAL 이면 원본도 별도 MediaFile 로 저장한다.
         
-        # 6. 로그 기록
-        SystemLog.objects.create(
-            user=self.user,
-            log_level='info',
-            log_category='system',
-            message=f'파일 업로드 성공: {uploaded_file.name}',
-            request_data={
-                'file_type': file_type,
-                'purpose': purpose,
-                'file_size': uploaded_file.size
-            }
-        )
+        Returns:
+            tuple: (저장할 파일 객체, metadata)
+        """
+        normalized_file, preprocessing = normalize_image(uploaded_file)
+        if preprocessing is None:
+            return uploaded_file, metadata
+        
+        if settings.IMAGE_NORMALIZE_KEEP_ORIGINAL:
+            original = self.upload_file(
+                uploaded_file=uploaded_file,
+                file_type=file_type,
+                purpose=purpose,
+                is_temporary=is_temporary,
+                metadata={'normalized_original': True},
+                use_s3=use_s3,
+                normalize=False
+            )
+            preprocessing['original_file_id'] = original.file_id
         
-        return media_file
+        return normalized_file, {**(metadata or {}), 'preprocessing': preprocessing}
+    
+    def _create_thumbnails(self, media_file: MediaFile, uploaded_file: UploadedFile):
+        """썸네일 생성 (실패는 로그만 남김)"""
+        try:
+            create_thumbnails(media_file, uploaded_file)
+        except Exception as e:
+            write_system_log(
+                user=self.user,
+                log_level='warning',
+                log_category='system',
+                message=f'썸네일 생성 실패: {media_file.original_name} ({str(e)})',
+                request_data={'file_id': media_file.file_id}
+            )
     
     def _validate_file(self, uploaded_file: UploadedFile, file_type: str):
         """파일 유효성 검사"""
@@ -140,6 +272,40 @@ class FileService:
                 f"파일 크기는 {max_size_mb}MB 이하여야 합니다."
             )
     
+    def _compute_content_hash(self, uploaded_file: UploadedFile) -> str:
+        """파일 내용 SHA-256 (청크 단위로 읽고 포인터는 처음으로 되돌림)"""
+        hasher = hashlib.sha256()
+        uploaded_file.seek(0)
+        for chunk in uploaded_file.chunks():
+            hasher.update(chunk)
+        uploaded_file.seek(0)
+        return hasher.hexdigest()
+    
+    def _find_duplicate(self, content_hash: str, storage_type: str):
+        """같은 사용자의 같은 내용 파일 (저장소 객체 재사용용, 없으면 None)"""
+        duplicate = MediaFile.objects.filter(
+            user=self.user,
+            content_hash=content_hash,
+            storage_type=storage_type,
+            is_deleted=False
+        ).order_by('-file_id').first()
+        
+        if duplicate is not None and storage_type == 'local':
+            full_path = os.path.join(settings.MEDIA_ROOT, duplicate.file_path)
+            if not os.path.exists(full_path):
+                return None
+        
+        return duplicate
+    
+    @staticmethod
+    def _is_shared(media_file: MediaFile) -> bool:
+        """같은 저장소 객체를 가리키는 다른 MediaFile 이 남아 있는지"""
+        return MediaFile.objects.filter(
+            storage_type=media_file.storage_type,
+            file_path=media_file.file_path,
+            is_deleted=False
+        ).exclude(file_id=media_file.file_id).exists()
+    
     def _get_file_extension(self, filename: str) -> str:
         """파일 확장자 추출"""
         return filename.split('.')[-1].lower()
@@ -196,6 +362,10 @@ class FileService:
         
         return s3_key, s3_key
     
+    def _build_s3_key(self, filename: str, purpose: str) -> str:
+        """S3 키 생성 ({purpose}/user_{id}/{filename})"""
+        return f"{purpose}/user_{self.user.user_id}/{filename}"
+    
     def get_file(self, file_id: int) -> MediaFile:
         """파일 조회"""
         try:
@@ -240,7 +410,7 @@ class FileService:
             media_file.save()
         
         # 로그 기록
-        SystemLog.objects.create(
+        write_system_log(
             user=self.user,
             log_level='info',
             log_category='system',
@@ -260,7 +430,7 @@ class FileService:
         """S3에 파일 저장"""
         
         # S3 키 생성
-        s3_key = f"{purpose}/user_{self.user.user_id}/{filename}"
+        s3_key = self._build_s3_key(filename, purpose)
         
         # S3 업로드
         s3_storage = S3Storage()
@@ -294,8 +464,11 @@ class FileService:
         media_file = self.get_file(file_id)
         
         if hard_delete:
-            # 물리적 파일 삭제
-            if media_file.storage_type == 'local':
+            # 물리적 파일 삭제 (중복 제거로 공유 중인 객체는 남겨 둠)
+            if self._is_shared(media_file):
+                pass
+            
+            elif media_file.storage_type == 'local':
                 file_full_path = os.path.join(
                     settings.MEDIA_ROOT,
                     media_file.file_path
@@ -308,7 +481,8 @@ class FileService:
                 s3_storage = S3Storage()
                 s3_storage.delete(media_file.s3_key)
             
-            # DB에서 삭제
+            # DB에서 삭제 (썸네일 포함)
+            delete_thumbnails([media_file.file_id])
             media_file.delete()
         else:
             # 논리적 삭제
@@ -317,7 +491,7 @@ class FileService:
             media_file.save()
         
         # 로그 기록
-        SystemLog.objects.create(
+        write_system_log(
             user=self.user,
             log_level='info',
             log_category='system',
@@ -329,54 +503,18 @@ class FileService:
         )
     
     @staticmethod
-    def cleanup_temporary_files(older_than_hours: int = 72):
+    def cleanup_temporary_files(older_than_hours: int = None):
         """
-        임시 파일 정리 (Celery 태스크에서 호출)
+        임시 파일 정리 (Celery 태스크 / cleanup_temp_files 명령에서 호출)
         
         Args:
-            older_than_hours: 이 시간보다 오래된 임시 파일 삭제
-        """
-        
-        from datetime import timedelta
-        
-        threshold_time = timezone.now() - timedelta(hours=older_than_hours)
+            older_than_hours: 이 시간보다 오래된 임시 파일 삭제 (기본 TEMP_FILE_RETENTION_HOURS)
         
-        # 오래된 임시 파일 조회
-        old_temp_files = MediaFile.objects.filter(
-            is_temporary=True,
-            is_deleted=False,
-            created_at__lt=threshold_time
-        )
-        
-        deleted_count = 0
-        for media_file in old_temp_files:
-            try:
-                # 물리적 파일 삭제
-                if media_file.storage_type == 'local':
-                    file_full_path = os.path.join(
-                        settings.MEDIA_ROOT,
-                        media_file.file_path
-                    )
-                    if os.path.exists(file_full_path):
-                        os.remove(file_full_path)
-                
-                # DB에서 삭제
-                media_file.delete()
-                deleted_count += 1
-            except Exception as e:
-                SystemLog.objects.create(
-                    log_level='error',
-                    log_category='system',
-                    message=f'임시 파일 삭제 실패: {media_file.original_name}',
-                    error_code='FILE_CLEANUP_ERROR',
-                    request_data={'file_id': media_file.file_id, 'error': str(e)}
-                )
+        Returns:
+            int: 삭제된 파일 수
+        """
         
-        # 로그 기록
-        SystemLog.objects.create(
-            log_level='info',
-            log_category='system',
-            message=f'임시 파일 정리 완료: {deleted_count}개 삭제'
-        )
+        from .janitor import TemporaryFileJanitor
         
-        return deleted_count
\ No newline at end of file
+        report = TemporaryFileJanitor(older_than_hours=older_than_hours).run()
+        return report['deleted']
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+로컬 저장 미디어 전송
+
+DEBUG 의 django.conf.urls.static 대신 MediaFileContentView 가 소유자/서명 확인 후 전송한다.
+- MEDIA_SENDFILE_BACKEND='nginx': X-Accel-Redirect 로 프록시에 전송을 넘김
+  (nginx: location /protected-media/ { internal; alias <MEDIA_ROOT>/; })
+- MEDIA_SENDFILE_BACKEND='apache': X-Sendfile (mod_xsendfile)
+- 비어 있으면 Django 가 직접 전송: ETag / Last-Modified 조건부 요청(304), Range(206) 지원
+
+다운로드 URL 에는 만료 시간이 있는 서명(token)을 붙여
+인증 헤더를 보낼 수 없는 <img>/<video> 플레이어도 바로 재생할 수 있다.
+"""
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core import signing
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date
+
+from .models import MediaFile
+
+
+SIGNING_SALT = 'media_files.content'
+
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def sign_file_id(file_id):
+    """파일 ID 서명 토큰"""
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign(str(file_id)).split(':', 1)[1]
+
+
+def verify_file_token(file_id, token):
+    """토큰이 이 파일의 유효한(만료 전) 서명인지"""
+    if not token:
+        return False
+    try:
+        signing.TimestampSigner(salt=SIGNING_SALT).unsign(
+            f'{file_id}:{token}',
+            max_age=settings.MEDIA_SERVE_URL_EXPIRATION
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def build_content_url(request, media_file):
+    """서명된 로컬 파일 전송 URL (절대 URL)"""
+    path = reverse('media_files:content', args=[media_file.file_id])
+    url = f'{path}?token={sign_file_id(media_file.file_id)}'
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def build_path_content_url(request, user, file_path):
+    """
+    저장 경로만 알고 있는 로컬 파일(프로필 이미지, 히트맵)의 서명된 전송 URL
+
+    Returns:
+        str: 사용자의 MediaFile 이 없으면 None
+    """
+    media_file = (
+        MediaFile.objects
+        .filter(user=user, file_path=file_path, is_deleted=False)
+        .only('file_id')
+        .first()
+    )
+    if media_file is None:
+        return None
+    return build_content_url(request, media_file)
+
+
+def _resolve_path(media_file):
+    """MEDIA_ROOT 안의 실제 경로 (밖을 가리키거나 없으면 404)"""
+    media_root = os.path.realpath(settings.MEDIA_ROOT)
+    full_path = os.path.realpath(os.path.join(media_root, media_file.file_path))
+
+    if os.path.commonpath([media_root, full_path]) != media_root or not os.path.isfile(full_path):
+        raise Http404('파일을 찾을 수 없습니다.')
+    return full_path
+
+
+def _parse_range(header, file_size):
+    """
+    단일 Range 헤더 해석
+
+    Returns:
+        tuple: (start, end) 포함 범위, 헤더가 없거나 해석할 수 없으면 None
+    Raises:
+        ValueError: 만족할 수 없는 범위 (416)
+    """
+    match = RANGE_PATTERN.match(header.strip()) if header else None
+    if not match:
+        # 여러 구간 요청 등은 전체 응답 (RFC 9110 허용)
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # bytes=-N : 마지막 N 바이트
+        length = int(last)
+        if length == 0:
+            raise ValueError('empty suffix range')
+        return max(0, file_size - length), file_size - 1
+
+    start = int(first)
+    end = min(int(last), file_size - 1) if last else file_size - 1
+    if start >= file_size or start > end:
+        raise ValueError('unsatisfiable range')
+    return start, end
+
+
+def _iter_range(full_path, start, length, chunk_size):
+    with open(full_path, 'rb') as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def serve_media_file(request, media_file):
+    """
+    로컬 MediaFile 전송 응답 (권한 확인은 호출 측)
+
+    Raises:
+        Http404: 파일이 없음
+    """
+    full_path = _resolve_path(media_file)
+    stat = os.stat(full_path)
+    etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    last_modified = int(stat.st_mtime)
+
+    # If-None-Match / If-Modified-Since → 304, If-Match 불일치 → 412
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if conditional is not None:
+        return conditional
+
+    content_type = media_file.mime_type or 'application/octet-stream'
+    backend = settings.MEDIA_SENDFILE_BACKEND
+
+    if backend == 'nginx':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = quote(
+            f"{settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{media_file.file_path}"
+        )
+    elif backend == 'apache':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+    else:
+        response = _direct_response(request, full_path, stat.st_size, content_type, etag)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = f'private, max-age={settings.MEDIA_SERVE_URL_EXPIRATION}'
+    response['Content-Disposition'] = content_disposition_header(False, media_file.original_name)
+    return response
+
+
+def _direct_response(request, full_path, file_size, content_type, etag):
+    """프록시 없이 직접 전송 (Range → 206)"""
+    range_header = request.META.get('HTTP_RANGE')
+
+    # If-Range 가 현재 ETag 와 다르면 파일이 바뀐 것이므로 전체 전송
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range != etag:
+        range_header = None
+
+    try:
+        byte_range = _parse_range(range_header, file_size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{file_size}'
+        return response
+
+    if byte_range is None:
+        return FileResponse(open(full_path, 'rb'), content_type=content_type)
+
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(
+        _iter_range(full_path, start, length, settings.MEDIA_SERVE_CHUNK_SIZE),
+        status=206,
+        content_type=content_type
+    )
+    response['Content-Length'] = str(length)
+    response['Content-Range'] = f'bytes {start}-{end}/{file_size}'
+    return response
@@ -1,25 +1,196 @@
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from collections import OrderedDict
 from django.conf import settings
+from django.core.cache import caches
 import logging
 import tempfile
+import threading
+import time
+from .timing import timed_stage
 
 logger = logging.getLogger(__name__)
 
 
+_s3_clients = {}
+_s3_clients_lock = threading.Lock()
+
+
+def get_s3_client():
+    """
+    프로세스 공용 S3 클라이언트
+    
+    boto3 클라이언트는 생성 비용(수 ms, 메모리)이 크고 스레드 안전하므로
+    설정값 조합별로 하나만 만들어 재사용한다.
+    """
+    key = (
+        settings.AWS_ACCESS_KEY_ID,
+        settings.AWS_SECRET_ACCESS_KEY,
+        settings.AWS_REGION,
+        settings.AWS_S3_MAX_POOL_CONNECTIONS,
+    )
+    
+    client = _s3_clients.get(key)
+    if client is not None:
+        return client
+    
+    with _s3_clients_lock:
+        client = _s3_clients.get(key)
+        if client is None:
+            client = boto3.client(
+                's3',
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                region_name=settings.AWS_REGION,
+                config=Config(max_pool_connections=settings.AWS_S3_MAX_POOL_CONNECTIONS)
+            )
+            _s3_clients[key] = client
+        return client
+
+
+class PresignedURLCache:
+    """
+    Presigned URL 캐시 (프로세스 LRU + 선택적 Django 캐시)
+    
+    (버킷, 키, 만료 시간) 별로 서명한 URL과 만료 시각을 보관하고,
+    남은 유효 시간이 AWS_PRESIGNED_URL_MIN_REMAINING 보다 많으면 같은 URL을 돌려준다.
+    같은 파일에 항상 같은 URL이 나가므로 목록 렌더링 시 서명 비용이 줄고
+    모바일 클라이언트의 이미지 캐시도 적중한다.
+    """
+    
+    KEY_PREFIX = 'presigned_url'
+    
+    def __init__(self):
+        self._entries = OrderedDict()
+        # (버킷, 키) -> 캐시 키 집합 (삭제 시 전체 항목을 훑지 않도록)
+        self._keys_by_file = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def _cache_key(self, bucket, s3_key, expiration):
+        return f'{self.KEY_PREFIX}:{bucket}:{expiration}:{s3_key}'
+    
+    def _shared_cache(self):
+        """설정된 Django 캐시 (없으면 None)"""
+        alias = settings.AWS_PRESIGNED_URL_CACHE_ALIAS
+        return caches[alias] if alias else None
+    
+    def _is_fresh(self, entry, now):
+        return entry is not None and entry[1] - now > settings.AWS_PRESIGNED_URL_MIN_REMAINING
+    
+    def get(self, bucket, s3_key, expiration):
+        """
+        아직 충분히 유효한 URL 조회
+        
+        Returns:
+            str: 캐시된 URL, 없거나 곧 만료되면 None
+        """
+        cache_key = self._cache_key(bucket, s3_key, expiration)
+        now = time.time()
+        
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if self._is_fresh(entry, now):
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return entry[0]
+        
+        shared = self._shared_cache()
+        if shared is not None:
+            entry = shared.get(cache_key)
+            if self._is_fresh(entry, now):
+                self._remember(bucket, s3_key, cache_key, entry)
+                with self._lock:
+                    self.hits += 1
+                return entry[0]
+        
+        with self._lock:
+            self.misses += 1
+        return None
+    
+    def set(self, bucket, s3_key, expiration, url):
+        """새로 서명한 URL 저장 (만료 시각 = 지금 + expiration)"""
+        if expiration <= settings.AWS_PRESIGNED_URL_MIN_REMAINING:
+            # 재사용할 수 있는 기간이 없는 짧은 URL은 저장하지 않음
+            return
+        
+        cache_key = self._cache_key(bucket, s3_key, expiration)
+        entry = (url, time.time() + expiration)
+        self._remember(bucket, s3_key, cache_key, entry)
+        
+        shared = self._shared_cache()
+        if shared is not None:
+            # 재사용 가능한 기간만큼만 보관
+            shared.set(cache_key, entry, expiration - settings.AWS_PRESIGNED_URL_MIN_REMAINING)
+    
+    def invalidate(self, bucket, s3_key):
+        """파일 삭제 시 해당 키의 URL 제거 (공유 캐시는 기본 만료 시간 항목만)"""
+        self.invalidate_many(bucket, [s3_key])
+    
+    def invalidate_many(self, bucket, s3_keys):
+        """여러 키의 URL 제거 (키마다 색인으로 찾으므로 캐시 크기와 무관, 잠금 1번)"""
+        with self._lock:
+            for s3_key in s3_keys:
+                for key in self._keys_by_file.pop((bucket, s3_key), ()):
+                    self._entries.pop(key, None)
+        
+        shared = self._shared_cache()
+        if shared is not None:
+            shared.delete_many([
+                self._cache_key(bucket, s3_key, settings.AWS_PRESIGNED_URL_EXPIRATION)
+                for s3_key in s3_keys
+            ])
+    
+    def _remember(self, bucket, s3_key, cache_key, entry):
+        with self._lock:
+            self._entries[cache_key] = entry
+            self._entries.move_to_end(cache_key)
+            self._keys_by_file.setdefault((bucket, s3_key), set()).add(cache_key)
+            while len(self._entries) > settings.AWS_PRESIGNED_URL_CACHE_SIZE:
+                evicted, _ = self._entries.popitem(last=False)
+                self._forget(evicted)
+    
+    def _forget(self, cache_key):
+        """밀려난 항목을 색인에서 제거 (캐시 키: prefix:버킷:만료:S3 키)"""
+        _, bucket, _, s3_key = cache_key.split(':', 3)
+        keys = self._keys_by_file.get((bucket, s3_key))
+        if keys is not None:
+            keys.discard(cache_key)
+            if not keys:
+                del self._keys_by_file[(bucket, s3_key)]
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_file.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+presigned_url_cache = PresignedURLCache()
+
+
 class S3Storage:
     """AWS S3 스토리지 관리"""
     
+    DELETE_OBJECTS_MAX_KEYS = 1000
+    
     def __init__(self):
-        """S3 클라이언트 초기화"""
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
-        )
+        """S3 클라이언트 초기화 (공용 클라이언트 재사용)"""
+        self.s3_client = get_s3_client()
         self.bucket_name = settings.AWS_STORAGE_BUCKET_NAME
     
+    @timed_stage('store')
     def upload(self, file_obj, s3_key, content_type=None):
         """
         S3에 파일 업로드
@@ -76,6 +247,7 @@ class S3Storage:
                 Bucket=self.bucket_name,
                 Key=s3_key
             )
+            presigned_url_cache.invalidate(self.bucket_name, s3_key)
             logger.info(f"S3 삭제 성공: {s3_key}")
             return True
         
@@ -83,10 +255,52 @@ class S3Storage:
             logger.error(f"S3 삭제 실패: {str(e)}")
             return False
     
+    def delete_many(self, s3_keys):
+        """
+        S3 객체 일괄 삭제 (delete_objects, 호출당 최대 1000개)
+        
+        Args:
+            s3_keys: 삭제할 S3 키 목록 (1000개 이하)
+        
+        Returns:
+            tuple: (삭제된 키 목록, {실패한 키: 오류 메시지})
+        """
+        if not s3_keys:
+            return [], {}
+        
+        if len(s3_keys) > self.DELETE_OBJECTS_MAX_KEYS:
+            raise ValueError(f"delete_objects 는 한 번에 {self.DELETE_OBJECTS_MAX_KEYS}개까지 삭제할 수 있습니다.")
+        
+        try:
+            response = self.s3_client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={
+                    'Objects': [{'Key': s3_key} for s3_key in s3_keys],
+                    'Quiet': True
+                }
+            )
+        except ClientError as e:
+            logger.error(f"S3 일괄 삭제 실패 ({len(s3_keys)}개): {str(e)}")
+            return [], {s3_key: str(e) for s3_key in s3_keys}
+        
+        # Quiet 모드에서는 실패한 키만 응답에 포함됨
+        errors = {
+            error['Key']: error.get('Message', error.get('Code', ''))
+            for error in response.get('Errors', [])
+        }
+        deleted = [s3_key for s3_key in s3_keys if s3_key not in errors]
+        
+        presigned_url_cache.invalidate_many(self.bucket_name, deleted)
+        
+        return deleted, errors
+    
+    @timed_stage('presign')
     def get_presigned_url(self, s3_key, expiration=None):
         """
         파일 다운로드용 서명된 URL 생성
         
+        남은 유효 시간이 충분한 URL이 캐시에 있으면 다시 서명하지 않고 재사용한다.
+        
         Args:
             s3_key: S3 키
             expiration: URL 만료 시간 (초), 기본값은 settings에서 가져옴
@@ -97,6 +311,10 @@ class S3Storage:
         if expiration is None:
             expiration = settings.AWS_PRESIGNED_URL_EXPIRATION
         
+        url = presigned_url_cache.get(self.bucket_name, s3_key, expiration)
+        if url is not None:
+            return url
+        
         try:
             url = self.s3_client.generate_presigned_url(
                 'get_object',
@@ -106,6 +324,7 @@ class S3Storage:
                 },
                 ExpiresIn=expiration
             )
+            presigned_url_cache.set(self.bucket_name, s3_key, expiration, url)
             return url
         
         except ClientError as e:
@@ -1,3 +1,860 @@
-from django.test import TestCase
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from botocore.exceptions import ClientError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APITestCase
+
+from users.models import User
+from .janitor import TemporaryFileJanitor
+from .log_writer import SystemLogWriter
+from .models import MediaFile, SystemLog
+from .resolvers import RelatedMediaResolver
+from .services import FileService
+from .serving import sign_file_id
+from . import thumbnails
+from .storage import PresignedURLCache, S3Storage, get_s3_client
+from .timing import collecting, current_timer, stage
+from .upload_handlers import S3MultipartUploadHandler
+
+
+class TemporaryFileJanitorTest(TestCase):
+    """만료된 임시 파일 정리 (S3 일괄 삭제, 로컬 삭제, 공유 객체 유지)"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(
+            email='tester@test.com',
+            password='testpass123!',
+            nickname='tester'
+        )
+
+    def make_file(self, name, storage_type='local', is_temporary=True, expired=True):
+        if storage_type == 's3':
+            s3_key = f'detection/{name}'
+            file_path = f'https://bucket.example.com/{s3_key}'
+        else:
+            s3_key = None
+            file_path = f'detection/{name}'
+            os.makedirs(os.path.join(self.media_root, 'detection'), exist_ok=True)
+            with open(os.path.join(self.media_root, file_path), 'wb') as f:
+                f.write(b'data')
+
+        media_file = MediaFile.objects.create(
+            user=self.user,
+            original_name=name,
+            file_name=name,
+            file_size=4,
+            file_type='image',
+            file_format='jpg',
+            mime_type='image/jpeg',
+            storage_type=storage_type,
+            file_path=file_path,
+            s3_key=s3_key,
+            purpose='detection',
+            is_temporary=is_temporary
+        )
+        if expired:
+            MediaFile.objects.filter(file_id=media_file.file_id).update(
+                created_at=timezone.now() - timedelta(hours=100)
+            )
+        return media_file
+
+    def test_cleanup_deletes_expired_files_in_chunks(self):
+        s3_files = [self.make_file(f's3_{i}.jpg', storage_type='s3') for i in range(3)]
+        local_file = self.make_file('local.jpg')
+        shared_file = self.make_file('shared.jpg')
+        MediaFile.objects.create(
+            **{field: getattr(shared_file, field) for field in [
+                'user', 'original_name', 'file_name', 'file_size', 'file_type',
+                'file_format', 'mime_type', 'storage_type', 'file_path', 'purpose'
+            ]}
+        )
+        fresh_file = self.make_file('fresh.jpg', expired=False)
+
+        with mock.patch.object(
+            S3Storage, 'delete_many', side_effect=lambda keys: (list(keys), {})
+        ) as delete_many:
+            report = TemporaryFileJanitor(older_than_hours=72, chunk_size=2).run()
+
+        deleted_keys = sorted(key for call in delete_many.call_args_list for key in call.args[0])
+        self.assertEqual(deleted_keys, sorted(media_file.s3_key for media_file in s3_files))
+
+        self.assertEqual(report['deleted'], 5)
+        self.assertEqual(report['chunks'], 3)
+        self.assertEqual(report['s3_objects_deleted'], 3)
+        self.assertEqual(report['local_files_deleted'], 1)
+        self.assertEqual(report['shared_skipped'], 1)
+        self.assertEqual(report['failed'], 0)
+
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, local_file.file_path)))
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, shared_file.file_path)))
+        self.assertEqual(
+            list(MediaFile.objects.filter(is_temporary=True).values_list('file_id', flat=True)),
+            [fresh_file.file_id]
+        )
+
+    def test_failed_s3_delete_keeps_row_for_retry(self):
+        media_file = self.make_file('s3.jpg', storage_type='s3')
+
+        with mock.patch.object(
+            S3Storage, 'delete_many', side_effect=lambda keys: ([], {key: 'AccessDenied' for key in keys})
+        ):
+            report = TemporaryFileJanitor(older_than_hours=72).run()
+
+        self.assertEqual(report['deleted'], 0)
+        self.assertEqual(report['failed'], 1)
+        self.assertTrue(MediaFile.objects.filter(file_id=media_file.file_id).exists())
+
+
+class ImageNormalizationTest(TestCase):
+    """분석용 이미지는 회전 적용/메타데이터 제거/축소 후 저장하고, 보호용 원본은 그대로 두는지 확인"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            IMAGE_NORMALIZE_MAX_EDGE=640,
+            SYSTEM_LOG_ASYNC=False
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(
+            email='tester@test.com',
+            password='testpass123!',
+            nickname='tester'
+        )
+
+    def make_photo(self):
+        # 세로 사진을 가로로 저장하고 EXIF 회전(Orientation=6)으로 표시하는 카메라 원본
+        image = Image.effect_noise((2000, 1000), 64).convert('RGB')
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        exif[0x010F] = 'Camera'
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=98, exif=exif)
+        return SimpleUploadedFile('photo.jpeg', buffer.getvalue(), content_type='image/jpeg')
+
+    def upload(self, photo, purpose):
+        return FileService(self.user).upload_file(
+            uploaded_file=photo,
+            file_type='image',
+            purpose=purpose,
+            is_temporary=True
+        )
+
+    def test_detection_upload_is_normalized(self):
+        photo = self.make_photo()
+        media_file = self.upload(photo, 'detection')
+
+        preprocessing = media_file.metadata['preprocessing']
+        self.assertEqual(preprocessing['original_size'], photo.size)
+        self.assertLess(preprocessing['normalized_size'], photo.size)
+        self.assertEqual(preprocessing['dimensions'], [320, 640])
+        self.assertTrue(preprocessing['exif_transposed'])
+        self.assertEqual(media_file.file_size, preprocessing['normalized_size'])
+        self.assertEqual(media_file.original_name, 'photo.jpeg')
+
+        with Image.open(os.path.join(self.media_root, media_file.file_path)) as stored:
+            self.assertEqual(stored.size, (320, 640))
+            self.assertFalse(stored.getexif())
+
+        original = self.make_photo()
+        protected = self.upload(original, 'protection')
+        self.assertNotIn('preprocessing', protected.metadata)
+        self.assertEqual(protected.file_size, original.size)
+
+    @override_settings(IMAGE_NORMALIZE_KEEP_ORIGINAL=True)
+    def test_original_is_kept_when_requested(self):
+        photo = self.make_photo()
+        media_file = self.upload(photo, 'detection')
+
+        original = MediaFile.objects.get(file_id=media_file.metadata['preprocessing']['original_file_id'])
+        self.assertEqual(original.file_size, photo.size)
+        self.assertTrue(original.metadata['normalized_original'])
+
+
+class ThumbnailTest(TestCase):
+    """업로드 시 WebP 썸네일이 원본 옆에 저장되고 목록 URL 조회/삭제가 함께 되는지 확인"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, SYSTEM_LOG_ASYNC=False)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(
+            email='tester@test.com',
+            password='testpass123!',
+            nickname='tester'
+        )
+
+    def upload_image(self, purpose, is_temporary):
+        buffer = io.BytesIO()
+        Image.new('RGB', (1200, 600), color='green').save(buffer, format='PNG')
+        return FileService(self.user).upload_file(
+            uploaded_file=SimpleUploadedFile('wide.png', buffer.getvalue(), content_type='image/png'),
+            file_type='image',
+            purpose=purpose,
+            is_temporary=is_temporary
+        )
+
+    def thumbnails_of(self, media_file):
+        return {
+            thumbnail.metadata['thumbnail_size']: thumbnail
+            for thumbnail in MediaFile.objects.filter(purpose='thumbnail', related_record_id=media_file.file_id)
+        }
+
+    def link_to_record(self, media_file, record_id=1):
+        media_file.related_model = 'AnalysisRecord'
+        media_file.related_record_id = record_id
+        media_file.save()
+
+    def test_kept_upload_creates_thumbnails(self):
+        media_file = self.upload_image('profiles', is_temporary=False)
+
+        thumbnails = self.thumbnails_of(media_file)
+        self.assertEqual(sorted(thumbnails), [128, 256, 512])
+        for size, thumbnail in thumbnails.items():
+            self.assertEqual(os.path.dirname(thumbnail.file_path), os.path.dirname(media_file.file_path))
+            self.assertFalse(thumbnail.is_temporary)
+            with Image.open(os.path.join(self.media_root, thumbnail.file_path)) as image:
+                self.assertEqual((image.format, image.size), ('WEBP', (size, size // 2)))
+
+    @override_settings(THUMBNAIL_LAZY_ASYNC=False)
+    def test_temporary_upload_creates_thumbnails_on_first_lookup(self):
+        media_file = self.upload_image('detection', is_temporary=True)
+
+        # 업로드 요청 경로에서는 만들지 않음
+        self.assertEqual(self.thumbnails_of(media_file), {})
+
+        self.link_to_record(media_file)
+        resolver = RelatedMediaResolver('AnalysisRecord', [1], request=RequestFactory().get('/'))
+        thumbnails = self.thumbnails_of(media_file)
+        self.assertEqual(sorted(thumbnails), [128, 256, 512])
+        self.assertTrue(all(thumbnail.is_temporary for thumbnail in thumbnails.values()))
+        self.assertEqual(
+            resolver.thumbnail_url_for(1, 256),
+            f'http://testserver/api/files/{thumbnails[256].file_id}/content/?token={sign_file_id(thumbnails[256].file_id)}'
+        )
+
+        # 두 번째 조회는 저장된 썸네일 사용
+        RelatedMediaResolver('AnalysisRecord', [1])
+        self.assertEqual(MediaFile.objects.filter(purpose='thumbnail').count(), 3)
+
+        FileService(self.user).delete_file(media_file.file_id, hard_delete=True)
+        self.assertFalse(MediaFile.objects.filter(purpose='thumbnail').exists())
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, thumbnails[256].file_path)))
+
+    def test_lazy_thumbnails_are_scheduled_once_in_background(self):
+        media_file = self.upload_image('detection', is_temporary=True)
+        self.link_to_record(media_file)
+        self.addCleanup(thumbnails._lazy_pending.clear)
+
+        executor = mock.Mock()
+        with mock.patch.object(thumbnails, '_get_lazy_executor', return_value=executor):
+            resolver = RelatedMediaResolver('AnalysisRecord', [1])
+            # 생성 중인 원본은 다시 예약하지 않음
+            RelatedMediaResolver('AnalysisRecord', [1])
+
+        self.assertIsNone(resolver.thumbnail_url_for(1, 256))
+        executor.submit.assert_called_once()
+        run, source = executor.submit.call_args.args
+        self.assertEqual((run, source.file_id), (thumbnails._run_lazily, media_file.file_id))
+
+
+class MediaFileContentTest(APITestCase):
+    """로컬 파일 전송: 서명/소유자 확인, Range(206), 조건부 요청(304), 프록시 위임"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, SYSTEM_LOG_ASYNC=False)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(email='owner@test.com', password='testpass123!', nickname='owner')
+        self.other = User.objects.create_user(email='other@test.com', password='testpass123!', nickname='other')
+
+        self.content = bytes(range(256)) * 4
+        self.media_file = FileService(self.user).upload_file(
+            uploaded_file=SimpleUploadedFile('clip.mp4', self.content, content_type='video/mp4'),
+            file_type='video',
+            purpose='detection'
+        )
+
+    def download_url(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(f'/api/files/{self.media_file.file_id}/download/')
+        self.client.force_authenticate(None)
+        self.assertEqual(response.status_code, 200)
+        return response.data['download_url']
+
+    def test_signed_url_supports_range_and_conditional_requests(self):
+        url = self.download_url()
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+        partial = self.client.get(url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial['Content-Range'], f'bytes 10-19/{len(self.content)}')
+        self.assertEqual(b''.join(partial.streaming_content), self.content[10:20])
+
+        suffix = self.client.get(url, HTTP_RANGE='bytes=-4')
+        self.assertEqual(b''.join(suffix.streaming_content), self.content[-4:])
+
+        self.assertEqual(self.client.get(url, HTTP_RANGE=f'bytes={len(self.content)}-').status_code, 416)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_requires_valid_token_or_owner(self):
+        content_url = f'/api/files/{self.media_file.file_id}/content/'
+
+        self.assertEqual(self.client.get(content_url).status_code, 401)
+        self.assertEqual(self.client.get(f'{content_url}?token=forged').status_code, 401)
+
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get(content_url).status_code, 404)
+
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(content_url).status_code, 200)
+
+    @override_settings(MEDIA_SENDFILE_BACKEND='nginx')
+    def test_transfer_is_offloaded_to_proxy(self):
+        response = self.client.get(self.download_url())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.media_file.file_path}')
+        self.assertEqual(response.content, b'')
+
+
+class StubS3Client:
+    """multipart 업로드 호출을 기록하는 S3 클라이언트 스텁 (fail_part 번호의 파트는 실패)"""
+
+    def __init__(self, fail_part=None):
+        self.fail_part = fail_part
+        self.calls = []
+        self.parts = {}
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.calls.append('put_object')
+        self.objects[Key] = Body
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        self.calls.append('create_multipart_upload')
+        return {'UploadId': 'upload-1'}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        if PartNumber == self.fail_part:
+            raise ClientError({'Error': {'Code': 'InternalError'}}, 'UploadPart')
+        self.parts[PartNumber] = Body
+        return {'ETag': f'etag-{PartNumber}'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.calls.append('complete_multipart_upload')
+        self.completed_parts = MultipartUpload['Parts']
+        self.objects[Key] = b''.join(self.parts[part['PartNumber']] for part in self.completed_parts)
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.calls.append('abort_multipart_upload')
+
+
+def make_video(size):
+    # mp4 시그니처 (offset 4: ftyp) + 본문
+    header = b'\x00\x00\x00\x18ftypmp42'
+    return header + bytes(index % 251 for index in range(size - len(header)))
+
+
+@override_settings(
+    AWS_STORAGE_BUCKET_NAME='test-bucket',
+    S3_STREAMING_UPLOAD=True,
+    S3_MULTIPART_PART_SIZE=1024,
+    S3_MULTIPART_CONCURRENCY=2,
+    ANALYSIS_EMBEDDED_WORKER=False,
+    SYSTEM_LOG_ASYNC=False
+)
+class S3StreamingUploadTest(APITestCase):
+    """영상 업로드를 S3 multipart 로 바로 스트리밍: 파트 업로드/완료, 실패·거부 시 취소, S3 미설정 시 기본 업로드"""
+
+    def setUp(self):
+        self.s3 = StubS3Client()
+        patcher = mock.patch('media_files.upload_handlers.get_s3_client', side_effect=lambda: self.s3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.s3_mocks = {}
+        for name in ['upload', 'delete']:
+            patcher = mock.patch.object(S3Storage, name, return_value=True)
+            self.s3_mocks[name] = patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user(email='stream@test.com', password='testpass123!', nickname='stream')
+        self.client.force_authenticate(self.user)
+
+    def post_video(self, content, name='clip.mp4', mode='async'):
+        return self.client.post(
+            '/api/detection/video/',
+            {'video': SimpleUploadedFile(name, content, content_type='video/mp4'), 'mode': mode},
+            format='multipart'
+        )
+
+    def test_video_is_uploaded_in_parts(self):
+        content = make_video(2500)
+
+        response = self.post_video(content)
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.s3.calls, ['create_multipart_upload', 'complete_multipart_upload'])
+        self.assertEqual(
+            self.s3.completed_parts,
+            [{'PartNumber': number, 'ETag': f'etag-{number}'} for number in (1, 2, 3)]
+        )
+        self.assertEqual([len(self.s3.parts[number]) for number in (1, 2, 3)], [1024, 1024, 452])
+
+        media_file = MediaFile.objects.get()
+        self.assertEqual(media_file.storage_type, 's3')
+        self.assertEqual(self.s3.objects[media_file.s3_key], content)
+        self.assertEqual(media_file.content_hash, hashlib.sha256(content).hexdigest())
+        self.assertEqual(media_file.file_size, len(content))
+        # 핸들러가 이미 올렸으므로 다시 업로드하지 않음
+        self.s3_mocks['upload'].assert_not_called()
+
+    def test_small_video_is_uploaded_with_single_put(self):
+        content = make_video(500)
+
+        response = self.post_video(content)
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.s3.calls, ['put_object'])
+        self.assertEqual(self.s3.objects[MediaFile.objects.get().s3_key], content)
+
+    def test_failed_part_aborts_upload(self):
+        self.s3.fail_part = 2
+
+        response = self.post_video(make_video(2500))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.s3.calls, ['create_multipart_upload', 'abort_multipart_upload'])
+        self.assertFalse(MediaFile.objects.exists())
+
+    def test_oversized_stream_is_rejected_and_aborted(self):
+        with mock.patch.dict(FileService.MAX_FILE_SIZES, {'video': 3000}), \
+                mock.patch.object(S3MultipartUploadHandler, 'chunk_size', 1024):
+            response = self.post_video(make_video(5000))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('MB 이하', response.data['error'])
+        self.assertEqual(self.s3.calls, ['create_multipart_upload', 'abort_multipart_upload'])
+        self.assertFalse(MediaFile.objects.exists())
+
+    def test_wrong_signature_is_rejected_before_upload(self):
+        response = self.post_video(b'not a video at all' * 100)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('mp4', response.data['error'])
+        self.assertEqual(self.s3.calls, [])
+
+    def test_streamed_file_is_deleted_when_request_is_invalid(self):
+        response = self.post_video(make_video(500), mode='bogus')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.s3.calls, ['put_object'])
+        self.s3_mocks['delete'].assert_called_once_with(next(iter(self.s3.objects)))
+
+    def test_token_authenticated_upload_is_streamed(self):
+        token = Token.objects.create(user=self.user)
+        self.client.force_authenticate(None)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        response = self.post_video(make_video(500))
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.s3.calls, ['put_object'])
+        self.assertTrue(MediaFile.objects.get().s3_key.startswith(f'detection/user_{self.user.user_id}/'))
+
+    def test_session_authenticated_upload_checks_csrf_once(self):
+        # CSRF 확인이 인증 도중 본문을 읽으므로 스트리밍 없이 기본 업로드
+        client = APIClient(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        csrf_token = 'a' * 32
+        client.cookies['csrftoken'] = csrf_token
+
+        response = client.post(
+            '/api/detection/video/',
+            {'video': SimpleUploadedFile('clip.mp4', make_video(2500), content_type='video/mp4'), 'mode': 'async'},
+            format='multipart',
+            HTTP_X_CSRFTOKEN=csrf_token
+        )
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.s3.calls, [])
+        self.s3_mocks['upload'].assert_called_once()
+        self.assertEqual(MediaFile.objects.get().user, self.user)
+
+        # CSRF 토큰이 없으면 403 (본문은 S3에 올리지 않음)
+        response = client.post(
+            '/api/detection/video/',
+            {'video': SimpleUploadedFile('clip.mp4', make_video(2500), content_type='video/mp4'), 'mode': 'async'},
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.s3.calls, [])
+        self.assertEqual(MediaFile.objects.count(), 1)
+
+    def test_unauthenticated_upload_is_not_streamed(self):
+        self.client.force_authenticate(None)
+
+        response = self.post_video(make_video(2500))
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.s3.calls, [])
+
+    @override_settings(AWS_STORAGE_BUCKET_NAME=None)
+    def test_falls_back_to_default_upload_without_bucket(self):
+        with mock.patch.object(FileService, '_save_to_s3', return_value=('https://s3/clip.mp4', 'detection/clip.mp4')):
+            response = self.post_video(make_video(2500))
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.s3.calls, [])
+        self.assertEqual(MediaFile.objects.get().s3_key, 'detection/clip.mp4')
+
+
+@override_settings(SYSTEM_LOG_ASYNC=True)
+class SystemLogWriterTest(TransactionTestCase):
+    """SystemLog 일괄 기록: 배치 크기/flush 간격, 버퍼 초과 시 버림, 트랜잭션 안 동기 저장, 삭제된 사용자 처리"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='log@test.com', password='testpass123!', nickname='log')
+
+    def make_writer(self, **options):
+        writer = SystemLogWriter(**options)
+        self.addCleanup(writer.stop)
+        return writer
+
+    def write(self, writer, count, **fields):
+        return [
+            writer.write(log_level='info', log_category='system', message=f'log {index}', **fields)
+            for index in range(count)
+        ]
+
+    def wait_for(self, condition, timeout=3):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def test_logs_are_saved_in_batches(self):
+        writer = self.make_writer(batch_size=3, flush_interval=30)
+
+        self.assertEqual(self.write(writer, 7), [True] * 7)
+
+        # 가득 찬 배치 2개만 바로 저장, 나머지 1건은 flush 간격까지 대기
+        self.assertTrue(self.wait_for(lambda: writer.stats()['written'] == 6))
+        self.assertEqual(SystemLog.objects.count(), 6)
+        self.assertEqual(writer.stats()['batches'], 2)
+
+        writer.flush()
+        self.assertEqual(SystemLog.objects.count(), 7)
+        self.assertEqual(writer.stats()['batches'], 3)
+
+    def test_partial_batch_is_saved_after_flush_interval(self):
+        writer = self.make_writer(batch_size=100, flush_interval=0.2)
+
+        start = time.monotonic()
+        self.write(writer, 2)
+        self.assertEqual(SystemLog.objects.count(), 0)
+
+        self.assertTrue(self.wait_for(lambda: SystemLog.objects.count() == 2))
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        self.assertEqual(writer.stats()['batches'], 1)
+
+    def test_full_buffer_drops_logs(self):
+        writer = self.make_writer(batch_size=1, flush_interval=30, max_buffer=2)
+        saving = threading.Event()
+        release = threading.Event()
+        save = writer._save
+
+        def slow_save(batch):
+            saving.set()
+            release.wait(5)
+            save(batch)
+
+        writer._save = slow_save
+
+        # 첫 로그 저장이 멈춰 있는 동안 큐(2칸)가 차면 나머지는 버림
+        self.assertEqual(self.write(writer, 1), [True])
+        self.assertTrue(saving.wait(3))
+        self.assertEqual(self.write(writer, 3), [True, True, False])
+        self.assertEqual(writer.stats()['dropped'], 1)
+
+        release.set()
+        writer.flush()
+        self.assertEqual(SystemLog.objects.count(), 3)
+        self.assertEqual(writer.stats()['written'], 3)
+
+    def test_logs_inside_transaction_are_saved_synchronously(self):
+        writer = self.make_writer()
+
+        with transaction.atomic():
+            self.write(writer, 1, user=self.user)
+            self.assertEqual(SystemLog.objects.filter(user=self.user).count(), 1)
+
+        # 트랜잭션 밖 기록이 없으면 스레드도 시작하지 않음
+        self.assertIsNone(writer._thread)
+
+    @override_settings(SYSTEM_LOG_ASYNC=False)
+    def test_sync_mode_saves_immediately(self):
+        writer = self.make_writer()
+
+        self.write(writer, 2)
+
+        self.assertEqual(SystemLog.objects.count(), 2)
+        self.assertIsNone(writer._thread)
+
+    def test_deleted_user_falls_back_to_row_by_row_save(self):
+        other = User.objects.create_user(email='gone@test.com', password='testpass123!', nickname='gone')
+        writer = self.make_writer(batch_size=100, flush_interval=30)
+
+        self.write(writer, 1, user=self.user)
+        self.write(writer, 1, user=other)
+        # 버퍼에 있는 동안 사용자 삭제 → bulk_create 는 IntegrityError
+        other.delete()
+        writer.flush()
+
+        self.assertEqual(
+            sorted(SystemLog.objects.values_list('user_id', flat=True), key=str),
+            sorted([self.user.user_id, None], key=str)
+        )
+        self.assertEqual((writer.stats()['written'], writer.stats()['failed']), (2, 0))
+
+
+class StageTimingTest(SimpleTestCase):
+    """단계 시간은 중첩 시 안쪽 단계를 빼고, 스레드 풀 작업까지 요청 단위로 모이는지 확인"""
+
+    def test_nested_stages_are_exclusive(self):
+        with collecting('test') as timer:
+            with stage('store'):
+                time.sleep(0.02)
+                with stage('presign'):
+                    time.sleep(0.05)
+            with stage('store'):
+                time.sleep(0.02)
+
+        timings = timer.as_dict()
+        self.assertGreaterEqual(timings['presign'], 50)
+        self.assertGreaterEqual(timings['store'], 40)
+        self.assertLess(timings['store'], 80)
+        self.assertGreaterEqual(timings['total'], timings['store'] + timings['presign'])
+
+    def test_stages_outside_collection_are_ignored(self):
+        with stage('store'):
+            self.assertIsNone(current_timer())
+
+        with override_settings(STAGE_TIMINGS_ENABLED=False):
+            with collecting('test') as timer:
+                with stage('store'):
+                    pass
+        self.assertIsNone(timer)
+
+    def test_copied_context_collects_pool_stages(self):
+        def work():
+            with stage('inference'):
+                time.sleep(0.02)
+
+        with collecting('test') as timer, ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(copy_context().run, work) for _ in range(3)]
+            for future in futures:
+                future.result()
+
+        self.assertGreaterEqual(timer.as_dict()['inference'], 60)
+
+
+class S3ClientCacheTest(SimpleTestCase):
+    """boto3 클라이언트는 (자격 증명, 리전, 풀 크기) 조합별로 하나만 생성"""
+
+    def setUp(self):
+        patcher = mock.patch.dict('media_files.storage._s3_clients', clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch('media_files.storage.boto3.client', side_effect=lambda *args, **kwargs: mock.Mock())
+        self.boto3_client = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_same_settings_share_one_client(self):
+        client = get_s3_client()
+
+        self.assertIs(get_s3_client(), client)
+        self.assertIs(S3Storage().s3_client, client)
+        self.assertEqual(self.boto3_client.call_count, 1)
+
+    def test_concurrent_first_calls_create_one_client(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            created = list(executor.map(lambda _: get_s3_client(), range(32)))
+
+        self.assertEqual(len({id(client) for client in created}), 1)
+        self.assertEqual(self.boto3_client.call_count, 1)
+
+    def test_region_credentials_or_pool_size_change_creates_new_client(self):
+        client = get_s3_client()
+
+        for overrides in [
+            {'AWS_REGION': 'us-east-1'},
+            {'AWS_ACCESS_KEY_ID': 'other-key', 'AWS_SECRET_ACCESS_KEY': 'other-secret'},
+            {'AWS_S3_MAX_POOL_CONNECTIONS': 50},
+        ]:
+            with self.subTest(**overrides), override_settings(**overrides):
+                other = get_s3_client()
+                self.assertIsNot(other, client)
+                self.assertIs(get_s3_client(), other)
+
+        self.assertEqual(self.boto3_client.call_count, 4)
+        self.assertEqual(self.boto3_client.call_args_list[1].kwargs['region_name'], 'us-east-1')
+        # 원래 설정으로 돌아오면 처음 클라이언트 재사용
+        self.assertIs(get_s3_client(), client)
+
+
+@override_settings(
+    AWS_PRESIGNED_URL_EXPIRATION=3600,
+    AWS_PRESIGNED_URL_MIN_REMAINING=600,
+    AWS_PRESIGNED_URL_CACHE_SIZE=2,
+    AWS_PRESIGNED_URL_CACHE_ALIAS=''
+)
+class PresignedURLCacheTest(SimpleTestCase):
+    """서명 URL은 남은 유효 시간이 충분할 때만 재사용하고, 프로세스 캐시는 LRU 로 크기 제한"""
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('media_files.storage.time.time', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.cache = PresignedURLCache()
+        patcher = mock.patch('media_files.storage.presigned_url_cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.s3_client = mock.Mock()
+        self.s3_client.generate_presigned_url.side_effect = (
+            lambda operation, Params, ExpiresIn: f"https://s3.test/{Params['Key']}?signed={self.now}"
+        )
+        patcher = mock.patch('media_files.storage.get_s3_client', return_value=self.s3_client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_url_is_reused_until_min_remaining_then_resigned(self):
+        storage = S3Storage()
+        url = storage.get_presigned_url('media/a.jpg')
+
+        self.now += 3600 - 600 - 1
+        self.assertEqual(storage.get_presigned_url('media/a.jpg'), url)
+        self.assertEqual(self.s3_client.generate_presigned_url.call_count, 1)
+
+        # 만료 전이라도 남은 시간이 MIN_REMAINING 이하면 새로 서명
+        self.now += 1
+        refreshed = storage.get_presigned_url('media/a.jpg')
+        self.assertNotEqual(refreshed, url)
+        self.assertEqual(self.s3_client.generate_presigned_url.call_count, 2)
+        self.assertEqual(storage.get_presigned_url('media/a.jpg'), refreshed)
+        self.assertEqual(self.cache.stats(), {'entries': 1, 'hits': 2, 'misses': 2})
+
+    def test_expiration_is_part_of_the_key_and_short_urls_are_not_cached(self):
+        self.cache.set('bucket', 'a.jpg', 3600, 'long')
+        self.cache.set('bucket', 'a.jpg', 600, 'short')
+
+        self.assertEqual(self.cache.get('bucket', 'a.jpg', 3600), 'long')
+        self.assertIsNone(self.cache.get('bucket', 'a.jpg', 600))
+        self.assertIsNone(self.cache.get('bucket', 'a.jpg', 7200))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.set('bucket', 'a.jpg', 3600, 'url-a')
+        self.cache.set('bucket', 'b.jpg', 3600, 'url-b')
+        # a 를 최근 사용으로 올리면 c 추가 시 b 가 밀려남
+        self.assertEqual(self.cache.get('bucket', 'a.jpg', 3600), 'url-a')
+        self.cache.set('bucket', 'c.jpg', 3600, 'url-c')
+
+        self.assertIsNone(self.cache.get('bucket', 'b.jpg', 3600))
+        self.assertEqual(self.cache.get('bucket', 'a.jpg', 3600), 'url-a')
+        self.assertEqual(self.cache.get('bucket', 'c.jpg', 3600), 'url-c')
+        self.assertEqual(self.cache.stats()['entries'], 2)
+
+    def test_delete_invalidates_cached_urls(self):
+        storage = S3Storage()
+        url = storage.get_presigned_url('media/a.jpg')
+        other = storage.get_presigned_url('media/b.jpg')
+
+        self.now += 1
+        self.assertTrue(storage.delete('media/a.jpg'))
+
+        self.assertNotEqual(storage.get_presigned_url('media/a.jpg'), url)
+        self.assertEqual(storage.get_presigned_url('media/b.jpg'), other)
+
+    def test_bulk_delete_invalidates_by_index(self):
+        storage = S3Storage()
+        urls = {key: storage.get_presigned_url(key) for key in ['media/a.jpg', 'media/b.jpg']}
+        self.s3_client.delete_objects.return_value = {}
+
+        self.now += 1
+        self.assertEqual(storage.delete_many(['media/a.jpg', 'media/c.jpg']), (['media/a.jpg', 'media/c.jpg'], {}))
+
+        self.assertEqual(set(self.cache._keys_by_file), {(storage.bucket_name, 'media/b.jpg')})
+        self.assertNotEqual(storage.get_presigned_url('media/a.jpg'), urls['media/a.jpg'])
+        self.assertEqual(storage.get_presigned_url('media/b.jpg'), urls['media/b.jpg'])
+
+    def test_evicted_entries_leave_the_index(self):
+        for name in ['a', 'b', 'c', 'd']:
+            self.cache.set('bucket', f'{name}.jpg', 3600, f'url-{name}')
+        self.cache.set('bucket', 'd.jpg', 7200, 'url-d-long')
+
+        self.assertEqual(self.cache.stats()['entries'], 2)
+        self.assertEqual(self.cache._keys_by_file, {('bucket', 'd.jpg'): {
+            self.cache._cache_key('bucket', 'd.jpg', 3600),
+            self.cache._cache_key('bucket', 'd.jpg', 7200),
+        }})
+
+        self.cache.invalidate('bucket', 'd.jpg')
+        self.assertEqual(self.cache.stats()['entries'], 0)
+        self.assertEqual(self.cache._keys_by_file, {})
+
+    @override_settings(
+        AWS_PRESIGNED_URL_CACHE_ALIAS='presigned',
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'presigned': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'presigned-test'},
+        }
+    )
+    def test_shared_cache_serves_other_processes(self):
+        self.cache.set('bucket', 'a.jpg', 3600, 'url-a')
+
+        # 다른 프로세스(새 인스턴스)는 공유 캐시에서 가져와 자기 LRU 에도 보관
+        other = PresignedURLCache()
+        self.assertEqual(other.get('bucket', 'a.jpg', 3600), 'url-a')
+        self.assertEqual(other.stats(), {'entries': 1, 'hits': 1, 'misses': 0})
+
+        self.now += 3600 - 600
+        self.assertIsNone(PresignedURLCache().get('bucket', 'a.jpg', 3600))
@@ -0,0 +1,398 @@
+"""
+목록 화면용 썸네일 (WebP)
+
+분석 기록 목록/프로필 화면이 수 MB 원본을 내려받지 않도록,
+THUMBNAIL_SIZES(긴 변 기준) 크기의 WebP 썸네일을 만들어 원본 옆에 저장한다.
+- 보관 파일(프로필 등): 업로드 시 생성
+- 임시 파일(분석/Zoom 업로드): 업로드 요청 경로에서는 만들지 않고, 목록에서 처음 조회될 때 생성
+  (ensure_thumbnails, 대부분은 목록에 나오기 전에 정리되므로 업로드마다 만들 필요가 없다)
+- 썸네일도 MediaFile 행 (purpose='thumbnail', related_model='MediaFile', related_record_id=원본 file_id)
+- 중복 제거로 저장소 객체를 공유하는 원본이면 기존 썸네일 객체를 그대로 재사용 (행만 추가)
+- 원본을 한 번만 디코딩해 큰 크기부터 차례로 줄임
+- 이미 올라간 파일은 generate_thumbnails 명령으로 채운다
+"""
+import hashlib
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import MediaFile
+from .storage import S3Storage
+
+logger = logging.getLogger(__name__)
+
+
+THUMBNAIL_PURPOSE = 'thumbnail'
+THUMBNAIL_RELATED_MODEL = 'MediaFile'
+
+
+def should_create_thumbnails(file_type, purpose):
+    """썸네일 대상 업로드인지"""
+    return (
+        settings.THUMBNAIL_ENABLED
+        and file_type in ('image', 'screenshot')
+        and purpose in settings.THUMBNAIL_PURPOSES
+    )
+
+
+def render_thumbnails(image_file, sizes=None, quality=None):
+    """
+    썸네일 WebP 바이트 생성
+
+    Args:
+        image_file: 원본 파일 객체 (읽은 뒤 포인터는 처음으로 되돌림)
+
+    Returns:
+        dict: {크기: (WebP 바이트, (가로, 세로))}
+
+    Raises:
+        ValueError: 이미지를 읽을 수 없음
+    """
+    sizes = sorted(sizes or settings.THUMBNAIL_SIZES, reverse=True)
+    quality = quality or settings.THUMBNAIL_QUALITY
+
+    image_file.seek(0)
+    try:
+        with Image.open(image_file) as image:
+            image.draft('RGB', (sizes[0], sizes[0]))
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+            thumbnails = {}
+            for size in sizes:
+                # 큰 크기의 결과를 다시 줄여 전체 해상도 리샘플링은 한 번만
+                image.thumbnail((size, size), Image.Resampling.LANCZOS)
+                buffer = io.BytesIO()
+                image.save(buffer, format='WEBP', quality=quality, method=4)
+                thumbnails[size] = (buffer.getvalue(), image.size)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f'썸네일을 만들 수 없는 이미지입니다: {str(e)}')
+    finally:
+        image_file.seek(0)
+
+    return thumbnails
+
+
+def create_thumbnails(source, image_file):
+    """
+    원본 MediaFile 의 썸네일 생성/저장 (업로드 직후 호출)
+
+    Args:
+        source: 원본 MediaFile
+        image_file: 원본 파일 객체 (저장된 내용과 같은 바이트)
+
+    Returns:
+        list: 생성된 썸네일 MediaFile
+    """
+    reused = _reuse_shared_thumbnails(source)
+    if reused:
+        return reused
+
+    thumbnails = render_thumbnails(image_file)
+    stem = os.path.splitext(source.file_name)[0]
+    targets = [
+        (size, f'{stem}_{size}.webp', data, dimensions)
+        for size, (data, dimensions) in thumbnails.items()
+    ]
+
+    if source.storage_type == 's3':
+        rows = _store_in_s3(source, targets)
+    else:
+        rows = _store_locally(source, targets)
+
+    return MediaFile.objects.bulk_create(rows)
+
+
+def _thumbnail_row(source, size, filename, data, dimensions, **location):
+    return MediaFile(
+        user_id=source.user_id,
+        original_name=filename,
+        file_name=filename,
+        file_size=len(data),
+        file_type='image',
+        file_format='webp',
+        mime_type='image/webp',
+        content_hash=hashlib.sha256(data).hexdigest(),
+        purpose=THUMBNAIL_PURPOSE,
+        is_temporary=source.is_temporary,
+        related_model=THUMBNAIL_RELATED_MODEL,
+        related_record_id=source.file_id,
+        metadata={'thumbnail_size': size, 'width': dimensions[0], 'height': dimensions[1]},
+        **location
+    )
+
+
+def _store_locally(source, targets):
+    """원본과 같은 디렉토리에 저장"""
+    directory = os.path.dirname(source.file_path)
+    os.makedirs(os.path.join(settings.MEDIA_ROOT, directory), exist_ok=True)
+
+    rows = []
+    for size, filename, data, dimensions in targets:
+        file_path = os.path.join(directory, filename)
+        with open(os.path.join(settings.MEDIA_ROOT, file_path), 'wb') as destination:
+            destination.write(data)
+        rows.append(_thumbnail_row(
+            source, size, filename, data, dimensions,
+            storage_type='local',
+            file_path=file_path
+        ))
+    return rows
+
+
+def _store_in_s3(source, targets):
+    """원본과 같은 prefix 에 동시 업로드 (하나라도 실패하면 ValueError)"""
+    prefix = os.path.dirname(source.s3_key)
+    s3_storage = S3Storage()
+
+    def upload(target):
+        size, filename, data, dimensions = target
+        s3_key = f'{prefix}/{filename}'
+        if not s3_storage.upload(io.BytesIO(data), s3_key, content_type='image/webp'):
+            raise ValueError(f'썸네일 S3 업로드 실패: {s3_key}')
+        return _thumbnail_row(
+            source, size, filename, data, dimensions,
+            storage_type='s3',
+            file_path=f'https://{settings.AWS_S3_CUSTOM_DOMAIN}/{s3_key}',
+            s3_key=s3_key,
+            s3_bucket=settings.AWS_STORAGE_BUCKET_NAME
+        )
+
+    with ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix='thumbnail-upload') as executor:
+        return list(executor.map(upload, targets))
+
+
+def _reuse_shared_thumbnails(source):
+    """같은 저장소 객체를 쓰는 다른 원본의 썸네일이 모두 있으면 행만 복제"""
+    sibling_ids = MediaFile.objects.filter(
+        storage_type=source.storage_type,
+        file_path=source.file_path,
+        is_deleted=False
+    ).exclude(file_id=source.file_id).values('file_id')
+
+    existing = {}
+    for thumbnail in MediaFile.objects.filter(
+        purpose=THUMBNAIL_PURPOSE,
+        related_model=THUMBNAIL_RELATED_MODEL,
+        related_record_id__in=sibling_ids,
+        is_deleted=False
+    ).order_by('-file_id'):
+        existing.setdefault(thumbnail.metadata['thumbnail_size'], thumbnail)
+
+    if set(existing) != set(settings.THUMBNAIL_SIZES):
+        return []
+
+    rows = []
+    for thumbnail in existing.values():
+        thumbnail.pk = None
+        thumbnail.user_id = source.user_id
+        thumbnail.is_temporary = source.is_temporary
+        thumbnail.related_record_id = source.file_id
+        rows.append(thumbnail)
+    return MediaFile.objects.bulk_create(rows)
+
+
+def get_thumbnails(source_ids):
+    """
+    원본별 썸네일 일괄 조회 (쿼리 1번)
+
+    Returns:
+        dict: {원본 file_id: {크기: 썸네일 MediaFile}}
+    """
+    thumbnails = {}
+    source_ids = [source_id for source_id in source_ids if source_id is not None]
+    if not source_ids:
+        return thumbnails
+
+    for thumbnail in MediaFile.objects.filter(
+        purpose=THUMBNAIL_PURPOSE,
+        related_model=THUMBNAIL_RELATED_MODEL,
+        related_record_id__in=source_ids,
+        is_deleted=False
+    ):
+        thumbnails.setdefault(thumbnail.related_record_id, {})[thumbnail.metadata['thumbnail_size']] = thumbnail
+
+    return thumbnails
+
+
+def create_thumbnails_from_storage(source):
+    """저장된 원본을 다시 읽어 썸네일 생성 (지연 생성, generate_thumbnails 명령)"""
+    if source.storage_type == 's3':
+        path = S3Storage().download_to_temp(source.s3_key)
+        if path is None:
+            raise ValueError('S3 다운로드 실패')
+        try:
+            with open(path, 'rb') as image_file:
+                return create_thumbnails(source, image_file)
+        finally:
+            os.remove(path)
+
+    with open(os.path.join(settings.MEDIA_ROOT, source.file_path), 'rb') as image_file:
+        return create_thumbnails(source, image_file)
+
+
+_lazy_executor = None
+_lazy_lock = threading.Lock()
+_lazy_pending = set()
+_lazy_failed = set()
+
+
+def _get_lazy_executor():
+    """프로세스 공용 지연 생성 스레드 풀"""
+    global _lazy_executor
+
+    if _lazy_executor is None:
+        with _lazy_lock:
+            if _lazy_executor is None:
+                _lazy_executor = ThreadPoolExecutor(
+                    max_workers=settings.THUMBNAIL_LAZY_WORKERS,
+                    thread_name_prefix='thumbnail-lazy'
+                )
+    return _lazy_executor
+
+
+def ensure_thumbnails(sources):
+    """
+    썸네일이 없는 원본의 썸네일 생성 (목록에서 처음 조회될 때)
+
+    THUMBNAIL_LAZY_ASYNC=True 면 백그라운드에서 만들고 이번 응답은 썸네일 없이 보낸다.
+    같은 원본은 동시에 한 번만, 실패한 원본은 프로세스 안에서 다시 시도하지 않는다.
+
+    Args:
+        sources: 썸네일이 없는 원본 MediaFile 목록
+
+    Returns:
+        dict: 바로 만든 썸네일 {원본 file_id: {크기: 썸네일 MediaFile}} (백그라운드면 빈 dict)
+    """
+    with _lazy_lock:
+        sources = [
+            source for source in sources
+            if source.file_id not in _lazy_pending and source.file_id not in _lazy_failed
+        ]
+        _lazy_pending.update(source.file_id for source in sources)
+
+    if not settings.THUMBNAIL_LAZY_ASYNC:
+        created = {}
+        for source in sources:
+            thumbnails = _create_lazily(source)
+            if thumbnails:
+                created[source.file_id] = {
+                    thumbnail.metadata['thumbnail_size']: thumbnail for thumbnail in thumbnails
+                }
+        return created
+
+    executor = _get_lazy_executor()
+    for source in sources:
+        executor.submit(_run_lazily, source)
+    return {}
+
+
+def _create_lazily(source):
+    """지연 생성 1건 (실패는 로그만 남김)"""
+    try:
+        return create_thumbnails_from_storage(source)
+    except Exception as e:
+        logger.warning(f"썸네일 지연 생성 실패: file_id={source.file_id} ({str(e)})")
+        with _lazy_lock:
+            _lazy_failed.add(source.file_id)
+        return []
+    finally:
+        with _lazy_lock:
+            _lazy_pending.discard(source.file_id)
+
+
+def _run_lazily(source):
+    """지연 생성 (스레드 풀)"""
+    try:
+        _create_lazily(source)
+    finally:
+        close_old_connections()
+
+
+def pick_size(requested=None):
+    """요청한 크기 (지원하지 않는 크기면 THUMBNAIL_DEFAULT_SIZE)"""
+    try:
+        requested = int(requested)
+    except (TypeError, ValueError):
+        return settings.THUMBNAIL_DEFAULT_SIZE
+    return requested if requested in settings.THUMBNAIL_SIZES else settings.THUMBNAIL_DEFAULT_SIZE
+
+
+def delete_thumbnails(source_ids):
+    """
+    원본의 썸네일 삭제 (다른 행과 공유 중인 객체는 남겨 둠)
+
+    Returns:
+        int: 삭제된 썸네일 행 수
+    """
+    thumbnails = list(MediaFile.objects.filter(
+        purpose=THUMBNAIL_PURPOSE,
+        related_model=THUMBNAIL_RELATED_MODEL,
+        related_record_id__in=source_ids
+    ))
+    if not thumbnails:
+        return 0
+
+    shared_paths = set(
+        MediaFile.objects.filter(
+            file_path__in=[thumbnail.file_path for thumbnail in thumbnails],
+            is_deleted=False
+        )
+        .exclude(file_id__in=[thumbnail.file_id for thumbnail in thumbnails])
+        .values_list('file_path', flat=True)
+    )
+
+    s3_keys = []
+    for thumbnail in thumbnails:
+        if thumbnail.file_path in shared_paths:
+            continue
+        if thumbnail.storage_type == 's3':
+            s3_keys.append(thumbnail.s3_key)
+        else:
+            try:
+                os.remove(os.path.join(settings.MEDIA_ROOT, thumbnail.file_path))
+            except FileNotFoundError:
+                pass
+
+    if s3_keys:
+        _, errors = S3Storage().delete_many(s3_keys)
+        if errors:
+            s3_key, message = next(iter(errors.items()))
+            logger.error(f"썸네일 S3 삭제 실패 {len(errors)}건: {s3_key} {message}")
+
+    MediaFile.objects.filter(file_id__in=[thumbnail.file_id for thumbnail in thumbnails]).delete()
+    return len(thumbnails)
+
+
+def _source_ids_for_path(user, file_path):
+    return list(
+        MediaFile.objects.filter(user=user, file_path=file_path, is_deleted=False)
+        .exclude(purpose=THUMBNAIL_PURPOSE)
+        .values_list('file_id', flat=True)
+    )
+
+
+def find_thumbnail_for_path(user, file_path, size=None):
+    """
+    저장 경로로 원본을 찾아 썸네일 조회 (경로만 저장하는 프로필 이미지용)
+
+    Returns:
+        MediaFile: 썸네일, 없으면 None
+    """
+    size = pick_size(size)
+    for thumbnails in get_thumbnails(_source_ids_for_path(user, file_path)).values():
+        if size in thumbnails:
+            return thumbnails[size]
+    return None
+
+
+def delete_thumbnails_for_path(user, file_path):
+    """저장 경로로 원본을 찾아 썸네일 삭제"""
+    return delete_thumbnails(_source_ids_for_path(user, file_path))
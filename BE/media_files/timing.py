@@ -0,0 +1,182 @@
+"""
+요청/작업 단계별 소요 시간 (stage timer)
+
+AnalysisRecord.processing_time 은 AI 호출 구간만 재므로 업로드, S3 PUT, 서명, DB 저장 중
+어디서 느려졌는지 알 수 없다. 요청(또는 워커 작업) 하나를 collect_timings 로 감싸면
+그 안에서 실행되는 stage('이름') 구간의 시간이 모인다.
+
+    @collect_timings('detection.image')        # 뷰/작업 함수 (sync/async 모두)
+    def post(self, request): ...
+
+    with stage('store'):                         # 서비스 코드
+        ...
+
+    @timed_stage('presign')                      # 서비스 메서드
+    def get_presigned_url(self, s3_key): ...
+
+- 단계: validate, normalize, store, thumbnail, cache, presign, health, inference, postprocess, persist
+- 단계가 중첩되면 바깥 단계에는 안쪽 단계를 뺀 시간만 더한다 (단계 합 ≈ 전체)
+- 같은 단계가 여러 번이면 합산 (스레드 풀에서 병렬로 실행된 파일별 시간도 합산)
+- 수집 중이 아니면 stage() 는 아무것도 하지 않는다
+- 요청이 끝나면 구조화 로그 1줄 (JSON): {"event", "stages": {...}, "total", ...}
+
+스레드 풀로 넘긴 작업까지 같은 요청으로 모으려면 contextvars.copy_context().run 으로 제출한다.
+(sync_to_async 는 자동으로 전달)
+"""
+import contextvars
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+_current_timer = contextvars.ContextVar('stage_timer', default=None)
+_current_stage = contextvars.ContextVar('stage_frame', default=None)
+
+
+class StageTimer:
+    """요청/작업 1건의 단계별 누적 시간 (ms)"""
+
+    def __init__(self, event):
+        self.event = event
+        self.fields = {}
+        self._stages = {}
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def add(self, name, elapsed_ms):
+        with self._lock:
+            self._stages[name] = self._stages.get(name, 0.0) + max(0.0, elapsed_ms)
+
+    def as_dict(self):
+        """{단계: ms, ..., 'total': 시작부터 지금까지 ms}"""
+        with self._lock:
+            timings = {name: round(elapsed, 1) for name, elapsed in self._stages.items()}
+        timings['total'] = round((time.perf_counter() - self._start) * 1000, 1)
+        return timings
+
+
+class _StageFrame:
+    """열린 단계 (안쪽 단계 시간을 빼기 위한 누적값)"""
+
+    __slots__ = ('children_ms',)
+
+    def __init__(self):
+        self.children_ms = 0.0
+
+
+def current_timer():
+    """수집 중인 StageTimer (없으면 None)"""
+    return _current_timer.get()
+
+
+@contextmanager
+def stage(name):
+    """단계 시간 측정 (수집 중이 아니면 그대로 실행)"""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+
+    parent = _current_stage.get()
+    frame = _StageFrame()
+    token = _current_stage.set(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        _current_stage.reset(token)
+        timer.add(name, elapsed - frame.children_ms)
+        if parent is not None:
+            parent.children_ms += elapsed
+
+
+def timed_stage(name):
+    """함수/메서드 전체를 단계 하나로 측정 (async 함수도 지원)"""
+    def decorator(func):
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with stage(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def collecting(event):
+    """
+    이 블록 안의 단계 시간 수집, 끝나면 구조화 로그 1줄
+
+    Yields:
+        StageTimer: 수집 중이 아니면(STAGE_TIMINGS_ENABLED=False) None
+    """
+    if not settings.STAGE_TIMINGS_ENABLED:
+        yield None
+        return
+
+    timer = StageTimer(event)
+    timer_token = _current_timer.set(timer)
+    stage_token = _current_stage.set(None)
+    try:
+        yield timer
+    finally:
+        _current_stage.reset(stage_token)
+        _current_timer.reset(timer_token)
+        log_stage_timings(timer)
+
+
+def collect_timings(event):
+    """뷰 핸들러/작업 함수 단위 collecting (응답이 있으면 상태 코드도 기록)"""
+    def decorator(func):
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with collecting(event) as timer:
+                    response = await func(*args, **kwargs)
+                    _record_status(timer, response)
+                    return response
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with collecting(event) as timer:
+                response = func(*args, **kwargs)
+                _record_status(timer, response)
+                return response
+        return wrapper
+
+    return decorator
+
+
+def _record_status(timer, response):
+    status_code = getattr(response, 'status_code', None)
+    if timer is not None and status_code is not None:
+        timer.fields['status'] = status_code
+
+
+def log_stage_timings(timer):
+    """단계별 시간 구조화 로그 (JSON 1줄)"""
+    timings = timer.as_dict()
+    total = timings.pop('total')
+    logger.info(json.dumps({
+        'event': timer.event,
+        **timer.fields,
+        'stages': timings,
+        'total': total,
+    }, ensure_ascii=False, default=str))
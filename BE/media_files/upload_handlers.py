@@ -0,0 +1,373 @@
+"""
+대용량 영상 S3 스트리밍 업로드
+
+기본 업로드 핸들러는 FILE_UPLOAD_MAX_MEMORY_SIZE(10MB)를 넘는 파일을 임시 파일에
+모두 받은 뒤에야 S3로 보낸다. S3MultipartUploadHandler 는 들어오는 청크를
+S3 multipart 업로드로 바로 흘려보내고, 같은 패스에서 SHA-256 을 계산한다.
+- 파트 크기 / 동시 업로드 수: TransferConfig (S3_MULTIPART_PART_SIZE, S3_MULTIPART_CONCURRENCY)
+- 확장자, 파일 시그니처(매직 바이트), 크기 초과는 스트림 도중 바로 중단
+"""
+import hashlib
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import BotoCoreError, ClientError
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import (
+    FileUploadHandler,
+    SkipFile,
+    StopFutureHandlers,
+)
+from django.http.multipartparser import MultiPartParserError
+
+from .services import FileService
+from .storage import S3Storage, get_s3_client
+
+logger = logging.getLogger(__name__)
+
+
+# 확장자별 파일 시그니처 (offset, 허용 바이트 목록)
+FILE_SIGNATURES = {
+    'mp4': (4, [b'ftyp']),
+    'mov': (4, [b'ftyp', b'moov', b'mdat', b'wide', b'free', b'skip', b'pnot']),
+    'avi': (0, [b'RIFF']),
+}
+
+SIGNATURE_SNIFF_SIZE = 12
+
+
+def streaming_upload_enabled():
+    """S3 스트리밍 업로드 사용 가능 여부"""
+    return settings.S3_STREAMING_UPLOAD and bool(settings.AWS_STORAGE_BUCKET_NAME)
+
+
+def get_transfer_config():
+    """multipart 파트 크기 / 동시 업로드 수"""
+    return TransferConfig(
+        multipart_threshold=settings.S3_MULTIPART_PART_SIZE,
+        multipart_chunksize=settings.S3_MULTIPART_PART_SIZE,
+        max_concurrency=settings.S3_MULTIPART_CONCURRENCY
+    )
+
+
+class S3StreamedFile(UploadedFile):
+    """
+    업로드 핸들러가 이미 S3에 올린 파일
+
+    본문은 S3에 있으므로 file 은 비어 있다.
+    FileService 는 s3_key 속성이 있으면 다시 업로드하지 않는다.
+    """
+
+    def __init__(self, name, content_type, size, charset, s3_key, content_hash,
+                 content_type_extra=None):
+        super().__init__(io.BytesIO(), name, content_type, size, charset, content_type_extra)
+        self.s3_key = s3_key
+        self.content_hash = content_hash
+        self.is_saved = False
+
+
+class S3MultipartUploadHandler(FileUploadHandler):
+    """지정한 필드의 파일을 S3 multipart 업로드로 바로 스트리밍"""
+
+    def __init__(self, request, user, field_names, file_type, purpose):
+        """
+        Args:
+            request: Django 요청
+            user: 인증이 끝난 사용자 (S3 키 생성, 본문을 읽는 도중 인증을 다시 하지 않도록 미리 받음)
+            field_names: 스트리밍할 폼 필드 이름 목록
+            file_type: FileService 파일 유형 (확장자/크기 검증 기준)
+            purpose: 사용 목적 (S3 키 접두사)
+        """
+        super().__init__(request)
+        self.user = user
+        self.field_names = set(field_names)
+        self.file_type = file_type
+        self.purpose = purpose
+        self.transfer_config = get_transfer_config()
+
+        self.rejection = None
+        self.streamed_files = []
+        self._reset()
+
+    def _reset(self):
+        self.active = False
+        self.s3_key = None
+        self.upload_id = None
+        self.buffer = bytearray()
+        self.hasher = None
+        self.size = 0
+        self.sniffed = False
+        self.futures = []
+        self.executor = None
+        self.slots = None
+
+    # ---------------------------------------------------------------
+    # Django 업로드 핸들러 인터페이스
+    # ---------------------------------------------------------------
+
+    def new_file(self, field_name, file_name, content_type, content_length,
+                 charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length,
+                         charset, content_type_extra)
+        self._reset()
+
+        if field_name not in self.field_names:
+            return
+
+        file_service = FileService(self.user)
+        extension = file_service._get_file_extension(file_name)
+        allowed = file_service.ALLOWED_EXTENSIONS[self.file_type]
+        if extension not in allowed:
+            self._reject(
+                f"{self.file_type} 타입은 {', '.join(allowed)} 확장자만 허용됩니다."
+            )
+
+        if content_length and content_length > self.max_size:
+            self._reject_oversize()
+
+        self.active = True
+        self.extension = extension
+        self.s3_key = file_service._build_s3_key(
+            file_service._generate_unique_filename(extension),
+            self.purpose
+        )
+        self.hasher = hashlib.sha256()
+
+        # 이 파일은 뒤 핸들러(메모리/임시 파일)로 넘기지 않음
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+
+        self.size += len(raw_data)
+        if self.size > self.max_size:
+            self._abort()
+            self._reject_oversize()
+
+        self.hasher.update(raw_data)
+        self.buffer += raw_data
+
+        if not self.sniffed and len(self.buffer) >= SIGNATURE_SNIFF_SIZE:
+            self._check_signature()
+
+        part_size = self.transfer_config.multipart_chunksize
+        while len(self.buffer) >= part_size:
+            self._submit_part(bytes(self.buffer[:part_size]))
+            del self.buffer[:part_size]
+
+        return None
+
+    def file_complete(self, file_size):
+        if not self.active:
+            return None
+
+        if not self.sniffed:
+            try:
+                self._check_signature()
+            except SkipFile:
+                # 파일 처리가 끝난 뒤라 SkipFile 로는 건너뛸 수 없음
+                raise MultiPartParserError(self.rejection)
+
+        try:
+            if self.upload_id is None:
+                # 파트 크기보다 작은 파일은 PUT 1번
+                self._client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=self.s3_key,
+                    Body=bytes(self.buffer),
+                    ContentType=self._content_type
+                )
+            else:
+                if self.buffer:
+                    self._submit_part(bytes(self.buffer))
+                self._complete_multipart()
+        except (BotoCoreError, ClientError) as e:
+            logger.error(f"S3 스트리밍 업로드 실패: {self.s3_key} ({str(e)})")
+            self._abort()
+            raise MultiPartParserError("S3 업로드에 실패했습니다.")
+
+        streamed_file = S3StreamedFile(
+            name=self.file_name,
+            content_type=self.content_type,
+            size=self.size,
+            charset=self.charset,
+            s3_key=self.s3_key,
+            content_hash=self.hasher.hexdigest(),
+            content_type_extra=self.content_type_extra
+        )
+        self.streamed_files.append(streamed_file)
+        logger.info(f"S3 스트리밍 업로드 성공: {self.s3_key} ({self.size} bytes)")
+
+        self._reset()
+        return streamed_file
+
+    def upload_interrupted(self):
+        if self.active:
+            self._abort()
+
+    # ---------------------------------------------------------------
+    # 내부 처리
+    # ---------------------------------------------------------------
+
+    @property
+    def max_size(self):
+        return FileService.MAX_FILE_SIZES[self.file_type]
+
+    @property
+    def bucket_name(self):
+        return settings.AWS_STORAGE_BUCKET_NAME
+
+    @property
+    def _content_type(self):
+        return self.content_type or 'application/octet-stream'
+
+    @property
+    def _client(self):
+        return get_s3_client()
+
+    def _reject(self, message):
+        """검증 실패: 사유를 남기고 이 파일의 나머지 스트림은 버림"""
+        self.rejection = message
+        self.active = False
+        raise SkipFile(message)
+
+    def _reject_oversize(self):
+        max_size_mb = self.max_size / (1024 * 1024)
+        self._reject(f"파일 크기는 {max_size_mb}MB 이하여야 합니다.")
+
+    def _check_signature(self):
+        """앞부분 바이트로 실제 파일 형식 확인"""
+        self.sniffed = True
+        signature = FILE_SIGNATURES.get(self.extension)
+        if signature is None:
+            return
+
+        offset, magic_values = signature
+        header = bytes(self.buffer[offset:offset + 4])
+        if header not in magic_values:
+            self._abort()
+            self._reject(f"파일 내용이 {self.extension} 형식이 아닙니다.")
+
+    def _submit_part(self, data):
+        """파트 1개를 스레드 풀로 업로드 (동시 업로드 수만큼만 메모리에 보관)"""
+        if self.upload_id is None:
+            self._start_multipart()
+
+        part_number = len(self.futures) + 1
+        self.slots.acquire()
+        future = self.executor.submit(self._upload_part, part_number, data)
+        future.add_done_callback(lambda _: self.slots.release())
+        self.futures.append(future)
+
+    def _start_multipart(self):
+        response = self._client.create_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=self.s3_key,
+            ContentType=self._content_type
+        )
+        self.upload_id = response['UploadId']
+
+        concurrency = self.transfer_config.max_concurrency
+        self.executor = ThreadPoolExecutor(
+            max_workers=concurrency,
+            thread_name_prefix='s3-multipart'
+        )
+        self.slots = threading.BoundedSemaphore(concurrency)
+
+    def _upload_part(self, part_number, data):
+        response = self._client.upload_part(
+            Bucket=self.bucket_name,
+            Key=self.s3_key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=data
+        )
+        return {'PartNumber': part_number, 'ETag': response['ETag']}
+
+    def _complete_multipart(self):
+        try:
+            parts = [future.result() for future in self.futures]
+        finally:
+            self.executor.shutdown(wait=True)
+
+        self._client.complete_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=self.s3_key,
+            UploadId=self.upload_id,
+            MultipartUpload={'Parts': parts}
+        )
+
+    def _abort(self):
+        """진행 중인 multipart 업로드 취소 (이미 올린 파트 정리)"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+        if self.upload_id is not None:
+            try:
+                self._client.abort_multipart_upload(
+                    Bucket=self.bucket_name,
+                    Key=self.s3_key,
+                    UploadId=self.upload_id
+                )
+            except (BotoCoreError, ClientError) as e:
+                logger.error(f"S3 multipart 취소 실패: {self.s3_key} ({str(e)})")
+
+        self._reset()
+
+    def discard_unsaved(self):
+        """MediaFile 로 저장되지 않은 스트리밍 파일 삭제 (요청 검증 실패 등)"""
+        s3_storage = None
+        for streamed_file in self.streamed_files:
+            if streamed_file.is_saved:
+                continue
+            if s3_storage is None:
+                s3_storage = S3Storage()
+            s3_storage.delete(streamed_file.s3_key)
+        self.streamed_files = []
+
+
+class StreamingUploadMixin:
+    """
+    APIView 용: streaming_upload_fields 의 파일을 S3로 바로 스트리밍
+
+    업로드 핸들러는 request.data 를 처음 읽기 전에 설치해야 한다.
+    인증/권한/요청 제한 확인(initial)을 먼저 끝내고 확정된 사용자를 핸들러에 넘기므로
+    본문을 읽는 도중 핸들러가 인증을 다시 시작하지 않고, 거절될 요청은 S3에 올리지 않는다.
+    세션 인증은 CSRF 확인 중에 본문을 이미 읽으므로 스트리밍 없이 기본 업로드로 처리된다.
+    """
+
+    streaming_upload_fields = ()
+    streaming_upload_file_type = 'video'
+    streaming_upload_purpose = 'detection'
+    streaming_upload_handler = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        django_request = request._request
+        body_parsed = hasattr(django_request, '_files')
+        if request.method == 'POST' and streaming_upload_enabled() and not body_parsed:
+            self.streaming_upload_handler = S3MultipartUploadHandler(
+                django_request,
+                user=request.user,
+                field_names=self.streaming_upload_fields,
+                file_type=self.streaming_upload_file_type,
+                purpose=self.streaming_upload_purpose
+            )
+            django_request.upload_handlers.insert(0, self.streaming_upload_handler)
+
+    def get_upload_rejection(self):
+        """스트리밍 도중 검증에 실패한 사유 (없으면 None)"""
+        if self.streaming_upload_handler is None:
+            return None
+        return self.streaming_upload_handler.rejection
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self.streaming_upload_handler is not None:
+            self.streaming_upload_handler.discard_unsaved()
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import MediaFileDownloadView
+from .views import MediaFileContentView, MediaFileDownloadView
 
 app_name = 'media_files'
 
 urlpatterns = [
     path('<int:file_id>/download/', MediaFileDownloadView.as_view(), name='download'),
+    path('<int:file_id>/content/', MediaFileContentView.as_view(), name='content'),
 ]
\ No newline at end of file
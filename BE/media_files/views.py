@@ -1,7 +1,12 @@
+from django.conf import settings
+from django.http import HttpResponseRedirect
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import NotAuthenticated
+from rest_framework.permissions import AllowAny
 from .models import MediaFile
+from .serving import build_content_url, serve_media_file, verify_file_token
 from .storage import S3Storage
 
 
@@ -32,12 +37,43 @@ class MediaFileDownloadView(APIView):
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
         else:
-            # 로컬 파일인 경우
-            download_url = f"/media/{media_file.file_path}"
+            # ✅ 로컬 파일은 서명된 전송 API URL (소유자 확인 후 프록시/Range 전송)
+            download_url = build_content_url(request, media_file)
         
         return Response({
             'file_id': media_file.file_id,
             'file_name': media_file.original_name,
             'download_url': download_url,
-            'expires_in': 3600  # 1시간
-        })
\ No newline at end of file
+            'expires_in': settings.MEDIA_SERVE_URL_EXPIRATION
+        })
+
+
+class MediaFileContentView(APIView):
+    """
+    미디어 파일 전송 API
+    
+    서명된 URL(?token=, MediaFileDownloadView 발급) 또는 로그인한 소유자만 받을 수 있다.
+    로컬 파일은 X-Accel-Redirect/X-Sendfile 또는 Range 지원 직접 전송, S3 파일은 Presigned URL 로 리다이렉트.
+    """
+    
+    permission_classes = [AllowAny]
+    
+    def get(self, request, file_id):
+        media_file = MediaFile.objects.filter(file_id=file_id, is_deleted=False).first()
+        
+        if not verify_file_token(file_id, request.query_params.get('token')):
+            if not request.user.is_authenticated:
+                raise NotAuthenticated()
+            if media_file is not None and media_file.user_id != request.user.user_id:
+                media_file = None
+        
+        if media_file is None:
+            return Response(
+                {'error': '파일을 찾을 수 없습니다.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        if media_file.storage_type == 's3':
+            return HttpResponseRedirect(S3Storage().get_presigned_url(media_file.s3_key))
+        
+        return serve_media_file(request, media_file)
\ No newline at end of file
@@ -21,6 +21,7 @@ class ProtectionJobAdmin(admin.ModelAdmin):
         'job_id',
         'created_at',
         'processing_started_at',
-        'processing_completed_at'
+        'processing_completed_at',
+        'stage_timings'
     ]
     ordering = ['-created_at']
\ No newline at end of file
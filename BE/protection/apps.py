@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class ProtectionConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "protection"
+
+    def ready(self):
+        # ✅ 내장 보호 워커 (웹 서버 프로세스에서만)
+        from .jobs import start_embedded_worker
+        start_embedded_worker()
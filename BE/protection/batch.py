@@ -0,0 +1,179 @@
+"""
+다중 파일 보호 (동시 처리)
+
+- 업로드: 요청 처리 중 파일별로 동시에 저장 (upload_files)
+- 보호: 워커가 파일별 워터마크 API 호출 + ResultUrl 서명을 동시에 실행 (protect_file)
+
+두 단계는 풀을 나눠 쓴다.
+- 업로드 풀(PROTECTION_UPLOAD_WORKERS): 웹 요청 경로 전용, 짧은 저장 작업만 실행
+- 보호 풀(PROTECTION_BATCH_WORKERS): 워커 전용, 파일당 최대 10분 걸리는 워터마크 호출
+같은 풀을 쓰면 워터마크 호출이 스레드를 모두 잡고 있는 동안 업로드 요청이 줄을 서서 기다린다.
+보호 풀 크기가 워터마크 서버로의 동시 호출 수 상한이며,
+10장 작업의 전체 지연이 가장 느린 1장의 지연에 가까워진다.
+"""
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from detection.pipeline import presign_result_urls
+from media_files.services import FileService
+from media_files.storage import S3Storage
+from media_files.timing import stage
+from .services import ProtectionService
+
+logger = logging.getLogger(__name__)
+
+
+_upload_executor = None
+_protect_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_upload_executor():
+    """프로세스 공용 업로드 스레드 풀 (요청 경로 전용)"""
+    global _upload_executor
+
+    if _upload_executor is None:
+        with _executor_lock:
+            if _upload_executor is None:
+                _upload_executor = ThreadPoolExecutor(
+                    max_workers=settings.PROTECTION_UPLOAD_WORKERS,
+                    thread_name_prefix='protection-upload'
+                )
+    return _upload_executor
+
+
+def get_protect_executor():
+    """프로세스 공용 워터마크 호출 스레드 풀 (워커 전용)"""
+    global _protect_executor
+
+    if _protect_executor is None:
+        with _executor_lock:
+            if _protect_executor is None:
+                _protect_executor = ThreadPoolExecutor(
+                    max_workers=settings.PROTECTION_BATCH_WORKERS,
+                    thread_name_prefix='protection-batch'
+                )
+    return _protect_executor
+
+
+def upload_files(user, uploaded_files, file_type, build_absolute_uri):
+    """
+    파일 여러 개를 동시에 업로드
+
+    Args:
+        user: 요청 사용자
+        uploaded_files: UploadedFile 목록
+        file_type: 'image' / 'video'
+        build_absolute_uri: 로컬 파일 URL 생성 함수 (워커가 AI 서버에 넘길 주소)
+
+    Returns:
+        list: 원본 순서대로 ProtectionJob.original_files 항목
+              (업로드 실패 시 'error' 포함, file_id 없음)
+    """
+    executor = get_upload_executor()
+    # 단계별 시간이 요청 것으로 모이도록 컨텍스트를 복사해 실행
+    futures = [
+        executor.submit(
+            contextvars.copy_context().run,
+            _upload_one, user, index, uploaded_file, file_type, build_absolute_uri
+        )
+        for index, uploaded_file in enumerate(uploaded_files)
+    ]
+    return [future.result() for future in futures]
+
+
+def _upload_one(user, index, uploaded_file, file_type, build_absolute_uri):
+    entry = {'index': index, 'file_name': uploaded_file.name, 'file_size': uploaded_file.size}
+
+    try:
+        media_file = FileService(user).upload_file(
+            uploaded_file=uploaded_file,
+            file_type=file_type,
+            purpose='protection',
+            is_temporary=False,
+            use_s3=settings.USE_S3_FOR_PROTECTION
+        )
+        entry.update({
+            'file_id': media_file.file_id,
+            'file_name': media_file.original_name,
+            'file_size': media_file.file_size,
+            'file_path': media_file.file_path,
+            'mime_type': media_file.mime_type,
+            'storage_type': media_file.storage_type,
+            's3_key': media_file.s3_key,
+        })
+        if media_file.storage_type != 's3':
+            entry['source_url'] = build_absolute_uri(f'/media/{media_file.file_path}')
+
+    except ValueError as e:
+        entry['error'] = str(e)
+    except Exception as e:
+        logger.exception(f"보호 파일 업로드 실패: {uploaded_file.name}")
+        entry['error'] = f'업로드 중 오류: {str(e)}'
+    finally:
+        close_old_connections()
+
+    return entry
+
+
+def failed_entry(original_file, error):
+    """ProtectionJob.protected_files 실패 항목"""
+    return {
+        'index': original_file['index'],
+        'file_id': original_file.get('file_id'),
+        'file_name': original_file['file_name'],
+        'status': 'failed',
+        'request_version': None,
+        'ResultUrl': None,
+        'error': error
+    }
+
+
+def protect_file(original_file, job_type, watermark_text):
+    """
+    업로드된 파일 1개 보호 (워커의 배치 스레드에서 호출)
+
+    Returns:
+        dict: ProtectionJob.protected_files 항목 (status: 'completed' | 'failed')
+    """
+    try:
+        if original_file.get('storage_type') == 's3':
+            input_url = S3Storage().get_presigned_url(original_file['s3_key'])
+        else:
+            input_url = original_file['source_url']
+
+        service = ProtectionService()
+        if original_file.get('mime_type', '').startswith('video/'):
+            result = service.protect_video(input_url, job_type, watermark_text)
+        else:
+            result = service.protect_image(input_url, job_type, watermark_text)
+
+        if not result['success']:
+            return failed_entry(original_file, result.get('error', '알 수 없는 오류'))
+
+        with stage('postprocess'):
+            results = presign_result_urls(result.get('results', []))
+            protected = next(
+                (info for info in results if info.get('request_version') == 'Watermark'),
+                results[0] if results else {}
+            )
+        return {
+            'index': original_file['index'],
+            'file_id': original_file['file_id'],
+            'file_name': original_file['file_name'],
+            'status': 'completed',
+            'request_version': protected.get('request_version'),
+            'ResultUrl': protected.get('ResultUrl'),
+            'error': None
+        }
+
+    except Exception as e:
+        logger.exception(f"파일 보호 실패: {original_file.get('file_name')}")
+        return failed_entry(original_file, f'처리 중 오류: {str(e)}')
+    finally:
+        close_old_connections()
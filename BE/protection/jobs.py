@@ -0,0 +1,298 @@
+"""
+보호 작업 큐 (DB 기반)
+
+워터마크 호출은 파일당 최대 10분이 걸리므로 웹 요청 안에서 실행하지 않는다.
+- 뷰는 파일을 업로드하고 job_status='pending' 작업을 만든 뒤 202를 반환
+- 워커는 SELECT ... FOR UPDATE SKIP LOCKED 로 작업을 가져가 스레드 풀에서 실행
+- 작업 안의 파일들은 batch.py 보호 풀(워커 전용)에서 동시에 보호하고,
+  파일이 끝날 때마다 progress_percentage / protected_files 를 갱신
+- 클라이언트는 ProtectionJobDetailView 로 진행 상황을 조회
+"""
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from detection.jobs import is_web_server_process
+from media_files.timing import collect_timings, current_timer, stage
+from .batch import failed_entry, get_protect_executor, protect_file
+from .models import ProtectionJob
+
+logger = logging.getLogger(__name__)
+
+
+def create_protection_job(user, job_type, watermark_text, original_files):
+    """
+    보호 작업 등록
+
+    Args:
+        original_files: batch.upload_files 결과 (업로드 실패 항목 포함)
+
+    Returns:
+        ProtectionJob: pending 상태의 작업 (요청 단계별 시간은 stage_timings['request'])
+    """
+    timer = current_timer()
+    job = ProtectionJob.objects.create(
+        user=user,
+        job_type=job_type,
+        watermark_text=watermark_text,
+        original_files=original_files,
+        job_status='pending',
+        progress_percentage=0.0,
+        stage_timings={'request': timer.as_dict()} if timer else {}
+    )
+    if timer:
+        timer.fields['job_id'] = job.job_id
+
+    # 커밋 이후 워커 깨우기
+    transaction.on_commit(notify_worker)
+
+    return job
+
+
+@collect_timings('protection.job')
+def process_protection_job(job_id):
+    """
+    작업 1건 실행 (워커 스레드에서 호출)
+
+    업로드 실패 파일은 바로 실패로 기록하고, 나머지는 동시에 보호한다.
+    파일별 단계 시간은 합산해 stage_timings['worker'] 에 저장한다.
+    """
+    timer = current_timer()
+    if timer:
+        timer.fields['job_id'] = job_id
+
+    job = ProtectionJob.objects.get(job_id=job_id)
+    original_files = job.original_files or []
+    total = len(original_files)
+
+    results = {}
+    for original_file in original_files:
+        if not original_file.get('file_id'):
+            results[original_file['index']] = failed_entry(
+                original_file,
+                original_file.get('error', '업로드되지 않은 파일입니다.')
+            )
+
+    executor = get_protect_executor()
+    futures = [
+        executor.submit(
+            contextvars.copy_context().run,
+            protect_file, original_file, job.job_type, job.watermark_text
+        )
+        for original_file in original_files
+        if original_file['index'] not in results
+    ]
+
+    if results:
+        _save_progress(job, results, total)
+
+    for future in as_completed(futures):
+        entry = future.result()
+        results[entry['index']] = entry
+        _save_progress(job, results, total)
+
+    _finish(job, results)
+
+
+def _save_progress(job, results, total):
+    """끝난 파일 수만큼 진행률 갱신 (끝난 파일 결과도 바로 조회 가능)"""
+    job.protected_files = [results[index] for index in sorted(results)]
+    job.progress_percentage = round(len(results) / total * 100, 2) if total else 100.0
+    with stage('persist'):
+        job.save(update_fields=['protected_files', 'progress_percentage'])
+
+
+def _finish(job, results):
+    failed = [entry for entry in results.values() if entry['status'] == 'failed']
+
+    job.protected_files = [results[index] for index in sorted(results)]
+    job.progress_percentage = 100.0
+    job.processing_completed_at = timezone.now()
+    if failed and len(failed) == len(results):
+        job.job_status = 'failed'
+        job.error_message = failed[0]['error']
+    else:
+        job.job_status = 'completed'
+        if failed:
+            job.error_message = f'{len(failed)}/{len(results)}개 파일 보호 실패: {failed[0]["error"]}'
+
+    timer = current_timer()
+    update_fields = [
+        'protected_files',
+        'progress_percentage',
+        'processing_completed_at',
+        'job_status',
+        'error_message'
+    ]
+    if timer:
+        job.stage_timings = {**(job.stage_timings or {}), 'worker': timer.as_dict()}
+        update_fields.append('stage_timings')
+    job.save(update_fields=update_fields)
+
+
+class ProtectionJobWorker:
+    """pending 보호 작업을 가져와 스레드 풀에서 실행하는 워커"""
+
+    def __init__(self, concurrency=None, poll_interval=None):
+        self.concurrency = concurrency or settings.PROTECTION_WORKER_CONCURRENCY
+        self.poll_interval = poll_interval or settings.PROTECTION_WORKER_POLL_INTERVAL
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concurrency,
+            thread_name_prefix='protection-job'
+        )
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def in_flight(self):
+        """현재 실행 중인 작업 수"""
+        with self._lock:
+            return len(self._in_flight)
+
+    def start(self):
+        """백그라운드 스레드로 워커 실행"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self.run_forever,
+            name='protection-job-poller',
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, wait=True):
+        """워커 종료"""
+        self._stop.set()
+        self._wakeup.set()
+        self._executor.shutdown(wait=wait)
+
+    def notify(self):
+        """새 작업 등록 알림 (폴링 대기 해제)"""
+        self._wakeup.set()
+
+    def run_forever(self):
+        """작업이 없으면 poll_interval 만큼 대기하며 반복"""
+        # AppConfig.ready() 에서 시작된 경우 앱 로딩이 끝난 뒤 첫 폴링
+        while not apps.ready and not self._stop.is_set():
+            self._stop.wait(0.1)
+
+        while not self._stop.is_set():
+            try:
+                self.requeue_stale_jobs()
+                claimed = self.poll_once()
+            except Exception:
+                logger.exception("보호 작업 폴링 실패")
+                claimed = 0
+            finally:
+                close_old_connections()
+
+            if not claimed:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def poll_once(self):
+        """
+        빈 슬롯만큼 작업을 가져와 실행
+
+        Returns:
+            int: 가져온 작업 수
+        """
+        free_slots = self.concurrency - self.in_flight
+        if free_slots <= 0:
+            return 0
+
+        job_ids = self._claim(free_slots)
+
+        for job_id in job_ids:
+            with self._lock:
+                self._in_flight.add(job_id)
+            self._executor.submit(self._run, job_id)
+
+        return len(job_ids)
+
+    def _claim(self, limit):
+        """pending 작업을 processing으로 바꾸며 가져오기 (처리 시작 시각 기록)"""
+        with transaction.atomic():
+            job_ids = list(
+                ProtectionJob.objects
+                .select_for_update(skip_locked=True)
+                .filter(job_status='pending')
+                .order_by('created_at')
+                .values_list('job_id', flat=True)[:limit]
+            )
+
+            if job_ids:
+                ProtectionJob.objects.filter(job_id__in=job_ids).update(
+                    job_status='processing',
+                    processing_started_at=timezone.now()
+                )
+
+        return job_ids
+
+    def _run(self, job_id):
+        """작업 실행 (스레드 풀)"""
+        close_old_connections()
+        try:
+            process_protection_job(job_id)
+        except Exception as e:
+            logger.exception(f"보호 작업 실패: job_id={job_id}")
+            ProtectionJob.objects.filter(job_id=job_id).update(
+                job_status='failed',
+                error_message=f'처리 중 오류: {str(e)}',
+                processing_completed_at=timezone.now()
+            )
+        finally:
+            with self._lock:
+                self._in_flight.discard(job_id)
+            close_old_connections()
+            self._wakeup.set()
+
+    def requeue_stale_jobs(self):
+        """워커가 죽어 processing 상태로 남은 작업을 다시 pending으로"""
+        threshold = timezone.now() - timedelta(seconds=settings.PROTECTION_JOB_STALE_TIMEOUT)
+        return ProtectionJob.objects.filter(
+            job_status='processing',
+            processing_started_at__lt=threshold
+        ).update(job_status='pending', progress_percentage=0.0)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_worker():
+    """프로세스 내장 워커 (최초 호출 시 시작)"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = ProtectionJobWorker()
+            _worker.start()
+        return _worker
+
+
+def notify_worker():
+    """내장 워커가 켜져 있으면 깨우기 (꺼져 있으면 전용 워커 프로세스가 폴링)"""
+    if settings.PROTECTION_EMBEDDED_WORKER:
+        get_worker().notify()
+
+
+def start_embedded_worker():
+    """
+    웹 서버 프로세스 시작 시 내장 워커 실행 (ProtectionConfig.ready)
+
+    재시작 전에 등록된 pending 작업과 processing 으로 멈춘 작업을
+    새 요청이 없어도 바로 이어서 처리한다.
+    """
+    if settings.PROTECTION_EMBEDDED_WORKER and is_web_server_process():
+        get_worker()
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from protection.jobs import ProtectionJobWorker
+
+
+class Command(BaseCommand):
+    """보호 작업 전용 워커 실행
+
+    사용법: python manage.py run_protection_worker --concurrency 2
+    (PROTECTION_EMBEDDED_WORKER=False 로 웹 프로세스 내장 워커를 끄고 사용)
+    """
+
+    help = 'DB 큐에 쌓인 콘텐츠 보호 작업을 처리합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=None, help='워커당 동시 작업 수')
+        parser.add_argument('--poll-interval', type=float, default=None, help='폴링 간격(초)')
+
+    def handle(self, *args, **options):
+        worker = ProtectionJobWorker(
+            concurrency=options['concurrency'],
+            poll_interval=options['poll_interval']
+        )
+
+        self.stdout.write(self.style.SUCCESS(f'보호 워커 시작 (동시 {worker.concurrency}개)'))
+
+        try:
+            worker.run_forever()
+        except KeyboardInterrupt:
+            self.stdout.write('보호 워커 종료 중...')
+        finally:
+            worker.stop(wait=True)
@@ -0,0 +1,27 @@
+# Generated by Django 5.1 on 2026-10-18 15:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("protection", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="protectionjob",
+            name="watermark_text",
+            field=models.CharField(
+                default="IMREAL", max_length=100, verbose_name="워터마크 텍스트"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="protectionjob",
+            index=models.Index(
+                fields=["job_status", "created_at"],
+                name="protection__job_sta_6770de_idx",
+            ),
+        ),
+    ]
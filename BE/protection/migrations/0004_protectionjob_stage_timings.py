@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-18 16:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("protection", "0003_protection_job_worker"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="protectionjob",
+            name="stage_timings",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text='{"request": {"validate": 2.0, "store": 120.5, "total": 131.2}, "worker": {"presign": 4.1, "inference": 9310.0, "total": 9342.7}}',
+                verbose_name="단계별 처리 시간(ms)",
+            ),
+        ),
+    ]
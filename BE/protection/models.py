@@ -30,6 +30,11 @@ class ProtectionJob(models.Model):
         choices=JOB_TYPE_CHOICES,
         verbose_name='작업 유형'
     )
+    watermark_text = models.CharField(
+        max_length=100,
+        default='IMREAL',
+        verbose_name='워터마크 텍스트'
+    )
     original_files = models.JSONField(
         verbose_name='원본 파일 목록',
         help_text='[{"file_name": "image1.jpg", "file_path": "/path/to/file", "file_size": 1024}]'
@@ -67,6 +72,13 @@ class ProtectionJob(models.Model):
         blank=True,
         verbose_name='오류 메시지'
     )
+    # ✅ 단계별 소요 시간: 요청(업로드)과 워커(보호 처리)를 나눠 기록
+    stage_timings = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='단계별 처리 시간(ms)',
+        help_text='{"request": {"validate": 2.0, "store": 120.5, "total": 131.2}, "worker": {"presign": 4.1, "inference": 9310.0, "total": 9342.7}}'
+    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일시')
     
     class Meta:
@@ -77,6 +89,7 @@ class ProtectionJob(models.Model):
         indexes = [
             models.Index(fields=['user', '-created_at']),
             models.Index(fields=['job_status']),
+            models.Index(fields=['job_status', 'created_at']),
         ]
     
     def __str__(self):
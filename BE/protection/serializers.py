@@ -22,6 +22,7 @@ class ProtectionJobSerializer(serializers.ModelSerializer):
             'user',
             'job_type',
             'job_type_display',
+            'watermark_text',
             'original_files',
             'protected_files',
             'job_status',
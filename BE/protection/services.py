@@ -1,7 +1,10 @@
 import requests
 import time
 from django.conf import settings
-from media_files.models import SystemLog
+from media_files.log_writer import write_system_log
+from media_files.timing import stage
+from detection.clients import get_model_client
+from detection.health import get_health_monitor
 
 
 class ProtectionService:
@@ -9,7 +12,9 @@ class ProtectionService:
     
     def __init__(self):
         self.fastapi_url = settings.FASTAPI_WATERMARK_URL
-        self.timeout = 600  # 10분
+        self.timeout = settings.PROTECTION_TIMEOUT  # 10분
+        self.client = get_model_client(self.fastapi_url)
+        self.health = get_health_monitor(self.fastapi_url)
     
 # BE/protection/services.py
 
@@ -18,7 +23,9 @@ class ProtectionService:
         start_time = time.time()
         
         try:
-            if not self.check_health():
+            with stage('health'):
+                available = self.health.allow_request()
+            if not available:
                 print("⚠️ AI 서버 없음 - Mock 데이터 반환")
                 return self._get_mock_protection_response(start_time)
             
@@ -73,14 +80,16 @@ class ProtectionService:
                 "WaterMark Text": watermark_text
             }
             
-            response = requests.post(
-                f"{self.fastapi_url}/add_watermark",
-                json=payload,
-                timeout=self.timeout
-            )
-            
-            response.raise_for_status()
-            result = response.json()
+            with stage('inference'):
+                response = self.client.post(
+                    '/add_watermark',
+                    json=payload,
+                    read_timeout=self.timeout
+                )
+                
+                response.raise_for_status()
+                result = response.json()
+            self.health.record_success()
             
             return {
                 'request_version': result.get('request_version', request_version),
@@ -88,7 +97,8 @@ class ProtectionService:
             }
         
         except requests.exceptions.RequestException as e:
-            SystemLog.objects.create(
+            self.health.record_failure(e)
+            write_system_log(
                 log_level='error',
                 log_category='protection',
                 message=f'{request_version} 보호 실패: {str(e)}',
@@ -110,12 +120,5 @@ class ProtectionService:
         }
     
     def check_health(self):
-        """FastAPI 서버 상태 확인"""
-        try:
-            response = requests.get(
-                f"{self.fastapi_url}/health",
-                timeout=2
-            )
-            return response.status_code == 200
-        except:
-            return False
\ No newline at end of file
+        """FastAPI 서버 상태 확인 (/health 직접 호출, 결과는 캐시에 반영)"""
+        return self.health.probe()
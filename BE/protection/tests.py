@@ -1,3 +1,221 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# Create your tests here.
+from unittest import mock
+
+from django.apps import apps
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+from rest_framework.test import APITransactionTestCase
+
+from users.models import User
+from . import batch, jobs
+from .jobs import ProtectionJobWorker
+from .models import ProtectionJob
+
+
+WATERMARK_DELAY = 0.3
+
+
+class StubWatermarkServerHandler(BaseHTTPRequestHandler):
+    """워터마크 AI 서버 스텁 (/health, /add_watermark), 검은색 이미지는 실패"""
+
+    def do_GET(self):
+        self._send_json(200, {'status': 'ok'})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length))
+        time.sleep(WATERMARK_DELAY)
+
+        file_path = payload['InputUrl'].split('/media/', 1)[1]
+        with Image.open(os.path.join(self.server.media_root, file_path)) as image:
+            is_bad = image.getpixel((0, 0)) == (0, 0, 0)
+
+        if is_bad:
+            self._send_json(500, {'detail': 'error'})
+            return
+
+        self._send_json(200, {
+            'request_version': 'Watermark',
+            'ResultUrl': f"https://results.example.com/{payload['InputUrl'].rsplit('/', 1)[-1]}"
+        })
+
+    def _send_json(self, status_code, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_image(name, color='red'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 32), color=color).save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class ProtectionJobWorkerTest(APITransactionTestCase):
+    """보호 요청은 바로 202를 반환하고, 워커가 파일별로 동시에 처리하며 진행률을 갱신하는지 확인"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubWatermarkServerHandler)
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.server.media_root = self.media_root
+
+        host, port = self.server.server_address
+        settings_override = override_settings(
+            FASTAPI_WATERMARK_URL=f'http://{host}:{port}',
+            MEDIA_ROOT=self.media_root,
+            USE_S3_FOR_PROTECTION=False,
+            PROTECTION_EMBEDDED_WORKER=False,
+            SYSTEM_LOG_ASYNC=False
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(email='protect@test.com', password='testpass123!', nickname='tester')
+        self.client.force_authenticate(self.user)
+
+    def run_worker(self):
+        worker = ProtectionJobWorker(concurrency=1)
+        self.assertEqual(worker.poll_once(), 1)
+        worker.stop(wait=True)
+
+    def test_images_are_protected_in_background_with_progress(self):
+        names = ['a.png', 'b.png', 'bad.png', 'c.png', 'd.png']
+        # 같은 내용이면 업로드가 중복 제거되므로 파일마다 색을 다르게
+        colors = ['red', 'green', 'black', 'blue', 'yellow']
+        files = [make_image(name, color) for name, color in zip(names, colors)]
+
+        start = time.monotonic()
+        response = self.client.post(
+            '/api/protection/images/',
+            {'files': files, 'job_type': 'watermark'},
+            format='multipart'
+        )
+        # 워터마크 호출을 기다리지 않고 바로 반환
+        self.assertLess(time.monotonic() - start, WATERMARK_DELAY)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['job_status'], 'pending')
+
+        progress = []
+        save_progress = jobs._save_progress
+
+        def record_progress(job, results, total):
+            save_progress(job, results, total)
+            progress.append(float(job.progress_percentage))
+
+        with mock.patch.object(jobs, '_save_progress', side_effect=record_progress):
+            self.run_worker()
+
+        self.assertEqual(progress, [20.0, 40.0, 60.0, 80.0, 100.0])
+
+        response = self.client.get(response.data['status_url'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['job_status'], 'completed')
+        self.assertEqual(float(response.data['progress_percentage']), 100.0)
+        # 순차 처리였다면 5 x WATERMARK_DELAY 이상
+        self.assertGreaterEqual(response.data['processing_duration'], WATERMARK_DELAY)
+        self.assertLess(response.data['processing_duration'], WATERMARK_DELAY * 3)
+
+        protected = response.data['protected_files']
+        self.assertEqual([entry['file_name'] for entry in protected], names)
+        self.assertEqual(
+            [entry['status'] for entry in protected],
+            ['completed', 'completed', 'failed', 'completed', 'completed']
+        )
+        self.assertTrue(protected[2]['error'])
+        self.assertIn('1/5', response.data['error_message'])
+        self.assertEqual(
+            [entry['file_id'] for entry in response.data['original_files']],
+            [entry['file_id'] for entry in protected]
+        )
+
+        # 요청(업로드)과 워커(보호 처리) 단계별 시간이 나눠 기록됨 (파일별 시간은 합산)
+        stage_timings = ProtectionJob.objects.get().stage_timings
+        self.assertTrue({'validate', 'store', 'persist', 'total'} <= stage_timings['request'].keys())
+        self.assertTrue({'health', 'inference', 'persist', 'total'} <= stage_timings['worker'].keys())
+        self.assertGreaterEqual(stage_timings['worker']['inference'], 4 * WATERMARK_DELAY * 1000)
+
+    def test_uploads_do_not_wait_for_busy_watermark_pool(self):
+        # 워커의 워터마크 호출이 보호 풀을 모두 잡고 있어도 업로드 요청은 바로 처리
+        protect_executor = batch.get_protect_executor()
+        release = threading.Event()
+        blockers = [protect_executor.submit(release.wait, 5) for _ in range(protect_executor._max_workers)]
+        self.addCleanup(lambda: [blocker.result() for blocker in blockers])
+        self.addCleanup(release.set)
+
+        start = time.monotonic()
+        response = self.client.post(
+            '/api/protection/images/',
+            {'files': [make_image('a.png'), make_image('b.png', 'green')], 'job_type': 'watermark'},
+            format='multipart'
+        )
+
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['file_count'], 2)
+        job = ProtectionJob.objects.get(job_id=response.data['job_id'])
+        self.assertTrue(all(entry.get('file_id') for entry in job.original_files))
+
+    def test_embedded_worker_resumes_pending_jobs_at_startup(self):
+        # 재시작 전에 등록만 되고 처리되지 않은 작업
+        response = self.client.post(
+            '/api/protection/images/',
+            {'files': [make_image('a.png')], 'job_type': 'watermark'},
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, 202)
+        job_id = response.data['job_id']
+
+        patcher = mock.patch.object(jobs, '_worker', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: jobs._worker and jobs._worker.stop(wait=True))
+
+        # 웹 서버 프로세스가 새로 뜨면 새 요청 없이 남은 작업을 처리
+        with override_settings(PROTECTION_EMBEDDED_WORKER=True), \
+                mock.patch('detection.jobs.sys.argv', ['/venv/bin/gunicorn', 'config.wsgi:application']):
+            apps.get_app_config('protection').ready()
+
+        deadline = time.monotonic() + 10
+        job = ProtectionJob.objects.get(job_id=job_id)
+        while job.job_status in ('pending', 'processing') and time.monotonic() < deadline:
+            time.sleep(0.05)
+            job.refresh_from_db()
+
+        self.assertIsNotNone(jobs._worker)
+        self.assertEqual(job.job_status, 'completed')
+        self.assertEqual(job.protected_files[0]['status'], 'completed')
+
+    def test_embedded_worker_does_not_start_outside_web_server(self):
+        with mock.patch.object(jobs, 'get_worker') as get_worker, \
+                mock.patch('detection.jobs.sys.argv', ['manage.py', 'migrate']), \
+                override_settings(PROTECTION_EMBEDDED_WORKER=True):
+            jobs.start_embedded_worker()
+        get_worker.assert_not_called()
@@ -1,8 +1,7 @@
 from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.conf import settings
-import os
+from django.urls import reverse
 
 from .models import ProtectionJob
 from .serializers import (
@@ -11,13 +10,52 @@ from .serializers import (
     ImageProtectionRequestSerializer,
     VideoProtectionRequestSerializer
 )
-from .services import ProtectionService
+from .batch import upload_files
+from .jobs import create_protection_job
 from media_files.services import FileService
+from media_files.timing import collect_timings, stage
+from config.pagination import KeysetPagination
+
+
+def _submit_protection_job(request, uploaded_files, file_type, job_type, watermark_text):
+    """파일 업로드 → 보호 작업 등록 후 202 응답 (워터마크 처리는 워커가 실행)"""
+    
+    # ✅ 파일별로 동시에 업로드
+    original_files = upload_files(
+        user=request.user,
+        uploaded_files=uploaded_files,
+        file_type=file_type,
+        build_absolute_uri=request.build_absolute_uri
+    )
+    
+    uploaded = [entry for entry in original_files if entry.get('file_id')]
+    if not uploaded:
+        return Response(
+            {'error': original_files[0].get('error', '파일 업로드에 실패했습니다.')},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    job = create_protection_job(
+        user=request.user,
+        job_type=job_type,
+        watermark_text=watermark_text,
+        original_files=original_files
+    )
+    
+    return Response({
+        'job_id': job.job_id,
+        'job_status': job.job_status,
+        'file_count': len(original_files),
+        'status_url': request.build_absolute_uri(
+            reverse('protection:job_detail', args=[job.job_id])
+        )
+    }, status=status.HTTP_202_ACCEPTED)
 
 
 class ImageProtectionView(APIView):
-    """이미지 보호 API - S3 URL만 반환"""
+    """이미지 보호 API - 작업 등록 후 바로 반환 (진행 상황은 작업 상세 API로 조회)"""
     
+    @collect_timings('protection.image')
     def post(self, request):
         serializer = ImageProtectionRequestSerializer(data=request.data)
         
@@ -29,104 +67,22 @@ class ImageProtectionView(APIView):
         # ✅ 워터마크 텍스트 받기
         watermark_text = serializer.validated_data.get('watermark_text', 'IMREAL')
         
-        file_service = FileService(request.user)
-        media_files = []
-        
         try:
-            for file in uploaded_files:
-                media_file = file_service.upload_file(
-                    uploaded_file=file,
-                    file_type='image',
-                    purpose='protection',
-                    is_temporary=False,
-                    use_s3=settings.USE_S3_FOR_PROTECTION
-                )
-                media_files.append(media_file)
-            
-            original_files_data = [
-                {
-                    'file_id': mf.file_id,
-                    'file_name': mf.original_name,
-                    'file_size': mf.file_size,
-                    'file_path': mf.file_path,
-                    'mime_type': mf.mime_type,
-                    'storage_type': mf.storage_type
-                }
-                for mf in media_files
-            ]
-            
-            job = ProtectionJob.objects.create(
-                user=request.user,
-                job_type=job_type,
-                original_files=original_files_data,
-                job_status='pending',
-                progress_percentage=0.0
-            )
-            
-            # S3 URL 생성
-            from media_files.storage import S3Storage
-            
-            if media_files[0].storage_type == 's3':
-                s3_storage = S3Storage()
-                s3_url = s3_storage.get_presigned_url(media_files[0].s3_key)
-            else:
-                s3_url = request.build_absolute_uri(f'/media/{media_files[0].file_path}')
-            
-            # ✅ AI 서버 호출 (watermark_text 전달)
-            protection_service = ProtectionService()
-            result = protection_service.protect_image(s3_url, job_type, watermark_text)
-            
-            if not result['success']:
-                job.job_status = 'failed'
-                job.error_message = result.get('error', '알 수 없는 오류')
-                job.save()
-                return Response({'error': result['error']}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
-            # ResultUrl을 Presigned URL로 변환
-            from media_files.storage import S3Storage
-            import re
-            
-            if 'results' in result:
-                for protected_info in result['results']:
-                    if 'ResultUrl' in protected_info and protected_info['ResultUrl']:
-                        original_url = protected_info['ResultUrl']
-                        match = re.search(r'amazonaws\.com/(.+?)$', original_url)
-                        if match:
-                            s3_key = match.group(1)
-                            s3_storage = S3Storage()
-                            protected_info['ResultUrl'] = s3_storage.get_presigned_url(s3_key)
-            
-            # 결과 처리
-            if 'results' in result:
-                protected_files_data = []
-                for idx, protected_info in enumerate(result['results']):
-                    protected_files_data.append({
-                        'request_version': protected_info.get('request_version'),
-                        'ResultUrl': protected_info.get('ResultUrl'),
-                        'file_name': media_files[idx].original_name if idx < len(media_files) else 'unknown'
-                    })
-            else:
-                protected_files_data = []
-            
-            job.protected_files = protected_files_data
-            job.job_status = 'completed'
-            job.progress_percentage = 100.0
-            job.save()
-            
-            return Response({
-                'job_id': job.job_id,
-                'status': 'completed',
-                'protected_files': protected_files_data
-            }, status=status.HTTP_201_CREATED)
-        
+            # 업로드 전에 모든 파일 검증 (하나라도 잘못되면 400)
+            file_service = FileService(request.user)
+            with stage('validate'):
+                for file in uploaded_files:
+                    file_service._validate_file(file, 'image')
         except ValueError as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
-
+        
+        return _submit_protection_job(request, uploaded_files, 'image', job_type, watermark_text)
 
 
 class VideoProtectionView(APIView):
-    """영상 보호 API - S3 URL만 반환"""
+    """영상 보호 API - 작업 등록 후 바로 반환 (진행 상황은 작업 상세 API로 조회)"""
     
+    @collect_timings('protection.video')
     def post(self, request):
         serializer = VideoProtectionRequestSerializer(data=request.data)
         
@@ -138,103 +94,29 @@ class VideoProtectionView(APIView):
         # ✅ 워터마크 텍스트 받기
         watermark_text = serializer.validated_data.get('watermark_text', 'IMREAL')
         
-        file_service = FileService(request.user)
-        
         try:
-            media_file = file_service.upload_file(
-                uploaded_file=video,
-                file_type='video',
-                purpose='protection',
-                is_temporary=False,
-                use_s3=settings.USE_S3_FOR_PROTECTION
-            )
-            
-            original_files_data = [{
-                'file_id': media_file.file_id,
-                'file_name': media_file.original_name,
-                'file_size': media_file.file_size,
-                'file_path': media_file.file_path,
-                'mime_type': media_file.mime_type,
-                'storage_type': media_file.storage_type
-            }]
-            
-            job = ProtectionJob.objects.create(
-                user=request.user,
-                job_type=job_type,
-                original_files=original_files_data,
-                job_status='pending',
-                progress_percentage=0.0
-            )
-            
-            # S3 URL 생성
-            from media_files.storage import S3Storage
-            
-            if media_file.storage_type == 's3':
-                s3_storage = S3Storage()
-                s3_url = s3_storage.get_presigned_url(media_file.s3_key)
-            else:
-                s3_url = request.build_absolute_uri(f'/media/{media_file.file_path}')
-            
-            # ✅ AI 서버 호출 (watermark_text 전달)
-            protection_service = ProtectionService()
-            result = protection_service.protect_video(s3_url, job_type, watermark_text)
-            
-            if not result['success']:
-                job.job_status = 'failed'
-                job.error_message = result.get('error', '알 수 없는 오류')
-                job.save()
-                return Response({'error': result['error']}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
-            # ResultUrl을 Presigned URL로 변환
-            from media_files.storage import S3Storage
-            import re
-            
-            if 'results' in result:
-                for protected_info in result['results']:
-                    if 'ResultUrl' in protected_info and protected_info['ResultUrl']:
-                        original_url = protected_info['ResultUrl']
-                        match = re.search(r'amazonaws\.com/(.+?)$', original_url)
-                        if match:
-                            s3_key = match.group(1)
-                            s3_storage = S3Storage()
-                            protected_info['ResultUrl'] = s3_storage.get_presigned_url(s3_key)
-            
-            # 결과 처리
-            if 'results' in result:
-                job.protected_files = result['results']
-                protected_url = result['results'][0].get('ResultUrl') if result['results'] else None
-                protected_filename = media_file.original_name
-            else:
-                protected_url = None
-                protected_filename = media_file.original_name
-                job.protected_files = []
-
-            job.job_status = 'completed'
-            job.progress_percentage = 100.0
-            job.save()
-            
-            return Response({
-                'job_id': job.job_id,
-                'status': 'completed',
-                'protected_url': protected_url,
-                'file_name': protected_filename
-            }, status=status.HTTP_201_CREATED)
-        
+            with stage('validate'):
+                FileService(request.user)._validate_file(video, 'video')
         except ValueError as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return _submit_protection_job(request, [video], 'video', job_type, watermark_text)
 
 
 class ProtectionJobListView(generics.ListAPIView):
     """보호 작업 목록 조회 API"""
     
     serializer_class = ProtectionJobListSerializer
+    # ✅ ?pagination=cursor 면 키셋 커서 페이지네이션 (기본은 페이지 번호)
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-created_at', '-job_id')
     
     def get_queryset(self):
         return ProtectionJob.objects.filter(user=self.request.user)
 
 
 class ProtectionJobDetailView(generics.RetrieveAPIView):
-    """보호 작업 상세 조회 API"""
+    """보호 작업 상세 조회 API (진행률 / 파일별 결과 폴링)"""
     
     serializer_class = ProtectionJobSerializer
     
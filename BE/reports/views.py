@@ -12,6 +12,7 @@ from .serializers import (
 )
 from detection.models import AnalysisRecord
 from media_files.services import FileService
+from config.pagination import KeysetPagination
 
 
 class ReportSubmitView(APIView):
@@ -112,6 +113,9 @@ class ReportListView(generics.ListAPIView):
     """신고 목록 조회 API"""
     
     serializer_class = ReportListSerializer
+    # ✅ ?pagination=cursor 면 키셋 커서 페이지네이션 (기본은 페이지 번호)
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-submitted_at', '-report_id')
     
     def get_queryset(self):
         queryset = Report.objects.filter(user=self.request.user)
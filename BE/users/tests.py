@@ -1,3 +1,58 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from .models import User
+
+
+def make_image(name='profile.png'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (600, 300), color='purple').save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+@override_settings(DEBUG=False, THUMBNAIL_LAZY_ASYNC=False, SYSTEM_LOG_ASYNC=False)
+class ProfileImageUrlTest(APITestCase):
+    """프로필 이미지/썸네일 URL 은 DEBUG 가 꺼져도 받을 수 있는 서명된 전송 URL"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(email='profile@test.com', password='testpass123!', nickname='profile')
+        token = Token.objects.create(user=self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {token.key}'}
+
+    def assert_served(self, url):
+        self.assertNotIn('/media/', url)
+        self.assertIn('?token=', url)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_uploaded_and_fetched_profile_urls_are_served(self):
+        response = self.client.post(
+            '/api/users/profile/image/?thumbnail_size=128',
+            {'image': make_image()},
+            format='multipart',
+            **self.auth
+        )
+        self.assertEqual(response.status_code, 200)
+        uploaded = self.assert_served(response.data['profile_image_url'])
+        self.assert_served(response.data['thumbnail_url'])
+
+        response = self.client.get('/api/users/profile/image/get/?thumbnail_size=128', **self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.assert_served(response.data['profile_image_url']), uploaded)
+        thumbnail = self.assert_served(response.data['thumbnail_url'])
+        with Image.open(io.BytesIO(thumbnail)) as image:
+            self.assertEqual(image.size, (128, 64))
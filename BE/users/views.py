@@ -8,6 +8,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.authentication import TokenAuthentication
 from django.conf import settings
 from django.utils import timezone
+from media_files.serving import build_content_url, build_path_content_url
+from media_files.thumbnails import delete_thumbnails_for_path, find_thumbnail_for_path
 from .models import User, UserPermission, AppSetting
 from .serializers import (
     UserRegistrationSerializer,
@@ -170,6 +172,7 @@ def upload_profile_image(request):
     try:
         # 기존 프로필 이미지 삭제
         if user.profile_image:
+            delete_thumbnails_for_path(user, user.profile_image)
             old_image_path = os.path.join(settings.MEDIA_ROOT, user.profile_image)
             if os.path.exists(old_image_path):
                 try:
@@ -192,12 +195,13 @@ def upload_profile_image(request):
         user.profile_image = media_file.file_path
         user.save()
         
-        # 이미지 URL 생성
-        profile_image_url = f"{settings.MEDIA_URL}{media_file.file_path}"
+        # 이미지 URL 생성 (/media/ 는 DEBUG 에서만 열리므로 서명된 전송 URL)
+        profile_image_url = build_content_url(request, media_file)
         
         return Response({
             'profile_image': media_file.file_path,
             'profile_image_url': profile_image_url,
+            'thumbnail_url': _profile_thumbnail_url(user, media_file.file_path, request),
             'message': '프로필 이미지가 업데이트되었습니다'
         }, status=status.HTTP_200_OK)
     
@@ -223,7 +227,8 @@ def delete_profile_image(request):
         )
     
     try:
-        # 물리적 파일 삭제
+        # 물리적 파일 삭제 (썸네일 포함)
+        delete_thumbnails_for_path(user, user.profile_image)
         image_path = os.path.join(settings.MEDIA_ROOT, user.profile_image)
         if os.path.exists(image_path):
             os.remove(image_path)
@@ -254,12 +259,22 @@ def get_profile_image(request):
     if not user.profile_image:
         return Response({
             'profile_image': None,
-            'profile_image_url': None
+            'profile_image_url': None,
+            'thumbnail_url': None
         }, status=status.HTTP_200_OK)
     
-    profile_image_url = f"{settings.MEDIA_URL}{user.profile_image}"
+    profile_image_url = build_path_content_url(request, user, user.profile_image)
     
     return Response({
         'profile_image': user.profile_image,
-        'profile_image_url': profile_image_url
-    }, status=status.HTTP_200_OK)
\ No newline at end of file
+        'profile_image_url': profile_image_url,
+        'thumbnail_url': _profile_thumbnail_url(user, user.profile_image, request)
+    }, status=status.HTTP_200_OK)
+
+
+def _profile_thumbnail_url(user, file_path, request):
+    """프로필 이미지 썸네일 URL (?thumbnail_size=128|256|512, 없으면 None)"""
+    thumbnail = find_thumbnail_for_path(user, file_path, request.query_params.get('thumbnail_size'))
+    if thumbnail is None:
+        return None
+    return build_content_url(request, thumbnail)
\ No newline at end of file
@@ -40,9 +40,10 @@ class ZoomCaptureAdmin(admin.ModelAdmin):
         'session',
         'participant_count',
         'alert_triggered',
+        'is_deduplicated',
         'capture_timestamp'
     ]
-    list_filter = ['alert_triggered', 'capture_timestamp']
+    list_filter = ['alert_triggered', 'is_deduplicated', 'capture_timestamp']
     search_fields = ['session__session_name']
     readonly_fields = ['capture_id', 'capture_timestamp']
     ordering = ['-capture_timestamp']
\ No newline at end of file
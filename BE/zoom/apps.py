@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ZoomConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "zoom"
+
+    def ready(self):
+        # 프레임 전달 설정 시스템 체크 (zoom.E001)
+        from . import checks  # noqa: F401
@@ -0,0 +1,44 @@
+"""
+프레임 전달 설정 시스템 체크
+
+메모리 전달 모드는 프레임을 캐시에 올리고 AI 서버가 별도 HTTP 요청(ZoomFrameBlobView)으로 가져간다.
+그 요청은 프레임을 올린 워커가 아닌 다른 프로세스로 갈 수 있고,
+sync 워커 1개면 분석 요청이 끝날 때까지 처리되지 못한다.
+따라서 캐시는 프로세스 밖에 있는 공유 캐시(Redis, Memcached, DB, 파일)여야 한다.
+"""
+from django.conf import settings
+from django.core.checks import Error, register
+
+from .frames import is_process_local_cache
+
+
+@register()
+def check_frame_transport(app_configs, **kwargs):
+    errors = []
+
+    if settings.ZOOM_FRAME_TRANSPORT == 'memory' and is_process_local_cache(settings.ZOOM_FRAME_CACHE_ALIAS):
+        errors.append(Error(
+            "ZOOM_FRAME_TRANSPORT='memory' 는 워커 프로세스 공용 캐시가 필요합니다.",
+            hint=(
+                f"CACHES['{settings.ZOOM_FRAME_CACHE_ALIAS}'] 를 Redis/Memcached 로 설정하거나 (REDIS_URL) "
+                "ZOOM_FRAME_TRANSPORT='file' 을 사용하세요."
+            ),
+            id='zoom.E001',
+        ))
+
+    # 영상 샘플링 프레임도 같은 보관소를 쓴다
+    if (
+        settings.VIDEO_SAMPLING_ENABLED
+        and settings.VIDEO_SAMPLING_FRAME_TRANSPORT == 'memory'
+        and is_process_local_cache(settings.ZOOM_FRAME_CACHE_ALIAS)
+    ):
+        errors.append(Error(
+            "VIDEO_SAMPLING_FRAME_TRANSPORT='memory' 는 워커 프로세스 공용 캐시가 필요합니다.",
+            hint=(
+                f"CACHES['{settings.ZOOM_FRAME_CACHE_ALIAS}'] 를 Redis/Memcached 로 설정하거나 (REDIS_URL) "
+                "VIDEO_SAMPLING_FRAME_TRANSPORT='file' 을 사용하세요."
+            ),
+            id='zoom.E002',
+        ))
+
+    return errors
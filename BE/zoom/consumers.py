@@ -0,0 +1,310 @@
+"""
+실시간 Zoom 캡처 채널 (WebSocket, 순수 ASGI)
+
+프레임마다 multipart POST + 토큰 인증 + Serializer 검증을 거치는 대신,
+세션당 WebSocket 하나로 프레임을 계속 받고 경고는 서버가 바로 밀어준다.
+
+연결: ws(s)://<host>/ws/zoom/sessions/<session_id>/?token=<API 토큰>
+      (또는 Authorization: Token <API 토큰> 헤더)
+
+클라이언트 → 서버
+- 바이너리 메시지: 캡처 이미지 (JPEG / PNG / WEBP)
+- 텍스트 메시지(JSON)
+    {"type": "participants", "participant_count": 3}
+    {"type": "ping"}
+
+서버 → 클라이언트 (JSON)
+- {"type": "ready", "session_id": 1, "max_in_flight": 2}
+- {"type": "capture" | "alert", "capture_id": ..., "is_deepfake": ..., ...}
+- {"type": "error", "error": "..."}
+- {"type": "pong"}
+
+처리 중인 프레임이 ZOOM_WS_MAX_IN_FLIGHT 개면 새 프레임은 대기열 1칸에 보관하고,
+그 사이 더 새 프레임이 오면 이전 대기 프레임은 버린다 (항상 최신 화면 분석).
+"""
+import asyncio
+import io
+import json
+import logging
+from urllib.parse import parse_qs
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image, UnidentifiedImageError
+from rest_framework.authtoken.models import Token
+
+from config.async_api import database_sync_to_async
+from media_files.timing import collect_timings
+from .models import ZoomSession
+from .services import ZoomCaptureService
+
+logger = logging.getLogger(__name__)
+
+
+# WebSocket 종료 코드
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_SESSION_NOT_FOUND = 4404
+
+FRAME_EXTENSIONS = {
+    'JPEG': ('jpg', 'image/jpeg'),
+    'PNG': ('png', 'image/png'),
+    'WEBP': ('webp', 'image/webp'),
+}
+
+
+def frame_to_upload(frame, sequence):
+    """
+    바이너리 프레임 → UploadedFile (이미지 형식 확인)
+
+    Raises:
+        ValueError: 크기 초과 또는 지원하지 않는 이미지
+    """
+    if len(frame) > settings.IMAGE_MAX_SIZE:
+        max_size_mb = settings.IMAGE_MAX_SIZE / (1024 * 1024)
+        raise ValueError(f"파일 크기는 {max_size_mb}MB 이하여야 합니다.")
+
+    try:
+        with Image.open(io.BytesIO(frame)) as image:
+            image_format = image.format
+            image.verify()
+    except (UnidentifiedImageError, OSError, SyntaxError):
+        raise ValueError("이미지 파일이 아닙니다.")
+
+    if image_format not in FRAME_EXTENSIONS:
+        raise ValueError(f"지원하지 않는 이미지 형식입니다: {image_format}")
+
+    extension, content_type = FRAME_EXTENSIONS[image_format]
+    return SimpleUploadedFile(f'capture_{sequence}.{extension}', frame, content_type=content_type)
+
+
+class ZoomCaptureConsumer:
+    """세션 1개에 대한 WebSocket 연결"""
+
+    def __init__(self, scope, receive, send, session_id):
+        self.scope = scope
+        self.receive = receive
+        self.send = send
+        self.session_id = int(session_id)
+
+        self.user = None
+        self.capture_service = None
+        self.participant_count = 1
+        self.max_in_flight = settings.ZOOM_WS_MAX_IN_FLIGHT
+
+        self.in_flight = set()
+        self.pending_frame = None
+        self.sequence = 0
+        self.dropped_frames = 0
+        self.closed = False
+
+    async def __call__(self):
+        while True:
+            message = await self.receive()
+            message_type = message['type']
+
+            if message_type == 'websocket.connect':
+                if not await self.connect():
+                    return
+
+            elif message_type == 'websocket.receive':
+                if message.get('bytes') is not None:
+                    self.submit_frame(message['bytes'])
+                elif message.get('text') is not None:
+                    await self.handle_text(message['text'])
+
+            elif message_type == 'websocket.disconnect':
+                await self.disconnect()
+                return
+
+    # ---------------------------------------------------------------
+    # 연결 / 종료
+    # ---------------------------------------------------------------
+
+    async def connect(self):
+        """토큰 인증 + 진행 중인 세션 확인 후 accept"""
+        self.user = await database_sync_to_async(self.authenticate)()
+        if self.user is None:
+            await self.close(CLOSE_UNAUTHORIZED)
+            return False
+
+        self.capture_service = ZoomCaptureService(self.user)
+        try:
+            await database_sync_to_async(self.capture_service.get_active_session)(self.session_id)
+        except ZoomSession.DoesNotExist:
+            await self.close(CLOSE_SESSION_NOT_FOUND)
+            return False
+
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        self.participant_count = self._parse_participant_count(
+            query.get('participants', [1])[0]
+        ) or 1
+
+        await self.send({'type': 'websocket.accept'})
+        await self.send_json({
+            'type': 'ready',
+            'session_id': self.session_id,
+            'max_in_flight': self.max_in_flight
+        })
+        return True
+
+    def authenticate(self):
+        """쿼리 문자열 token 또는 Authorization: Token 헤더 (DRF 토큰)"""
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        key = query.get('token', [None])[0]
+
+        if key is None:
+            headers = dict(self.scope.get('headers', []))
+            authorization = headers.get(b'authorization', b'').decode()
+            if authorization.startswith('Token '):
+                key = authorization[len('Token '):].strip()
+
+        if not key:
+            return None
+
+        try:
+            token = Token.objects.select_related('user').get(key=key)
+        except Token.DoesNotExist:
+            return None
+
+        return token.user if token.user.is_active else None
+
+    async def disconnect(self):
+        """대기 프레임은 버리고 처리 중인 프레임은 기록까지 마무리"""
+        self.closed = True
+        self.pending_frame = None
+        if self.in_flight:
+            await asyncio.gather(*self.in_flight, return_exceptions=True)
+
+    async def close(self, code=1000):
+        self.closed = True
+        await self.send({'type': 'websocket.close', 'code': code})
+
+    # ---------------------------------------------------------------
+    # 메시지 처리
+    # ---------------------------------------------------------------
+
+    async def handle_text(self, text):
+        try:
+            message = json.loads(text)
+        except ValueError:
+            await self.send_json({'type': 'error', 'error': 'JSON 형식이 아닙니다.'})
+            return
+
+        message_type = message.get('type')
+
+        if message_type == 'ping':
+            await self.send_json({'type': 'pong'})
+
+        elif message_type == 'participants':
+            participant_count = self._parse_participant_count(message.get('participant_count'))
+            if participant_count is None:
+                await self.send_json({'type': 'error', 'error': '참가자 수는 1 이상이어야 합니다.'})
+                return
+            self.participant_count = participant_count
+
+        else:
+            await self.send_json({'type': 'error', 'error': f'알 수 없는 메시지: {message_type}'})
+
+    def submit_frame(self, frame):
+        """처리 슬롯이 있으면 바로 분석, 없으면 최신 프레임 1개만 대기"""
+        if len(self.in_flight) < self.max_in_flight:
+            self._start(frame)
+            return
+
+        if self.pending_frame is not None:
+            self.dropped_frames += 1
+        self.pending_frame = frame
+
+    def _start(self, frame):
+        self.sequence += 1
+        task = asyncio.ensure_future(self.process_frame(frame, self.sequence))
+        self.in_flight.add(task)
+        task.add_done_callback(self._on_frame_done)
+
+    def _on_frame_done(self, task):
+        self.in_flight.discard(task)
+        # process_frame 밖으로 나온 예외 (전송 실패 등)는 여기서만 드러남
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                f"Zoom 실시간 프레임 작업 실패: session={self.session_id}",
+                exc_info=task.exception()
+            )
+        if self.pending_frame is not None and not self.closed:
+            frame, self.pending_frame = self.pending_frame, None
+            self._start(frame)
+
+    @collect_timings('zoom.realtime_frame')
+    async def process_frame(self, frame, sequence):
+        """프레임 1장 분석 후 결과(경고)를 클라이언트로 전송"""
+        participant_count = self.participant_count
+
+        try:
+            screenshot, session = await database_sync_to_async(self._load_frame)(frame, sequence)
+            # AI 분석은 이벤트 루프에서 대기 (프레임마다 스레드를 잡지 않음)
+            outcome = await self.capture_service.aprocess_frame(
+                session,
+                screenshot,
+                participant_count,
+                base_url=self._base_url()
+            )
+        except ZoomSession.DoesNotExist:
+            await self.send_json({'type': 'error', 'error': '활성화된 세션을 찾을 수 없습니다.'})
+            if not self.closed:
+                await self.close(CLOSE_SESSION_NOT_FOUND)
+            return
+        except ValueError as e:
+            await self.send_json({'type': 'error', 'sequence': sequence, 'error': str(e)})
+            return
+        except Exception:
+            logger.exception(f"Zoom 실시간 캡처 처리 실패: session={self.session_id}")
+            await self.send_json({
+                'type': 'error',
+                'sequence': sequence,
+                'error': '캡처 분석 중 오류가 발생했습니다.'
+            })
+            return
+
+        if not outcome['success']:
+            await self.send_json({'type': 'error', 'sequence': sequence, 'error': outcome['error']})
+            return
+
+        result = outcome['result']
+        await self.send_json({
+            'type': 'alert' if result['alert_triggered'] else 'capture',
+            'sequence': sequence,
+            'dropped_frames': self.dropped_frames,
+            **result
+        })
+
+    def _load_frame(self, frame, sequence):
+        screenshot = frame_to_upload(frame, sequence)
+        # 세션 상태(종료 여부, 중복 판정 기준)는 프레임마다 새로 읽음
+        session = self.capture_service.get_active_session(self.session_id)
+        return screenshot, session
+
+    def _base_url(self):
+        """연결한 Host 기준 HTTP 주소 (메모리 전달 모드의 프레임 URL용)"""
+        headers = dict(self.scope.get('headers', []))
+        host = headers.get(b'host', b'').decode()
+        if not host and self.scope.get('server'):
+            host = '%s:%s' % tuple(self.scope['server'])
+        if not host:
+            return None
+        scheme = 'https' if self.scope.get('scheme') == 'wss' else 'http'
+        return f'{scheme}://{host}'
+
+    async def send_json(self, payload):
+        if self.closed:
+            return
+        await self.send({
+            'type': 'websocket.send',
+            'text': json.dumps(payload, ensure_ascii=False)
+        })
+
+    @staticmethod
+    def _parse_participant_count(value):
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            return None
+        return value if value >= 1 else None
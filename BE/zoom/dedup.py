@@ -0,0 +1,66 @@
+"""
+Zoom 캡처 프레임 중복 판정 (dHash)
+
+정적인 회의 화면은 연속 캡처가 거의 같으므로, 마지막으로 분석한 프레임과
+지각 해시(difference hash)의 해밍 거리가 ZOOM_DEDUP_HAMMING_THRESHOLD 이하이면
+AI 분석 없이 이전 판정을 재사용한다.
+"""
+from django.conf import settings
+from PIL import Image
+
+
+HASH_SIZE = 8  # 8x8 = 64비트
+
+
+def compute_dhash(image_file, hash_size=HASH_SIZE):
+    """
+    이미지 dHash (16자리 16진수 문자열)
+
+    그레이스케일로 (hash_size + 1) x hash_size 로 줄인 뒤
+    가로로 인접한 픽셀의 밝기 증감을 비트로 만든다.
+
+    Args:
+        image_file: 파일 객체 (읽은 뒤 포인터는 처음으로 되돌림)
+    """
+    image_file.seek(0)
+    with Image.open(image_file) as image:
+        # JPEG 은 축소 디코딩으로 전체 해상도 디코딩 비용을 줄임
+        image.draft('L', (hash_size * 8, hash_size * 8))
+        pixels = list(
+            image.convert('L')
+            .resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+            .getdata()
+        )
+    image_file.seek(0)
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+
+    return f'{value:0{hash_size * hash_size // 4}x}'
+
+
+def hamming_distance(hash_a, hash_b):
+    """두 해시의 다른 비트 수"""
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count('1')
+
+
+def can_reuse_previous_verdict(session, frame_hash):
+    """
+    이 프레임을 세션의 마지막 분석 결과로 대신할 수 있는지
+
+    - 마지막으로 분석한 프레임과의 해밍 거리가 임계값 이하
+    - 연속 재사용 횟수가 ZOOM_DEDUP_MAX_REUSE 미만 (주기적으로 실제 분석)
+    """
+    if not settings.ZOOM_DEDUP_ENABLED:
+        return False
+
+    if not session.last_frame_hash or session.last_analyzed_record_id is None:
+        return False
+
+    if session.dedup_streak >= settings.ZOOM_DEDUP_MAX_REUSE:
+        return False
+
+    return hamming_distance(session.last_frame_hash, frame_hash) <= settings.ZOOM_DEDUP_HAMMING_THRESHOLD
@@ -0,0 +1,56 @@
+"""
+Zoom 캡처 프레임 임시 보관소 (메모리 전달 모드)
+
+프레임을 MEDIA_ROOT 에 쓰고 지우는 대신 Django 캐시에 잠깐 올려 두고,
+AI 서버는 추측할 수 없는 토큰 URL(ZoomFrameBlobView)로 가져간다.
+분석이 끝나면 바로 지우고, 남아 있더라도 ZOOM_FRAME_BLOB_TTL 뒤 만료된다.
+
+AI 서버의 요청은 프레임을 올린 워커가 아닌 다른 프로세스로 갈 수 있으므로
+ZOOM_FRAME_CACHE_ALIAS 는 공유 캐시(Redis, Memcached 등)여야 한다 (checks.py, zoom.E001).
+"""
+import secrets
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+# 프로세스 안에만 있는 캐시 (다른 워커 프로세스에서 보이지 않음)
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_process_local_cache(alias):
+    """캐시 alias 가 프로세스별 캐시인지 (CACHES 미설정 시 기본값은 LocMemCache)"""
+    backend = settings.CACHES.get(alias, {}).get('BACKEND', PROCESS_LOCAL_CACHE_BACKENDS[0])
+    return backend in PROCESS_LOCAL_CACHE_BACKENDS
+
+
+class FrameBlobStore:
+    """토큰 → (프레임 바이트, MIME 타입)"""
+
+    KEY_PREFIX = 'zoom_frame'
+
+    @property
+    def cache(self):
+        return caches[settings.ZOOM_FRAME_CACHE_ALIAS]
+
+    def _key(self, token):
+        return f'{self.KEY_PREFIX}:{token}'
+
+    def put(self, frame, content_type):
+        """프레임 보관 후 토큰 반환"""
+        token = secrets.token_urlsafe(32)
+        self.cache.set(self._key(token), (frame, content_type), settings.ZOOM_FRAME_BLOB_TTL)
+        return token
+
+    def get(self, token):
+        """(frame, content_type), 없거나 만료되면 None"""
+        return self.cache.get(self._key(token))
+
+    def delete(self, token):
+        self.cache.delete(self._key(token))
+
+
+frame_blob_store = FrameBlobStore()
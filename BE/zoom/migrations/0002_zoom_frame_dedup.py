@@ -0,0 +1,47 @@
+# Generated by Django 5.1 on 2026-10-18 15:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("detection", "0004_analysisrecord_job_status"),
+        ("zoom", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="zoomcapture",
+            name="is_deduplicated",
+            field=models.BooleanField(default=False, verbose_name="중복 프레임 여부"),
+        ),
+        migrations.AddField(
+            model_name="zoomsession",
+            name="dedup_streak",
+            field=models.IntegerField(default=0, verbose_name="연속 중복 캡처 수"),
+        ),
+        migrations.AddField(
+            model_name="zoomsession",
+            name="last_analyzed_record",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="detection.analysisrecord",
+                verbose_name="마지막 분석 기록",
+            ),
+        ),
+        migrations.AddField(
+            model_name="zoomsession",
+            name="last_frame_hash",
+            field=models.CharField(
+                blank=True,
+                max_length=16,
+                null=True,
+                verbose_name="마지막 분석 프레임 해시",
+            ),
+        ),
+    ]
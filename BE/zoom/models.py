@@ -30,6 +30,23 @@ class ZoomSession(models.Model):
         verbose_name='세션 상태'
     )
     
+    # 프레임 중복 판정 (마지막으로 실제 분석한 프레임 기준)
+    last_frame_hash = models.CharField(
+        max_length=16,
+        null=True,
+        blank=True,
+        verbose_name='마지막 분석 프레임 해시'
+    )
+    last_analyzed_record = models.ForeignKey(
+        'detection.AnalysisRecord',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='마지막 분석 기록'
+    )
+    dedup_streak = models.IntegerField(default=0, verbose_name='연속 중복 캡처 수')
+    
     class Meta:
         db_table = 'zoom_sessions'
         verbose_name = 'Zoom 세션'
@@ -70,6 +87,10 @@ class ZoomCapture(models.Model):
     participant_count = models.IntegerField(verbose_name='참가자 수')
     capture_timestamp = models.DateTimeField(auto_now_add=True, verbose_name='캡처 시간')
     alert_triggered = models.BooleanField(default=False, verbose_name='경고 발생 여부')
+    is_deduplicated = models.BooleanField(
+        default=False,
+        verbose_name='중복 프레임 여부'
+    )
     
     class Meta:
         db_table = 'zoom_captures'
@@ -0,0 +1,10 @@
+"""Zoom WebSocket 라우팅 (config/asgi.py 에서 사용)"""
+import re
+
+from .consumers import ZoomCaptureConsumer
+
+
+websocket_urlpatterns = [
+    # 실시간 캡처 채널
+    (re.compile(r'^/ws/zoom/sessions/(?P<session_id>\d+)/$'), ZoomCaptureConsumer),
+]
@@ -70,6 +70,7 @@ class ZoomCaptureSerializer(serializers.ModelSerializer):
             'participant_count',
             'capture_timestamp',
             'alert_triggered',
+            'is_deduplicated',
             'analysis_result',
             'confidence_score',
         ]
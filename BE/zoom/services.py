@@ -0,0 +1,359 @@
+"""
+Zoom 캡처 프레임 처리
+
+HTTP 캡처 API(ZoomCaptureView)와 실시간 WebSocket 채널(ZoomCaptureConsumer)이
+같은 처리 흐름을 쓴다.
+중복 프레임 판정 → (필요 시) AI 분석 1회 → ZoomCapture 기록 → 세션 통계 갱신
+
+프레임 전달 방식 (ZOOM_FRAME_TRANSPORT)
+- memory: 프레임은 메모리에만 두고 단기 보관소(frames.py) URL로 AI 서버에 전달.
+          AnalysisRecord / ZoomCapture 만 저장하고, 경고가 난 프레임만 파일로 보관
+- file: MEDIA_ROOT 임시 저장 → 로컬 경로 전달 → 삭제 (기존 방식)
+
+aprocess_frame 은 async 뷰/WebSocket 채널용으로, AI 분석만 await 하고
+중복 판정/검증/기록 저장은 스레드 풀에서 실행한다.
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.db.models import F
+from django.urls import reverse
+
+from config.async_api import database_sync_to_async
+from detection.pipeline import (
+    upload_for_detection,
+    analyze_media_file,
+    aanalyze_media_file,
+    infer_with_cache,
+    ainfer_with_cache,
+    save_analysis_record,
+    link_media_file,
+    store_stage_timings
+)
+from media_files.preprocessing import normalize_image, should_normalize
+from media_files.services import FileService
+from media_files.timing import stage
+from .dedup import compute_dhash, can_reuse_previous_verdict
+from .frames import frame_blob_store
+from .models import ZoomSession, ZoomCapture
+
+
+class ZoomCaptureService:
+    """Zoom 세션 캡처 분석 서비스"""
+
+    def __init__(self, user):
+        self.user = user
+
+    def get_active_session(self, session_id):
+        """
+        진행 중인 세션 조회
+
+        Raises:
+            ZoomSession.DoesNotExist
+        """
+        return ZoomSession.objects.get(
+            session_id=session_id,
+            user=self.user,
+            session_status='active'
+        )
+
+    def process_frame(self, session, screenshot, participant_count, base_url=None):
+        """
+        캡처 프레임 1장 분석 후 기록
+
+        Args:
+            session: 진행 중인 ZoomSession
+            screenshot: 이미지 파일 객체 (UploadedFile)
+            participant_count: 참가자 수
+            base_url: AI 서버가 프레임을 가져갈 백엔드 주소 (메모리 모드, ZOOM_FRAME_BASE_URL 우선)
+
+        Returns:
+            dict: {
+                'success': bool,
+                'capture': ZoomCapture,
+                'result': 응답 본문 (capture_id, is_deepfake, ...),
+                'error': str (실패 시)
+            }
+
+        Raises:
+            ValueError: 파일 검증/업로드 실패
+        """
+        # ✅ 직전에 분석한 프레임과 거의 같으면 AI 분석 없이 이전 판정 재사용
+        frame_hash, reused = self._reuse_previous_verdict(session, screenshot, participant_count)
+        if reused is not None:
+            return reused
+
+        if settings.ZOOM_FRAME_TRANSPORT == 'memory':
+            outcome = self._analyze_in_memory(session, screenshot, base_url)
+        else:
+            outcome = self._analyze_from_disk(session, screenshot)
+
+        if not outcome['success']:
+            return outcome
+
+        return self._record_capture(
+            session,
+            outcome['record'],
+            participant_count,
+            is_deduplicated=False,
+            frame_hash=frame_hash
+        )
+
+    async def aprocess_frame(self, session, screenshot, participant_count, base_url=None):
+        """process_frame 의 async 버전 (결과/예외 동일)"""
+        frame_hash, reused = await database_sync_to_async(self._reuse_previous_verdict)(
+            session, screenshot, participant_count
+        )
+        if reused is not None:
+            return reused
+
+        if settings.ZOOM_FRAME_TRANSPORT == 'memory':
+            outcome = await self._aanalyze_in_memory(session, screenshot, base_url)
+        else:
+            outcome = await self._aanalyze_from_disk(session, screenshot)
+
+        if not outcome['success']:
+            return outcome
+
+        return await database_sync_to_async(self._record_capture)(
+            session,
+            outcome['record'],
+            participant_count,
+            is_deduplicated=False,
+            frame_hash=frame_hash
+        )
+
+    def _reuse_previous_verdict(self, session, screenshot, participant_count):
+        """
+        중복 프레임 판정
+
+        Returns:
+            tuple: (프레임 dHash, 이전 판정을 재사용했으면 _record_capture 결과 아니면 None)
+        """
+        with stage('dedup'):
+            try:
+                frame_hash = compute_dhash(screenshot)
+            except (OSError, ValueError):
+                frame_hash = None
+            reusable = bool(frame_hash) and can_reuse_previous_verdict(session, frame_hash)
+
+        if reusable:
+            return frame_hash, self._record_capture(
+                session,
+                session.last_analyzed_record,
+                participant_count,
+                is_deduplicated=True
+            )
+
+        return frame_hash, None
+
+    def _analyze_in_memory(self, session, screenshot, base_url):
+        """디스크/MediaFile/SystemLog 없이 분석 (경고 프레임만 보관)"""
+        frame = self._prepare_frame(screenshot)
+        get_source_url, tokens = self._frame_source(frame, base_url)
+
+        try:
+            # ✅ 같은 내용이면 결과 캐시, 아니면 AI 분석 1회
+            result = infer_with_cache(frame['content_hash'], 'zoom', get_source_url)
+        finally:
+            self._release_frame(tokens)
+
+        if not result['success']:
+            return result
+
+        return self._save_frame_result(session, frame, result)
+
+    async def _aanalyze_in_memory(self, session, screenshot, base_url):
+        """_analyze_in_memory 의 async 버전"""
+        frame = await database_sync_to_async(self._prepare_frame)(screenshot)
+        get_source_url, tokens = self._frame_source(frame, base_url)
+
+        try:
+            result = await ainfer_with_cache(frame['content_hash'], 'zoom', get_source_url)
+        finally:
+            await database_sync_to_async(self._release_frame)(tokens)
+
+        if not result['success']:
+            return result
+
+        return await database_sync_to_async(self._save_frame_result)(session, frame, result)
+
+    def _prepare_frame(self, screenshot):
+        """
+        프레임 검증 + 정규화 후 메모리로 읽기
+
+        Raises:
+            ValueError: 파일 검증 실패
+        """
+        file_service = FileService(self.user)
+        with stage('validate'):
+            file_service._validate_file(screenshot, 'screenshot')
+
+        # ✅ 업로드 경로와 같은 정규화 (축소된 프레임을 AI 서버로 전달)
+        frame_name = screenshot.name
+        if should_normalize('screenshot', 'zoom'):
+            with stage('normalize'):
+                screenshot, _ = normalize_image(screenshot)
+
+        screenshot.seek(0)
+        data = screenshot.read()
+        screenshot.seek(0)
+
+        with stage('validate'):
+            content_hash = hashlib.sha256(data).hexdigest()
+
+        return {
+            'name': frame_name,
+            'file': screenshot,
+            'data': data,
+            'content_hash': content_hash,
+            'file_format': file_service._get_file_extension(screenshot.name)
+        }
+
+    def _frame_source(self, frame, base_url):
+        """
+        캐시 미스일 때만 프레임을 단기 보관소에 올리는 입력 URL 생성 함수
+
+        Returns:
+            tuple: (get_source_url, 발급된 토큰 목록 - 분석 후 _release_frame 으로 삭제)
+        """
+        base_url = (settings.ZOOM_FRAME_BASE_URL or base_url or '').rstrip('/')
+        tokens = []
+
+        def get_source_url():
+            if not base_url:
+                return None
+            token = frame_blob_store.put(frame['data'], frame['file'].content_type)
+            tokens.append(token)
+            return f"{base_url}{reverse('zoom:frame_blob', args=[token])}"
+
+        return get_source_url, tokens
+
+    def _release_frame(self, tokens):
+        for token in tokens:
+            frame_blob_store.delete(token)
+
+    def _save_frame_result(self, session, frame, result):
+        """분석 기록 저장 (경고 프레임은 파일로 보관)"""
+        record = save_analysis_record(
+            user=self.user,
+            analysis_type='zoom',
+            result=result,
+            file_name=frame['name'],
+            file_size=len(frame['data']),
+            file_format=frame['file_format']
+        )
+
+        if settings.ZOOM_RETAIN_ALERT_FRAMES and record.analysis_result in ['suspicious', 'deepfake']:
+            self._retain_frame(session, frame['file'], record)
+
+        store_stage_timings(record)
+        return {'success': True, 'record': record, 'result': result}
+
+    def _retain_frame(self, session, screenshot, record):
+        """경고가 난 프레임만 파일로 남겨 기록과 연결"""
+        media_file = FileService(self.user).upload_file(
+            uploaded_file=screenshot,
+            file_type='screenshot',
+            purpose='zoom',
+            metadata={'session_id': session.session_id, 'retained_on_alert': True},
+            use_s3=False,
+            normalize=False  # 분석 전에 이미 정규화됨
+        )
+        link_media_file(media_file, record)
+
+        record.original_path = media_file.file_path
+        with stage('persist'):
+            record.save(update_fields=['original_path', 'updated_at'])
+
+    def _analyze_from_disk(self, session, screenshot):
+        """임시 파일 저장 → 로컬 경로로 분석 → 삭제"""
+        media_file, full_path = self._upload_frame(session, screenshot)
+
+        # ✅ 공통 파이프라인으로 분석 (AI 분석 1회 + 기록 저장)
+        outcome = analyze_media_file(
+            user=self.user,
+            media_file=media_file,
+            analysis_type='zoom',
+            source_url=full_path
+        )
+
+        # ✅ 임시 파일 즉시 삭제
+        FileService(self.user).delete_file(media_file.file_id, hard_delete=True)
+
+        return outcome
+
+    async def _aanalyze_from_disk(self, session, screenshot):
+        """_analyze_from_disk 의 async 버전"""
+        media_file, full_path = await database_sync_to_async(self._upload_frame)(session, screenshot)
+
+        outcome = await aanalyze_media_file(
+            user=self.user,
+            media_file=media_file,
+            analysis_type='zoom',
+            source_url=full_path
+        )
+
+        await database_sync_to_async(FileService(self.user).delete_file)(media_file.file_id, hard_delete=True)
+
+        return outcome
+
+    def _upload_frame(self, session, screenshot):
+        """
+        임시 파일 저장
+
+        Returns:
+            tuple: (MediaFile, 로컬 전체 경로)
+        """
+        # ✅ 통합 파일 업로드
+        media_file = upload_for_detection(
+            user=self.user,
+            uploaded_file=screenshot,
+            file_type='screenshot',
+            purpose='zoom',
+            use_s3=False,
+            metadata={'session_id': session.session_id}
+        )
+        return media_file, os.path.join(settings.MEDIA_ROOT, media_file.file_path)
+
+    def _record_capture(self, session, record, participant_count, is_deduplicated,
+                        frame_hash=None):
+        """ZoomCapture 기록 + 세션 통계 갱신"""
+        is_deepfake = record.analysis_result in ['suspicious', 'deepfake']
+
+        # 세션 통계 갱신 (같은 세션의 프레임이 동시에 처리될 수 있으므로 F() 사용)
+        updates = {
+            'total_captures': F('total_captures') + 1,
+            'suspicious_detections': F('suspicious_detections') + int(is_deepfake),
+        }
+        if is_deduplicated:
+            updates['dedup_streak'] = F('dedup_streak') + 1
+        else:
+            # 이후 캡처의 비교 기준 갱신
+            updates['last_frame_hash'] = frame_hash
+            updates['last_analyzed_record'] = record
+            updates['dedup_streak'] = 0
+
+        with stage('persist'):
+            capture = ZoomCapture.objects.create(
+                session=session,
+                record=record,
+                participant_count=participant_count,
+                alert_triggered=is_deepfake,
+                is_deduplicated=is_deduplicated
+            )
+            ZoomSession.objects.filter(session_id=session.session_id).update(**updates)
+
+        return {
+            'success': True,
+            'capture': capture,
+            'result': {
+                'capture_id': capture.capture_id,
+                'is_deepfake': is_deepfake,
+                'confidence_score': float(record.confidence_score),
+                'analysis_result': record.analysis_result,
+                'alert_triggered': is_deepfake,
+                'is_deduplicated': is_deduplicated
+            }
+        }
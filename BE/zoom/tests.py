@@ -1,3 +1,332 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.error import HTTPError
+from urllib.request import urlopen
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import LiveServerTestCase, SimpleTestCase, TransactionTestCase, override_settings
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from media_files.storage import S3Storage
+from users.models import User
+from .checks import check_frame_transport
+from .consumers import CLOSE_SESSION_NOT_FOUND, CLOSE_UNAUTHORIZED, ZoomCaptureConsumer
+from .models import ZoomSession
+
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class FetchingAIServerHandler(BaseHTTPRequestHandler):
+    """InputUrl 을 실제로 내려받는 AI 서버 스텁 (/health, /detect_deepfake)"""
+
+    def do_GET(self):
+        self._send_json({'status': 'ok'})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        try:
+            with urlopen(body['InputUrl'], timeout=5) as response:
+                self.server.fetches.append((body['InputUrl'], response.status, response.read()))
+        except HTTPError as e:
+            self.server.fetches.append((body['InputUrl'], e.code, b''))
+
+        self._send_json({
+            'face_count': 1,
+            'face_quality_scores': [{'face_id': 1, 'rate': 0.9, 'is_deepfake': False, 'ResultUrl': None}]
+        })
+
+    def _send_json(self, body):
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_frame(color='green'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 32), color=color).save(buffer, format='JPEG')
+    return SimpleUploadedFile('frame.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+class FrameTransportCheckTest(SimpleTestCase):
+    """메모리 전달 모드는 워커 간 공유 캐시가 있어야 시스템 체크를 통과"""
+
+    @override_settings(ZOOM_FRAME_TRANSPORT='memory', CACHES=LOCMEM_CACHES)
+    def test_memory_transport_requires_shared_cache(self):
+        self.assertEqual([error.id for error in check_frame_transport(None)], ['zoom.E001'])
+
+    @override_settings(ZOOM_FRAME_TRANSPORT='memory', CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp/zoom-frames'}
+    })
+    def test_memory_transport_with_shared_cache(self):
+        self.assertEqual(check_frame_transport(None), [])
+
+    @override_settings(ZOOM_FRAME_TRANSPORT='file', CACHES=LOCMEM_CACHES)
+    def test_file_transport_needs_no_cache(self):
+        self.assertEqual(check_frame_transport(None), [])
+
+    @override_settings(VIDEO_SAMPLING_ENABLED=True, VIDEO_SAMPLING_FRAME_TRANSPORT='memory', CACHES=LOCMEM_CACHES)
+    def test_sampling_memory_transport_requires_shared_cache(self):
+        self.assertEqual([error.id for error in check_frame_transport(None)], ['zoom.E002'])
+
+
+class FrameBlobFetchTest(LiveServerTestCase):
+    """메모리 전달 모드: AI 서버가 토큰 URL(ZoomFrameBlobView)로 프레임을 가져가고, 분석 후 토큰은 사라짐"""
+
+    client_class = APIClient
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FetchingAIServerHandler)
+        cls.server.fetches = []
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.fetches.clear()
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+
+        host, port = self.server.server_address
+        # 테스트 프로세스 하나에서 라이브 서버 스레드와 캐시를 공유
+        settings_override = override_settings(
+            FASTAPI_URL=f'http://{host}:{port}',
+            MEDIA_ROOT=media_root,
+            ZOOM_FRAME_TRANSPORT='memory',
+            ZOOM_FRAME_BASE_URL=self.live_server_url,
+            SYSTEM_LOG_ASYNC=False
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        for name, value in [('upload', True), ('delete', True)]:
+            patcher = mock.patch.object(S3Storage, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user(email='zoom@test.com', password='testpass123!', nickname='zoom')
+        self.client.force_authenticate(self.user)
+
+    def test_model_server_fetches_frame_by_token(self):
+        session = ZoomSession.objects.create(
+            user=self.user,
+            session_name='면접',
+            start_time='2025-01-01T00:00:00Z'
+        )
+
+        response = self.client.post(
+            f'/api/zoom/sessions/{session.session_id}/capture/',
+            {'screenshot': make_frame(), 'participant_count': 2},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(self.server.fetches), 1)
+        url, status_code, frame = self.server.fetches[0]
+        self.assertTrue(url.startswith(f'{self.live_server_url}/api/zoom/frames/'))
+        self.assertEqual(status_code, 200)
+        self.assertEqual(Image.open(io.BytesIO(frame)).format, 'JPEG')
+
+        # 분석이 끝난 프레임은 바로 삭제
+        with self.assertRaises(HTTPError) as raised:
+            urlopen(url, timeout=5)
+        self.assertEqual(raised.exception.code, 404)
+
+
+def run_consumer(session_id, messages, query_string=b'', headers=()):
+    """가짜 ASGI receive/send 로 컨슈머 실행 (보낸 메시지 목록 반환)"""
+    sent = []
+
+    async def run():
+        inbox = list(messages)
+
+        async def receive():
+            return inbox.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            'type': 'websocket',
+            'path': f'/ws/zoom/sessions/{session_id}/',
+            'query_string': query_string,
+            'headers': list(headers),
+        }
+        await ZoomCaptureConsumer(scope, receive, send, str(session_id))()
+
+    async_to_sync(run)()
+    return sent
+
+
+class ZoomCaptureConsumerConnectTest(TransactionTestCase):
+    """WebSocket 연결: 토큰 인증(4401), 진행 중인 세션 확인(4404)"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='ws@test.com', password='testpass123!', nickname='ws')
+        self.token = Token.objects.create(user=self.user)
+        self.session = ZoomSession.objects.create(
+            user=self.user,
+            session_name='면접',
+            start_time='2025-01-01T00:00:00Z'
+        )
+
+    def test_missing_or_invalid_token_is_rejected(self):
+        for query_string in [b'', b'token=forged']:
+            sent = run_consumer(self.session.session_id, [{'type': 'websocket.connect'}], query_string)
+            self.assertEqual(sent, [{'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED}])
+
+    def test_unknown_session_is_rejected(self):
+        other = User.objects.create_user(email='other@test.com', password='testpass123!', nickname='other')
+        other_session = ZoomSession.objects.create(
+            user=other,
+            session_name='다른 사용자',
+            start_time='2025-01-01T00:00:00Z'
+        )
+
+        for session_id in [999999, other_session.session_id]:
+            sent = run_consumer(
+                session_id,
+                [{'type': 'websocket.connect'}],
+                f'token={self.token.key}'.encode()
+            )
+            self.assertEqual(sent, [{'type': 'websocket.close', 'code': CLOSE_SESSION_NOT_FOUND}])
+
+    def test_header_token_connects_and_answers_ping(self):
+        sent = run_consumer(
+            self.session.session_id,
+            [
+                {'type': 'websocket.connect'},
+                {'type': 'websocket.receive', 'text': json.dumps({'type': 'ping'})},
+                {'type': 'websocket.disconnect', 'code': 1000},
+            ],
+            b'participants=3',
+            headers=[(b'authorization', f'Token {self.token.key}'.encode())]
+        )
+
+        self.assertEqual(sent[0], {'type': 'websocket.accept'})
+        self.assertEqual(
+            [json.loads(message['text']) for message in sent[1:]],
+            [
+                {'type': 'ready', 'session_id': self.session.session_id, 'max_in_flight': settings.ZOOM_WS_MAX_IN_FLIGHT},
+                {'type': 'pong'},
+            ]
+        )
+
+
+class ZoomCaptureConsumerFlowTest(SimpleTestCase):
+    """프레임 흐름: 동시 처리 수 제한, 최신 프레임만 대기, 종료 시 처리 중 프레임 마무리"""
+
+    def make_consumer(self, max_in_flight=1):
+        self.sent = []
+
+        async def send(message):
+            self.sent.append(message)
+
+        consumer = ZoomCaptureConsumer({'type': 'websocket', 'headers': []}, None, send, '1')
+        consumer.max_in_flight = max_in_flight
+        return consumer
+
+    def block_frames(self, consumer):
+        """process_frame 대신 release 될 때까지 기다리는 가짜 분석 (시작한 프레임 기록)"""
+        started = []
+        releases = {}
+
+        async def process_frame(frame, sequence):
+            started.append(frame)
+            releases[frame] = asyncio.Event()
+            await releases[frame].wait()
+
+        consumer.process_frame = process_frame
+        return started, releases
+
+    def test_latest_frame_waits_and_older_pending_frames_are_dropped(self):
+        async def scenario():
+            consumer = self.make_consumer(max_in_flight=1)
+            started, releases = self.block_frames(consumer)
+
+            for frame in [b'a', b'b', b'c']:
+                consumer.submit_frame(frame)
+            await asyncio.sleep(0)
+
+            self.assertEqual(started, [b'a'])
+            self.assertEqual(len(consumer.in_flight), 1)
+            self.assertEqual((consumer.pending_frame, consumer.dropped_frames), (b'c', 1))
+
+            releases[b'a'].set()
+            for _ in range(3):
+                await asyncio.sleep(0)
+
+            self.assertEqual(started, [b'a', b'c'])
+            self.assertIsNone(consumer.pending_frame)
+            self.assertEqual(consumer.sequence, 2)
+
+            releases[b'c'].set()
+            await asyncio.gather(*consumer.in_flight)
+
+        async_to_sync(scenario)()
+
+    def test_disconnect_drains_in_flight_and_discards_pending(self):
+        async def scenario():
+            consumer = self.make_consumer(max_in_flight=2)
+            started, releases = self.block_frames(consumer)
+
+            for frame in [b'a', b'b', b'c']:
+                consumer.submit_frame(frame)
+            await asyncio.sleep(0)
+
+            disconnect = asyncio.ensure_future(consumer.disconnect())
+            await asyncio.sleep(0)
+            self.assertFalse(disconnect.done())
+
+            releases[b'a'].set()
+            releases[b'b'].set()
+            await disconnect
+
+            # 대기 프레임은 시작하지 않음
+            self.assertEqual(started, [b'a', b'b'])
+            self.assertFalse(consumer.in_flight)
+            self.assertIsNone(consumer.pending_frame)
+
+        async_to_sync(scenario)()
+
+    def test_frame_task_exceptions_are_logged(self):
+        async def scenario():
+            consumer = self.make_consumer()
+
+            async def process_frame(frame, sequence):
+                raise ConnectionResetError('client went away')
+
+            consumer.process_frame = process_frame
+            consumer.submit_frame(b'a')
+            await asyncio.gather(*consumer.in_flight, return_exceptions=True)
+            await asyncio.sleep(0)
+            self.assertFalse(consumer.in_flight)
+
+        with self.assertLogs('zoom.consumers', 'ERROR') as logs:
+            async_to_sync(scenario)()
+
+        self.assertIn('client went away', '\n'.join(logs.output))
@@ -1,7 +1,10 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     ZoomSessionStartView,
     ZoomCaptureView,
+    AsyncZoomCaptureView,
+    ZoomFrameBlobView,
     ZoomSessionEndView,
     ZoomSessionListView,
     ZoomSessionDetailView,
@@ -18,7 +21,13 @@ urlpatterns = [
     path('sessions/<int:pk>/', ZoomSessionDetailView.as_view(), name='session_detail'),
     
     # 캡처 분석
-    path('sessions/<int:session_id>/capture/', ZoomCaptureView.as_view(), name='capture'),
+    # ✅ ASGI 배포에서는 AI 응답을 await 하는 async 뷰
+    path(
+        'sessions/<int:session_id>/capture/',
+        (AsyncZoomCaptureView if settings.ASYNC_VIEWS_ENABLED else ZoomCaptureView).as_view(),
+        name='capture'
+    ),
+    path('frames/<str:token>/', ZoomFrameBlobView.as_view(), name='frame_blob'),
     
     # 보고서
     path('sessions/<int:session_id>/report/', ZoomSessionReportView.as_view(), name='report'),
@@ -1,7 +1,9 @@
 from rest_framework import status, generics
 from rest_framework.response import Response
+from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
 from django.conf import settings
+from django.http import HttpResponse
 from django.utils import timezone
 import os
 
@@ -12,9 +14,11 @@ from .serializers import (
     ZoomSessionStartSerializer,
     ZoomCaptureRequestSerializer
 )
-from detection.models import AnalysisRecord
-from detection.services import AIModelService
-from media_files.services import FileService
+from .frames import frame_blob_store
+from .services import ZoomCaptureService
+from config.async_api import AsyncAPIView, database_sync_to_async
+from media_files.timing import collect_timings, stage
+from config.pagination import KeysetPagination
 
 
 class ZoomSessionStartView(APIView):
@@ -48,10 +52,13 @@ class ZoomSessionStartView(APIView):
 class ZoomCaptureView(APIView):
     """Zoom 캡처 분석 API"""
     
+    @collect_timings('zoom.capture')
     def post(self, request, session_id):
         serializer = ZoomCaptureRequestSerializer(data=request.data)
         
-        if not serializer.is_valid():
+        with stage('validate'):
+            is_valid = serializer.is_valid()
+        if not is_valid:
             return Response(
                 serializer.errors,
                 status=status.HTTP_400_BAD_REQUEST
@@ -60,117 +67,113 @@ class ZoomCaptureView(APIView):
         screenshot = serializer.validated_data['screenshot']
         participant_count = serializer.validated_data['participant_count']
         
+        capture_service = ZoomCaptureService(request.user)
+        
         # 세션 확인
         try:
-            session = ZoomSession.objects.get(
-                session_id=session_id,
-                user=request.user,
-                session_status='active'
-            )
+            session = capture_service.get_active_session(session_id)
         except ZoomSession.DoesNotExist:
             return Response(
                 {'error': '활성화된 세션을 찾을 수 없습니다.'},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # ✅ FileService 사용
-        file_service = FileService(request.user)
-        
+        # ✅ 중복 프레임 판정 → AI 분석 → 캡처 기록 (실시간 채널과 공용)
         try:
-            # ✅ 통합 파일 업로드
-            media_file = file_service.upload_file(
-                uploaded_file=screenshot,
-                file_type='screenshot',
-                purpose='zoom',
-                is_temporary=True,  # 분석 후 삭제
-                metadata={'session_id': session_id},
-                use_s3=False
+            outcome = capture_service.process_frame(
+                session,
+                screenshot,
+                participant_count,
+                base_url=request.build_absolute_uri('/')
             )
-            
-            # AI 분석
-            ai_service = AIModelService()
-            full_path = os.path.join(settings.MEDIA_ROOT, media_file.file_path)
-            result = ai_service.analyze_image(full_path)
-            
-            if not result['success']:
-                return Response(
-                    {'error': result['error']},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-            
-            # ✅ 새로운 API 명세에 맞춰 분석 결과 계산
-            if 'face_quality_scores' in result:
-                # 새로운 다중 얼굴 감지 방식
-                face_scores = result['face_quality_scores']
-                is_any_deepfake = any(face['is_deepfake'] for face in face_scores)
-                avg_confidence = sum(face['rate'] for face in face_scores) / len(face_scores) if face_scores else 0
-                
-                # 분석 결과 결정
-                if is_any_deepfake:
-                    analysis_result = 'deepfake' if avg_confidence >= 0.8 else 'suspicious'
-                else:
-                    analysis_result = 'safe'
-                
-                confidence_score = avg_confidence * 100  # 0-100 스케일
-                detection_details = face_scores
-            else:
-                # 이전 방식 (하위 호환)
-                analysis_result = result.get('analysis_result', 'safe')
-                confidence_score = result.get('confidence_score', 0)
-                detection_details = None
-            
-            # 분석 기록 저장
-            record = AnalysisRecord.objects.create(
-                user=request.user,
-                analysis_type='zoom',
-                file_name=media_file.original_name,
-                file_size=media_file.file_size,
-                file_format=media_file.file_format,
-                original_path=media_file.file_path,
-                analysis_result=analysis_result,
-                confidence_score=confidence_score,
-                detection_details=detection_details,
-                processing_time=result['processing_time'],
-                ai_model_version='v1.0'
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            
-            # ✅ 관계 연결
-            media_file.related_model = 'AnalysisRecord'
-            media_file.related_record_id = record.record_id
-            media_file.save()
-            
-            # Zoom 캡처 기록
-            is_deepfake = analysis_result in ['suspicious', 'deepfake']
-            
-            capture = ZoomCapture.objects.create(
-                session=session,
-                record=record,
-                participant_count=participant_count,
-                alert_triggered=is_deepfake
+        
+        if not outcome['success']:
+            return Response(
+                {'error': outcome['error']},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-            
-            # 세션 통계 업데이트
-            session.total_captures += 1
-            if is_deepfake:
-                session.suspicious_detections += 1
-            session.save()
-            
-            # ✅ 임시 파일 즉시 삭제
-            file_service.delete_file(media_file.file_id, hard_delete=True)
-            
-            return Response({
-                'capture_id': capture.capture_id,
-                'is_deepfake': is_deepfake,
-                'confidence_score': float(confidence_score),  # ← 변수 사용!
-                'analysis_result': analysis_result,  # ← 변수 사용!
-                'alert_triggered': is_deepfake
-            }, status=status.HTTP_201_CREATED)
         
+        return Response(outcome['result'], status=status.HTTP_201_CREATED)
+
+
+class AsyncZoomCaptureView(AsyncAPIView):
+    """Zoom 캡처 분석 API async 버전 (ASYNC_VIEWS_ENABLED, ASGI 배포)"""
+    
+    @collect_timings('zoom.capture')
+    async def post(self, request, session_id):
+        serializer = ZoomCaptureRequestSerializer(data=request.data)
+        
+        with stage('validate'):
+            is_valid = await database_sync_to_async(serializer.is_valid)()
+        if not is_valid:
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        screenshot = serializer.validated_data['screenshot']
+        participant_count = serializer.validated_data['participant_count']
+        
+        capture_service = ZoomCaptureService(request.user)
+        
+        try:
+            session = await database_sync_to_async(capture_service.get_active_session)(session_id)
+        except ZoomSession.DoesNotExist:
+            return Response(
+                {'error': '활성화된 세션을 찾을 수 없습니다.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        # ✅ AI 분석은 await, 중복 판정/기록은 스레드 풀
+        try:
+            outcome = await capture_service.aprocess_frame(
+                session,
+                screenshot,
+                participant_count,
+                base_url=request.build_absolute_uri('/')
+            )
         except ValueError as e:
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        
+        if not outcome['success']:
+            return Response(
+                {'error': outcome['error']},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        return Response(outcome['result'], status=status.HTTP_201_CREATED)
+
+
+class ZoomFrameBlobView(APIView):
+    """
+    메모리 전달 모드의 캡처 프레임 제공 (AI 서버 전용)
+    
+    토큰은 추측할 수 없고 분석이 끝나면 바로 삭제되므로 인증 없이 제공한다.
+    """
+    
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    
+    def get(self, request, token):
+        blob = frame_blob_store.get(token)
+        if blob is None:
+            return Response(
+                {'error': '프레임을 찾을 수 없습니다.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        frame, content_type = blob
+        response = HttpResponse(frame, content_type=content_type or 'application/octet-stream')
+        response['Cache-Control'] = 'no-store'
+        return response
 
 
 class ZoomSessionEndView(APIView):
@@ -204,6 +207,9 @@ class ZoomSessionListView(generics.ListAPIView):
     """Zoom 세션 목록 조회 API"""
     
     serializer_class = ZoomSessionSerializer
+    # ✅ ?pagination=cursor 면 키셋 커서 페이지네이션 (기본은 페이지 번호)
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-start_time', '-session_id')
     
     def get_queryset(self):
         queryset = ZoomSession.objects.filter(user=self.request.user)